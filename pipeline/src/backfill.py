@@ -0,0 +1,363 @@
+import argparse
+import logging
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from pydantic import BaseModel
+
+from src.config import Settings
+from src.graph import (
+    GetFile,
+    InsertDataIntoBigQuery,
+    LoadPDF,
+    MergeResults,
+    NormalizeText,
+    PaperRecord,
+    PipelineState,
+    load_payload,
+    merge_record,
+    payload_scope,
+    release_payload
+)
+from src.graph.find_near_duplicate_node import adapt_record
+from src.tasks.check_processed_paper import check_processed_papers
+from src.tasks.extract_key_research_findings_and_methodology import key_research_findings_and_methodology_request
+from src.tasks.extract_metadata import METADATA_SCHEMA, metadata_request
+from src.tasks.extract_summary_and_keywords import summary_and_keywords_request, summary_request
+from src.tasks.prompts import TaskRequest
+from src.utils.batch_prediction import (
+    BatchJobClient,
+    BatchRequest,
+    BatchResult,
+    get_batch_job_client,
+    run_batch_prediction
+)
+from src.utils.clients import get_storage_client
+from src.utils.json_utils import extract_json_object
+from src.utils.keywords import extract_keywords_batch
+from src.utils.near_duplicates import NearDuplicate, NearDuplicateIndex, minhash_signatures, near_duplicate_index
+from src.utils.pdf_metadata import extract_metadata_from_pdf
+from src.utils.usage import bind_paper_id, record_usage, track_usage
+from src.utils.vertex_ai_llama_client import build_chat_payload
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Files whose papers are checked at once (see `_prepare_papers`): their PDFs are held in memory
+# until the check.
+PREPARE_CHUNK_SIZE = 100
+
+
+class BackfillResult(BaseModel):
+    """
+    Outcome of a backfill.
+
+    Attributes:
+        processed (List[str]): Files processed and inserted into BigQuery.
+        skipped (List[str]): Files whose paper had already been processed.
+        failed (List[str]): Files that could not be processed.
+    """
+
+    processed: List[str] = []
+    skipped: List[str] = []
+    failed: List[str] = []
+
+
+class _Paper:
+    """A paper of a backfill: its pipeline state, partial record and pending LLM requests."""
+
+    def __init__(self, file_name: str, state: PipelineState):
+        self.file_name = file_name
+        self.state = state
+        self.paper_id: str = state["state"]["paper_id"]
+        self.record = PaperRecord()
+        self.failed_fields: List[str] = []
+        # Near duplicate whose fields are reused, and the paper of the backfill it is, if any
+        self.duplicate: Optional[NearDuplicate] = None
+        self.leader: Optional["_Paper"] = None
+        # Pending requests, with their batch request key and truncated input tokens
+        self.requests: List[Tuple[TaskRequest, BatchRequest, int]] = []
+
+
+def _run_node(node: Any, state: PipelineState) -> None:
+    """Run a pipeline node outside of the graph, merging its output into the state."""
+    state["state"].update(node(state)["state"])
+
+
+def _prepare_papers(file_names: Sequence[str], result: BackfillResult) -> List[_Paper]:
+    """
+    Run the nodes preceding the extraction branches: get the files, check their papers have not
+    been processed, extract and normalise their text.
+
+    The files are prepared in chunks of `PREPARE_CHUNK_SIZE`: the papers of a chunk are checked
+    all at once (see `check_processed_papers`), rather than with one query per paper, so its
+    files are all fetched first. Only the text of the papers is kept: the PDF of a paper is
+    released once its text is extracted, so that at most a chunk of PDFs is held in memory. The
+    files of the processed papers, and the copies of a file of the backfill (same paper ID), are
+    added to the skipped files of the result, and the files that could not be prepared to its
+    failed files.
+
+    Returns:
+        List[_Paper]: The papers to extract.
+    """
+    papers: List[_Paper] = []
+    paper_ids: Set[str] = set()
+    for start in range(0, len(file_names), PREPARE_CHUNK_SIZE):
+        papers.extend(_prepare_chunk(file_names[start:start + PREPARE_CHUNK_SIZE], paper_ids, result))
+    return papers
+
+
+def _prepare_chunk(file_names: Sequence[str], paper_ids: Set[str], result: BackfillResult) -> List[_Paper]:
+    """Prepare a chunk of the files of a backfill (see `_prepare_papers`)."""
+    states: List[Tuple[str, PipelineState]] = []
+    for file_name in file_names:
+        state: PipelineState = {"state": {}}
+        try:
+            _run_node(GetFile(file_name), state)
+        except Exception as e:
+            logger.error(f"Failed to get file {file_name}: {e}")
+            result.failed.append(file_name)
+            continue
+        # Files with the same content are the same paper: it is only extracted once
+        if state["state"]["paper_id"] in paper_ids:
+            logger.info(f"File {file_name} is a copy of paper ID {state['state']['paper_id']}, skipping it")
+            release_payload(state["state"]["file"])
+            result.skipped.append(file_name)
+            continue
+        paper_ids.add(state["state"]["paper_id"])
+        states.append((file_name, state))
+
+    try:
+        processed = check_processed_papers([state["state"]["paper_id"] for _, state in states])
+    except Exception as e:
+        logger.error(f"Failed to check the processed papers: {e}")
+        for file_name, state in states:
+            release_payload(state["state"]["file"])
+            result.failed.append(file_name)
+        return []
+
+    papers = []
+    for file_name, state in states:
+        if state["state"]["paper_id"] in processed:
+            release_payload(state["state"]["file"])
+            result.skipped.append(file_name)
+            continue
+        try:
+            # LoadPDF releases the PDF once its text is extracted
+            _run_node(LoadPDF(), state)
+            _run_node(NormalizeText(), state)
+            papers.append(_Paper(file_name, state))
+        except Exception as e:
+            logger.error(f"Failed to prepare file {file_name}: {e}")
+            release_payload(state["state"].get("file"))
+            result.failed.append(file_name)
+    return papers
+
+
+def _find_near_duplicates(papers: List[_Paper], settings: Settings) -> None:
+    """
+    Look up the papers in the near-duplicate index (see `FindNearDuplicate`), with their
+    signatures computed in one batch. A paper similar to an earlier paper of the backfill follows
+    it: it reuses its fields once they are extracted.
+    """
+    texts = [load_payload(paper.state["state"]["text"]) for paper in papers]
+    index = near_duplicate_index(settings)
+    leaders = NearDuplicateIndex()
+    by_id: Dict[str, _Paper] = {}
+    for paper, signature in zip(papers, minhash_signatures(texts)):
+        paper.state["state"]["minhash"] = signature
+        paper.duplicate = index.query(signature, settings.near_duplicate_threshold)
+        if paper.duplicate is None:
+            paper.duplicate = leaders.query(signature, settings.near_duplicate_threshold)
+            if paper.duplicate is None:
+                leaders.add(paper.paper_id, signature, {})
+                by_id[paper.paper_id] = paper
+                continue
+            paper.leader = by_id[paper.duplicate.paper_id]
+        paper.state["state"]["duplicate_of"] = paper.duplicate.paper_id
+        logger.info(
+            f"Paper ID {paper.paper_id} is a near duplicate of paper ID {paper.duplicate.paper_id} "
+            f"(similarity {paper.duplicate.similarity:.2f}), reusing its fields"
+        )
+
+
+def _reuse_fields(paper: _Paper) -> None:
+    """Fill the record of a near-duplicate paper with the (adapted) fields of its duplicate."""
+    duplicate = paper.duplicate
+    if paper.leader is not None:
+        duplicate = duplicate.model_copy(update={"record": paper.leader.record.to_dict()})
+        paper.failed_fields = list(paper.leader.failed_fields)
+    text = load_payload(paper.state["state"]["text"])
+    page_lengths = paper.state["state"].get("page_lengths") or [0]
+    merge_record(paper.record, adapt_record(duplicate, paper.state["state"].get("document_info"), text[:page_lengths[0]]))
+
+
+def _task_requests(paper: _Paper, text: str, settings: Settings) -> List[TaskRequest]:
+    """
+    Fill the fields extracted without an LLM (see `extract_metadata_from_pdf`), and return the
+    extraction requests of the remaining ones.
+    """
+    page_lengths = paper.state["state"].get("page_lengths") or [0]
+    metadata = extract_metadata_from_pdf(paper.state["state"].get("document_info"), text[:page_lengths[0]])
+    merge_record(paper.record, {field: value for field, value in metadata.items() if value is not None})
+
+    missing = [field for field in METADATA_SCHEMA["required"] if metadata[field] is None]
+    requests = [metadata_request(text, missing)] if missing else []
+    requests.append(summary_request(text) if settings.keyword_extractor == "local" else summary_and_keywords_request(text))
+    requests.append(key_research_findings_and_methodology_request(text))
+    return requests
+
+
+def _apply_result(
+    paper: _Paper,
+    request: TaskRequest,
+    batch_request: BatchRequest,
+    truncated_tokens: int,
+    result: Optional[BatchResult]
+) -> None:
+    """
+    Record the usage of a batch prediction result, and merge its fields into the paper record.
+    The fields of a failed request are reported as failed.
+    """
+    fields: Dict[str, Any] = {field: None for field in request.fields}
+    if result is None or result.content is None:
+        logger.error(
+            f"Batch prediction of '{request.name}' failed for paper ID {paper.paper_id}: "
+            f"{result.error if result else 'no result'}"
+        )
+        paper.failed_fields.extend(request.fields)
+    else:
+        record_usage(
+            result.usage,
+            "".join(message["content"] for message in batch_request.payload["messages"]),
+            result.content,
+            model=batch_request.payload["model"],
+            latency=0.0,
+            task=request.task,
+            truncated_tokens=truncated_tokens
+        )
+        try:
+            fields = extract_json_object(result.content, fields=request.fields)
+        except Exception as e:
+            logger.error(f"Error parsing '{request.name}' for paper ID {paper.paper_id}: {e}")
+            paper.failed_fields.extend(request.fields)
+    merge_record(paper.record, fields)
+
+
+def run_backfill(
+    file_names: Sequence[str],
+    client: Optional[BatchJobClient] = None,
+    settings: Optional[Settings] = None
+) -> BackfillResult:
+    """
+    Process papers with batch prediction jobs instead of synchronous LLM requests.
+
+    The papers go through the pipeline nodes up to the text normalisation, one at a time, with
+    a processed paper check per chunk of files (see `_prepare_papers`). The
+    extraction requests of all the papers are then run as batch prediction jobs (see
+    `run_batch_prediction`), which are not subject to the online quotas and are billed at a
+    discount, and the parsed results go through `MergeResults` and `InsertDataIntoBigQuery`.
+    With the `local` keyword extractor, the keywords are weighted across the whole backfill
+    (see `extract_keywords_batch`).
+
+    If the `near_duplicate_threshold` setting is set, the near duplicates of indexed papers, or
+    of earlier papers of the backfill, have no extraction requests: they reuse the fields of
+    their duplicate (see `FindNearDuplicate`).
+
+    Batch predictions report no per-request latency: their usage is recorded with a latency of 0.
+
+    Args:
+        file_names (Sequence[str]): Names of the files in the bucket.
+        client (Optional[BatchJobClient]): Batch prediction job client. Defaults to the client
+            configured with the `batch_job_client` setting.
+        settings (Optional[Settings]): The pipeline settings.
+
+    Returns:
+        BackfillResult: The processed, skipped and failed files.
+    """
+    settings = settings or Settings()
+    client = client or get_batch_job_client(settings)
+    result = BackfillResult()
+
+    with track_usage(), payload_scope():
+        papers = _prepare_papers(file_names, result)
+
+        if settings.near_duplicate_threshold is not None:
+            _find_near_duplicates(papers, settings)
+        extracted = [paper for paper in papers if paper.duplicate is None]
+
+        if settings.keyword_extractor == "local":
+            texts = [load_payload(paper.state["state"]["text"]) for paper in extracted]
+            for paper, keywords in zip(extracted, extract_keywords_batch(texts, settings.keyword_count)):
+                merge_record(paper.record, {"keywords": keywords or None})
+            del texts
+
+        for paper in extracted:
+            text = load_payload(paper.state["state"]["text"])
+            for request in _task_requests(paper, text, settings):
+                payload, truncated_tokens = build_chat_payload(
+                    request.messages, settings, request.response_format, request.task, text
+                )
+                paper.requests.append(
+                    (request, BatchRequest(key=f"{paper.paper_id}/{request.name}", payload=payload), truncated_tokens)
+                )
+            # The requests hold the text: it is only read again to cache the text of a paper with failed fields
+            if not settings.text_cache_bucket_name:
+                release_payload(paper.state["state"]["text"])
+                paper.state["state"]["text"] = None
+
+        batch_requests = [batch_request for paper in papers for _, batch_request, _ in paper.requests]
+        logger.info(f"Running {len(batch_requests)} batch prediction requests for {len(papers)} papers")
+        try:
+            results = run_batch_prediction(batch_requests, client, settings) if batch_requests else {}
+        except Exception as e:
+            logger.error(f"Batch prediction failed: {e}")
+            result.failed.extend(paper.file_name for paper in papers)
+            return result
+
+        for paper in papers:
+            try:
+                with bind_paper_id(paper.paper_id):
+                    for request, batch_request, truncated_tokens in paper.requests:
+                        _apply_result(paper, request, batch_request, truncated_tokens, results.get(batch_request.key))
+                    if paper.duplicate is not None:
+                        _reuse_fields(paper)
+                state: PipelineState = {
+                    "state": paper.state["state"],
+                    "record": paper.record,
+                    "failed_fields": paper.failed_fields
+                }
+                _run_node(MergeResults(), state)
+                _run_node(InsertDataIntoBigQuery(), state)
+                result.processed.append(paper.file_name)
+            except Exception as e:
+                logger.error(f"Failed to insert paper ID {paper.paper_id} from file {paper.file_name}: {e}")
+                result.failed.append(paper.file_name)
+
+    logger.info(
+        f"Backfill complete: {len(result.processed)} processed, {len(result.skipped)} skipped, "
+        f"{len(result.failed)} failed"
+    )
+    return result
+
+
+def list_files(prefix: str) -> List[str]:
+    """List the PDF files of the bucket under a prefix."""
+    bucket = get_storage_client().bucket(Settings().google_storage_bucket_name)
+    return [blob.name for blob in bucket.list_blobs(prefix=prefix) if blob.name.lower().endswith(".pdf")]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Backfill papers with Vertex AI batch prediction jobs.")
+    parser.add_argument("files", nargs="*", help="Names of the files in the bucket.")
+    parser.add_argument("--prefix", help="Process every PDF file of the bucket under this prefix.")
+    parser.add_argument("--papers-per-job", type=int, default=500, help="Papers per batch of prediction jobs.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    file_names = list(args.files) + (list_files(args.prefix) if args.prefix else [])
+    for start in range(0, len(file_names), args.papers_per_job):
+        run_backfill(file_names[start:start + args.papers_per_job])
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,53 @@
 import os
 from functools import lru_cache
-from pydantic import ConfigDict, Field
+from typing import Dict, List, Literal, Optional
+from pydantic import BaseModel, ConfigDict, Field
 from pydantic_settings import BaseSettings
 
+
+class ModelRule(BaseModel):
+    """
+    Model override applied to the requests of a task whose input text length is within a range.
+
+    Attributes:
+        min_chars (int): Minimum input text length, in characters (inclusive).
+        max_chars (Optional[int]): Maximum input text length, in characters (exclusive).
+            Unbounded if not set.
+        model (Optional[str]): Model name.
+        max_tokens (Optional[int]): Maximum number of completion tokens.
+        temperature (Optional[float]): Sampling temperature.
+        max_input_tokens (Optional[int]): Token budget of the input text.
+    """
+
+    min_chars: int = Field(0, ge=0)
+    max_chars: Optional[int] = Field(None, gt=0)
+    model: Optional[str] = None
+    max_tokens: Optional[int] = Field(None, gt=0)
+    temperature: Optional[float] = Field(None, ge=0)
+    max_input_tokens: Optional[int] = Field(None, gt=0)
+
+
+class TaskModelSettings(BaseModel):
+    """
+    Model and generation parameters of the requests of a task.
+
+    Attributes:
+        model (Optional[str]): Model name. Defaults to `vertex_ai_llama_model`.
+        max_tokens (Optional[int]): Maximum number of completion tokens. Defaults to the model's.
+        temperature (Optional[float]): Sampling temperature. Defaults to the model's.
+        max_input_tokens (Optional[int]): Token budget of the input text. Defaults to
+            `vertex_ai_max_input_tokens`.
+        rules (List[ModelRule]): Length-based overrides. The first rule matching the input text
+            length overrides the parameters it sets.
+    """
+
+    model: Optional[str] = None
+    max_tokens: Optional[int] = Field(None, gt=0)
+    temperature: Optional[float] = Field(None, ge=0)
+    max_input_tokens: Optional[int] = Field(None, gt=0)
+    rules: List[ModelRule] = []
+
+
 class Settings(BaseSettings):
     """
     Configuration settings for the pipeline.
@@ -16,8 +61,133 @@ class Settings(BaseSettings):
         vertex_ai_llama_model (str): The Llama model name served on Vertex AI API service.
         bigquery_dataset_id (str): The BigQuery dataset ID for storing extracted data.
         google_storage_bucket_name (str): The Google Cloud Storage bucket name for storing extracted data.
+        vertex_ai_request_timeout (float): Timeout, in seconds, of a single Vertex AI API request.
+        vertex_ai_max_retries (int): Number of retries of a failed Vertex AI API request.
+        vertex_ai_retry_backoff_base (float): Base delay, in seconds, of the exponential retry backoff.
+        vertex_ai_retry_backoff_max (float): Maximum delay, in seconds, between two retries. A request
+            whose Retry-After exceeds it is not retried.
+        vertex_ai_hedge_percentile (Optional[float]): Latency percentile after which a hedged
+            duplicate request is sent. Hedging is disabled if not set.
+        vertex_ai_hedge_max_workers (int): Maximum number of Vertex AI requests, primary or
+            hedged, running at once on the hedged request executor. No duplicate is sent when
+            every worker is busy.
+        vertex_ai_stream (bool): Whether to stream Vertex AI responses and stop reading as soon as
+            the JSON object in the response is complete.
+        vertex_ai_structured_output (bool): Whether to request JSON-schema-constrained output
+            (`response_format`) from the Vertex AI OpenAI-compatible endpoint.
+        telemetry_exporter (Optional[str]): Comma-separated OpenTelemetry span and metric
+            exporters (`console`, `file`, `otlp` or any registered one). Tracing and metrics are
+            disabled if not set.
+        telemetry_file_path (str): Output file of the `file` span exporter.
+        telemetry_metrics_file_path (str): Output file of the `file` metric exporter.
+        telemetry_metric_export_interval (float): Delay, in seconds, between two metric exports.
+        telemetry_service_name (str): Service name reported in the exported spans and metrics.
+        bigquery_store_llm_usage (bool): Whether to insert the LLM token usage of each paper into
+            the `llm_usage` BigQuery table, alongside the paper record.
+        prewarm_clients (bool): Whether to import the heavy dependencies and create the Google
+            Cloud clients in background threads as soon as the function instance starts.
+        payload_store (str): Store of the large pipeline payloads (PDF file and text) kept out of
+            the pipeline state: `memory` or `disk`.
+        payload_store_path (Optional[str]): Directory of the `disk` payload store. Defaults to a
+            new temporary directory.
+        vertex_ai_task_models (Dict[str, TaskModelSettings]): Model and generation parameters per
+            task (`metadata`, `summary_and_keywords`, `key_research_findings_and_methodology`), as
+            a JSON object. Tasks not listed use `vertex_ai_llama_model`.
+        keyword_extractor (str): Keyword extractor: `llm` (requested along with the summary) or
+            `local` (scored locally from the text, the LLM being only asked for the summary).
+        keyword_count (int): Maximum number of keywords extracted by the `local` extractor.
+        vertex_ai_max_input_tokens (Optional[int]): Token budget of the paper text embedded in
+            each prompt. Longer texts are truncated (see `fit_to_budget`). Unbounded if not set.
+        batch_job_client (str): Batch prediction job client of the backfills (`vertex_ai` or any
+            registered one).
+        batch_prediction_bucket_name (Optional[str]): Google Cloud Storage bucket of the batch
+            prediction job inputs and outputs. The bucket of the pipeline is used if not set.
+        batch_prediction_prefix (str): Prefix, in the batch prediction bucket, of the job inputs
+            and outputs. Objects under it are never processed as papers.
+        batch_prediction_poll_interval (float): Delay, in seconds, between two batch prediction
+            job status polls.
+        batch_prediction_timeout (float): Maximum duration, in seconds, of a batch prediction job.
+        graph_max_concurrency (Optional[int]): Maximum number of pipeline branches running at
+            once (thread pool default if not set).
+        graph_shared_executor (bool): Run the pipeline branches of all the invocations on one
+            long-lived thread pool, instead of a new pool per invocation.
+        text_cache_bucket_name (Optional[str]): Google Cloud Storage bucket of the cached texts
+            of the papers with failed fields, read by the repair mode. The texts are not cached
+            if not set. It should not be the bucket the pipeline is triggered on.
+        text_cache_prefix (str): Prefix, in the text cache bucket, of the cached texts. Objects
+            under it are never processed as papers.
+        near_duplicate_threshold (Optional[float]): Minimum estimated Jaccard similarity of the
+            text of a new paper with an indexed one for the new paper to reuse its extracted
+            fields, without LLM requests. Near-duplicate detection is disabled if not set.
+        near_duplicate_index_path (Optional[str]): Path of the near-duplicate index file. The
+            index is kept in memory, per instance, if not set.
+        work_queue (str): Work queue the worker pulls files from (`pubsub`, `sqlite` or any
+            registered one).
+        work_queue_subscription (Optional[str]): Pub/Sub subscription to the object
+            notifications of the bucket, as a name or a full `projects/.../subscriptions/...` path.
+        work_queue_path (str): Database file of the `sqlite` work queue.
+        worker_concurrency (int): Number of papers processed at once by the worker.
+        worker_prefetch (int): Number of messages the worker keeps pulled ahead, processing or
+            waiting for a free slot (at least `worker_concurrency`).
+        worker_ack_interval (float): Maximum delay, in seconds, before the worker acknowledges
+            the messages of the processed papers, in bulk.
+        worker_max_attempts (int): Number of deliveries of a message after which a failing paper
+            is acknowledged anyway, and given up.
+        worker_lease_seconds (float): Lease, in seconds, of the messages pulled by the worker,
+            extended every half lease until they are acknowledged, so that the papers being
+            processed or waiting for a slot are not delivered again (at most 600, the Pub/Sub
+            maximum ack deadline).
+        metadata_head_pages (Optional[int]): Number of first pages of the PDF the metadata is
+            extracted from, as soon as they are parsed, while the other pages are parsed. The
+            metadata is extracted from the whole text, with the other fields, if not set, or
+            when near duplicates are looked up (`near_duplicate_threshold`).
+        speculative_parse (bool): Parse the PDF while checking whether the paper has been
+            processed, rather than once it is known to be new: the check no longer delays new
+            papers, at the cost of a partial parse of the processed ones.
     """
 
     vertex_ai_llama_model: str = Field(..., json_schema_extra={'env': 'VERTEX_AI_LLAMA_MODEL'})
     bigquery_dataset_id: str = Field(..., json_schema_extra={'env': 'BIGQUERY_DATASET_ID'})
     google_storage_bucket_name: str = Field(..., json_schema_extra={'env': 'GOOGLE_STORAGE_BUCKET_NAME'})
+    vertex_ai_request_timeout: float = Field(30.0, json_schema_extra={'env': 'VERTEX_AI_REQUEST_TIMEOUT'})
+    vertex_ai_max_retries: int = Field(3, json_schema_extra={'env': 'VERTEX_AI_MAX_RETRIES'})
+    vertex_ai_retry_backoff_base: float = Field(1.0, json_schema_extra={'env': 'VERTEX_AI_RETRY_BACKOFF_BASE'})
+    vertex_ai_retry_backoff_max: float = Field(20.0, json_schema_extra={'env': 'VERTEX_AI_RETRY_BACKOFF_MAX'})
+    vertex_ai_hedge_percentile: Optional[float] = Field(None, json_schema_extra={'env': 'VERTEX_AI_HEDGE_PERCENTILE'})
+    vertex_ai_hedge_max_workers: int = Field(16, gt=0, json_schema_extra={'env': 'VERTEX_AI_HEDGE_MAX_WORKERS'})
+    vertex_ai_stream: bool = Field(False, json_schema_extra={'env': 'VERTEX_AI_STREAM'})
+    vertex_ai_structured_output: bool = Field(False, json_schema_extra={'env': 'VERTEX_AI_STRUCTURED_OUTPUT'})
+    telemetry_exporter: Optional[str] = Field(None, json_schema_extra={'env': 'TELEMETRY_EXPORTER'})
+    telemetry_file_path: str = Field("spans.jsonl", json_schema_extra={'env': 'TELEMETRY_FILE_PATH'})
+    telemetry_metrics_file_path: str = Field("metrics.jsonl", json_schema_extra={'env': 'TELEMETRY_METRICS_FILE_PATH'})
+    telemetry_metric_export_interval: float = Field(60.0, gt=0, json_schema_extra={'env': 'TELEMETRY_METRIC_EXPORT_INTERVAL'})
+    telemetry_service_name: str = Field("research-paper-pipeline", json_schema_extra={'env': 'TELEMETRY_SERVICE_NAME'})
+    bigquery_store_llm_usage: bool = Field(False, json_schema_extra={'env': 'BIGQUERY_STORE_LLM_USAGE'})
+    prewarm_clients: bool = Field(False, json_schema_extra={'env': 'PREWARM_CLIENTS'})
+    payload_store: str = Field("memory", json_schema_extra={'env': 'PAYLOAD_STORE'})
+    payload_store_path: Optional[str] = Field(None, json_schema_extra={'env': 'PAYLOAD_STORE_PATH'})
+    vertex_ai_task_models: Dict[str, TaskModelSettings] = Field({}, json_schema_extra={'env': 'VERTEX_AI_TASK_MODELS'})
+    keyword_extractor: Literal["llm", "local"] = Field("llm", json_schema_extra={'env': 'KEYWORD_EXTRACTOR'})
+    keyword_count: int = Field(10, gt=0, json_schema_extra={'env': 'KEYWORD_COUNT'})
+    vertex_ai_max_input_tokens: Optional[int] = Field(100000, gt=0, json_schema_extra={'env': 'VERTEX_AI_MAX_INPUT_TOKENS'})
+    batch_job_client: str = Field("vertex_ai", json_schema_extra={'env': 'BATCH_JOB_CLIENT'})
+    batch_prediction_bucket_name: Optional[str] = Field(None, json_schema_extra={'env': 'BATCH_PREDICTION_BUCKET_NAME'})
+    batch_prediction_prefix: str = Field("batch-prediction", json_schema_extra={'env': 'BATCH_PREDICTION_PREFIX'})
+    batch_prediction_poll_interval: float = Field(60.0, gt=0, json_schema_extra={'env': 'BATCH_PREDICTION_POLL_INTERVAL'})
+    batch_prediction_timeout: float = Field(86400.0, gt=0, json_schema_extra={'env': 'BATCH_PREDICTION_TIMEOUT'})
+    graph_max_concurrency: Optional[int] = Field(None, gt=0, json_schema_extra={'env': 'GRAPH_MAX_CONCURRENCY'})
+    graph_shared_executor: bool = Field(False, json_schema_extra={'env': 'GRAPH_SHARED_EXECUTOR'})
+    text_cache_bucket_name: Optional[str] = Field(None, json_schema_extra={'env': 'TEXT_CACHE_BUCKET_NAME'})
+    text_cache_prefix: str = Field("text-cache", json_schema_extra={'env': 'TEXT_CACHE_PREFIX'})
+    near_duplicate_threshold: Optional[float] = Field(None, gt=0, le=1, json_schema_extra={'env': 'NEAR_DUPLICATE_THRESHOLD'})
+    near_duplicate_index_path: Optional[str] = Field(None, json_schema_extra={'env': 'NEAR_DUPLICATE_INDEX_PATH'})
+    work_queue: str = Field("pubsub", json_schema_extra={'env': 'WORK_QUEUE'})
+    work_queue_subscription: Optional[str] = Field(None, json_schema_extra={'env': 'WORK_QUEUE_SUBSCRIPTION'})
+    work_queue_path: str = Field("work_queue.sqlite3", json_schema_extra={'env': 'WORK_QUEUE_PATH'})
+    worker_concurrency: int = Field(8, gt=0, json_schema_extra={'env': 'WORKER_CONCURRENCY'})
+    worker_prefetch: int = Field(16, gt=0, json_schema_extra={'env': 'WORKER_PREFETCH'})
+    worker_ack_interval: float = Field(1.0, ge=0, json_schema_extra={'env': 'WORKER_ACK_INTERVAL'})
+    worker_max_attempts: int = Field(5, gt=0, json_schema_extra={'env': 'WORKER_MAX_ATTEMPTS'})
+    worker_lease_seconds: float = Field(60.0, ge=10, le=600, json_schema_extra={'env': 'WORKER_LEASE_SECONDS'})
+    metadata_head_pages: Optional[int] = Field(None, gt=0, json_schema_extra={'env': 'METADATA_HEAD_PAGES'})
+    speculative_parse: bool = Field(False, json_schema_extra={'env': 'SPECULATIVE_PARSE'})
@@ -1,11 +1,35 @@
+from .paper_record import PaperRecord, PaperRecordError, merge_record
 from .pipeline_state import PipelineState
 from .graph_error import GraphError
+from .payload_store import (
+    DiskPayloadStore,
+    MemoryPayloadStore,
+    PayloadHandle,
+    PayloadStore,
+    PayloadStoreError,
+    load_payload,
+    payload_scope,
+    release_payload,
+    store_payload
+)
+from .branch_executor import (
+    BRANCH_EXECUTOR_KEY,
+    BranchExecutor,
+    BranchExecutorError,
+    branch_queue_time,
+    get_shared_branch_executor,
+    install_branch_executor,
+    uninstall_branch_executor
+)
+from .instrumentation import InstrumentedNode, NodeMetrics, add_observer, remove_observer
 from .get_file_node import GetFile
 from .check_processed_paper_node import CheckProcessedPaper
 from .load_pdf_node import LoadPDF
+from .normalize_text_node import NormalizeText
+from .find_near_duplicate_node import FindNearDuplicate
 from .extract_metadata_node import ExtractMetadata
 from .extract_summary_and_keywords_node import ExtractSummaryAndKeywords
 from .extract_key_research_findings_and_methodology_node import ExtractKeyResearchFindingsAndMethodology
 from .merge_results_node import MergeResults
 from .insert_data_into_bigquery_node import InsertDataIntoBigQuery
-from .pipeline_builder import PipelineBuilder
\ No newline at end of file
+from .pipeline_builder import ExtractionPipelineBuilder, PipelineBuilder
\ No newline at end of file
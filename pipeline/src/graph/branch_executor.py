@@ -0,0 +1,154 @@
+import importlib.metadata
+import threading
+import time
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import lru_cache
+from typing import Any, Callable, Iterator, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import get_executor_for_config
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Key, in the `configurable` run configuration, of the executor running the parallel branches.
+BRANCH_EXECUTOR_KEY = "branch_executor"
+
+# LangGraph versions whose runner creates its thread pools through
+# `langgraph.pregel.executor.get_executor_for_config`, replaced by `install_branch_executor`.
+SUPPORTED_LANGGRAPH_VERSION = "0.2."
+
+# Time the current task waited for a worker of the branch executor, set in the worker thread.
+_queue_time: ContextVar[float] = ContextVar("branch_queue_time", default=0.0)
+
+
+class BranchExecutorError(Exception):
+    """Custom exception for errors related to the branch executor."""
+    pass
+
+
+def branch_queue_time() -> float:
+    """Return the time, in seconds, the current task waited for a branch executor worker."""
+    return _queue_time.get()
+
+
+class BranchExecutor(Executor):
+    """
+    Thread pool running the parallel branches of the pipeline.
+
+    Like LangChain's `ContextThreadPoolExecutor`, every task runs in a copy of the submitting
+    context, so the context variables bound by the caller (paper ID, usage report, span) are
+    visible in the branches. The time each task waits for a worker is measured and exposed to
+    the task through `branch_queue_time`.
+
+    Args:
+        max_workers (Optional[int]): Maximum number of worker threads. Defaults to the
+            `ThreadPoolExecutor` default.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="branch")
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        context = copy_context()
+        submitted = time.perf_counter()
+
+        def run() -> Any:
+            _queue_time.set(time.perf_counter() - submitted)
+            return fn(*args, **kwargs)
+
+        return self._executor.submit(context.run, run)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        self._executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+@lru_cache(maxsize=None)
+def get_shared_branch_executor(max_workers: Optional[int] = None) -> BranchExecutor:
+    """
+    Get the process-wide branch executor with a number of workers, created on first use.
+
+    It is shared by every pipeline run of the process and never shut down, so its worker
+    threads are reused across invocations, and `max_workers` bounds the branches running
+    concurrently on the instance, whatever the number of concurrent runs.
+
+    Returns:
+        BranchExecutor: The branch executor.
+    """
+    logger.info("Creating shared branch executor with %s workers", max_workers or "default")
+    return BranchExecutor(max_workers)
+
+
+@contextmanager
+def _get_executor_for_config(config: Optional[RunnableConfig]) -> Iterator[Executor]:
+    """
+    Replacement of LangChain's `get_executor_for_config` used by the LangGraph runner.
+
+    For the runs of the pipeline, whose configuration has the `BRANCH_EXECUTOR_KEY` entry (see
+    `PipelineBuilder`), yield the configured executor, left running at the end of the run, or if
+    it is None a new `BranchExecutor` with `max_concurrency` workers for the run. The runs of any
+    other graph get LangChain's executor, as without the hook.
+    """
+    config = config or {}
+    configurable = config.get("configurable") or {}
+    if BRANCH_EXECUTOR_KEY not in configurable:
+        with get_executor_for_config(config) as executor:
+            yield executor
+        return
+    executor = configurable[BRANCH_EXECUTOR_KEY]
+    if executor is not None:
+        yield executor
+        return
+    with BranchExecutor(config.get("max_concurrency")) as executor:
+        yield executor
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install_branch_executor() -> None:
+    """
+    Make the LangGraph runner execute the parallel branches of the pipeline on a `BranchExecutor`.
+
+    LangGraph (0.2.x) creates a new thread pool for every invocation through
+    `get_executor_for_config`, without any supported extension point: it is replaced, once, in
+    the LangGraph executor module. The runs of other graphs are left to LangChain's executor.
+
+    Raises:
+        BranchExecutorError: If the installed LangGraph version is not supported, or its runner
+            no longer creates its executors through `get_executor_for_config`.
+    """
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        version = importlib.metadata.version("langgraph")
+        if not version.startswith(SUPPORTED_LANGGRAPH_VERSION):
+            logger.error(f"Unsupported LangGraph version {version} for the branch executor")
+            raise BranchExecutorError(
+                f"Unsupported LangGraph version {version}: the branch executor requires LangGraph {SUPPORTED_LANGGRAPH_VERSION}x"
+            )
+        from langgraph.pregel import executor
+        if getattr(executor, "get_executor_for_config", None) is not get_executor_for_config:
+            logger.error("The LangGraph runner does not create its executors with get_executor_for_config")
+            raise BranchExecutorError(
+                "langgraph.pregel.executor.get_executor_for_config is missing or already replaced"
+            )
+        executor.get_executor_for_config = _get_executor_for_config
+        _installed = True
+
+
+def uninstall_branch_executor() -> None:
+    """Restore LangChain's executor in the LangGraph runner (see `install_branch_executor`)."""
+    global _installed
+    with _install_lock:
+        if not _installed:
+            return
+        from langgraph.pregel import executor
+        executor.get_executor_for_config = get_executor_for_config
+        _installed = False
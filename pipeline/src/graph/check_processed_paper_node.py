@@ -1,16 +1,58 @@
-from src.graph import PipelineState, GraphError
+from concurrent.futures import Executor
+from functools import lru_cache
+from typing import Optional
+
+from src.graph import PipelineState, GraphError, release_payload
+from src.graph.branch_executor import BranchExecutor
 from src.tasks import check_processed_paper
 
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Workers of the executor of the speculative checks. The lookups are short, and run apart from
+# the branch executor, where they would wait behind the LLM requests of other papers.
+CHECK_EXECUTOR_WORKERS = 4
+
+
+@lru_cache(maxsize=None)
+def get_check_executor() -> BranchExecutor:
+    """Get the process-wide executor of the speculative processed paper checks, created on first use."""
+    logger.info("Creating processed paper check executor with %d workers", CHECK_EXECUTOR_WORKERS)
+    return BranchExecutor(CHECK_EXECUTOR_WORKERS)
+
 
 class CheckProcessedPaper:
+    """
+    Pipeline node checking whether the paper has already been processed.
+
+    In speculative mode, the check only starts: it runs on the executor while the PDF is parsed,
+    and its future is passed to `LoadPDF` through the `processed_check` key of the state, which
+    abandons the parse of a processed paper and gates the extraction on the result.
+
+    Args:
+        speculative (bool): Start the check without waiting for its result.
+        executor (Optional[Executor]): Executor of the speculative check. Defaults to a small
+            dedicated executor (see `get_check_executor`), rather than the branch executor.
+    """
+    def __init__(self, speculative: bool = False, executor: Optional[Executor] = None):
+        self.speculative = speculative
+        self.executor = executor
+
     def __call__(self, state: PipelineState) -> bool:
         try:
             logger.info(f"Checking if paper ID {state.get('state', {}).get('paper_id', None)} has been processed")
-            return {"state": {"processed": check_processed_paper(state["state"]["paper_id"])}}
+            if self.speculative:
+                executor = self.executor or get_check_executor()
+                return {"state": {"processed_check": executor.submit(check_processed_paper, state["state"]["paper_id"])}}
+
+            processed = check_processed_paper(state["state"]["paper_id"])
+            if not processed:
+                return {"state": {"processed": processed}}
+
+            # The pipeline ends here: the file has no other consumer.
+            release_payload(state["state"].get("file"))
+            return {"state": {"processed": processed, "file": None}}
         except Exception as e:
             logger.error(f"Failed to check if paper ID {state.get('state', {}).get('paper_id', None)} has been processed: {e}")
             raise GraphError(e)
@@ -1,16 +1,53 @@
-from src.graph import PipelineState, GraphError
-from typing import Any
+from src.graph import PipelineState, GraphError, load_payload
+from typing import Any, Dict, List, Tuple
 from src.tasks import extract_metadata
+from src.utils.field_status import collect_failed_fields
+from src.utils.pdf_utils import PDFContent
+from src.utils.text_normalization import normalize_pages
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def extract_head_metadata(head: PDFContent) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Extract the metadata from the head of a paper (its first pages), normalised like the whole
+    text (see `NormalizeText`).
+
+    Returns:
+        Tuple[Dict[str, Any], List[str]]: The metadata fields, and the fields that failed.
+    """
+    normalized = normalize_pages(head.pages())
+    first_page = normalized.text[:normalized.page_lengths[0]] if normalized.page_lengths else ""
+    with collect_failed_fields() as failed_fields:
+        record = extract_metadata(normalized.text, document_info=head.document_info, first_page=first_page)
+    return record, failed_fields
+
+
 class ExtractMetadata:
+    """
+    Pipeline node extracting the paper metadata (title, authors, publication date, abstract).
+
+    If the extraction was started from the first pages while the PDF was parsed (`head_metadata`
+    future in the state, see `LoadPDF`), its result is awaited instead.
+    """
     def __call__(self, state: PipelineState) -> Any:
         try:
             logger.info(f"Extracting metadata from paper ID {state.get('state', {}).get('paper_id', None)}")
-            return {"state": {"metadata": extract_metadata(state["state"]["text"])}}
+            head_metadata = state["state"].get("head_metadata")
+            if head_metadata is not None:
+                record, failed_fields = head_metadata.result()
+                return {"record": record, "failed_fields": failed_fields}
+
+            text = load_payload(state["state"]["text"])
+            page_lengths = state["state"].get("page_lengths") or [0]
+            with collect_failed_fields() as failed_fields:
+                record = extract_metadata(
+                    text,
+                    document_info=state["state"].get("document_info"),
+                    first_page=text[:page_lengths[0]]
+                )
+            return {"record": record, "failed_fields": failed_fields}
         except Exception as e:
             logger.error(f"Failed to extract metadata from paper ID {state.get('state', {}).get('paper_id', None)}: {e}")
             raise GraphError(e)
@@ -1,6 +1,7 @@
-from src.graph import PipelineState, GraphError
+from src.graph import PipelineState, GraphError, load_payload
 from typing import Any
 from src.tasks import extract_summary_and_keywords
+from src.utils.field_status import collect_failed_fields
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -10,7 +11,9 @@ class ExtractSummaryAndKeywords:
     def __call__(self, state: PipelineState) -> Any:
         try:
             logger.info(f"Extracting summary and keywords from paper ID {state.get('state', {}).get('paper_id', None)}")
-            return {"state": {"summary": extract_summary_and_keywords(state["state"]["text"])}}
+            with collect_failed_fields() as failed_fields:
+                record = extract_summary_and_keywords(load_payload(state["state"]["text"]))
+            return {"record": record, "failed_fields": failed_fields}
         except Exception as e:
             logger.error(f"Failed to extract summary and keywords from paper ID {state.get('state', {}).get('paper_id', None)}: {e}")
             raise GraphError(e)
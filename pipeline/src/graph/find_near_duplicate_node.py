@@ -0,0 +1,64 @@
+from typing import Any, Dict, Optional
+
+from src.config import Settings
+from src.graph import PipelineState, GraphError, load_payload
+from src.utils.near_duplicates import NearDuplicate, minhash_signature, near_duplicate_index
+from src.utils.pdf_metadata import extract_metadata_from_pdf
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def adapt_record(
+    duplicate: NearDuplicate,
+    document_info: Optional[Dict[str, str]],
+    first_page: str
+) -> Dict[str, Any]:
+    """
+    Adapt the fields of a near-duplicate paper to a new one: the metadata found in the new PDF
+    itself (see `extract_metadata_from_pdf`, no LLM request), e.g. the date of a new version,
+    replace those of the duplicate.
+    """
+    metadata = extract_metadata_from_pdf(document_info, first_page)
+    return {**duplicate.record, **{field: value for field, value in metadata.items() if value is not None}}
+
+
+class FindNearDuplicate:
+    """
+    Pipeline node looking up the paper in the near-duplicate index before the extraction
+    branches.
+
+    The MinHash signature of the normalised text is added to the state (see
+    `minhash_signature`), so that the paper is indexed once extracted (see `MergeResults`). If
+    an indexed paper is similar enough (`near_duplicate_threshold` setting), e.g. a re-exported
+    PDF or a new version with minor changes, its fields are reused, adapted with the metadata of
+    the new PDF, and the extraction branches are skipped (see `PipelineBuilder`).
+
+    The node does nothing if the `near_duplicate_threshold` setting is not set.
+    """
+    def __call__(self, state: PipelineState) -> Any:
+        paper_id = state.get("state", {}).get("paper_id", None)
+        try:
+            settings = Settings()
+            if settings.near_duplicate_threshold is None:
+                return {"state": {}}
+
+            logger.info(f"Looking for near duplicates of paper ID {paper_id}")
+            text = load_payload(state["state"]["text"])
+            signature = minhash_signature(text)
+            duplicate = near_duplicate_index(settings).query(signature, settings.near_duplicate_threshold)
+            if duplicate is None:
+                return {"state": {"minhash": signature}}
+
+            logger.info(
+                f"Paper ID {paper_id} is a near duplicate of paper ID {duplicate.paper_id} "
+                f"(similarity {duplicate.similarity:.2f}), reusing its fields"
+            )
+            page_lengths = state["state"].get("page_lengths") or [0]
+            return {
+                "state": {"minhash": signature, "duplicate_of": duplicate.paper_id},
+                "record": adapt_record(duplicate, state["state"].get("document_info"), text[:page_lengths[0]])
+            }
+        except Exception as e:
+            logger.error(f"Failed to look for near duplicates of paper ID {paper_id}: {e}")
+            raise GraphError(e)
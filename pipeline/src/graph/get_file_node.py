@@ -1,5 +1,7 @@
+from typing import Optional
+
 from src.tasks import get_file_from_bucket
-from src.graph import PipelineState
+from src.graph import PipelineState, store_payload
 from src.utils.hash import generate_file_hash
 from src.logger import get_logger
 
@@ -7,20 +9,30 @@ logger = get_logger(__name__)
 
 
 class GetFile:
+    """
+    Pipeline node getting the file of the paper from the Google Cloud Storage bucket.
+
+    The name of the file is either bound to the node, or read from the `file_name` key of the
+    state, so that a pipeline compiled once processes any file (see `run_worker`).
+
+    Args:
+        file_name (Optional[str]): Name of the file. Read from the state if not set.
+    """
     def __init__(
         self,
-        file_name: str
+        file_name: Optional[str] = None
     ):
         self.file_name = file_name
 
-    def __call__(self, _: PipelineState):
-        logger.info(f"Getting file {self.file_name} from GCS bucket")
-        file = get_file_from_bucket(self.file_name)
+    def __call__(self, state: PipelineState):
+        file_name = self.file_name or state["state"]["file_name"]
+        logger.info(f"Getting file {file_name} from GCS bucket")
+        file = get_file_from_bucket(file_name)
         paper_id = generate_file_hash(file)
 
         return {
             "state": {
-                "file": file,
+                "file": store_payload(file),
                 "paper_id": paper_id
             }
         }
@@ -1,7 +1,6 @@
 from typing import Any
 from src.graph import PipelineState, GraphError
 from src.tasks import insert_data_into_bigquery
-from google.cloud.bigquery import Client
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -19,6 +18,13 @@ class InsertDataIntoBigQuery:
             logger.info(f"Inserting data into BigQuery")
             data = state["state"]
             data.pop("text", None)
+            data.pop("file", None)
+            data.pop("page_lengths", None)
+            data.pop("document_info", None)
+            data.pop("minhash", None)
+            data.pop("store", None)
+            data.pop("head_metadata", None)
+            data.pop("processed_check", None)
             paper_id = data.pop("paper_id")
 
             insert_data_into_bigquery(
@@ -0,0 +1,158 @@
+import sys
+import time
+import threading
+from io import BytesIO
+from typing import Any, Callable, List, Optional
+
+from opentelemetry.trace import Status, StatusCode
+from pydantic import BaseModel
+
+from src.graph import PipelineState
+from src.graph.branch_executor import branch_queue_time
+from src.utils.telemetry import get_tracer
+from src.utils.usage import bind_paper_id
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+tracer = get_tracer(__name__)
+
+
+class NodeMetrics(BaseModel):
+    """
+    Metrics of a single pipeline node execution.
+
+    Attributes:
+        node (str): Node name.
+        paper_id (Optional[str]): ID of the processed paper, if known.
+        start_time (float): Start time, as returned by `time.perf_counter`.
+        wall_time (float): Elapsed wall time, in seconds.
+        queue_time (float): Time the node waited for a branch executor worker, in seconds (0
+            for nodes run on the invoking thread).
+        cpu_time (float): CPU time of the executing thread, in seconds.
+        input_size (int): Approximate size, in bytes, of the node input state.
+        output_size (int): Approximate size, in bytes, of the node output.
+        error (Optional[str]): Error raised by the node, if any.
+    """
+
+    node: str
+    paper_id: Optional[str] = None
+    start_time: float
+    wall_time: float
+    queue_time: float = 0.0
+    cpu_time: float
+    input_size: int
+    output_size: int
+    error: Optional[str] = None
+
+
+_observers: List[Callable[[NodeMetrics], None]] = []
+_observers_lock = threading.Lock()
+
+
+def add_observer(observer: Callable[[NodeMetrics], None]) -> None:
+    """Register a callable receiving the metrics of every instrumented node execution."""
+    with _observers_lock:
+        _observers.append(observer)
+
+
+def remove_observer(observer: Callable[[NodeMetrics], None]) -> None:
+    """Unregister a node metrics observer."""
+    with _observers_lock:
+        _observers.remove(observer)
+
+
+def payload_size(value: Any) -> int:
+    """
+    Approximate the size, in bytes, of a state payload.
+
+    Strings and binary buffers count their length, containers the sum of their items, and any
+    other value its `sys.getsizeof`.
+    """
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, BytesIO):
+        return value.getbuffer().nbytes
+    if isinstance(value, dict):
+        return sum(payload_size(item) for item in value.values())
+    if isinstance(value, (list, tuple, set)):
+        return sum(payload_size(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class InstrumentedNode:
+    """
+    Pipeline node wrapper recording timing and size metrics, and tracing the node execution.
+
+    Each execution records its wall time, CPU time, branch executor queue time (see
+    `branch_queue_time`) and input/output sizes in an OpenTelemetry span (a child of the current
+    span, so all nodes of one event share one trace), logs them, and notifies the registered
+    observers. The LLM requests sent by the node are attributed to
+    the paper ID found in the state.
+
+    Args:
+        name (str): Node name.
+        node (Callable[[PipelineState], Any]): The wrapped node.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        node: Callable[[PipelineState], Any]
+    ):
+        self.name = name
+        self.node = node
+
+    def __call__(self, state: PipelineState) -> Any:
+        paper_id = (state.get('state') or {}).get('paper_id')
+        input_size = payload_size(state)
+        output = None
+        error = None
+
+        with tracer.start_as_current_span(self.name) as span, bind_paper_id(paper_id):
+            start_time = time.perf_counter()
+            start_cpu_time = time.thread_time()
+            try:
+                output = self.node(state)
+                return output
+            except Exception as e:
+                error = str(e)
+                span.record_exception(e)
+                span.set_status(Status(StatusCode.ERROR, error))
+                raise
+            finally:
+                metrics = NodeMetrics(
+                    node=self.name,
+                    paper_id=paper_id,
+                    start_time=start_time,
+                    wall_time=time.perf_counter() - start_time,
+                    queue_time=branch_queue_time(),
+                    cpu_time=time.thread_time() - start_cpu_time,
+                    input_size=input_size,
+                    output_size=payload_size(output),
+                    error=error
+                )
+                self._record(span, metrics)
+
+    def _record(self, span: Any, metrics: NodeMetrics) -> None:
+        """Attach the metrics to the span, log them and notify the observers."""
+        if metrics.paper_id:
+            span.set_attribute("paper.id", metrics.paper_id)
+        span.set_attribute("node.wall_time_s", metrics.wall_time)
+        span.set_attribute("node.cpu_time_s", metrics.cpu_time)
+        span.set_attribute("node.queue_time_s", metrics.queue_time)
+        span.set_attribute("node.input_bytes", metrics.input_size)
+        span.set_attribute("node.output_bytes", metrics.output_size)
+
+        logger.info(
+            "Node '%s' took %.3fs (CPU %.3fs, queued %.3fs), input %d bytes, output %d bytes",
+            metrics.node, metrics.wall_time, metrics.cpu_time, metrics.queue_time, metrics.input_size,
+            metrics.output_size
+        )
+
+        with _observers_lock:
+            observers = list(_observers)
+        for observer in observers:
+            try:
+                observer(metrics)
+            except Exception as e:
+                logger.error(f"Node metrics observer failed: {e}")
@@ -1,17 +1,103 @@
-from typing import Any, Union
-from io import BytesIO
-from src.graph import PipelineState, GraphError
-from src.utils.pdf_utils import extract_text_from_pdf
+from concurrent.futures import Executor, Future
+from typing import Any, Dict, List, Optional, Tuple
+from src.config import Settings
+from src.graph import PipelineState, GraphError, load_payload, release_payload, store_payload
+from src.graph.branch_executor import get_shared_branch_executor
+from src.graph.extract_metadata_node import extract_head_metadata
+from src.utils.pdf_utils import PDFContent, extract_pdf_content
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
 
+def _processed(processed_check: Optional[Future]) -> bool:
+    """Whether the speculative processed paper check is done, and found the paper processed."""
+    return (
+        processed_check is not None and processed_check.done()
+        and processed_check.exception() is None and processed_check.result()
+    )
+
+
+def _extract_head_metadata(head: PDFContent, processed_check: Future) -> Optional[Tuple[Dict[str, Any], List[str]]]:
+    """Extract the head metadata once the speculative processed paper check found the paper new."""
+    if processed_check.result():
+        return None
+    return extract_head_metadata(head)
+
+
 class LoadPDF:
+    """
+    Pipeline node extracting the text, page boundaries and document information of the PDF file.
+
+    With `head_pages` set, the metadata extraction starts as soon as the first pages are parsed
+    (see `extract_head_metadata`): it runs on the executor while the other pages are parsed, so
+    that the parse time of a long document and the LLM latency overlap. Its future is passed to
+    `ExtractMetadata` through the `head_metadata` key of the state. The metadata is not extracted
+    early when near duplicates are looked up (`near_duplicate_threshold` setting): the lookup
+    needs the whole text, and a near duplicate sends no LLM request at all (see
+    `FindNearDuplicate`).
+
+    If the processed paper check was started speculatively (`processed_check` future in the
+    state, see `CheckProcessedPaper`), the parse is abandoned as soon as the check finds the
+    paper processed, and the node then waits for the check: a processed paper ends the pipeline
+    (`processed` key of the state), its text being discarded. The early metadata extraction
+    only sends its request once the check found the paper new.
+
+    Args:
+        head_pages (Optional[int]): Number of pages the metadata is extracted from, as soon as
+            they are parsed. The metadata is extracted from the whole text by `ExtractMetadata`
+            if not set.
+        executor (Optional[Executor]): Executor of the early metadata extraction. Defaults to the
+            shared branch executor (see `get_shared_branch_executor`).
+    """
+    def __init__(self, head_pages: Optional[int] = None, executor: Optional[Executor] = None):
+        self.head_pages = head_pages
+        self.executor = executor
+
     def __call__(self, state: PipelineState) -> Any:
         try:
             logger.info(f"Extracting text from PDF for paper ID {state.get('state', {}).get('paper_id', None)}")
-            return {"state": {"text": extract_text_from_pdf(state['state']['file'])}}
+            file = state['state']['file']
+            processed_check = state['state'].get('processed_check')
+            head_metadata: List[Future] = []
+            head_pages = self.head_pages
+            if head_pages and Settings().near_duplicate_threshold is not None:
+                head_pages = None
+
+            def on_head(head: PDFContent) -> None:
+                logger.info(f"Starting the metadata extraction from the first {len(head.page_lengths)} pages")
+                executor = self.executor or get_shared_branch_executor(None)
+                if processed_check is None:
+                    head_metadata.append(executor.submit(extract_head_metadata, head))
+                else:
+                    head_metadata.append(executor.submit(_extract_head_metadata, head, processed_check))
+
+            content = extract_pdf_content(
+                load_payload(file),
+                head_pages=head_pages or 0,
+                on_head=on_head if head_pages else None,
+                cancelled=(lambda: _processed(processed_check)) if processed_check is not None else None
+            )
+
+            # The file is only consumed here: release it and drop it from the state.
+            release_payload(file)
+            if processed_check is not None and processed_check.result():
+                logger.info(
+                    f"Paper ID {state['state'].get('paper_id', None)} has been processed, discarding its text"
+                )
+                return {"state": {"processed": True, "processed_check": None, "file": None}}
+
+            output = {
+                "text": store_payload(content.text),
+                "page_lengths": content.page_lengths,
+                "document_info": content.document_info,
+                "file": None
+            }
+            if processed_check is not None:
+                output.update({"processed": False, "processed_check": None})
+            if head_metadata:
+                output["head_metadata"] = head_metadata[0]
+            return {"state": output}
         except Exception as e:
             logger.error(f"Failed to extract text from PDF for paper ID {state.get('state', {}).get('paper_id', None)}: {e}")
             raise GraphError(e)
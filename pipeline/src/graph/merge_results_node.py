@@ -1,6 +1,9 @@
-from typing import Any
-from functools import reduce
-from src.graph import PipelineState, GraphError
+from typing import Any, Dict
+from src.config import Settings
+from src.graph import PaperRecord, PipelineState, GraphError, load_payload, release_payload
+from src.tasks.text_cache import store_text
+from src.utils.field_status import field_status
+from src.utils.near_duplicates import near_duplicate_index
 from src.logger import get_logger
 
 logger = get_logger(__name__)
@@ -8,29 +11,60 @@ logger = get_logger(__name__)
 
 class MergeResults:
     """
-    Merge the results from the pipeline state into a single dictionary,
-    excluding the 'text' key.
+    Merge the results of the extraction branches into the shared state, excluding the 'text' key.
 
-    This node flattens the state by merging all keys which are dictionaries into a single dictionary.
+    The branches have already been folded into the typed paper record by its reducer, field by
+    field: the record is validated here, once, and its fields are written to the state in a single
+    pass.
 
-    In consequence, the shared state is *rewritten* here, since there is no need to keep the previous
-    structure.
+    The status of every field (`extracted`, `missing` or `failed`, see `field_status`) is added
+    to the state, to be stored with the paper. If a branch failed and the
+    `text_cache_bucket_name` setting is set, the text is cached (see `store_text`), so that the
+    failed fields can be repaired later without reprocessing the paper, unless the paper is not
+    stored (`store` key of the state unset, see `ExtractionPipelineBuilder`).
+
+    A paper with a MinHash signature (see `FindNearDuplicate`) whose fields were all extracted
+    is added to the near-duplicate index, so that its near duplicates reuse its fields.
+
+    The extraction branches were the last consumers of the text: it is released from the payload
+    store and dropped from the state.
     """
     def __call__(self, state: PipelineState) -> Any:
         try:
             logger.info(f"Merging results for paper ID {state.get('state', {}).get('paper_id', None)}")
-            merged_result = reduce(
-                lambda a, b: {**a, **b},
-                (
-                    value
-                    for _, value in state["state"].items()
-                    if isinstance(value, dict)
-                ),
-                {}
-            )
-
-            return {"state": {**merged_result}}
+            merged_result = state["record"].validate().to_dict()
+            failed_fields = state.get("failed_fields") or []
+            merged_result["field_status"] = field_status(merged_result, failed_fields)
+            merged_result["text"] = None
+
+            if failed_fields:
+                if state["state"].get("store", True):
+                    self._cache_text(state)
+            elif state["state"].get("minhash") and not state["state"].get("duplicate_of"):
+                self._index_paper(state, merged_result)
+
+            release_payload(state["state"].get("text"))
+
+            return {"state": merged_result}
 
         except Exception as e:
             logger.error(f"Failed to merge results.")
             raise GraphError(e)
+
+    def _index_paper(self, state: PipelineState, fields: Dict[str, Any]) -> None:
+        """Add a paper to the near-duplicate index. An indexing failure does not fail the paper."""
+        paper_id = state["state"].get("paper_id")
+        try:
+            record = {name: fields[name] for name in PaperRecord.__slots__}
+            near_duplicate_index(Settings()).add(paper_id, state["state"]["minhash"], record)
+        except Exception as e:
+            logger.error(f"Failed to add paper ID {paper_id} to the near-duplicate index: {e}")
+
+    def _cache_text(self, state: PipelineState) -> None:
+        """Cache the text of a paper with failed fields. A caching failure does not fail the paper."""
+        paper_id = state["state"].get("paper_id")
+        try:
+            if Settings().text_cache_bucket_name:
+                store_text(paper_id, load_payload(state["state"]["text"]))
+        except Exception as e:
+            logger.error(f"Failed to cache the text of paper ID {paper_id}, its failed fields cannot be repaired: {e}")
@@ -0,0 +1,45 @@
+from typing import Any
+
+from opentelemetry import trace
+
+from src.graph import PipelineState, GraphError, load_payload, release_payload, store_payload
+from src.utils.pdf_utils import split_pages
+from src.utils.text_normalization import normalize_pages
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class NormalizeText:
+    """
+    Pipeline node normalising the extracted text before it is sent to the extraction branches:
+    running headers, footers and page numbers are stripped, hyphenated line breaks joined and
+    whitespace collapsed, so that every LLM request carries less input.
+
+    The normalised text replaces the original one in the payload store, and the character
+    reduction is recorded on the node span.
+    """
+    def __call__(self, state: PipelineState) -> Any:
+        try:
+            logger.info(f"Normalising text for paper ID {state.get('state', {}).get('paper_id', None)}")
+            handle = state["state"]["text"]
+            text = load_payload(handle)
+            page_lengths = state["state"].get("page_lengths") or [len(text)]
+
+            normalized = normalize_pages(split_pages(text, page_lengths))
+
+            span = trace.get_current_span()
+            span.set_attribute("text.original_chars", normalized.original_length)
+            span.set_attribute("text.normalized_chars", len(normalized.text))
+            span.set_attribute("text.removed_lines", normalized.removed_lines)
+
+            release_payload(handle)
+            return {
+                "state": {
+                    "text": store_payload(normalized.text),
+                    "page_lengths": normalized.page_lengths
+                }
+            }
+        except Exception as e:
+            logger.error(f"Failed to normalise text for paper ID {state.get('state', {}).get('paper_id', None)}: {e}")
+            raise GraphError(e)
@@ -0,0 +1,136 @@
+from typing import Any, Dict, List, Mapping, Optional, Union
+
+
+class PaperRecordError(Exception):
+    """Custom exception for paper record errors."""
+    pass
+
+
+class PaperRecord:
+    """
+    Typed record of the fields extracted from a research paper by the pipeline branches.
+
+    The record has a fixed set of slots, one per extracted field, so that the outputs of any
+    number of branches are folded into a single object, field by field, without rebuilding a
+    dictionary for each branch. Fields not set by any branch are `None`.
+
+    Attributes:
+        title (Optional[str]): Paper title.
+        authors (Optional[List[str]]): Author names.
+        publication_date (Optional[str]): Publication date, in "YYYY-MM-DD" format.
+        abstract (Optional[str]): Paper abstract.
+        summary (Optional[str]): Paper summary.
+        keywords (Optional[List[str]]): Paper keywords.
+        methodology (Optional[str]): Research methodology.
+        key_research_findings (Optional[List[str]]): Key research findings.
+    """
+
+    TEXT_FIELDS = ("title", "publication_date", "abstract", "summary", "methodology")
+    LIST_FIELDS = ("authors", "keywords", "key_research_findings")
+
+    __slots__ = (
+        "title",
+        "authors",
+        "publication_date",
+        "abstract",
+        "summary",
+        "keywords",
+        "methodology",
+        "key_research_findings"
+    )
+
+    title: Optional[str]
+    authors: Optional[List[str]]
+    publication_date: Optional[str]
+    abstract: Optional[str]
+    summary: Optional[str]
+    keywords: Optional[List[str]]
+    methodology: Optional[str]
+    key_research_findings: Optional[List[str]]
+
+    def __init__(self, **fields: Any):
+        for name in self.__slots__:
+            setattr(self, name, None)
+        self.update(fields)
+
+    def update(self, fields: Mapping[str, Any]) -> "PaperRecord":
+        """
+        Set the given fields, in place.
+
+        Args:
+            fields (Mapping[str, Any]): Field values, keyed by field name.
+
+        Returns:
+            PaperRecord: The record itself.
+
+        Raises:
+            PaperRecordError: If a field is unknown.
+        """
+        for name, value in fields.items():
+            if name not in self.__slots__:
+                raise PaperRecordError(f"Unknown paper record field: {name}")
+            setattr(self, name, value)
+        return self
+
+    def validate(self) -> "PaperRecord":
+        """
+        Check and normalise the field types, in place: text fields must be strings, and list
+        fields lists of strings (a single string is wrapped in a list). Missing fields stay `None`.
+
+        Returns:
+            PaperRecord: The record itself.
+
+        Raises:
+            PaperRecordError: If a field has an invalid type.
+        """
+        for name in self.TEXT_FIELDS:
+            value = getattr(self, name)
+            if value is not None and not isinstance(value, str):
+                raise PaperRecordError(f"Field '{name}' must be a string, got {type(value).__name__}")
+
+        for name in self.LIST_FIELDS:
+            value = getattr(self, name)
+            if value is None:
+                continue
+            if isinstance(value, str):
+                setattr(self, name, [value])
+            elif not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+                raise PaperRecordError(f"Field '{name}' must be a list of strings")
+        return self
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the fields as a dictionary."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PaperRecord):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"PaperRecord({fields})"
+
+
+def merge_record(
+    a: PaperRecord,
+    b: Union[PaperRecord, Mapping[str, Any]]
+) -> PaperRecord:
+    """
+    Fold a branch output into the paper record.
+
+    The record is updated in place, so that merging costs one assignment per field set by the
+    branch. Reducers run sequentially once the branches of a step are done, so no branch reads
+    the record while it is updated.
+
+    Args:
+        a: The paper record.
+        b: The branch output: a dictionary of fields, or another record (its non-`None` fields
+            are merged).
+
+    Returns:
+        The updated paper record.
+    """
+    if isinstance(b, PaperRecord):
+        b = {name: getattr(b, name) for name in b.__slots__ if getattr(b, name) is not None}
+    return a.update(b)
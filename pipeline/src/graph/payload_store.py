@@ -0,0 +1,247 @@
+import os
+import tempfile
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, Dict, Iterator, Literal, Optional, Set, Union
+
+from pydantic import BaseModel, ConfigDict
+
+from src.config import Settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+Payload = Union[BytesIO, bytes, str]
+
+# Handles created during the current pipeline run, released when the run ends.
+_scope: ContextVar[Optional[Set["PayloadHandle"]]] = ContextVar("payload_scope", default=None)
+
+
+class PayloadStoreError(Exception):
+    """Custom exception for payload store errors."""
+    pass
+
+
+class PayloadHandle(BaseModel):
+    """
+    Reference to a large payload kept out of the pipeline state.
+
+    Attributes:
+        key (str): Key of the payload in the store.
+        kind (Literal["bytes", "text"]): Kind of payload: binary content (returned as `BytesIO`)
+            or text.
+        size (int): Size of the payload, in bytes or characters.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    key: str
+    kind: Literal["bytes", "text"]
+    size: int
+
+
+class PayloadStore(ABC):
+    """
+    Side store of the large pipeline payloads (the PDF file and its text).
+
+    Nodes put payloads in the store and pass their handle through the state, so the state stays
+    small while it is merged at every step, and each payload is freed as soon as its last
+    consumer releases it. Stores implement `_write`, `_read` and `_delete`.
+    """
+
+    def put(self, value: Payload) -> PayloadHandle:
+        """
+        Store a payload.
+
+        Args:
+            value (Payload): Binary content (`BytesIO` or `bytes`) or text.
+
+        Returns:
+            PayloadHandle: The payload handle.
+        """
+        if isinstance(value, str):
+            kind, data = "text", value
+        elif isinstance(value, BytesIO):
+            kind, data = "bytes", value.getvalue()
+        elif isinstance(value, (bytes, bytearray)):
+            kind, data = "bytes", bytes(value)
+        else:
+            raise PayloadStoreError(f"Unsupported payload type: {type(value).__name__}")
+
+        handle = PayloadHandle(key=uuid.uuid4().hex, kind=kind, size=len(data))
+        self._write(handle, data)
+
+        scope = _scope.get()
+        if scope is not None:
+            scope.add(handle)
+        return handle
+
+    def get(self, handle: PayloadHandle) -> Payload:
+        """
+        Get a payload.
+
+        Args:
+            handle (PayloadHandle): The payload handle.
+
+        Returns:
+            Payload: A new `BytesIO` over binary content, or the text.
+
+        Raises:
+            PayloadStoreError: If the payload is not in the store (e.g. already released).
+        """
+        data = self._read(handle)
+        return BytesIO(data) if handle.kind == "bytes" else data
+
+    def release(self, handle: PayloadHandle) -> None:
+        """
+        Release a payload. Releasing a payload twice is a no-op.
+
+        Args:
+            handle (PayloadHandle): The payload handle.
+        """
+        self._delete(handle)
+        scope = _scope.get()
+        if scope is not None:
+            scope.discard(handle)
+
+    @abstractmethod
+    def _write(self, handle: PayloadHandle, data: Union[bytes, str]) -> None:
+        """Write the data of a new payload."""
+
+    @abstractmethod
+    def _read(self, handle: PayloadHandle) -> Union[bytes, str]:
+        """Read the data of a payload, raising `PayloadStoreError` if it is not in the store."""
+
+    @abstractmethod
+    def _delete(self, handle: PayloadHandle) -> None:
+        """Delete the data of a payload, if still in the store."""
+
+
+class MemoryPayloadStore(PayloadStore):
+    """
+    Payload store keeping the payloads in memory.
+    """
+
+    def __init__(self):
+        self._payloads: Dict[str, Union[bytes, str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def _write(self, handle: PayloadHandle, data: Union[bytes, str]) -> None:
+        with self._lock:
+            self._payloads[handle.key] = data
+
+    def _read(self, handle: PayloadHandle) -> Union[bytes, str]:
+        try:
+            return self._payloads[handle.key]
+        except KeyError:
+            raise PayloadStoreError(f"Payload {handle.key} not found")
+
+    def _delete(self, handle: PayloadHandle) -> None:
+        with self._lock:
+            self._payloads.pop(handle.key, None)
+
+
+class DiskPayloadStore(PayloadStore):
+    """
+    Payload store spilling the payloads to files, so they do not stay in the process memory
+    while the LLM requests are in flight.
+
+    Args:
+        directory (Optional[str]): Directory of the payload files. Defaults to a new temporary
+            directory.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory or tempfile.mkdtemp(prefix="payloads-")
+        os.makedirs(self.directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(os.listdir(self.directory))
+
+    def _path(self, handle: PayloadHandle) -> str:
+        return os.path.join(self.directory, handle.key)
+
+    def _write(self, handle: PayloadHandle, data: Union[bytes, str]) -> None:
+        with open(self._path(handle), 'wb') as file:
+            file.write(data.encode('utf-8') if isinstance(data, str) else data)
+
+    def _read(self, handle: PayloadHandle) -> Union[bytes, str]:
+        try:
+            with open(self._path(handle), 'rb') as file:
+                data = file.read()
+        except FileNotFoundError:
+            raise PayloadStoreError(f"Payload {handle.key} not found")
+        return data.decode('utf-8') if handle.kind == "text" else data
+
+    def _delete(self, handle: PayloadHandle) -> None:
+        try:
+            os.remove(self._path(handle))
+        except FileNotFoundError:
+            pass
+
+
+# Payload store classes, keyed by the name used in the `payload_store` setting.
+PAYLOAD_STORES = {
+    "memory": lambda settings: MemoryPayloadStore(),
+    "disk": lambda settings: DiskPayloadStore(settings.payload_store_path),
+}
+
+
+@lru_cache(maxsize=None)
+def get_payload_store() -> PayloadStore:
+    """
+    Get the process-wide payload store selected by the `payload_store` setting.
+
+    Raises:
+        PayloadStoreError: If the configured payload store is unknown.
+    """
+    settings = Settings()
+    if settings.payload_store not in PAYLOAD_STORES:
+        raise PayloadStoreError(f"Unknown payload store: {settings.payload_store}")
+    return PAYLOAD_STORES[settings.payload_store](settings)
+
+
+def store_payload(value: Payload) -> PayloadHandle:
+    """Put a payload in the payload store and return its handle."""
+    return get_payload_store().put(value)
+
+
+def load_payload(value: Union[PayloadHandle, Any]) -> Any:
+    """
+    Resolve a state value: payload handles are read from the payload store, and any other value
+    (e.g. a raw `BytesIO` or text set by a caller not using the store) is returned as is.
+    """
+    if isinstance(value, PayloadHandle):
+        return get_payload_store().get(value)
+    return value
+
+
+def release_payload(value: Union[PayloadHandle, Any]) -> None:
+    """Release a state value from the payload store, if it is a payload handle."""
+    if isinstance(value, PayloadHandle):
+        get_payload_store().release(value)
+
+
+@contextmanager
+def payload_scope() -> Iterator[None]:
+    """
+    Release the payloads stored within the block and not released by their consumers, e.g.
+    because the pipeline failed or ended early.
+    """
+    handles: Set[PayloadHandle] = set()
+    token = _scope.set(handles)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+        for handle in list(handles):
+            logger.info("Releasing payload %s left by the pipeline run", handle.key)
+            get_payload_store().release(handle)
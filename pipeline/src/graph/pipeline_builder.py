@@ -1,21 +1,25 @@
-from typing import Union
+from concurrent.futures import Executor
+from typing import Any, Callable, List, Optional, Union
 from io import BytesIO
 
 from langgraph.graph import StateGraph, START, END
 from langgraph.graph.state import CompiledStateGraph
-from google.cloud.bigquery import Client as BigQueryClient
 
 from src.graph import (
     PipelineState,
+    InstrumentedNode,
     GetFile,
     CheckProcessedPaper,
     LoadPDF,
+    NormalizeText,
+    FindNearDuplicate,
     ExtractMetadata,
     ExtractKeyResearchFindingsAndMethodology,
     ExtractSummaryAndKeywords,
     MergeResults,
     InsertDataIntoBigQuery
 )
+from src.graph.branch_executor import BRANCH_EXECUTOR_KEY, install_branch_executor
 
 from src.logger import get_logger
 
@@ -25,30 +29,77 @@ logger = get_logger(__name__)
 class PipelineBuilder:
     """
     Builder class for the LangGraph pipeline
+
+    The parallel extraction branches run on a `BranchExecutor` (see `install_branch_executor`):
+    by default a new one per invocation, with at most `max_concurrency` workers, or the given
+    long-lived executor, whose worker threads are then reused across invocations.
+
+    A pipeline built without a file processes the file named by the `file_name` key of its
+    input state, e.g. `pipeline.invoke({"state": {"file_name": name}})`, so that it is compiled
+    once for any number of files.
+
+    Args:
+        file (Optional[str]): Name of the file to process. Read from the input state if not set.
+        max_concurrency (Optional[int]): Maximum number of branches running at once. Defaults to
+            the thread pool default.
+        executor (Optional[Executor]): Executor shared by the invocations of the pipeline (see
+            `get_shared_branch_executor`).
+        metadata_head_pages (Optional[int]): Number of pages the metadata is extracted from, as
+            soon as they are parsed (see `LoadPDF`). The metadata extraction is a branch
+            run on the whole text if not set.
+        speculative_parse (bool): Parse the PDF while checking whether the paper has been
+            processed, rather than after (see `CheckProcessedPaper`). The extraction branches
+            still only run for new papers.
     """
     def __init__(
         self,
-        file: str
+        file: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        metadata_head_pages: Optional[int] = None,
+        speculative_parse: bool = False
     ):
         self.file = file
+        self.max_concurrency = max_concurrency
+        self.executor = executor
+        self.metadata_head_pages = metadata_head_pages
+        self.speculative_parse = speculative_parse
         self.pipeline: StateGraph = StateGraph(PipelineState)
 
+    def add_node(
+        self,
+        name: str,
+        node: Callable[[PipelineState], Any]
+    ):
+        """
+        Add a node to the pipeline, wrapped with timing instrumentation and tracing.
+        """
+        self.pipeline.add_node(name, InstrumentedNode(name, node))
+
     def add_nodes(self):
         """
         Add all nodes to the pipeline.
         """
         logger.info("Adding nodes to the pipeline")
-        self.pipeline.add_node("Get File", GetFile(self.file))
-        self.pipeline.add_node("Check Processed Paper", CheckProcessedPaper())
-        self.pipeline.add_node("Load PDF", LoadPDF())
-        self.pipeline.add_node("Extract Metadata", ExtractMetadata())
-        self.pipeline.add_node(
+        self.add_node("Get File", GetFile(self.file))
+        self.add_node("Check Processed Paper", CheckProcessedPaper(self.speculative_parse))
+        self.add_extraction_nodes()
+
+    def add_extraction_nodes(self):
+        """
+        Add the nodes extracting the paper fields from its file, and storing them.
+        """
+        self.add_node("Load PDF", LoadPDF(self.metadata_head_pages, self.executor))
+        self.add_node("Normalize Text", NormalizeText())
+        self.add_node("Find Near Duplicate", FindNearDuplicate())
+        self.add_node("Extract Metadata", ExtractMetadata())
+        self.add_node(
             "Extract Key Research Findings And Methodology",
             ExtractKeyResearchFindingsAndMethodology()
         )
-        self.pipeline.add_node("Extract Summary And Keywords", ExtractSummaryAndKeywords())
-        self.pipeline.add_node("Merge Results", MergeResults())
-        self.pipeline.add_node("Insert Data Into BigQuery", InsertDataIntoBigQuery())
+        self.add_node("Extract Summary And Keywords", ExtractSummaryAndKeywords())
+        self.add_node("Merge Results", MergeResults())
+        self.add_node("Insert Data Into BigQuery", InsertDataIntoBigQuery())
 
     def add_edges(self):
         """
@@ -57,22 +108,51 @@ class PipelineBuilder:
         logger.info("Adding edges to the pipeline")
         self.pipeline.add_edge(START, "Get File")
         self.pipeline.add_edge("Get File", "Check Processed Paper")
+        if self.speculative_parse:
+            # Load PDF awaits the check, and ends the pipeline of a processed paper
+            self.pipeline.add_edge("Check Processed Paper", "Load PDF")
+        else:
+            self.pipeline.add_conditional_edges(
+                "Check Processed Paper",
+                self._conditional_route,
+                {
+                    "load_pdf": "Load PDF",
+                    "end": END
+                }
+            )
+        self.add_extraction_edges()
+        self.pipeline.add_edge("Merge Results", "Insert Data Into BigQuery")
+        self.pipeline.add_edge("Insert Data Into BigQuery", END)
+
+    def add_extraction_edges(self):
+        """
+        Add the edges from the loading of the file to the merge of the extracted fields.
+        """
+        if self.speculative_parse:
+            self.pipeline.add_conditional_edges(
+                "Load PDF",
+                self._speculative_route,
+                {
+                    "normalize_text": "Normalize Text",
+                    "end": END
+                }
+            )
+        else:
+            self.pipeline.add_edge("Load PDF", "Normalize Text")
+        self.pipeline.add_edge("Normalize Text", "Find Near Duplicate")
         self.pipeline.add_conditional_edges(
-            "Check Processed Paper",
-            self._conditional_route,
+            "Find Near Duplicate",
+            self._near_duplicate_route,
             {
-                "load_pdf": "Load PDF",
-                "end": END
+                "extract_metadata": "Extract Metadata",
+                "extract_key_research_findings_and_methodology": "Extract Key Research Findings And Methodology",
+                "extract_summary_and_keywords": "Extract Summary And Keywords",
+                "merge_results": "Merge Results"
             }
         )
-        self.pipeline.add_edge("Load PDF", "Extract Metadata")
-        self.pipeline.add_edge("Load PDF", "Extract Key Research Findings And Methodology")
-        self.pipeline.add_edge("Load PDF", "Extract Summary And Keywords")
         self.pipeline.add_edge("Extract Metadata", "Merge Results")
         self.pipeline.add_edge("Extract Key Research Findings And Methodology", "Merge Results")
         self.pipeline.add_edge("Extract Summary And Keywords", "Merge Results")
-        self.pipeline.add_edge("Merge Results", "Insert Data Into BigQuery")
-        self.pipeline.add_edge("Insert Data Into BigQuery", END)
 
     def _conditional_route(self, state: PipelineState) -> str:
         """
@@ -82,6 +162,26 @@ class PipelineBuilder:
             return "end"
         return "load_pdf"
 
+    def _speculative_route(self, state: PipelineState) -> str:
+        """
+        Extract the fields of the parsed paper, unless the speculative check found it processed.
+        """
+        if state.get('state', {}).get('processed', False):
+            return "end"
+        return "normalize_text"
+
+    def _near_duplicate_route(self, state: PipelineState) -> List[str]:
+        """
+        Run the extraction branches, unless the fields of a near-duplicate paper are reused.
+        """
+        if state.get('state', {}).get('duplicate_of'):
+            return ["merge_results"]
+        return [
+            "extract_metadata",
+            "extract_key_research_findings_and_methodology",
+            "extract_summary_and_keywords"
+        ]
+
     def __call__(self) -> CompiledStateGraph:
         """
         Build and compile the pipeline.
@@ -89,5 +189,67 @@ class PipelineBuilder:
         logger.info("Compiling the pipeline")
         self.add_nodes()
         self.add_edges()
-        self.pipeline = self.pipeline.compile()
+        install_branch_executor()
+        self.pipeline = self.pipeline.compile().with_config(
+            max_concurrency=self.max_concurrency,
+            configurable={BRANCH_EXECUTOR_KEY: self.executor}
+        )
         return self.pipeline
+
+
+class ExtractionPipelineBuilder(PipelineBuilder):
+    """
+    Builder class of the synchronous extraction pipeline, run on a file received in an HTTP
+    request rather than read from the bucket (see the `extract` function).
+
+    The pipeline starts at the loading of the file, whose payload handle and paper ID are given
+    in the input state (`file` and `paper_id` keys), and the extracted fields are only inserted
+    into BigQuery if the `store` key of the state is set.
+
+    Args:
+        max_concurrency (Optional[int]): Maximum number of branches running at once. Defaults to
+            the thread pool default.
+        executor (Optional[Executor]): Executor shared by the invocations of the pipeline (see
+            `get_shared_branch_executor`).
+        metadata_head_pages (Optional[int]): Number of pages the metadata is extracted from, as
+            soon as they are parsed (see `LoadPDF`).
+    """
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        metadata_head_pages: Optional[int] = None
+    ):
+        super().__init__(None, max_concurrency, executor, metadata_head_pages)
+
+    def add_nodes(self):
+        """
+        Add all nodes to the pipeline.
+        """
+        logger.info("Adding nodes to the pipeline")
+        self.add_extraction_nodes()
+
+    def add_edges(self):
+        """
+        Add all edges to define the pipeline flow.
+        """
+        logger.info("Adding edges to the pipeline")
+        self.pipeline.add_edge(START, "Load PDF")
+        self.add_extraction_edges()
+        self.pipeline.add_conditional_edges(
+            "Merge Results",
+            self._store_route,
+            {
+                "insert_data_into_bigquery": "Insert Data Into BigQuery",
+                "end": END
+            }
+        )
+        self.pipeline.add_edge("Insert Data Into BigQuery", END)
+
+    def _store_route(self, state: PipelineState) -> str:
+        """
+        Insert the extracted fields into BigQuery only if requested.
+        """
+        if state.get('state', {}).get('store', False):
+            return "insert_data_into_bigquery"
+        return "end"
@@ -1,4 +1,7 @@
-from typing import Annotated, TypedDict, Dict, Any
+import operator
+from typing import Annotated, TypedDict, Dict, Any, List
+
+from src.graph.paper_record import PaperRecord, merge_record
 
 
 def update_state(
@@ -6,22 +9,25 @@ def update_state(
     b: Dict[str, Any]
 ) -> Dict[str, Any]:
     """
-    Merge two dictionaries `a` and `b` into a new dictionary.
+    Merge the dictionary `b` into the dictionary `a`, in place.
+
+    The state channel owns `a` (LangGraph starts each run with a new empty dictionary and applies
+    the reducers once the nodes of a step are done), so it is updated in place rather than copied
+    on every node return.
 
     Args:
         a: The first dictionary.
         b: The second dictionary.
 
     Returns:
-        A new dictionary containing the merged content of `a` and `b`.
+        The dictionary `a`, containing the merged content of `a` and `b`.
     """
-    updated = a.copy()
-    updated.update(b)
+    a.update(b)
 
-    return updated
+    return a
 
 
-class PipelineState(TypedDict):
+class PipelineState(TypedDict, total=False):
     """
     Represents the shared state object used by pipeline nodes in a data processing workflow.
 
@@ -31,9 +37,17 @@ class PipelineState(TypedDict):
     Attributes:
         state (Annotated[Dict[str, Any], update_state]):
             A dictionary designed for additive operations, where new data from pipeline nodes
-            is merged or updated. the `update_state` function is the reduce function to 
+            is merged or updated. the `update_state` function is the reduce function to
             update the state, by merging the new dictionary output from the just-executed node
             to the current shared state two dictionaries.
+        record (Annotated[PaperRecord, merge_record]):
+            The fields extracted by the extraction branches. Each branch returns the fields it
+            extracted, and `merge_record` sets them on the typed record, so the branch outputs
+            are merged field by field.
+        failed_fields (Annotated[List[str], operator.add]):
+            The fields whose extraction task failed, as opposed to fields the paper does not
+            contain. Each branch returns the fields it failed to extract, and they are
+            concatenated.
 
     Usage:
         This object is initialized as:
@@ -43,6 +57,11 @@ class PipelineState(TypedDict):
         Pipeline nodes are expected to return a dictionary with the new data to be merged into the state:
         >>> return {'state': {'key': 'value'}}
 
+        Extraction branches return the fields they extracted:
+        >>> return {'record': {'title': 'title'}, 'failed_fields': []}
+
         - This structure ensures the state maintains a single dictionary for downstream operations.
     """
     state: Annotated[Dict[str, Any], update_state]
+    record: Annotated[PaperRecord, merge_record]
+    failed_fields: Annotated[List[str], operator.add]
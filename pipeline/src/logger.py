@@ -1,6 +1,102 @@
+import atexit
 import logging
 import os
-from google.cloud import logging as cloud_logging
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+from typing import List, Optional
+from src.utils.lazy_import import lazy_import
+
+cloud_logging = lazy_import("google.cloud.logging")
+
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+
+_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_handler: Optional[QueueHandler] = None
+_listener: Optional[QueueListener] = None
+_lock = threading.Lock()
+
+
+class _InProcessQueueHandler(QueueHandler):
+    """
+    Queue handler leaving the records untouched.
+
+    The default `QueueHandler.prepare` formats every record in the calling thread so that it can
+    be pickled. The queue never leaves the process here, so formatting (including the lazy
+    `%`-style message arguments) is left to the listener thread, off the hot path.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _create_handlers() -> List[logging.Handler]:
+    """
+    Create the handlers writing the log records: the Google Cloud Logging handler in Cloud
+    Functions, a file and a console handler otherwise.
+    """
+    if os.getenv("FUNCTION_NAME") is not None:
+        # Use Google Cloud Logging in production
+        client = cloud_logging.Client()
+        return [client.get_default_handler()]
+
+    # Local development logging: File + Console
+    file_handler = logging.FileHandler("app.log")
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    return [file_handler, console_handler]
+
+
+def configure_logging() -> QueueHandler:
+    """
+    Set up the process-wide logging pipeline, once.
+
+    Loggers enqueue their records through a shared queue handler, and a single listener thread
+    writes them with one set of handlers (a single Cloud Logging client in production), so that
+    log I/O does not block the pipeline.
+
+    Returns:
+        QueueHandler: The shared queue handler.
+    """
+    global _queue_handler, _listener
+    with _lock:
+        if _queue_handler is None:
+            _queue_handler = _InProcessQueueHandler(_queue)
+            atexit.register(shutdown_logging)
+        if _listener is None:
+            _listener = QueueListener(_queue, *_create_handlers(), respect_handler_level=True)
+            _listener.start()
+        return _queue_handler
+
+
+def flush_logging() -> None:
+    """
+    Write the records queued so far and flush the handlers, e.g. at the end of a Cloud Function
+    invocation, after which the instance can be frozen before the listener thread catches up.
+    """
+    with _lock:
+        if _listener is not None:
+            # Stopping the listener handles the queued records; a new thread then takes over
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.flush()
+            _listener.start()
+
+
+def shutdown_logging() -> None:
+    """
+    Flush the queued records, stop the listener thread and close its handlers. Records logged
+    afterwards are queued until the next `configure_logging` call starts a new listener.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
 
 def get_logger(name):
     """
@@ -16,25 +112,6 @@ def get_logger(name):
     # Disable propagation to avoid duplicate logs
     logger.propagate = False
 
-    google_cloud_logging = os.getenv("FUNCTION_NAME") is not None
-
-    if google_cloud_logging:
-        # Use Google Cloud Logging in production
-        client = cloud_logging.Client()
-        client.setup_logging(log_level=logging.INFO)
-        # Do not add additional handlers in cloud environment
-    else:
-        # Local development logging: File + Console
-        log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-
-        # FileHandler for local development
-        file_handler = logging.FileHandler("app.log")
-        file_handler.setFormatter(logging.Formatter(log_format))
-        logger.addHandler(file_handler)
-
-        # Console handler for local development
-        console_handler = logging.StreamHandler()
-        console_handler.setFormatter(logging.Formatter(log_format))
-        logger.addHandler(console_handler)
+    logger.addHandler(configure_logging())
 
     return logger
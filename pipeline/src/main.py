@@ -1,23 +1,193 @@
+import json
 import logging
+from functools import lru_cache
+from io import BytesIO
+from typing import Any, Dict, Iterator
 
+import flask
 import functions_framework
 
 from cloudevents.http import CloudEvent
-from src.graph import PipelineBuilder
+from pydantic import ValidationError
+from src.utils.clients import prewarm_clients_if_enabled
+
+# Start pre-warming before importing the graph, so that the dependency imports overlap.
+prewarm_clients_if_enabled()
+
+from src.config import Settings  # noqa: E402
+from src.graph import (  # noqa: E402
+    ExtractionPipelineBuilder,
+    PaperRecord,
+    PipelineBuilder,
+    get_shared_branch_executor,
+    payload_scope,
+    store_payload
+)
+from src.tasks import check_processed_paper  # noqa: E402
+from src.utils.bucket_objects import is_paper_object  # noqa: E402
+from src.utils.hash import generate_file_hash  # noqa: E402
+from src.utils.telemetry import configure_tracing, flush_telemetry, get_tracer  # noqa: E402
+from src.utils.usage import UsageReport, track_usage  # noqa: E402
+from src.logger import flush_logging  # noqa: E402
 
 logging.basicConfig(level=logging.INFO)
 
+tracer = get_tracer(__name__)
+
+# Configure tracing once per instance rather than on each event. Invalid settings are reported
+# when the first event is processed.
+try:
+    configure_tracing()
+except ValidationError:
+    pass
+
 @functions_framework.cloud_event
 def pipeline(event: CloudEvent) -> None:
     """Process a cloud event.
 
+    All the pipeline node spans are traced under one root span per event, and the LLM usage
+    of the run is logged once the pipeline completes. Payloads left in the payload store by a
+    failed run are released. The parallel branches run on the branch executor configured by the
+    `graph_max_concurrency` and `graph_shared_executor` settings.
+
+    The objects which are not papers (see `is_paper_object`), such as the ones the pipeline writes
+    to the bucket, are ignored.
+
     Args:
         event (CloudEvent): CloudEvent object.
     """
     try:
         logging.info(event)
-        pipeline_builder = PipelineBuilder(file=event.data["name"])
-        pipeline = pipeline_builder()
-        pipeline.invoke({"state": {}})
+        settings = Settings()
+        if not is_paper_object(event.data["name"], settings):
+            logging.info(f"Object {event.data['name']} is not a paper, it is ignored")
+            return
+        with tracer.start_as_current_span(
+            "pipeline",
+            attributes={"event.id": event["id"], "event.type": event["type"], "file.name": event.data["name"]}
+        ), track_usage() as usage, payload_scope():
+            pipeline_builder = PipelineBuilder(
+                file=event.data["name"],
+                max_concurrency=settings.graph_max_concurrency,
+                executor=(
+                    get_shared_branch_executor(settings.graph_max_concurrency)
+                    if settings.graph_shared_executor else None
+                ),
+                metadata_head_pages=settings.metadata_head_pages,
+                speculative_parse=settings.speculative_parse
+            )
+            pipeline = pipeline_builder()
+            pipeline.invoke({"state": {}})
+            log_usage(usage)
     except Exception as e:
-        logging.exception(e)
\ No newline at end of file
+        logging.exception(e)
+    finally:
+        # The instance can be frozen as soon as the function returns
+        flush_telemetry()
+        flush_logging()
+
+
+@functions_framework.http
+def extract(request: flask.Request) -> Any:
+    """Extract the fields of a PDF file posted in an HTTP request, and return them.
+
+    The file is the request body, or its `file` part for a multipart form. The response is
+    streamed as JSON lines: one per extraction branch, with its fields, as soon as the branch
+    completes, then the merged fields, with their status. The fields are inserted into BigQuery
+    only with the `store=true` query parameter, and if the paper has not been processed yet.
+
+    The pipeline is compiled once per instance (see `get_extraction_pipeline`), and reuses the
+    clients of the instance.
+
+    Args:
+        request (flask.Request): The HTTP request.
+
+    Returns:
+        The streamed response, or a 400 response if the request has no file.
+    """
+    file = request.files.get("file")
+    content = file.read() if file else request.get_data()
+    if not content:
+        return flask.jsonify({"error": "The request must contain a PDF file"}), 400
+    store = request.args.get("store", "").lower() in ("1", "true", "yes")
+    return flask.Response(stream_extraction(content, store), mimetype="application/x-ndjson")
+
+
+@lru_cache(maxsize=None)
+def get_extraction_pipeline() -> Any:
+    """Compile the extraction pipeline of the `extract` function, once per instance."""
+    settings = Settings()
+    return ExtractionPipelineBuilder(
+        max_concurrency=settings.graph_max_concurrency,
+        executor=(
+            get_shared_branch_executor(settings.graph_max_concurrency)
+            if settings.graph_shared_executor else None
+        ),
+        metadata_head_pages=settings.metadata_head_pages
+    )()
+
+
+def stream_extraction(content: bytes, store: bool) -> Iterator[str]:
+    """Run the extraction pipeline on a PDF file, yielding its results as JSON lines.
+
+    Args:
+        content (bytes): The PDF file.
+        store (bool): Whether to insert the extracted fields into BigQuery.
+
+    Yields:
+        str: The fields extracted by each branch (`node`, `fields` and `failed_fields`), then
+            the result (`paper_id`, `fields`, `field_status`, `duplicate_of` and `stored`), or an
+            `error`.
+    """
+    file = BytesIO(content)
+    with tracer.start_as_current_span("extract", attributes={"file.size": len(content), "store": store}), \
+            track_usage() as usage, payload_scope():
+        try:
+            paper_id = generate_file_hash(file)
+            if store and check_processed_paper(paper_id):
+                logging.info(f"Paper ID {paper_id} has already been processed, it is not stored again")
+                store = False
+            state = {"state": {"file": store_payload(file), "paper_id": paper_id, "store": store}}
+            duplicate_of = None
+            merged: Dict[str, Any] = {}
+            for update in get_extraction_pipeline().stream(state, stream_mode="updates"):
+                for node, output in update.items():
+                    output = output or {}
+                    duplicate_of = output.get("state", {}).get("duplicate_of", duplicate_of)
+                    if node == "Merge Results":
+                        merged = output["state"]
+                    elif output.get("record") is not None:
+                        record = output["record"]
+                        yield json.dumps({
+                            "node": node,
+                            "fields": record.to_dict() if isinstance(record, PaperRecord) else dict(record),
+                            "failed_fields": output.get("failed_fields") or []
+                        }) + "\n"
+            yield json.dumps({
+                "paper_id": paper_id,
+                "fields": {name: merged.get(name) for name in PaperRecord.__slots__},
+                "field_status": merged.get("field_status"),
+                "duplicate_of": duplicate_of,
+                "stored": store
+            }) + "\n"
+            log_usage(usage)
+        except Exception as e:
+            logging.exception(e)
+            yield json.dumps({"error": str(e)}) + "\n"
+        finally:
+            flush_telemetry()
+            flush_logging()
+
+
+def log_usage(usage: UsageReport) -> None:
+    """Log the LLM usage of a run, per task and in total."""
+    for task, totals in usage.totals_by_task().items():
+        logging.info(
+            f"LLM usage for task '{task}': {totals.requests} requests, {totals.prompt_tokens} prompt tokens, "
+            f"{totals.completion_tokens} completion tokens, {totals.latency:.3f}s"
+        )
+    totals = usage.totals()
+    logging.info(
+        f"LLM usage for the run: {totals.requests} requests, {totals.prompt_tokens} prompt tokens, "
+        f"{totals.completion_tokens} completion tokens, {totals.latency:.3f}s"
+    )
\ No newline at end of file
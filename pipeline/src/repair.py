@@ -0,0 +1,179 @@
+import argparse
+import logging
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from src.config import Settings
+from src.tasks.check_processed_paper import query_papers_with_failed_fields
+from src.tasks.extract_key_research_findings_and_methodology import key_research_findings_and_methodology_request
+from src.tasks.extract_metadata import METADATA_SCHEMA, metadata_request
+from src.tasks.extract_summary_and_keywords import summary_and_keywords_request, summary_request
+from src.tasks.insert_data_into_bigquery import update_research_paper_fields
+from src.tasks.prompts import TaskRequest
+from src.tasks.text_cache import delete_text, load_text
+from src.utils.field_status import FIELD_FAILED, field_status
+from src.utils.json_utils import extract_json_object
+from src.utils.keywords import extract_keywords
+from src.utils.usage import bind_paper_id, track_usage
+from src.utils.vertex_ai_llama_client import vertex_ai_llama_request
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class RepairResult(BaseModel):
+    """
+    Outcome of a repair.
+
+    Attributes:
+        repaired (List[str]): Papers whose failed fields were all extracted.
+        failed (List[str]): Papers with fields still failing after the repair.
+        skipped (List[str]): Papers whose text is not cached.
+    """
+
+    repaired: List[str] = []
+    failed: List[str] = []
+    skipped: List[str] = []
+
+
+def _repair_requests(text: str, failed: List[str], settings: Settings) -> List[TaskRequest]:
+    """
+    Build the requests of the tasks owning the failed fields, and only those: the metadata
+    request only asks for the failed metadata fields, and the summary request replaces the
+    summary and keywords request when the keywords did not fail.
+    """
+    requests = []
+    metadata = [field for field in METADATA_SCHEMA["required"] if field in failed]
+    if metadata:
+        requests.append(metadata_request(text, metadata))
+    if "keywords" in failed and settings.keyword_extractor == "llm":
+        requests.append(summary_and_keywords_request(text))
+    elif "summary" in failed:
+        requests.append(summary_request(text))
+    if "methodology" in failed or "key_research_findings" in failed:
+        requests.append(key_research_findings_and_methodology_request(text))
+    return requests
+
+
+def _run_request(request: TaskRequest, text: str) -> Optional[Dict[str, Any]]:
+    """Send a task request to Vertex AI, and parse its fields. Returns None if it fails."""
+    try:
+        logger.info(f"Extracting '{request.name}' again")
+        return extract_json_object(
+            vertex_ai_llama_request(
+                request.messages,
+                response_format=request.response_format,
+                task=request.task,
+                text=text
+            ),
+            fields=request.fields
+        )
+    except Exception as e:
+        logger.error(f"Error extracting '{request.name}' again: {e}")
+        return None
+
+
+def repair_paper(paper_id: str, statuses: Dict[str, str], settings: Settings) -> Optional[List[str]]:
+    """
+    Extract the failed fields of a paper again from its cached text, and update them in BigQuery.
+
+    Only the tasks owning the failed fields are run (see `_repair_requests`), and only the failed
+    fields are updated: the fields already extracted are left as they are.
+
+    Args:
+        paper_id (str): Unique identifier for the research paper.
+        statuses (Dict[str, str]): Status of every field of the paper, keyed by field name.
+        settings (Settings): The pipeline settings.
+
+    Returns:
+        Optional[List[str]]: The fields still failing, or None if the text is not cached.
+    """
+    failed = [field for field, status in statuses.items() if status == FIELD_FAILED]
+    text = load_text(paper_id)
+    if text is None:
+        logger.error(f"Text of paper ID {paper_id} is not cached, its fields {', '.join(failed)} cannot be repaired")
+        return None
+
+    data: Dict[str, Any] = {}
+    still_failed = list(failed)
+    if "keywords" in failed and settings.keyword_extractor == "local":
+        data["keywords"] = extract_keywords(text, settings.keyword_count) or None
+        still_failed.remove("keywords")
+    for request in _repair_requests(text, failed, settings):
+        fields = _run_request(request, text)
+        if fields is None:
+            continue
+        for field in request.fields:
+            if field in still_failed:
+                data[field] = fields.get(field)
+                still_failed.remove(field)
+
+    repaired_status = {
+        status["field"]: status["status"]
+        for status in field_status({field: data.get(field) for field in failed}, still_failed)
+    }
+    update_research_paper_fields(
+        paper_id,
+        data,
+        [{"field": field, "status": repaired_status.get(field, status)} for field, status in statuses.items()]
+    )
+    if not still_failed:
+        delete_text(paper_id)
+    return still_failed
+
+
+def run_repair(limit: Optional[int] = None, settings: Optional[Settings] = None) -> RepairResult:
+    """
+    Repair the papers with failed fields.
+
+    When an extraction task fails, the paper is inserted with the fields of the task set to
+    `None` and marked as `failed` in its field status, and its text is cached (see
+    `MergeResults`). The papers with failed fields are queried from BigQuery, and only their
+    failing tasks are run again on the cached text, usually one LLM request per paper instead of
+    a full pipeline run. The extracted fields and the field status are updated in place.
+
+    Args:
+        limit (Optional[int]): Maximum number of papers repaired.
+        settings (Optional[Settings]): The pipeline settings.
+
+    Returns:
+        RepairResult: The repaired, still failing and skipped papers.
+    """
+    settings = settings or Settings()
+    result = RepairResult()
+
+    with track_usage():
+        for paper_id, statuses in query_papers_with_failed_fields(limit).items():
+            try:
+                with bind_paper_id(paper_id):
+                    still_failed = repair_paper(paper_id, statuses, settings)
+            except Exception as e:
+                logger.error(f"Failed to repair paper ID {paper_id}: {e}")
+                result.failed.append(paper_id)
+                continue
+            if still_failed is None:
+                result.skipped.append(paper_id)
+            elif still_failed:
+                result.failed.append(paper_id)
+            else:
+                result.repaired.append(paper_id)
+
+    logger.info(
+        f"Repair complete: {len(result.repaired)} repaired, {len(result.failed)} failed, "
+        f"{len(result.skipped)} skipped"
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Extract the failed fields of the processed papers again.")
+    parser.add_argument("--limit", type=int, help="Maximum number of papers repaired.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    run_repair(args.limit)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,5 +3,5 @@ from .extract_metadata import extract_metadata
 from .extract_summary_and_keywords import extract_summary_and_keywords
 from .extract_key_research_findings_and_methodology import extract_key_research_findings_and_methodology
 from .get_file_from_bucket import get_file_from_bucket
-from .insert_data_into_bigquery import insert_data_into_bigquery
-from .check_processed_paper import check_processed_paper
\ No newline at end of file
+from .insert_data_into_bigquery import insert_data_into_bigquery, update_research_paper_fields
+from .check_processed_paper import check_processed_paper, check_processed_papers, query_papers_with_failed_fields
\ No newline at end of file
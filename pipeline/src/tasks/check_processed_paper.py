@@ -1,48 +1,125 @@
-from google.cloud.bigquery import Client, QueryJobConfig, ScalarQueryParameter
 from textwrap import dedent
+from typing import Dict, Optional, Sequence, Set
 
 from src.config import Settings
+from src.utils.clients import bigquery, get_bigquery_client
+from src.utils.field_status import FIELD_FAILED
 from src.tasks import BigQueryError
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Maximum number of paper IDs looked up per query, bounding the size of the query parameters
+# (BigQuery requests are limited to 10 MB).
+PROCESSED_CHECK_CHUNK_SIZE = 10000
 
-def check_processed_paper(
-    paper_id: str
-) -> bool:
+
+def check_processed_papers(
+    paper_ids: Sequence[str],
+    chunk_size: int = PROCESSED_CHECK_CHUNK_SIZE
+) -> Set[str]:
     """
-    Check if a research paper has already been processed and inserted into BigQuery.
+    Check which research papers have already been processed and inserted into BigQuery.
+
+    The IDs are looked up with one query per chunk of `chunk_size` IDs, passed as an array
+    parameter, rather than with one query per paper.
 
     Args:
-        paper_id (str): Unique identifier for the research paper.
+        paper_ids (Sequence[str]): Unique identifiers of the research papers.
+        chunk_size (int): Maximum number of IDs per query.
 
     Returns:
-        bool: True if the research paper has been processed, False otherwise.
+        Set[str]: The IDs of the processed research papers.
     """
     try:
-        logger.info(f"Checking if research paper with ID '{paper_id}' has already been processed")
-        client = Client()
+        ids = list(dict.fromkeys(paper_ids))
+        if not ids:
+            return set()
+        client = get_bigquery_client()
 
         query = dedent(f"""
             SELECT id
             FROM `{client.project}.{Settings().bigquery_dataset_id}.research_papers`
-            WHERE id = @paper_id
+            WHERE id IN UNNEST(@paper_ids)
         """).strip()
 
-        query_job = client.query(
-            query,
-            job_config=QueryJobConfig(
-                query_parameters=[
-                    ScalarQueryParameter("paper_id", "STRING", paper_id)
-                ]
+        processed = set()
+        for start in range(0, len(ids), chunk_size):
+            query_job = client.query(
+                query,
+                job_config=bigquery.QueryJobConfig(
+                    query_parameters=[
+                        bigquery.ArrayQueryParameter("paper_ids", "STRING", ids[start:start + chunk_size])
+                    ]
+                )
             )
-        )
-        processed = len(list(query_job)) > 0
+            processed.update(row["id"] for row in query_job)
 
-        logger.info(f"Research paper with ID '{paper_id}' is{' ' if processed else ' not '}processed")
+        logger.info(f"{len(processed)} of {len(ids)} research papers are processed")
 
         return processed
     except Exception as e:
         logger.error(f"Failed to query research paper data: {e}")
         raise BigQueryError(f"Failed to query research paper data: {e}")
+
+
+def check_processed_paper(
+    paper_id: str
+) -> bool:
+    """
+    Check if a research paper has already been processed and inserted into BigQuery (see
+    `check_processed_papers`).
+
+    Args:
+        paper_id (str): Unique identifier for the research paper.
+
+    Returns:
+        bool: True if the research paper has been processed, False otherwise.
+    """
+    logger.info(f"Checking if research paper with ID '{paper_id}' has already been processed")
+    processed = paper_id in check_processed_papers([paper_id])
+
+    logger.info(f"Research paper with ID '{paper_id}' is{' ' if processed else ' not '}processed")
+
+    return processed
+
+
+def query_papers_with_failed_fields(
+    limit: Optional[int] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    Query the research papers with at least one field whose extraction task failed.
+
+    Args:
+        limit (Optional[int]): Maximum number of papers returned.
+
+    Returns:
+        Dict[str, Dict[str, str]]: The status of every field of the papers (see `field_status`),
+            keyed by paper ID.
+    """
+    try:
+        logger.info("Querying research papers with failed fields")
+        client = get_bigquery_client()
+
+        query = dedent(f"""
+            SELECT id, field_status
+            FROM `{client.project}.{Settings().bigquery_dataset_id}.research_papers`
+            WHERE EXISTS(SELECT 1 FROM UNNEST(field_status) WHERE status = @status)
+            {"LIMIT @limit" if limit else ""}
+        """).strip()
+
+        parameters = [bigquery.ScalarQueryParameter("status", "STRING", FIELD_FAILED)]
+        if limit:
+            parameters.append(bigquery.ScalarQueryParameter("limit", "INT64", limit))
+        query_job = client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=parameters))
+        papers = {
+            row["id"]: {status["field"]: status["status"] for status in row["field_status"]}
+            for row in query_job
+        }
+
+        logger.info(f"Found {len(papers)} research papers with failed fields")
+
+        return papers
+    except Exception as e:
+        logger.error(f"Failed to query research papers with failed fields: {e}")
+        raise BigQueryError(f"Failed to query research papers with failed fields: {e}")
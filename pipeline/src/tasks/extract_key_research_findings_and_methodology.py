@@ -1,26 +1,38 @@
 from typing import Dict, Union, List
-import json
 
+from src.tasks.prompts import TaskRequest, task_messages
+from src.utils.field_status import report_failed_fields
+from src.utils.json_utils import extract_json_object, json_schema_response_format
 from src.utils.vertex_ai_llama_client import vertex_ai_llama_request
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+KEY_RESEARCH_FINDINGS_AND_METHODOLOGY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "methodology": {"type": ["string", "null"]},
+        "key_research_findings": {"type": ["array", "null"], "items": {"type": "string"}}
+    },
+    "required": ["methodology", "key_research_findings"],
+    "additionalProperties": False
+}
 
-def extract_key_research_findings_and_methodology(text: str) -> Dict[str, Union[str, List[str]]]:
-    """Extract key research findings and methodology from the given text."""
-    findings_prompt = f"""
-    You are an AI assistant. From the research paper text provided, extract the following:
+
+def key_research_findings_and_methodology_request(text: str) -> TaskRequest:
+    """Build the request extracting key research findings and methodology from the given text."""
+    findings_instructions = """
+    From the research paper text above, extract the following:
 
     - Methodology
     - Key Research Findings
 
     Provide the output in **valid JSON format** that strictly follows this JSON schema:
 
-    {{
+    {
         "methodology": "string",          // The methodology used in the research.
         "key_research_findings": ["string"] // The key findings of the research.
-    }}
+    }
 
     - Both fields are required: if any information is missing, set its value to null.
     - Extract the content exactly as it appears in the text, without any changes or modifications.
@@ -28,26 +40,44 @@ def extract_key_research_findings_and_methodology(text: str) -> Dict[str, Union[
 
     Example:
 
-    {{
+    {
     "methodology": "We conducted a series of experiments using a randomized controlled trial design to evaluate the effectiveness of the proposed algorithm.",
     "key_research_findings": ["The proposed algorithm outperformed baseline models by 15% in accuracy and demonstrated robustness across multiple datasets."]
-    }}
+    }
+    """
+    return TaskRequest(
+        name="key_research_findings_and_methodology",
+        task="key_research_findings_and_methodology",
+        messages=task_messages(text, findings_instructions),
+        response_format=json_schema_response_format("key_research_findings_and_methodology", KEY_RESEARCH_FINDINGS_AND_METHODOLOGY_SCHEMA),
+        fields=KEY_RESEARCH_FINDINGS_AND_METHODOLOGY_SCHEMA["required"]
+    )
 
-    Do not infer any data based on previous training, strictly use only source text given below:
 
-    Text:
-    \"\"\"
-    {text}
-    \"\"\"
+def extract_key_research_findings_and_methodology(text: str) -> Dict[str, Union[str, List[str]]]:
     """
+    Extract key research findings and methodology from the given text.
 
+    If the extraction fails, both fields are `None` and reported as failed (see
+    `report_failed_fields`).
+    """
+    request = key_research_findings_and_methodology_request(text)
     try:
         logger.info("Extracting key research findings and methodology")
-        return json.loads(vertex_ai_llama_request(findings_prompt).strip('```json').strip('```'))
+        return extract_json_object(
+            vertex_ai_llama_request(
+                request.messages,
+                response_format=request.response_format,
+                task=request.task,
+                text=text
+            ),
+            fields=request.fields
+        )
 
     except Exception as e:
         logger.error(f"Error extracting key research findings and methodology: {e}")
         print(f"Error extracting key research findings and methodology: {e}")
+        report_failed_fields(request.fields)
         return {
             "methodology": None,
             "key_research_findings": None
@@ -1,62 +1,164 @@
-from typing import Dict, Union, List
 import json
+from typing import Dict, Optional, Sequence, Union, List
 
+from src.tasks.prompts import TaskRequest, task_messages
+from src.utils.field_status import report_failed_fields
+from src.utils.json_utils import extract_json_object, json_schema_response_format
+from src.utils.pdf_metadata import extract_metadata_from_pdf
 from src.utils.vertex_ai_llama_client import vertex_ai_llama_request
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+METADATA_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "title": {"type": ["string", "null"]},
+        "authors": {"type": ["array", "null"], "items": {"type": "string"}},
+        "publication_date": {"type": ["string", "null"]},
+        "abstract": {"type": ["string", "null"]}
+    },
+    "required": ["title", "authors", "publication_date", "abstract"],
+    "additionalProperties": False
+}
 
-def extract_metadata(text: str) -> Dict[str, Union[str, List[str]]]:
-    """Extract metadata such as title, authors, publication date, and abstract."""
-    metadata_prompt = f"""
-    You are an AI assistant. Extract the following metadata from the research paper text:
+# Prompt parts of each metadata field: name, JSON type, description, rule and example value.
+METADATA_FIELD_PROMPTS = {
+    "title": (
+        "Title",
+        '"string"',
+        "The title of the paper.",
+        None,
+        "Advancements in Machine Learning"
+    ),
+    "authors": (
+        "Authors",
+        '["string"]',
+        "An array of author names.",
+        "Authors: should be an array of author names as strings.",
+        ["Alice Johnson", "Bob Smith"]
+    ),
+    "publication_date": (
+        "Publication Date",
+        '"string"',
+        'The publication date in "YYYY-MM-DD" format.',
+        'Publication Date: must be in "YYYY-MM-DD" format. It can be found at the beginning or end of the text in most cases.',
+        "2022-08-30"
+    ),
+    "abstract": (
+        "Abstract",
+        '"string"',
+        "The abstract of the paper.",
+        "Abstract: must be included exactly as it appears in the text, without any changes or modifications.",
+        "This study explores recent advancements in machine learning techniques."
+    )
+}
 
-    - Title
-    - Authors
-    - Publication Date
-    - Abstract
+
+def _metadata_instructions(fields: Sequence[str]) -> str:
+    """Build the instructions requesting the given metadata fields."""
+    prompts = [(field, *METADATA_FIELD_PROMPTS[field]) for field in fields]
+    separators = [","] * (len(prompts) - 1) + [""]
+    names = "\n    ".join(f"- {name}" for _, name, *_ in prompts)
+    schema = "\n        ".join(
+        f'"{field}": {json_type}{separator}'.ljust(34) + f"// {description}"
+        for (field, _, json_type, description, *_), separator in zip(prompts, separators)
+    )
+    rules = "".join(f"\n    - {rule}" for *_, rule, _ in prompts if rule)
+    example = "\n        ".join(
+        f'"{field}": {json.dumps(value)}{separator}'
+        for (field, *_, value), separator in zip(prompts, separators)
+    )
+    return f"""
+    Extract the following metadata from the research paper text above:
+
+    {names}
 
     Provide the output in **valid JSON format** that strictly follows this JSON schema:
 
     {{
-        "title": "string",                // The title of the paper.
-        "authors": ["string"],            // An array of author names.
-        "publication_date": "string",     // The publication date in "YYYY-MM-DD" format.
-        "abstract": "string"              // The abstract of the paper.
+        {schema}
     }}
 
-    - All fields are required: if any information is missing, set its value to null.
-    - Authors: should be an array of author names as strings.
-    - Publication Date: must be in "YYYY-MM-DD" format. It can be found at the beginning or end of the text in most cases.
-    - Abstract: must be included exactly as it appears in the text, without any changes or modifications.
+    - All fields are required: if any information is missing, set its value to null.{rules}
     - Do not include any additional text: output only the JSON object.
 
     Example:
 
     {{
-        "title": "Advancements in Machine Learning",
-        "authors": ["Alice Johnson", "Bob Smith"],
-        "publication_date": "2022-08-30",
-        "abstract": "This study explores recent advancements in machine learning techniques."
+        {example}
     }}
+    """
+
+
+def metadata_request(text: str, fields: Sequence[str]) -> TaskRequest:
+    """
+    Build the request extracting the given metadata fields.
+
+    Args:
+        text (str): Text of the paper.
+        fields (Sequence[str]): Metadata fields to extract.
+
+    Returns:
+        TaskRequest: The request.
+    """
+    fields = list(fields)
+    schema = {
+        **METADATA_SCHEMA,
+        "properties": {field: METADATA_SCHEMA["properties"][field] for field in fields},
+        "required": fields
+    }
+    return TaskRequest(
+        name="metadata",
+        task="metadata",
+        messages=task_messages(text, _metadata_instructions(fields)),
+        response_format=json_schema_response_format("metadata", schema),
+        fields=fields
+    )
 
-    Do not infer any data based on previous training, strictly use only source text given below:
 
-    Text:
-    \"\"\"
-    {text}
-    \"\"\"
+def extract_metadata(
+    text: str,
+    document_info: Optional[Dict[str, str]] = None,
+    first_page: Optional[str] = None
+) -> Dict[str, Union[str, List[str]]]:
     """
+    Extract metadata such as title, authors, publication date, and abstract.
+
+    The fields are first extracted without an LLM, from the PDF document information dictionary
+    and the first page text (see `extract_metadata_from_pdf`). Vertex AI is only asked for the
+    fields that could not be filled with confidence, if any. If that request fails, those fields
+    are `None` and reported as failed (see `report_failed_fields`).
+
+    Args:
+        text (str): Text of the paper.
+        document_info (Optional[Dict[str, str]]): Document information dictionary entries.
+        first_page (Optional[str]): First page text.
+
+    Returns:
+        Dict[str, Union[str, List[str]]]: The title, authors, publication date and abstract.
+    """
+    metadata = extract_metadata_from_pdf(document_info, first_page)
+    missing = [field for field in METADATA_SCHEMA["required"] if metadata[field] is None]
+    if not missing:
+        logger.info("Metadata extracted from the PDF, skipping Vertex AI")
+        return metadata
+
+    request = metadata_request(text, missing)
     try:
         logger.info("Extracting metadata")
-        return json.loads(vertex_ai_llama_request(metadata_prompt).strip('```json').strip('```'))
+        metadata.update(extract_json_object(
+            vertex_ai_llama_request(
+                request.messages,
+                response_format=request.response_format,
+                task=request.task,
+                text=text
+            ),
+            fields=request.fields
+        ))
+        return metadata
 
     except Exception as e:
         logger.error(f"Error extracting metadata: {e}")
-        return {
-            "title": None,
-            "authors": None,
-            "publication_date": None,
-            "abstract": None
-        }
+        report_failed_fields(request.fields)
+        return metadata
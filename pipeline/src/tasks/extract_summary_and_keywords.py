@@ -1,16 +1,37 @@
-from typing import Dict, Union, List
-import json
+from typing import Dict, Optional, Union, List
 
+from src.config import Settings
+from src.tasks.prompts import TaskRequest, task_messages
+from src.utils.field_status import report_failed_fields
+from src.utils.json_utils import extract_json_object, json_schema_response_format
+from src.utils.keywords import extract_keywords
 from src.utils.vertex_ai_llama_client import vertex_ai_llama_request
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+SUMMARY_AND_KEYWORDS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": ["string", "null"]},
+        "keywords": {"type": ["array", "null"], "items": {"type": "string"}}
+    },
+    "required": ["summary", "keywords"],
+    "additionalProperties": False
+}
+
+SUMMARY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": ["string", "null"]}
+    },
+    "required": ["summary"],
+    "additionalProperties": False
+}
 
-def extract_summary_and_keywords(text: str) -> Dict[str, Union[str, List[str]]]:
-    """Extract a summary and keywords from the given text."""
-    summary_prompt = f"""
-    You are an AI assistant. From the research paper text provided, perform the following tasks:
+
+SUMMARY_AND_KEYWORDS_INSTRUCTIONS = """
+    From the research paper text above, perform the following tasks:
 
     1. **Generate a concise summary**: Provide a brief summary of the paper in your own words.
 
@@ -18,10 +39,10 @@ def extract_summary_and_keywords(text: str) -> Dict[str, Union[str, List[str]]]:
 
     Provide the output in **valid JSON format** that strictly follows this JSON schema:
 
-    {{
+    {
         "summary": "string",      // A concise summary of the paper.
         "keywords": ["string"]    // An array of keywords or key phrases.
-    }}
+    }
 
 
     - Both fields are required: if any information is missing, set its value to null.
@@ -30,24 +51,109 @@ def extract_summary_and_keywords(text: str) -> Dict[str, Union[str, List[str]]]:
 
     Example:
 
-    {{
+    {
         "summary": "This paper explores the impact of artificial intelligence on job automation, analyzing employment data to reveal significant correlations.",
         "keywords": ["Artificial Intelligence", "Job Automation", "Employment Data", "Economic Impact"]
-    }}
+    }
+    """
+
+SUMMARY_INSTRUCTIONS = """
+    From the research paper text above, **generate a concise summary**:
+    provide a brief summary of the paper in your own words.
+
+    Provide the output in **valid JSON format** that strictly follows this JSON schema:
+
+    {
+        "summary": "string"       // A concise summary of the paper.
+    }
 
-    Do not infer any data based on previous training, strictly use only source text given below:
 
-    Text:
-    \"\"\"
-    {text}
-    \"\"\"
+    - The field is required: if the information is missing, set its value to null.
+    - Do **not** include any additional text: output **only the JSON object**. Do not begin with any introductory text or  "```json" line.
+
+    Example:
+
+    {
+        "summary": "This paper explores the impact of artificial intelligence on job automation, analyzing employment data to reveal significant correlations."
+    }
     """
+
+
+def summary_and_keywords_request(text: str) -> TaskRequest:
+    """Build the request extracting a summary and keywords from the given text."""
+    return TaskRequest(
+        name="summary_and_keywords",
+        task="summary_and_keywords",
+        messages=task_messages(text, SUMMARY_AND_KEYWORDS_INSTRUCTIONS),
+        response_format=json_schema_response_format("summary_and_keywords", SUMMARY_AND_KEYWORDS_SCHEMA),
+        fields=SUMMARY_AND_KEYWORDS_SCHEMA["required"]
+    )
+
+
+def summary_request(text: str) -> TaskRequest:
+    """Build the request extracting a summary only from the given text."""
+    return TaskRequest(
+        name="summary",
+        task="summary_and_keywords",
+        messages=task_messages(text, SUMMARY_INSTRUCTIONS),
+        response_format=json_schema_response_format("summary", SUMMARY_SCHEMA),
+        fields=SUMMARY_SCHEMA["required"]
+    )
+
+
+def extract_summary_and_keywords(text: str) -> Dict[str, Union[str, List[str]]]:
+    """
+    Extract a summary and keywords from the given text.
+
+    With the `local` keyword extractor setting, the keywords are scored locally from the text
+    (see `extract_keywords`) and Vertex AI is only asked for the summary.
+
+    The fields of a failed Vertex AI request are `None` and reported as failed (see
+    `report_failed_fields`).
+    """
+    settings = Settings()
+    if settings.keyword_extractor == "local":
+        return {
+            "summary": _extract_summary(text),
+            "keywords": extract_keywords(text, settings.keyword_count) or None
+        }
+
+    request = summary_and_keywords_request(text)
     try:
         logger.info("Extracting summary and keywords")
-        return json.loads(vertex_ai_llama_request(summary_prompt).strip('```json').strip('```'))
+        return extract_json_object(
+            vertex_ai_llama_request(
+                request.messages,
+                response_format=request.response_format,
+                task=request.task,
+                text=text
+            ),
+            fields=request.fields
+        )
     except Exception as e:
         logger.error(f"Error extracting summary and keywords: {e}")
+        report_failed_fields(request.fields)
         return {
             "summary": None,
             "keywords": None
-        }
\ No newline at end of file
+        }
+
+
+def _extract_summary(text: str) -> Optional[str]:
+    """Extract a summary only from the given text."""
+    request = summary_request(text)
+    try:
+        logger.info("Extracting summary")
+        return extract_json_object(
+            vertex_ai_llama_request(
+                request.messages,
+                response_format=request.response_format,
+                task=request.task,
+                text=text
+            ),
+            fields=request.fields
+        )["summary"]
+    except Exception as e:
+        logger.error(f"Error extracting summary: {e}")
+        report_failed_fields(request.fields)
+        return None
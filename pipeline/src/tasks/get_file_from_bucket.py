@@ -1,6 +1,6 @@
 from io import BytesIO
-from google.cloud import storage
 from src.config import Settings
+from src.utils.clients import get_storage_client
 from src.tasks import GoogleStorageError
 from src.logger import get_logger
 
@@ -23,8 +23,8 @@ def get_file_from_bucket(file_name: str) -> BytesIO:
     """
     try:
         logger.info(f"Downloading file '{file_name}' from Google Cloud Storage")
-        # Initialize the Google Cloud Storage client
-        storage_client = storage.Client()
+        # Get the shared Google Cloud Storage client
+        storage_client = get_storage_client()
 
         # Retrieve bucket details from settings
         bucket_name = Settings().google_storage_bucket_name
@@ -1,13 +1,18 @@
-
-from google.cloud.bigquery import Client
+from textwrap import dedent
+from typing import Dict, List
 
 from src.config import Settings
+from src.utils.clients import bigquery, get_bigquery_client
 from src.utils.hash import generate_unique_hash
+from src.utils.usage import current_usage_report
 from src.tasks import BigQueryError
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Text fields of the research_papers table.
+RESEARCH_PAPER_FIELDS = ("title", "abstract", "summary", "methodology", "publication_date")
+
 
 def insert_data_into_bigquery(
     paper_id: str,
@@ -16,23 +21,117 @@ def insert_data_into_bigquery(
     """
     Insert research paper data into BigQuery tables.
 
+    Missing or failed list fields (`None`) insert no rows: the paper is stored with the fields
+    that were extracted, and its field status.
+
+    If the `bigquery_store_llm_usage` setting is enabled, the LLM usage records of the paper
+    collected in the current usage report are inserted too.
+
     Args:
         paper_id (str): Unique identifier for the research paper.
         data (dict): Research paper data.
     """
-    dataset_id: str = Settings().bigquery_dataset_id
-    client = Client()
+    settings = Settings()
+    dataset_id: str = settings.bigquery_dataset_id
+    client = get_bigquery_client()
 
     logger.info(f"Inserting data into BigQuery tables for paper ID: {paper_id}")
     _insert_research_papers(client, dataset_id, paper_id, data)
     _insert_authors(client, dataset_id, paper_id, data)
     _insert_keywords(client, dataset_id, paper_id, data)
     _insert_key_research_findings(client, dataset_id, paper_id, data)
+    if settings.bigquery_store_llm_usage:
+        _insert_llm_usage(client, dataset_id, paper_id)
     logger.info(f"Data insertion complete for paper ID: {paper_id}")
 
 
+def update_research_paper_fields(
+    paper_id: str,
+    data: dict,
+    field_status: List[Dict[str, str]]
+) -> None:
+    """
+    Update the fields of a research paper already inserted into BigQuery, and its field status.
+
+    Text fields are updated in the research_papers table, and the rows of the list fields
+    (authors, keywords, key research findings) are inserted into their tables. Rows still in the
+    BigQuery streaming buffer (inserted within the last minutes) cannot be updated.
+
+    If the `bigquery_store_llm_usage` setting is enabled, the LLM usage records of the paper
+    collected in the current usage report are inserted too.
+
+    Args:
+        paper_id (str): Unique identifier for the research paper.
+        data (dict): Updated research paper fields.
+        field_status (List[Dict[str, str]]): Status of every field (see `field_status`).
+    """
+    settings = Settings()
+    dataset_id: str = settings.bigquery_dataset_id
+    client = get_bigquery_client()
+
+    logger.info(f"Updating fields {', '.join(data)} in BigQuery tables for paper ID: {paper_id}")
+    _update_research_papers(client, dataset_id, paper_id, data, field_status)
+    lists = {field: data.get(field) for field in ("authors", "keywords", "key_research_findings")}
+    _insert_authors(client, dataset_id, paper_id, lists)
+    _insert_keywords(client, dataset_id, paper_id, lists)
+    _insert_key_research_findings(client, dataset_id, paper_id, lists)
+    if settings.bigquery_store_llm_usage:
+        _insert_llm_usage(client, dataset_id, paper_id)
+    logger.info(f"Data update complete for paper ID: {paper_id}")
+
+
+def _update_research_papers(
+    client: "bigquery.Client",
+    dataset_id: str,
+    paper_id: str,
+    data: dict,
+    field_status: List[Dict[str, str]]
+) -> None:
+    """
+    Update the text fields and the field status of a research paper in research_papers table.
+
+    Args:
+        client (bigquery.Client): BigQuery client.
+        dataset_id (str): BigQuery dataset ID.
+        paper_id (str): Unique identifier for the research paper.
+        data (dict): Updated research paper fields.
+        field_status (List[Dict[str, str]]): Status of every field.
+    """
+    fields = [field for field in RESEARCH_PAPER_FIELDS if field in data]
+    assignments = [f"{field} = @{field}" for field in fields] + ["field_status = @field_status"]
+    query = dedent(f"""
+        UPDATE `{client.project}.{dataset_id}.research_papers`
+        SET {", ".join(assignments)}
+        WHERE id = @paper_id
+    """).strip()
+    parameters = [
+        bigquery.ScalarQueryParameter(field, "DATE" if field == "publication_date" else "STRING", data[field])
+        for field in fields
+    ]
+    status_type = bigquery.StructQueryParameterType(
+        bigquery.ScalarQueryParameterType("STRING", name="field"),
+        bigquery.ScalarQueryParameterType("STRING", name="status")
+    )
+    parameters.append(bigquery.ArrayQueryParameter("field_status", status_type, [
+        bigquery.StructQueryParameter(
+            None,
+            bigquery.ScalarQueryParameter("field", "STRING", status["field"]),
+            bigquery.ScalarQueryParameter("status", "STRING", status["status"])
+        )
+        for status in field_status
+    ]))
+    parameters.append(bigquery.ScalarQueryParameter("paper_id", "STRING", paper_id))
+
+    try:
+        logger.info(f"Updating research paper data in BigQuery table for paper ID: {paper_id}")
+        client.query(query, job_config=bigquery.QueryJobConfig(query_parameters=parameters)).result()
+    except Exception as e:
+        logger.error(f"Failed to update research paper data: {e}")
+        raise BigQueryError(f"Failed to update research paper data: {e}")
+
+
 def _insert_research_papers(
-    client: Client,
+    client: "bigquery.Client",
     dataset_id: str,
     paper_id: str,
     data: dict
@@ -41,7 +140,7 @@ def _insert_research_papers(
     Insert research paper data into research_papers table.
 
     Args:
-        client (Client): BigQuery client.
+        client (bigquery.Client): BigQuery client.
         dataset_id (str): BigQuery dataset ID.
         paper_id (str): Unique identifier for the research paper.
         data (dict): Research paper data.
@@ -52,7 +151,9 @@ def _insert_research_papers(
         "abstract": data["abstract"],
         "summary": data["summary"],
         "methodology": data["methodology"],
-        "publication_date": data["publication_date"]
+        "publication_date": data["publication_date"],
+        "field_status": data.get("field_status") or [],
+        "duplicate_of": data.get("duplicate_of")
     }]
     try:
         logger.info(f"Inserting research paper data into BigQuery table for paper ID: {paper_id}")
@@ -62,7 +163,7 @@ def _insert_research_papers(
         raise BigQueryError(f"Failed to insert research paper data: {e}")
 
 def _insert_authors(
-    client: Client,
+    client: "bigquery.Client",
     dataset_id: str,
     paper_id: str,
     data: dict
@@ -71,12 +172,14 @@ def _insert_authors(
     Insert author data into authors and authors_x_research_papers tables.
 
     Args:
-        client (Client): BigQuery client.
+        client (bigquery.Client): BigQuery client.
         dataset_id (str): BigQuery dataset ID.
         paper_id (str): Unique identifier for the research paper.
         data (dict): Research paper data.
     """
-    authors = list(map(lambda author: {'author_id': generate_unique_hash(author), 'name': author, 'paper_id': paper_id}, data['authors']))
+    authors = list(map(lambda author: {'author_id': generate_unique_hash(author), 'name': author, 'paper_id': paper_id}, data['authors'] or []))
+    if not authors:
+        return
 
     try:
         client.insert_rows_json(f"{client.project}.{dataset_id}.authors", authors, ignore_unknown_values=True, skip_invalid_rows=True)
@@ -91,7 +194,7 @@ def _insert_authors(
         raise BigQueryError(f"Failed to insert authors_x_research_papers data: {e}")
 
 def _insert_keywords(
-    client: Client,
+    client: "bigquery.Client",
     dataset_id: str,
     paper_id: str,
     data: dict
@@ -100,12 +203,14 @@ def _insert_keywords(
     Insert keyword data into keywords and keywords_x_research_papers tables.
 
     Args:
-        client (Client): BigQuery client.
+        client (bigquery.Client): BigQuery client.
         dataset_id (str): BigQuery dataset ID.
         paper_id (str): Unique identifier for the research paper.
         data (dict): Research paper data.
     """
-    keywords = list(map(lambda keyword: {'keyword_id': generate_unique_hash(keyword), 'keyword': keyword, 'paper_id': paper_id}, data['keywords']))
+    keywords = list(map(lambda keyword: {'keyword_id': generate_unique_hash(keyword), 'keyword': keyword, 'paper_id': paper_id}, data['keywords'] or []))
+    if not keywords:
+        return
 
     try:
         logger.info(f"Inserting keywords data into BigQuery table for paper ID: {paper_id}")
@@ -122,7 +227,7 @@ def _insert_keywords(
         raise BigQueryError(f"Failed to insert keywords_x_research_papers data: {e}")
 
 def _insert_key_research_findings(
-    client: Client,
+    client: "bigquery.Client",
     dataset_id: str,
     paper_id: str,
     data: dict
@@ -131,12 +236,14 @@ def _insert_key_research_findings(
     Insert key research findings data into key_research_findings table.
 
     Args:
-        client (Client): BigQuery client.
+        client (bigquery.Client): BigQuery client.
         dataset_id (str): BigQuery dataset ID.
         paper_id (str): Unique identifier for the research paper.
         data (dict): Research paper data.
     """
-    findings = list(map(lambda finding: {'paper_id': paper_id, 'finding': finding}, data['key_research_findings']))
+    findings = list(map(lambda finding: {'paper_id': paper_id, 'finding': finding}, data['key_research_findings'] or []))
+    if not findings:
+        return
 
     try:
         logger.info(f"Inserting key research findings data into BigQuery table for paper ID: {paper_id}")
@@ -144,3 +251,34 @@ def _insert_key_research_findings(
     except Exception as e:
         logger.error(f"Failed to insert key research findings data: {e}")
         raise BigQueryError(f"Failed to insert key research findings data: {e}")
+
+def _insert_llm_usage(
+    client: "bigquery.Client",
+    dataset_id: str,
+    paper_id: str
+) -> None:
+    """
+    Insert the LLM usage records of the paper into llm_usage table.
+
+    Args:
+        client (bigquery.Client): BigQuery client.
+        dataset_id (str): BigQuery dataset ID.
+        paper_id (str): Unique identifier for the research paper.
+    """
+    report = current_usage_report()
+    if report is None:
+        return
+
+    usage = [
+        {**record.model_dump(mode="json"), 'paper_id': paper_id}
+        for record in report.records(paper_id)
+    ]
+    if not usage:
+        return
+
+    try:
+        logger.info(f"Inserting LLM usage data into BigQuery table for paper ID: {paper_id}")
+        client.insert_rows_json(f"{client.project}.{dataset_id}.llm_usage", usage)
+    except Exception as e:
+        logger.error(f"Failed to insert LLM usage data: {e}")
+        raise BigQueryError(f"Failed to insert LLM usage data: {e}")
@@ -0,0 +1,69 @@
+from typing import Any, Dict, List
+
+from pydantic import BaseModel
+
+Message = Dict[str, str]
+
+SYSTEM_PROMPT = (
+    "You are an AI assistant extracting information from research papers. "
+    "Do not infer any data based on previous training, strictly use only the source text of the "
+    "research paper given by the user."
+)
+
+
+def document_messages(text: str) -> List[Message]:
+    """
+    Build the messages shared by every extraction request of a paper: the system prompt and the
+    paper text.
+
+    They do not depend on the task, so the requests of the different tasks start with the same
+    (multi-thousand-token) prefix, which the serving side can prefill once and reuse from its
+    prefix (KV) cache across the parallel extraction calls. This requires the requests to go to
+    the same model with the same paper text: the text is truncated once per paper (see
+    `shared_input_budget`), and tasks routed to different models (see the
+    `vertex_ai_task_models` setting) do not reuse the prefix.
+
+    Args:
+        text (str): Text of the paper.
+
+    Returns:
+        List[Message]: The chat messages.
+    """
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f'Research paper text:\n"""\n{text}\n"""'}
+    ]
+
+
+def task_messages(text: str, instructions: str) -> List[Message]:
+    """
+    Build the messages of an extraction request: the shared document messages (see
+    `document_messages`), followed by the instructions of the task.
+
+    Args:
+        text (str): Text of the paper.
+        instructions (str): Task instructions.
+
+    Returns:
+        List[Message]: The chat messages.
+    """
+    return document_messages(text) + [{"role": "user", "content": instructions}]
+
+
+class TaskRequest(BaseModel):
+    """
+    LLM request of an extraction task, sent synchronously or as part of a batch prediction job.
+
+    Attributes:
+        name (str): Name of the request, unique per paper (e.g. `summary`).
+        task (str): Name of the task, used to route the request and attribute its usage.
+        messages (List[Message]): Chat messages (see `task_messages`).
+        response_format (Dict[str, Any]): Expected output (see `json_schema_response_format`).
+        fields (List[str]): Fields of the JSON object expected in the response.
+    """
+
+    name: str
+    task: str
+    messages: List[Message]
+    response_format: Dict[str, Any]
+    fields: List[str]
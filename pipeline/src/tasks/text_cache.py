@@ -0,0 +1,70 @@
+from typing import Optional
+
+from src.config import Settings
+from src.utils.clients import get_storage_client
+from src.tasks import GoogleStorageError
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def _text_blob(paper_id: str, settings: Settings):
+    """Return the Google Cloud Storage blob of the cached text of a paper."""
+    if not settings.text_cache_bucket_name:
+        raise GoogleStorageError("The text_cache_bucket_name setting is required by the text cache")
+    bucket = get_storage_client().bucket(settings.text_cache_bucket_name)
+    return bucket.blob(f"{settings.text_cache_prefix.strip('/')}/{paper_id}.txt")
+
+
+def store_text(paper_id: str, text: str) -> None:
+    """
+    Store the normalised text of a paper in the text cache, under the `text_cache_prefix` of the
+    `text_cache_bucket_name` bucket, so that its failed fields can be extracted again without the
+    PDF (see `src.repair`).
+
+    Args:
+        paper_id (str): Unique identifier for the research paper.
+        text (str): Normalised text of the paper.
+    """
+    try:
+        logger.info(f"Caching the text of paper ID {paper_id}")
+        _text_blob(paper_id, Settings()).upload_from_string(text, content_type="text/plain; charset=utf-8")
+    except Exception as e:
+        logger.error(f"Failed to cache the text of paper ID {paper_id}: {e}")
+        raise GoogleStorageError(f"Failed to cache the text of paper ID {paper_id}: {e}")
+
+
+def load_text(paper_id: str) -> Optional[str]:
+    """
+    Load the cached text of a paper.
+
+    Args:
+        paper_id (str): Unique identifier for the research paper.
+
+    Returns:
+        Optional[str]: The text, or None if it is not cached.
+    """
+    try:
+        blob = _text_blob(paper_id, Settings())
+        if not blob.exists():
+            return None
+        return blob.download_as_bytes().decode("utf-8")
+    except Exception as e:
+        logger.error(f"Failed to load the cached text of paper ID {paper_id}: {e}")
+        raise GoogleStorageError(f"Failed to load the cached text of paper ID {paper_id}: {e}")
+
+
+def delete_text(paper_id: str) -> None:
+    """
+    Delete the cached text of a paper, once its fields no longer need to be repaired.
+
+    Args:
+        paper_id (str): Unique identifier for the research paper.
+    """
+    try:
+        blob = _text_blob(paper_id, Settings())
+        if blob.exists():
+            blob.delete()
+    except Exception as e:
+        logger.error(f"Failed to delete the cached text of paper ID {paper_id}: {e}")
+        raise GoogleStorageError(f"Failed to delete the cached text of paper ID {paper_id}: {e}")
@@ -0,0 +1,272 @@
+import json
+import time
+import uuid
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import requests
+from pydantic import BaseModel
+
+from src.config import Settings
+from src.utils.clients import get_storage_client
+from src.utils.vertex_ai_llama_client import get_project_id, get_token
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+JOB_STATE_SUCCEEDED = "JOB_STATE_SUCCEEDED"
+JOB_STATE_PARTIALLY_SUCCEEDED = "JOB_STATE_PARTIALLY_SUCCEEDED"
+# Terminal states of a batch prediction job, and those whose results can be read.
+TERMINAL_JOB_STATES = {
+    JOB_STATE_SUCCEEDED,
+    JOB_STATE_PARTIALLY_SUCCEEDED,
+    "JOB_STATE_FAILED",
+    "JOB_STATE_CANCELLED",
+    "JOB_STATE_EXPIRED",
+}
+COMPLETED_JOB_STATES = {JOB_STATE_SUCCEEDED, JOB_STATE_PARTIALLY_SUCCEEDED}
+
+VERTEX_AI_API = "https://us-central1-aiplatform.googleapis.com/v1"
+
+
+class BatchPredictionError(Exception):
+    """Custom exception for errors related to batch prediction jobs."""
+    pass
+
+
+class BatchRequest(BaseModel):
+    """
+    Request of a batch prediction job.
+
+    Attributes:
+        key (str): Key of the request, unique within the job.
+        payload (Dict[str, Any]): Chat completion payload (see `build_chat_payload`).
+    """
+
+    key: str
+    payload: Dict[str, Any]
+
+
+class BatchResult(BaseModel):
+    """
+    Result of a batch prediction request.
+
+    Attributes:
+        key (str): Key of the request.
+        content (Optional[str]): Content of the model response, if the request succeeded.
+        usage (Optional[Dict[str, Any]]): Response `usage` block, if reported.
+        error (Optional[str]): Error of the request, if it failed.
+    """
+
+    key: str
+    content: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+
+class BatchJobClient(ABC):
+    """
+    Interface of the batch prediction job services: submit a job, poll its state and read its
+    results. All the requests of a job are sent to the same model.
+    """
+
+    @abstractmethod
+    def submit(self, model: str, batch_requests: Sequence[BatchRequest]) -> str:
+        """Submit a batch prediction job and return its name."""
+
+    @abstractmethod
+    def state(self, job: str) -> str:
+        """Return the state of a job (e.g. `JOB_STATE_SUCCEEDED`)."""
+
+    @abstractmethod
+    def results(self, job: str) -> List[BatchResult]:
+        """Return the results of a completed job."""
+
+
+def parse_prediction(line: Dict[str, Any]) -> BatchResult:
+    """
+    Parse a line of a batch prediction output: the `custom_id` of the request, and its OpenAI
+    chat completion `response` (possibly wrapped in a `body`) or `error`.
+    """
+    key = line.get("custom_id") or line.get("key") or ""
+    response = line.get("response") or {}
+    response = response.get("body", response)
+    choices = response.get("choices") or []
+    if line.get("error") or not choices:
+        return BatchResult(key=key, error=str(line.get("error") or "No choices returned in the response."))
+    return BatchResult(
+        key=key,
+        content=choices[-1].get("message", {}).get("content", ""),
+        usage=response.get("usage")
+    )
+
+
+class VertexAIBatchJobClient(BatchJobClient):
+    """
+    Vertex AI batch prediction job client.
+
+    The requests are written as JSONL to the `batch_prediction_bucket_name` Google Cloud Storage
+    bucket, under the `batch_prediction_prefix`, and the job writes its predictions next to them.
+    Without a batch prediction bucket, the bucket of the pipeline is used: the pipeline then
+    ignores the files, but each of them still triggers an invocation.
+
+    Args:
+        settings (Settings): The pipeline settings.
+    """
+
+    def __init__(self, settings: Settings):
+        self.bucket_name = settings.batch_prediction_bucket_name or settings.google_storage_bucket_name
+        if not settings.batch_prediction_bucket_name:
+            logger.warning(
+                "The batch_prediction_bucket_name setting is not set, the batch prediction files are "
+                f"written to the bucket of the pipeline: {self.bucket_name}"
+            )
+        self.prefix = settings.batch_prediction_prefix.strip("/")
+        self.timeout = settings.vertex_ai_request_timeout
+
+    def _request(self, method: str, url: str, **kwargs) -> Dict[str, Any]:
+        try:
+            response = requests.request(
+                method,
+                url,
+                headers={"Authorization": f"Bearer {get_token()}", "Content-Type": "application/json"},
+                timeout=self.timeout,
+                **kwargs
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Vertex AI batch prediction request failed: {e}")
+            raise BatchPredictionError(f"Vertex AI batch prediction request failed: {e}")
+
+    def submit(self, model: str, batch_requests: Sequence[BatchRequest]) -> str:
+        job_id = uuid.uuid4().hex
+        input_name = f"{self.prefix}/{job_id}/input.jsonl"
+        lines = "".join(
+            json.dumps({
+                "custom_id": request.key,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": request.payload
+            }) + "\n"
+            for request in batch_requests
+        )
+        get_storage_client().bucket(self.bucket_name).blob(input_name).upload_from_string(
+            lines, content_type="application/jsonl"
+        )
+
+        # Model as a Model Garden publisher model, e.g. `meta/llama-3.1-405b-instruct-maas`
+        publisher, _, name = model.partition("/")
+        job = self._request(
+            "POST",
+            f"{VERTEX_AI_API}/projects/{get_project_id()}/locations/us-central1/batchPredictionJobs",
+            json={
+                "displayName": f"research-paper-backfill-{job_id}",
+                "model": f"publishers/{publisher}/models/{name}",
+                "inputConfig": {
+                    "instancesFormat": "jsonl",
+                    "gcsSource": {"uris": [f"gs://{self.bucket_name}/{input_name}"]}
+                },
+                "outputConfig": {
+                    "predictionsFormat": "jsonl",
+                    "gcsDestination": {"outputUriPrefix": f"gs://{self.bucket_name}/{self.prefix}/{job_id}/output"}
+                }
+            }
+        )
+        return job["name"]
+
+    def state(self, job: str) -> str:
+        return self._request("GET", f"{VERTEX_AI_API}/{job}")["state"]
+
+    def results(self, job: str) -> List[BatchResult]:
+        output = self._request("GET", f"{VERTEX_AI_API}/{job}")["outputInfo"]["gcsOutputDirectory"]
+        prefix = output.split(f"gs://{self.bucket_name}/", 1)[-1]
+        results = []
+        for blob in get_storage_client().bucket(self.bucket_name).list_blobs(prefix=prefix):
+            if not blob.name.endswith(".jsonl"):
+                continue
+            for line in blob.download_as_bytes().decode("utf-8").splitlines():
+                if line.strip():
+                    results.append(parse_prediction(json.loads(line)))
+        return results
+
+
+# Batch job client factories, keyed by the name used in the `batch_job_client` setting.
+BATCH_JOB_CLIENTS: Dict[str, Callable[[Settings], BatchJobClient]] = {
+    "vertex_ai": VertexAIBatchJobClient,
+}
+
+
+def register_batch_job_client(name: str, factory: Callable[[Settings], BatchJobClient]) -> None:
+    """
+    Register a batch prediction job client, selectable through the `batch_job_client` setting.
+
+    Args:
+        name (str): Name of the client.
+        factory (Callable[[Settings], BatchJobClient]): Builds the client from the settings.
+    """
+    BATCH_JOB_CLIENTS[name] = factory
+
+
+def get_batch_job_client(settings: Settings) -> BatchJobClient:
+    """
+    Build the batch prediction job client configured in the settings.
+
+    Raises:
+        BatchPredictionError: If an unknown client is configured.
+    """
+    if settings.batch_job_client not in BATCH_JOB_CLIENTS:
+        raise BatchPredictionError(f"Unknown batch job client: {settings.batch_job_client}")
+    return BATCH_JOB_CLIENTS[settings.batch_job_client](settings)
+
+
+def run_batch_prediction(
+    batch_requests: Sequence[BatchRequest],
+    client: BatchJobClient,
+    settings: Settings
+) -> Dict[str, BatchResult]:
+    """
+    Run requests as batch prediction jobs: one job per model, submitted together and polled
+    until all of them complete.
+
+    Args:
+        batch_requests (Sequence[BatchRequest]): The requests.
+        client (BatchJobClient): The batch prediction job client.
+        settings (Settings): The pipeline settings (poll interval and timeout).
+
+    Returns:
+        Dict[str, BatchResult]: The results, keyed by request key. Requests missing from the job
+            outputs have no result.
+
+    Raises:
+        BatchPredictionError: If a job fails, or does not complete before the timeout.
+    """
+    by_model: Dict[str, List[BatchRequest]] = defaultdict(list)
+    for request in batch_requests:
+        by_model[request.payload["model"]].append(request)
+
+    jobs = []
+    for model, model_requests in by_model.items():
+        job = client.submit(model, model_requests)
+        logger.info("Submitted batch prediction job %s: %d requests to model %s", job, len(model_requests), model)
+        jobs.append(job)
+
+    deadline = time.monotonic() + settings.batch_prediction_timeout
+    pending = list(jobs)
+    while pending:
+        for job in list(pending):
+            state = client.state(job)
+            if state not in TERMINAL_JOB_STATES:
+                continue
+            if state not in COMPLETED_JOB_STATES:
+                raise BatchPredictionError(f"Batch prediction job {job} ended in state {state}")
+            logger.info("Batch prediction job %s completed in state %s", job, state)
+            pending.remove(job)
+        if not pending:
+            break
+        if time.monotonic() >= deadline:
+            raise BatchPredictionError(f"Batch prediction jobs did not complete in time: {', '.join(pending)}")
+        time.sleep(settings.batch_prediction_poll_interval)
+
+    return {result.key: result for job in jobs for result in client.results(job)}
@@ -0,0 +1,23 @@
+from src.config import Settings
+
+
+def is_paper_object(name: str, settings: Settings) -> bool:
+    """
+    Check whether an object of the bucket is a paper to process: a PDF file, outside of the
+    prefixes the pipeline writes to.
+
+    The bucket notifications are not filtered by the trigger, so objects written by the pipeline
+    itself would otherwise be downloaded, hashed and looked up again before failing to parse.
+
+    Args:
+        name (str): Name of the object.
+        settings (Settings): The pipeline settings (`text_cache_prefix` and
+            `batch_prediction_prefix`).
+
+    Returns:
+        bool: Whether the object is a paper.
+    """
+    if not name.lower().endswith(".pdf"):
+        return False
+    prefixes = [settings.text_cache_prefix, settings.batch_prediction_prefix]
+    return not any(prefix and name.startswith(prefix.strip("/") + "/") for prefix in prefixes)
@@ -0,0 +1,88 @@
+import importlib
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable, Dict, List
+
+from pydantic import ValidationError
+
+from src.config import Settings
+from src.utils.lazy_import import lazy_import
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+bigquery = lazy_import("google.cloud.bigquery")
+storage = lazy_import("google.cloud.storage")
+
+
+@lru_cache(maxsize=None)
+def get_bigquery_client() -> "bigquery.Client":
+    """
+    Get the process-wide BigQuery client, created on first use.
+
+    Returns:
+        google.cloud.bigquery.Client: The BigQuery client.
+    """
+    logger.info("Creating BigQuery client")
+    return bigquery.Client()
+
+
+@lru_cache(maxsize=None)
+def get_storage_client() -> "storage.Client":
+    """
+    Get the process-wide Google Cloud Storage client, created on first use.
+
+    Returns:
+        google.cloud.storage.Client: The Google Cloud Storage client.
+    """
+    logger.info("Creating Google Cloud Storage client")
+    return storage.Client()
+
+
+def _import_pdfplumber() -> None:
+    importlib.import_module("pdfplumber")
+
+
+# Pre-warming tasks, keyed by name: each one imports a heavy dependency and creates its client.
+PREWARM_TASKS: Dict[str, Callable[[], object]] = {
+    "bigquery": get_bigquery_client,
+    "storage": get_storage_client,
+    "pdfplumber": _import_pdfplumber,
+}
+
+
+def prewarm_clients() -> List[Future]:
+    """
+    Import the heavy dependencies and create the clients in parallel, in background threads.
+
+    Failures are only logged: the clients are created again on first use.
+
+    Returns:
+        List[Future]: One future per pre-warming task.
+    """
+    def prewarm(name: str, task: Callable[[], object]) -> None:
+        try:
+            task()
+            logger.info("Pre-warmed %s", name)
+        except Exception as e:
+            logger.error(f"Failed to pre-warm {name}: {e}")
+
+    executor = ThreadPoolExecutor(max_workers=len(PREWARM_TASKS), thread_name_prefix="prewarm")
+    futures = [executor.submit(prewarm, name, task) for name, task in PREWARM_TASKS.items()]
+    executor.shutdown(wait=False)
+    return futures
+
+
+def prewarm_clients_if_enabled() -> None:
+    """
+    Start pre-warming the clients if the `prewarm_clients` setting is enabled.
+
+    Invalid settings are ignored here: they are reported when the first event is processed.
+    """
+    try:
+        enabled = Settings().prewarm_clients
+    except ValidationError:
+        return
+    if enabled:
+        logger.info("Pre-warming clients")
+        prewarm_clients()
@@ -0,0 +1,59 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional
+
+# Statuses of an extracted field: extracted, not found in the paper (null), or its task failed.
+FIELD_EXTRACTED = "extracted"
+FIELD_MISSING = "missing"
+FIELD_FAILED = "failed"
+
+_failed_fields: ContextVar[Optional[List[str]]] = ContextVar("failed_fields", default=None)
+
+
+@contextmanager
+def collect_failed_fields() -> Iterator[List[str]]:
+    """
+    Collect the fields whose extraction failed in the current context (see
+    `report_failed_fields`).
+
+    Yields:
+        List[str]: The failed fields, filled as the tasks report them.
+    """
+    failed: List[str] = []
+    token = _failed_fields.set(failed)
+    try:
+        yield failed
+    finally:
+        _failed_fields.reset(token)
+
+
+def report_failed_fields(fields: Iterable[str]) -> None:
+    """
+    Report fields whose extraction task failed, as opposed to fields the paper does not contain.
+    Ignored outside of `collect_failed_fields`.
+    """
+    failed = _failed_fields.get()
+    if failed is not None:
+        failed.extend(field for field in fields if field not in failed)
+
+
+def field_status(fields: Mapping[str, Any], failed: Iterable[str]) -> List[Dict[str, str]]:
+    """
+    Build the status of every field of a record: `failed` if its task failed, otherwise
+    `extracted` or `missing` depending on its value.
+
+    Args:
+        fields (Mapping[str, Any]): Field values, keyed by field name.
+        failed (Iterable[str]): Fields whose task failed.
+
+    Returns:
+        List[Dict[str, str]]: One `{"field", "status"}` entry per field, as stored in BigQuery.
+    """
+    failed = set(failed)
+    return [
+        {
+            "field": name,
+            "status": FIELD_FAILED if name in failed else FIELD_EXTRACTED if value is not None else FIELD_MISSING
+        }
+        for name, value in fields.items()
+    ]
@@ -26,20 +26,20 @@ def generate_file_hash(file: Union[str, BytesIO]) -> str:
     """
     hash_func = hashlib.sha256()
 
-    logger.info(f"Generating hash for file: {file}")
-
     if isinstance(file, str):
+        logger.info("Generating hash for file: %s", file)
         with open(file, 'rb') as f:
             for chunk in iter(lambda: f.read(4096), b""):
                 hash_func.update(chunk)
     else:
+        logger.info("Generating hash for in-memory file of %d bytes", file.getbuffer().nbytes)
         file.seek(0)  # Ensure reading from the start
         for chunk in iter(lambda: file.read(4096), b""):
             hash_func.update(chunk)
 
     hash = hash_func.hexdigest()
 
-    logger.info(f"Hash generated: {hash}")
+    logger.info("Hash generated: %s", hash)
 
     return hash
 
@@ -57,7 +57,7 @@ def generate_unique_hash(string: str) -> str:
     Raises:
         HashError: If the input string is empty or None.
     """
-    logger.info(f"Generating hash for string: {string}")
+    logger.info("Generating hash for string: %s", string)
 
     if not string or not string.strip():
         logger.error("Input string must not be empty or only whitespace.")
@@ -65,5 +65,5 @@ def generate_unique_hash(string: str) -> str:
 
     hash = hashlib.sha256(string.strip().encode("utf-8")).hexdigest()
 
-    logger.info(f"Hash generated: {hash}")
+    logger.info("Hash generated: %s", hash)
     return hash
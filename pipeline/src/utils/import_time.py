@@ -0,0 +1,151 @@
+import argparse
+import re
+import subprocess
+import sys
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+# Line written by `python -X importtime`, e.g. "import time:       212 |      83011 |     flask".
+_IMPORT_TIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+class ImportTimeError(Exception):
+    """Custom exception for import time measurement errors."""
+    pass
+
+
+class ImportTiming(BaseModel):
+    """
+    Import time of a module, as reported by `python -X importtime`.
+
+    Attributes:
+        module (str): Module name.
+        self_us (int): Time, in microseconds, spent importing the module itself.
+        cumulative_us (int): Time, in microseconds, including the modules it imported.
+        depth (int): Nesting level of the import (0 for the imported module).
+    """
+
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_import_times(output: str) -> List[ImportTiming]:
+    """
+    Parse the `python -X importtime` output.
+
+    Args:
+        output (str): The standard error output of the interpreter.
+
+    Returns:
+        List[ImportTiming]: The import time of every module, in import completion order.
+    """
+    timings = []
+    for line in output.splitlines():
+        match = _IMPORT_TIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            timings.append(ImportTiming(
+                module=module,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(indent) - 1) // 2
+            ))
+    return timings
+
+
+def measure_import_times(module: str) -> List[ImportTiming]:
+    """
+    Import a module in a fresh interpreter and measure the import time of every module loaded.
+
+    Args:
+        module (str): Name of the module to import.
+
+    Returns:
+        List[ImportTiming]: The import time of every module loaded.
+
+    Raises:
+        ImportTimeError: If the module cannot be imported.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True
+    )
+    if result.returncode != 0:
+        raise ImportTimeError(f"Failed to import {module}: {result.stderr.strip().splitlines()[-1:]}")
+    return parse_import_times(result.stderr)
+
+
+def total_import_time(module: str, timings: List[ImportTiming]) -> float:
+    """Return the total import time, in milliseconds, of a module."""
+    return next(
+        (timing.cumulative_us for timing in timings if timing.module == module and timing.depth == 0),
+        0
+    ) / 1000
+
+
+def format_report(
+    module: str,
+    timings: List[ImportTiming],
+    top: int = 20
+) -> str:
+    """
+    Format the import time report of a module.
+
+    The report shows the total import time of the module, then the top-level packages sorted
+    by cumulative import time (where the cost of a dependency is attributed), then the single
+    modules with the highest self import time.
+
+    Args:
+        module (str): Name of the imported module.
+        timings (List[ImportTiming]): The import times.
+        top (int): Number of rows of each ranking.
+
+    Returns:
+        str: The plain-text report.
+    """
+    packages = {}
+    for timing in timings:
+        package = timing.module.split(".")[0]
+        packages[package] = packages.get(package, 0) + timing.self_us
+
+    lines = [f"Import time of {module}: {total_import_time(module, timings):.1f} ms", "", f"  {'package':<48}{'self ms':>10}"]
+    for package, self_us in sorted(packages.items(), key=lambda item: -item[1])[:top]:
+        lines.append(f"  {package:<48}{self_us / 1000:>10.1f}")
+
+    lines += ["", f"  {'module':<48}{'self ms':>10}{'cumul. ms':>10}"]
+    for timing in sorted(timings, key=lambda timing: -timing.self_us)[:top]:
+        lines.append(f"  {timing.module:<48}{timing.self_us / 1000:>10.1f}{timing.cumulative_us / 1000:>10.1f}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m src.utils.import_time",
+        description="Report the import time cost per module of the pipeline entry point."
+    )
+    parser.add_argument("module", nargs="?", default="src.main", help="Module to import (default: src.main).")
+    parser.add_argument("--top", type=int, default=20, help="Number of rows of each ranking.")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=None,
+        help="Fail (exit code 1) if the total import time exceeds this budget, in milliseconds."
+    )
+    args = parser.parse_args(argv)
+
+    timings = measure_import_times(args.module)
+    print(format_report(args.module, timings, top=args.top))
+
+    total_ms = total_import_time(args.module, timings)
+    if args.budget_ms is not None and total_ms > args.budget_ms:
+        print(f"\nImport time budget exceeded: {total_ms:.1f} ms > {args.budget_ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+
+class JSONParseError(Exception):
+    """Custom exception for model outputs that cannot be parsed as a JSON object."""
+    pass
+
+
+class JSONObjectScanner:
+    """
+    Incremental scanner detecting when a streamed JSON object is complete.
+
+    Text is fed chunk by chunk, as it is received from a streaming API. Any text before the
+    first `{` (e.g. a "```json" fence or an introductory sentence) is skipped, and the scanner
+    tracks string literals, escape sequences and nesting depth to detect when the top-level
+    object closes, so the caller can stop consuming the stream right away.
+
+    Usage:
+        >>> scanner = JSONObjectScanner()
+        >>> scanner.feed('```json\\n{"title": "A {brace}')
+        False
+        >>> scanner.feed('"} and some trailing prose')
+        True
+        >>> scanner.value
+        '{"title": "A {brace}"}'
+    """
+
+    def __init__(self):
+        self._parts: List[str] = []
+        self._depth = 0
+        self._started = False
+        self._in_string = False
+        self._escape = False
+        self.complete = False
+
+    @property
+    def value(self) -> str:
+        """The JSON object text scanned so far."""
+        return ''.join(self._parts)
+
+    def feed(self, chunk: str) -> bool:
+        """
+        Feed a chunk of text to the scanner.
+
+        Args:
+            chunk (str): Next chunk of the streamed text.
+
+        Returns:
+            bool: True once the top-level JSON object is complete.
+        """
+        if self.complete:
+            return True
+
+        start = 0
+        if not self._started:
+            start = chunk.find('{')
+            if start == -1:
+                return False
+            self._started = True
+
+        for index in range(start, len(chunk)):
+            char = chunk[index]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == '\\':
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    self._parts.append(chunk[start:index + 1])
+                    self.complete = True
+                    return True
+
+        self._parts.append(chunk[start:])
+        return False
+
+
+_PYTHON_LITERALS = {"None": "null", "True": "true", "False": "false"}
+_SMART_QUOTES = str.maketrans({"\u201c": '"', "\u201d": '"'})
+
+
+def repair_json(text: str) -> str:
+    """
+    Repair common defects of LLM-generated JSON.
+
+    The following defects are fixed, outside of string literals:
+        - `//` line comments (often copied from the schema shown in the prompt).
+        - Trailing commas before a closing bracket.
+        - Python literals (`None`, `True`, `False`).
+        - Unterminated strings and unclosed brackets of a truncated output.
+
+    Args:
+        text (str): JSON text, starting at the opening `{`.
+
+    Returns:
+        str: The repaired JSON text.
+    """
+    text = text.translate(_SMART_QUOTES)
+    output: List[str] = []
+    stack: List[str] = []
+    in_string = False
+    escape = False
+    index = 0
+
+    while index < len(text):
+        char = text[index]
+        if in_string:
+            output.append(char)
+            if escape:
+                escape = False
+            elif char == '\\':
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            output.append(char)
+        elif text.startswith('//', index):
+            newline = text.find('\n', index)
+            index = len(text) if newline == -1 else newline
+            continue
+        elif char in '{[':
+            stack.append('}' if char == '{' else ']')
+            output.append(char)
+        elif char in '}]':
+            _strip_trailing_comma(output)
+            if stack:
+                stack.pop()
+            output.append(char)
+            if not stack:
+                break
+        elif char.isalpha():
+            end = index
+            while end < len(text) and text[end].isalpha():
+                end += 1
+            word = text[index:end]
+            output.append(_PYTHON_LITERALS.get(word, word))
+            index = end
+            continue
+        else:
+            output.append(char)
+        index += 1
+
+    if in_string:
+        if escape:
+            output.pop()
+        output.append('"')
+    while stack:
+        _strip_trailing_comma(output)
+        if ''.join(output).rstrip().endswith(':'):
+            output.append(' null')
+        output.append(stack.pop())
+
+    return ''.join(output)
+
+
+def _strip_trailing_comma(output: List[str]) -> None:
+    """Remove a trailing comma (and surrounding whitespace) from the output buffer."""
+    while output and output[-1].isspace():
+        output.pop()
+    if output and output[-1] == ',':
+        output.pop()
+
+
+def extract_json_object(
+    text: str,
+    fields: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """
+    Extract a JSON object from an LLM response, tolerating decorations and common defects.
+
+    A strict parse is tried first. Otherwise the first JSON object in the text is located,
+    skipping code fences and any surrounding prose, and it is repaired if needed.
+
+    Args:
+        text (str): The LLM response.
+        fields (Optional[Iterable[str]]): Expected fields. If given, the result contains exactly
+            these fields, and missing ones are set to None.
+
+    Returns:
+        Dict[str, Any]: The parsed JSON object.
+
+    Raises:
+        JSONParseError: If no JSON object can be extracted from the text.
+    """
+    try:
+        result = json.loads(text)
+    except (TypeError, ValueError):
+        result = None
+
+    if not isinstance(result, dict):
+        start = text.find('{') if isinstance(text, str) else -1
+        if start == -1:
+            raise JSONParseError("No JSON object found in the response.")
+
+        scanner = JSONObjectScanner()
+        scanner.feed(text[start:])
+        candidate = scanner.value if scanner.complete else text[start:]
+        try:
+            result = json.loads(candidate)
+        except ValueError:
+            try:
+                result = json.loads(repair_json(candidate))
+            except ValueError as e:
+                raise JSONParseError(f"Invalid JSON object in the response: {e}")
+
+    if not isinstance(result, dict):
+        raise JSONParseError("The response is not a JSON object.")
+
+    if fields is not None:
+        result = {field: result.get(field) for field in fields}
+
+    return result
+
+
+def json_schema_response_format(name: str, schema: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Build an OpenAI-compatible `response_format` requesting output constrained to a JSON schema.
+
+    Args:
+        name (str): Name of the schema.
+        schema (Dict[str, Any]): JSON schema of the expected output.
+
+    Returns:
+        Dict[str, Any]: The `response_format` payload.
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "schema": schema,
+            "strict": True
+        }
+    }
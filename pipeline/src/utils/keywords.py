@@ -0,0 +1,157 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+STOPWORDS = frozenset("""
+a about above across after again against al all almost also although always am among an and
+another any are as at based be because been before being below between both but by can compare
+compared could demonstrate demonstrated describe described did do does doing done due during
+each either et etc evaluate evaluated fig figure find for found from further given had has
+have having he her here hers herself him himself his how however i if in into introduce
+introduced is it its itself just less like many may might more most much must my myself near
+need new no nor not now obtain obtained of off on once one only or other others our ours
+ourselves out over own paper per present presented propose proposed provide provides rather
+report reported result results same section several she should show showed shown shows since
+so some study studied such table than that the their theirs them
+themselves then there therefore these they this those though through thus to too two under
+until up upon us use used uses using very via was we well were what when where whether which
+while who whom why will with within without would yet you your yours yourself yourselves
+""".split())
+
+# Words, including hyphenated and alphanumeric ones (e.g. "fine-tuning", "GPT4").
+WORD_PATTERN = re.compile(r"[A-Za-z][A-Za-z0-9]*(?:-[A-Za-z0-9]+)*")
+# Punctuation ending a candidate phrase.
+PHRASE_BOUNDARY_PATTERN = re.compile(r"[.,;:!?()\[\]{}\"“”‘’/\\|<>=+*•–—]|\n\s*\n")
+
+MAX_PHRASE_WORDS = 3
+MIN_WORD_LENGTH = 3
+
+
+def candidate_phrases(text: str) -> List[Tuple[str, ...]]:
+    """
+    Split a text into candidate keyword phrases, RAKE-style: runs of content words delimited by
+    stopwords, short words and punctuation. Runs longer than `MAX_PHRASE_WORDS` keep their last
+    words, where the head of an English noun phrase is.
+
+    Args:
+        text (str): The text.
+
+    Returns:
+        List[Tuple[str, ...]]: The phrases, as tuples of their original words, in text order.
+    """
+    phrases = []
+    for fragment in PHRASE_BOUNDARY_PATTERN.split(text):
+        phrase: List[str] = []
+        for word in WORD_PATTERN.findall(fragment) + [""]:
+            if word and word.lower() not in STOPWORDS and len(word) >= MIN_WORD_LENGTH:
+                phrase.append(word)
+                continue
+            if phrase:
+                phrases.append(tuple(phrase[-MAX_PHRASE_WORDS:]))
+            phrase = []
+    return phrases
+
+
+def _rake_scores(phrases: Sequence[Tuple[str, ...]]) -> Dict[Tuple[str, ...], float]:
+    """
+    Score the distinct phrases of a document: the sum of the degree-to-frequency ratios of their
+    words, weighted by the phrase frequency.
+    """
+    frequency: Counter = Counter()
+    degree: Counter = Counter()
+    counts: Counter = Counter()
+    for phrase in phrases:
+        key = tuple(word.lower() for word in phrase)
+        counts[key] += 1
+        for word in key:
+            frequency[word] += 1
+            degree[word] += len(key)
+
+    return {
+        key: sum(degree[word] / frequency[word] for word in key) * math.log1p(count)
+        for key, count in counts.items()
+    }
+
+
+def extract_keywords_batch(
+    texts: Sequence[str],
+    top_n: int = 10
+) -> List[List[str]]:
+    """
+    Extract the keywords of a batch of documents, without an LLM.
+
+    Candidate phrases are scored with RAKE within each document, and weighted by their inverse
+    document frequency across the batch, so that phrases shared by every document of a backfill
+    batch (e.g. venue boilerplate) rank below the phrases specific to each document. Each
+    document is tokenised once and the document frequencies are counted in a single pass.
+
+    Args:
+        texts (Sequence[str]): The documents.
+        top_n (int): Maximum number of keywords per document.
+
+    Returns:
+        List[List[str]]: The keywords of each document, best first, in their original casing.
+    """
+    documents = [candidate_phrases(text) for text in texts]
+    scores = [_rake_scores(phrases) for phrases in documents]
+
+    document_frequency: Counter = Counter()
+    for document_scores in scores:
+        document_frequency.update(document_scores.keys())
+    total = len(texts)
+
+    keywords = []
+    for phrases, document_scores in zip(documents, scores):
+        surface = {}
+        for phrase in phrases:
+            surface.setdefault(tuple(word.lower() for word in phrase), " ".join(phrase))
+
+        ranked = sorted(
+            document_scores,
+            key=lambda key: document_scores[key] * (math.log((1 + total) / (1 + document_frequency[key])) + 1),
+            reverse=True
+        )
+        keywords.append(_select(ranked, surface, top_n))
+
+    logger.info("Extracted keywords from %d documents", total)
+    return keywords
+
+
+def _select(
+    ranked: Iterable[Tuple[str, ...]],
+    surface: Dict[Tuple[str, ...], str],
+    top_n: int
+) -> List[str]:
+    """Keep the best phrases, skipping those contained in a phrase already selected."""
+    selected: List[Tuple[str, ...]] = []
+    for key in ranked:
+        if len(selected) == top_n:
+            break
+        if any(_contains(chosen, key) for chosen in selected):
+            continue
+        selected.append(key)
+    return [surface[key] for key in selected]
+
+
+def _contains(phrase: Tuple[str, ...], part: Tuple[str, ...]) -> bool:
+    """Whether `part` is a contiguous sub-phrase of `phrase`."""
+    return any(phrase[i:i + len(part)] == part for i in range(len(phrase) - len(part) + 1))
+
+
+def extract_keywords(text: str, top_n: int = 10) -> List[str]:
+    """
+    Extract the keywords of a document, without an LLM (see `extract_keywords_batch`).
+
+    Args:
+        text (str): The document.
+        top_n (int): Maximum number of keywords.
+
+    Returns:
+        List[str]: The keywords, best first.
+    """
+    return extract_keywords_batch([text], top_n)[0]
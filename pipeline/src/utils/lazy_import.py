@@ -0,0 +1,59 @@
+import importlib
+import threading
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule(ModuleType):
+    """
+    Module proxy importing the actual module on first attribute access.
+
+    Unlike `importlib.util.LazyLoader`, loading is thread-safe, so a lazy module can be first
+    used concurrently from the pipeline branches or the client pre-warming threads.
+
+    Args:
+        name (str): Fully qualified name of the module.
+    """
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__lock = threading.Lock()
+        self.__module = None
+
+    def _load(self) -> ModuleType:
+        """Import the module, once."""
+        if self.__module is None:
+            with self.__lock:
+                if self.__module is None:
+                    self.__module = importlib.import_module(self.__name__)
+        return self.__module
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._load(), name)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__module is not None else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Import a module lazily: its code only runs the first time one of its attributes is used.
+
+    Heavy dependencies not needed by every pipeline execution (e.g. `pdfplumber` for papers
+    already processed) are loaded this way, keeping them off the cold start path.
+
+    Args:
+        name (str): Fully qualified name of the module.
+
+    Returns:
+        ModuleType: A proxy of the module.
+
+    Usage:
+        >>> pdfplumber = lazy_import("pdfplumber")
+        >>> pdfplumber.open("paper.pdf")  # pdfplumber is imported here
+    """
+    return LazyModule(name)
@@ -0,0 +1,126 @@
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from src.config import Settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Tasks whose requests start with the paper text (see `document_messages`): the serving side can
+# prefill it once per paper and reuse it across their requests.
+EXTRACTION_TASKS = ("metadata", "summary_and_keywords", "key_research_findings_and_methodology")
+
+
+class ModelRoute(BaseModel):
+    """
+    Model and generation parameters of an LLM request.
+
+    Attributes:
+        model (str): Model name.
+        max_tokens (Optional[int]): Maximum number of completion tokens, if limited.
+        temperature (Optional[float]): Sampling temperature, if set.
+        max_input_tokens (Optional[int]): Token budget of the input text, if limited.
+    """
+
+    model: str
+    max_tokens: Optional[int] = None
+    temperature: Optional[float] = None
+    max_input_tokens: Optional[int] = None
+
+    def generation_parameters(self) -> Dict[str, Any]:
+        """Return the generation parameters to add to the request payload."""
+        parameters: Dict[str, Any] = {}
+        if self.max_tokens is not None:
+            parameters["max_tokens"] = self.max_tokens
+        if self.temperature is not None:
+            parameters["temperature"] = self.temperature
+        return parameters
+
+
+def route_model(
+    settings: Settings,
+    task: Optional[str],
+    text_length: int
+) -> ModelRoute:
+    """
+    Select the model and generation parameters of a task request.
+
+    The `vertex_ai_task_models` entry of the task overrides the global `vertex_ai_llama_model`
+    and `vertex_ai_max_input_tokens`, and the first of its rules matching the input text length overrides the parameters it sets.
+    This routes e.g. metadata extraction to a small fast model, and long papers to a model with a
+    bigger context window.
+
+    Args:
+        settings (Settings): The pipeline settings.
+        task (Optional[str]): Name of the task sending the request.
+        text_length (int): Length, in characters, of the task input text.
+
+    Returns:
+        ModelRoute: The model and generation parameters of the request.
+    """
+    route = _route(settings, task, text_length)
+    if task and task in settings.vertex_ai_task_models:
+        logger.info(
+            "Routing task '%s' (%d characters) to model %s",
+            task, text_length, route.model
+        )
+    return route
+
+
+def _route(settings: Settings, task: Optional[str], text_length: int) -> ModelRoute:
+    """Select the model and generation parameters of a task request (see `route_model`)."""
+    route = ModelRoute(
+        model=settings.vertex_ai_llama_model,
+        max_input_tokens=settings.vertex_ai_max_input_tokens
+    )
+    task_settings = settings.vertex_ai_task_models.get(task) if task else None
+    if task_settings is None:
+        return route
+
+    overrides = [task_settings]
+    for rule in task_settings.rules:
+        if rule.min_chars <= text_length and (rule.max_chars is None or text_length < rule.max_chars):
+            overrides.append(rule)
+            break
+
+    for override in overrides:
+        for name in ("model", "max_tokens", "temperature", "max_input_tokens"):
+            value = getattr(override, name)
+            if value is not None:
+                setattr(route, name, value)
+    return route
+
+
+def shared_input_budget(
+    settings: Settings,
+    task: Optional[str],
+    route: ModelRoute,
+    text_length: int
+) -> Optional[int]:
+    """
+    Input token budget of a task request, shared by the extraction tasks of a paper.
+
+    The extraction requests of a paper only share their prefix, the paper text, if it is
+    truncated the same way for every task. When the extraction tasks are all routed to the same
+    model, the text is therefore fitted to the smallest of their budgets rather than to the budget
+    of each task, so that it is truncated once per paper. Tasks routed to different models (see
+    the `vertex_ai_task_models` setting) cannot reuse each other's prefix cache anyway: each keeps
+    its own budget, and the prefix reuse is lost.
+
+    Args:
+        settings (Settings): The pipeline settings.
+        task (Optional[str]): Name of the task sending the request.
+        route (ModelRoute): Route of the request (see `route_model`).
+        text_length (int): Length, in characters, of the task input text.
+
+    Returns:
+        Optional[int]: The token budget of the input text, if limited.
+    """
+    if task not in EXTRACTION_TASKS:
+        return route.max_input_tokens
+    routes = [_route(settings, name, text_length) for name in EXTRACTION_TASKS]
+    if any(other.model != route.model for other in routes):
+        return route.max_input_tokens
+    budgets = [other.max_input_tokens for other in routes if other.max_input_tokens is not None]
+    return min(budgets) if budgets else None
@@ -0,0 +1,230 @@
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from pydantic import BaseModel
+
+from src.config import Settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+Signature = List[int]
+
+# Number of MinHash values of a signature, and number of LSH bands they are split into. With 16
+# bands of 8 values, pairs above a Jaccard similarity of about 0.7 are likely to share a band.
+NUM_PERM = 128
+BANDS = 16
+# Words per shingle.
+SHINGLE_WORDS = 3
+WORD_PATTERN = re.compile(r"\w+")
+# Value of a signature slot no shingle hashed to.
+EMPTY_SLOT = 2 ** 32 - 1
+
+
+class NearDuplicateIndexError(Exception):
+    """Custom exception for errors related to the near-duplicate index."""
+    pass
+
+
+def _shingle_hashes(text: str) -> Set[int]:
+    """Hash the word shingles of a text (lowercased), to 64-bit integers stable across processes."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < SHINGLE_WORDS:
+        words = words + [""] * (SHINGLE_WORDS - len(words))
+    return {
+        int.from_bytes(hashlib.blake2b(" ".join(words[i:i + SHINGLE_WORDS]).encode("utf-8"), digest_size=8).digest(), "big")
+        for i in range(len(words) - SHINGLE_WORDS + 1)
+    }
+
+
+def minhash_signature(text: str, num_perm: int = NUM_PERM) -> Signature:
+    """
+    Compute the MinHash signature of a text, over its word shingles.
+
+    The signature uses one-permutation hashing: every shingle is hashed once, the high bits of
+    the hash pick one of the `num_perm` slots and the low bits are its value, and each slot keeps
+    its minimum. This costs one hash per shingle rather than one per shingle and permutation,
+    and, like classic MinHash, two signatures agree on a slot with a probability close to the
+    Jaccard similarity of the shingle sets. Empty slots (short texts) borrow the value of the
+    next non-empty slot, so that they still compare meaningfully.
+
+    Args:
+        text (str): The (normalised) text.
+        num_perm (int): Number of signature slots.
+
+    Returns:
+        Signature: The signature.
+    """
+    signature = [EMPTY_SLOT] * num_perm
+    for value in _shingle_hashes(text):
+        slot = (value >> 32) % num_perm
+        low = value & EMPTY_SLOT
+        if low < signature[slot]:
+            signature[slot] = low
+
+    filled = [slot for slot, value in enumerate(signature) if value != EMPTY_SLOT]
+    if filled and len(filled) < num_perm:
+        densified = list(signature)
+        for slot in range(num_perm):
+            if signature[slot] == EMPTY_SLOT:
+                offset = 1
+                while signature[(slot + offset) % num_perm] == EMPTY_SLOT:
+                    offset += 1
+                densified[slot] = signature[(slot + offset) % num_perm]
+        signature = densified
+    return signature
+
+
+def minhash_signatures(texts: Iterable[str], num_perm: int = NUM_PERM) -> List[Signature]:
+    """Compute the MinHash signatures of a batch of texts (see `minhash_signature`)."""
+    return [minhash_signature(text, num_perm) for text in texts]
+
+
+def signature_similarity(a: Signature, b: Signature) -> float:
+    """Estimate the Jaccard similarity of two texts from their signatures: the share of equal slots."""
+    if len(a) != len(b) or not a:
+        raise NearDuplicateIndexError("Signatures must have the same, non-zero, length")
+    return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+class NearDuplicate(BaseModel):
+    """
+    Indexed paper similar to a new one.
+
+    Attributes:
+        paper_id (str): ID of the indexed paper.
+        similarity (float): Estimated Jaccard similarity of the texts.
+        record (Dict[str, Any]): Fields extracted from the indexed paper.
+    """
+
+    paper_id: str
+    similarity: float
+    record: Dict[str, Any]
+
+
+class NearDuplicateIndex:
+    """
+    Locality-sensitive hashing (LSH) index of MinHash signatures, with the fields extracted from
+    each indexed paper.
+
+    The signatures are split into bands, and papers sharing a band are candidates, whose
+    similarity is then estimated from their full signatures. If a path is given, the entries
+    are appended to a JSON Lines file as they are added, and loaded from it on creation.
+
+    Args:
+        path (Optional[str]): Path of the index file. The index is kept in memory only if not set.
+        num_perm (int): Signature length.
+        bands (int): Number of LSH bands (must divide `num_perm`).
+    """
+
+    def __init__(self, path: Optional[str] = None, num_perm: int = NUM_PERM, bands: int = BANDS):
+        if num_perm % bands:
+            raise NearDuplicateIndexError(f"The number of bands ({bands}) must divide the signature length ({num_perm})")
+        self.path = path
+        self.num_perm = num_perm
+        self.bands = bands
+        self._rows = num_perm // bands
+        self._entries: Dict[str, Tuple[Signature, Dict[str, Any]]] = {}
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[str]] = defaultdict(list)
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self._load(path)
+
+    def _band_keys(self, signature: Signature) -> List[Tuple[int, Tuple[int, ...]]]:
+        return [
+            (band, tuple(signature[band * self._rows:(band + 1) * self._rows]))
+            for band in range(self.bands)
+        ]
+
+    def _insert(self, paper_id: str, signature: Signature, record: Dict[str, Any]) -> None:
+        if len(signature) != self.num_perm:
+            raise NearDuplicateIndexError(f"Expected a signature of {self.num_perm} values, got {len(signature)}")
+        if paper_id in self._entries:
+            for key in self._band_keys(self._entries[paper_id][0]):
+                self._buckets[key].remove(paper_id)
+        for key in self._band_keys(signature):
+            self._buckets[key].append(paper_id)
+        self._entries[paper_id] = (list(signature), record)
+
+    def _load(self, path: str) -> None:
+        try:
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._insert(entry["paper_id"], entry["signature"], entry["record"])
+        except (OSError, ValueError, KeyError) as e:
+            logger.error(f"Failed to load the near-duplicate index {path}: {e}")
+            raise NearDuplicateIndexError(f"Failed to load the near-duplicate index {path}: {e}")
+        logger.info("Loaded %d papers from the near-duplicate index %s", len(self._entries), path)
+
+    def add(self, paper_id: str, signature: Signature, record: Dict[str, Any]) -> None:
+        """
+        Add a paper to the index, replacing its previous entry if any.
+
+        Args:
+            paper_id (str): ID of the paper.
+            signature (Signature): MinHash signature of its text.
+            record (Dict[str, Any]): Fields extracted from the paper (JSON serialisable).
+        """
+        with self._lock:
+            self._insert(paper_id, signature, record)
+            if self.path:
+                try:
+                    with open(self.path, "a", encoding="utf-8") as file:
+                        file.write(json.dumps({"paper_id": paper_id, "signature": signature, "record": record}) + "\n")
+                except OSError as e:
+                    logger.error(f"Failed to write the near-duplicate index {self.path}: {e}")
+                    raise NearDuplicateIndexError(f"Failed to write the near-duplicate index {self.path}: {e}")
+
+    def query(self, signature: Signature, threshold: float) -> Optional[NearDuplicate]:
+        """
+        Find the indexed paper most similar to a signature.
+
+        Args:
+            signature (Signature): MinHash signature of the new paper text.
+            threshold (float): Minimum estimated Jaccard similarity.
+
+        Returns:
+            Optional[NearDuplicate]: The most similar paper at or above the threshold, if any.
+        """
+        with self._lock:
+            candidates = {paper_id for key in self._band_keys(signature) for paper_id in self._buckets.get(key, ())}
+            best = None
+            for paper_id in sorted(candidates):
+                candidate, record = self._entries[paper_id]
+                similarity = signature_similarity(signature, candidate)
+                if similarity >= threshold and (best is None or similarity > best.similarity):
+                    best = NearDuplicate(paper_id=paper_id, similarity=similarity, record=dict(record))
+            return best
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, paper_id: str) -> bool:
+        return paper_id in self._entries
+
+
+@lru_cache(maxsize=None)
+def get_near_duplicate_index(path: Optional[str] = None) -> NearDuplicateIndex:
+    """
+    Get the near-duplicate index of the process, stored at a path, created on first use.
+
+    Args:
+        path (Optional[str]): Path of the index file (in memory only if not set).
+
+    Returns:
+        NearDuplicateIndex: The index.
+    """
+    return NearDuplicateIndex(path)
+
+
+def near_duplicate_index(settings: Settings) -> NearDuplicateIndex:
+    """Get the near-duplicate index configured by the `near_duplicate_index_path` setting."""
+    return get_near_duplicate_index(settings.near_duplicate_index_path)
@@ -0,0 +1,140 @@
+import re
+from datetime import date
+from typing import Dict, List, Optional, Union
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+METADATA_FIELDS = ("title", "authors", "publication_date", "abstract")
+
+# `D:YYYYMMDD...` dates of the PDF document information dictionary.
+PDF_DATE_PATTERN = re.compile(r"^(?:D:)?(\d{4})(\d{2})(\d{2})")
+# Document info titles left by the authoring tools rather than set by the authors.
+PLACEHOLDER_TITLE_PATTERN = re.compile(
+    r"(^untitled|^microsoft word|^slide \d|\.(pdf|docx?|tex|dvi|ps)$)",
+    re.IGNORECASE
+)
+AUTHOR_SEPARATOR_PATTERN = re.compile(r"\s*(?:,|;|\band\b|&)\s*", re.IGNORECASE)
+ABSTRACT_HEADING_PATTERN = re.compile(r"^\s*abstract\b[\s.:—–-]*", re.IGNORECASE | re.MULTILINE)
+# Headings following the abstract: keywords, index terms or the first (numbered) section.
+ABSTRACT_END_PATTERN = re.compile(
+    r"^\s*(?:keywords?|key\s+words|index\s+terms|(?:1|I)\.?\s+introduction|introduction)\b",
+    re.IGNORECASE | re.MULTILINE
+)
+
+MIN_TITLE_LENGTH = 10
+MAX_TITLE_LENGTH = 300
+MIN_ABSTRACT_LENGTH = 100
+
+
+def _normalize(text: str) -> str:
+    """Lowercase the text and collapse its whitespace, for lenient comparisons."""
+    return " ".join(text.split()).lower()
+
+
+def parse_pdf_date(value: str) -> Optional[str]:
+    """
+    Parse a PDF date (e.g. `D:20220830120000+01'00'`) into a "YYYY-MM-DD" date.
+
+    Args:
+        value (str): The PDF date.
+
+    Returns:
+        Optional[str]: The date, or None if it is not a valid PDF date.
+    """
+    match = PDF_DATE_PATTERN.match(value.strip())
+    if not match:
+        return None
+    try:
+        return date(*(int(group) for group in match.groups())).isoformat()
+    except ValueError:
+        return None
+
+
+def extract_title(document_info: Dict[str, str], first_page: str) -> Optional[str]:
+    """
+    Return the document info `Title` if it is a plausible title printed on the first page.
+    """
+    title = " ".join(document_info.get("Title", "").split())
+    if not MIN_TITLE_LENGTH <= len(title) <= MAX_TITLE_LENGTH or PLACEHOLDER_TITLE_PATTERN.search(title):
+        return None
+    if _normalize(title) not in _normalize(first_page):
+        return None
+    return title
+
+
+def extract_authors(document_info: Dict[str, str], first_page: str) -> Optional[List[str]]:
+    """
+    Return the document info `Author` names if all of them are printed on the first page.
+    """
+    names = [name for name in AUTHOR_SEPARATOR_PATTERN.split(document_info.get("Author", "")) if name]
+    # Single words are initials or surnames of "Surname, Initials" lists, not full names
+    if not names or any(len(name.split()) < 2 for name in names):
+        return None
+    page = _normalize(first_page)
+    if not all(_normalize(name) in page for name in names):
+        return None
+    return [" ".join(name.split()) for name in names]
+
+
+def extract_publication_date(document_info: Dict[str, str], first_page: str) -> Optional[str]:
+    """
+    Return the document info `CreationDate` if its year is printed on the first page, since the
+    creation date of a PDF is otherwise often a later export date.
+    """
+    publication_date = parse_pdf_date(document_info.get("CreationDate", ""))
+    if publication_date is None or publication_date[:4] not in first_page:
+        return None
+    return publication_date
+
+
+def extract_abstract(first_page: str) -> Optional[str]:
+    """
+    Return the text between an "Abstract" heading and the next heading (keywords, index terms or
+    introduction) of the first page. Abstracts without a closing heading on the first page may
+    continue on the next one, so they are not returned.
+    """
+    start = ABSTRACT_HEADING_PATTERN.search(first_page)
+    if start is None:
+        return None
+    end = ABSTRACT_END_PATTERN.search(first_page, start.end())
+    if end is None:
+        return None
+    abstract = " ".join(first_page[start.end():end.start()].split())
+    if len(abstract) < MIN_ABSTRACT_LENGTH:
+        return None
+    return abstract
+
+
+def extract_metadata_from_pdf(
+    document_info: Optional[Dict[str, str]],
+    first_page: Optional[str]
+) -> Dict[str, Union[str, List[str], None]]:
+    """
+    Extract the paper metadata without an LLM, from the PDF document information dictionary and
+    the first page text.
+
+    Each field is only filled when the heuristics are confident, e.g. a document info entry is
+    confirmed by the first page text; other fields are set to None.
+
+    Args:
+        document_info (Optional[Dict[str, str]]): Document information dictionary entries.
+        first_page (Optional[str]): First page text.
+
+    Returns:
+        Dict[str, Union[str, List[str], None]]: The title, authors, publication date and abstract.
+    """
+    document_info = document_info or {}
+    first_page = first_page or ""
+    metadata = {
+        "title": extract_title(document_info, first_page),
+        "authors": extract_authors(document_info, first_page),
+        "publication_date": extract_publication_date(document_info, first_page),
+        "abstract": extract_abstract(first_page)
+    }
+    logger.info(
+        "Metadata fields extracted from the PDF: %s",
+        [field for field in METADATA_FIELDS if metadata[field] is not None]
+    )
+    return metadata
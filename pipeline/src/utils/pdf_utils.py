@@ -1,24 +1,101 @@
-import pdfplumber
 from io import BytesIO
-from typing import Union
+from typing import Any, Callable, Dict, List, Optional, Union
+from pydantic import BaseModel
+from src.utils.lazy_import import lazy_import
 from src.logger import get_logger
 
+pdfplumber = lazy_import("pdfplumber")
+
 logger = get_logger(__name__)
 
 
+# Document information dictionary entries kept alongside the text.
+DOCUMENT_INFO_KEYS = ("Title", "Author", "CreationDate")
+
+
 class PDFExtractionError(Exception):
     """Custom exception for PDF extraction errors."""
     pass
 
 
-def extract_text_from_pdf(pdf: Union[str, BytesIO]) -> str:
-    """Extract text from a PDF file using pdfplumber.
+class PDFContent(BaseModel):
+    """
+    Content extracted from a PDF file.
+
+    Attributes:
+        text (str): Text of all the pages, concatenated.
+        page_lengths (List[int]): Length of the text of each page, in `text`.
+        document_info (Dict[str, str]): `Title`, `Author` and `CreationDate` entries of the
+            document information dictionary, if present.
+    """
+
+    text: str
+    page_lengths: List[int] = []
+    document_info: Dict[str, str] = {}
+
+    def pages(self) -> List[str]:
+        """Split the text into the text of each page."""
+        return split_pages(self.text, self.page_lengths)
+
+
+def split_pages(text: str, page_lengths: List[int]) -> List[str]:
+    """
+    Split a text into the text of each page.
+
+    Args:
+        text (str): Text of all the pages, concatenated.
+        page_lengths (List[int]): Length of the text of each page.
+
+    Returns:
+        List[str]: The text of each page.
+    """
+    pages = []
+    start = 0
+    for length in page_lengths:
+        pages.append(text[start:start + length])
+        start += length
+    return pages
+
+
+def _document_info(metadata: Dict[str, Any]) -> Dict[str, str]:
+    """Keep the text entries of the document information dictionary listed in `DOCUMENT_INFO_KEYS`."""
+    info = {}
+    for key in DOCUMENT_INFO_KEYS:
+        value = metadata.get(key)
+        if isinstance(value, bytes):
+            value = value.decode("utf-8", errors="ignore")
+        if isinstance(value, str) and value.strip():
+            info[key] = value.strip()
+    return info
+
+
+def _content(pages: List[str], document_info: Dict[str, str]) -> PDFContent:
+    return PDFContent(text=''.join(pages), page_lengths=[len(page) for page in pages], document_info=document_info)
+
+
+def extract_pdf_content(
+    pdf: Union[str, BytesIO],
+    head_pages: int = 0,
+    on_head: Optional[Callable[[PDFContent], None]] = None,
+    cancelled: Optional[Callable[[], bool]] = None
+) -> PDFContent:
+    """Extract the text, the page boundaries and the document information from a PDF file.
+
+    The content of the first pages can be handed over before the other pages are parsed, e.g. to
+    start working on the head of a long document early, and the parse can be abandoned, e.g. when
+    its result is no longer needed.
 
     Args:
         pdf (Union[str, BytesIO]): Path to the PDF file or a BytesIO object.
+        head_pages (int): Number of pages of the head content.
+        on_head (Optional[Callable[[PDFContent], None]]): Called with the content of the first
+            `head_pages` pages (or of all the pages of a shorter document) once parsed.
+        cancelled (Optional[Callable[[], bool]]): Checked before each page: once it returns
+            True, the remaining pages are not parsed.
 
     Returns:
-        str: Text extracted from the PDF file.
+        PDFContent: Content extracted from the PDF file (of the pages parsed before the parse was
+            cancelled, if it was).
 
     Raises:
         PDFExtractionError: If the PDF cannot be opened or processed.
@@ -27,10 +104,21 @@ def extract_text_from_pdf(pdf: Union[str, BytesIO]) -> str:
         logger.info("Extracting text from PDF")
 
         with pdfplumber.open(pdf) as pdf:
-            text = ''.join(page.extract_text() or '' for page in pdf.pages)
+            document_info = _document_info(pdf.metadata or {})
+            pages = []
+            for page in pdf.pages:
+                if cancelled is not None and cancelled():
+                    logger.info(f"PDF extraction cancelled after {len(pages)} pages")
+                    return _content(pages, document_info)
+                pages.append(page.extract_text() or '')
+                if on_head is not None and len(pages) == head_pages:
+                    on_head(_content(pages, document_info))
+                    on_head = None
+            if on_head is not None:
+                on_head(_content(pages, document_info))
 
         logger.info("Text extracted from PDF")
-        return text
+        return _content(pages, document_info)
     except Exception as e:
         logger.error(f"Failed to extract text from PDF: {e}")
         raise PDFExtractionError(f"Failed to extract text from PDF: {e}")
@@ -0,0 +1,295 @@
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from functools import lru_cache
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Callable, Deque, Optional, Set, TypeVar
+
+from pydantic import BaseModel, Field
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+# Default maximum number of calls running at once on the hedged call executor.
+HEDGE_MAX_WORKERS = 16
+
+
+class RetryPolicy(BaseModel):
+    """
+    Retry policy for remote calls.
+
+    Attributes:
+        max_retries (int): Number of retries after the first attempt (0 disables retries).
+        backoff_base (float): Base delay, in seconds, of the exponential backoff.
+        backoff_max (float): Upper bound, in seconds, of a single backoff delay.
+        hedge_percentile (Optional[float]): Latency percentile (0-100) after which a duplicate
+            (hedged) request is sent. Hedging is disabled when it is None.
+        hedge_min_samples (int): Minimum number of observed latencies needed before hedging.
+        hedge_max_workers (int): Maximum number of calls, primary or hedged, running at once on
+            the hedged call executor (see `HedgeExecutor`).
+    """
+
+    max_retries: int = Field(3, ge=0)
+    backoff_base: float = Field(1.0, ge=0)
+    backoff_max: float = Field(20.0, ge=0)
+    hedge_percentile: Optional[float] = Field(None, gt=0, lt=100)
+    hedge_min_samples: int = Field(20, ge=1)
+    hedge_max_workers: int = Field(HEDGE_MAX_WORKERS, ge=1)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        Compute the delay before the next attempt using exponential backoff with full jitter.
+
+        A server-provided `Retry-After` value is honoured as a lower bound. It is not capped at
+        `backoff_max`: retrying earlier than the server asked would only fail again, so
+        `call_with_retry` gives up instead when it exceeds `backoff_max`.
+
+        Args:
+            attempt (int): Zero-based number of the attempt that just failed.
+            retry_after (Optional[float]): Delay, in seconds, requested by the server.
+
+        Returns:
+            float: Seconds to sleep before retrying.
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class RetryableError(Exception):
+    """Error raised by an attempt that can be safely retried."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a `Retry-After` HTTP header value.
+
+    Args:
+        value (Optional[str]): Header value, either delay-seconds or an HTTP-date.
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class LatencyTracker:
+    """
+    Thread-safe sliding window of observed call latencies.
+
+    Args:
+        window (int): Maximum number of latencies kept.
+    """
+
+    def __init__(self, window: int = 200):
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float) -> None:
+        """Record a latency, in seconds."""
+        with self._lock:
+            self._latencies.append(latency)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._latencies)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """
+        Return the given percentile (0-100) of the recorded latencies, or None if there are none.
+        """
+        with self._lock:
+            samples = sorted(self._latencies)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, int(round(percentile / 100 * (len(samples) - 1))))
+        return samples[index]
+
+
+class HedgeExecutor:
+    """
+    Fixed-size thread pool of the hedged calls.
+
+    A call is only submitted when a worker is free: a call queued behind others would not cut
+    any latency, and an unbounded pool would let the hedged requests double the requests in
+    flight under load.
+
+    Args:
+        max_workers (int): Maximum number of calls running at once.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedged-request")
+        self._slots = threading.BoundedSemaphore(max_workers)
+
+    def try_submit(self, call: Callable[[], T]) -> Optional["Future[T]"]:
+        """Run `call` on a free worker, or return None if every worker is busy."""
+        if not self._slots.acquire(blocking=False):
+            return None
+        future = self._executor.submit(call)
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+@lru_cache(maxsize=None)
+def get_hedge_executor(max_workers: int = HEDGE_MAX_WORKERS) -> HedgeExecutor:
+    """Get the process-wide hedged call executor of the given size, created on first use."""
+    return HedgeExecutor(max_workers)
+
+
+def _discard(future: Future, on_discard: Callable[[T], None], context: contextvars.Context) -> None:
+    """Hand the result of a call that lost the race to `on_discard`, in the context of the caller."""
+    if future.cancelled() or future.exception() is not None:
+        return
+    try:
+        context.copy().run(on_discard, future.result())
+    except Exception as e:
+        logger.error(f"Failed to handle the result of a discarded hedged request: {e}")
+
+
+def hedged_call(
+    call: Callable[[], T],
+    hedge_after: float,
+    executor: Optional[HedgeExecutor] = None,
+    on_discard: Optional[Callable[[T], None]] = None
+) -> T:
+    """
+    Run `call` and, if it has not completed after `hedge_after` seconds, run a duplicate.
+
+    The first successful result wins; the slower call is left to finish in the background, and
+    its result, e.g. the usage of a billed response, is handed to `on_discard` once it completes.
+    If both calls fail, the error of the last one to finish is raised. The calls run on a
+    fixed-size executor: without a free worker, the call runs in the calling thread, unhedged,
+    and no duplicate is sent.
+
+    Args:
+        call (Callable[[], T]): Idempotent call to execute.
+        hedge_after (float): Seconds to wait for the primary call before hedging.
+        executor (Optional[HedgeExecutor]): Executor of the calls. Defaults to the
+            process-wide executor (see `get_hedge_executor`).
+        on_discard (Optional[Callable[[T], None]]): Called with the result of a successful call
+            that lost the race, in the context of the caller.
+
+    Returns:
+        T: The result of the first call to succeed.
+    """
+    executor = executor or get_hedge_executor()
+    context = contextvars.copy_context()
+
+    primary = executor.try_submit(call)
+    if primary is None:
+        logger.info("No hedged request worker available, sending the request without hedging")
+        return call()
+
+    done, pending = wait({primary}, timeout=hedge_after)
+    if not done:
+        hedge = executor.try_submit(call)
+        if hedge is None:
+            logger.info(f"Request exceeded {hedge_after:.2f}s, no worker available for a hedged request")
+        else:
+            logger.info(f"Request exceeded {hedge_after:.2f}s, sending hedged request")
+            pending.add(hedge)
+
+    error: Optional[BaseException] = None
+    while True:
+        for future in done:
+            error = future.exception()
+            if error is None:
+                if on_discard is not None:
+                    losers: Set[Future] = (done | pending) - {future}
+                    for loser in losers:
+                        loser.add_done_callback(lambda loser: _discard(loser, on_discard, context))
+                return future.result()
+        if not pending:
+            raise error
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+
+def call_with_retry(
+    call: Callable[[], T],
+    policy: RetryPolicy,
+    latency_tracker: Optional[LatencyTracker] = None,
+    sleep: Optional[Callable[[float], None]] = None,
+    on_discard: Optional[Callable[[T], None]] = None
+) -> T:
+    """
+    Execute `call` applying the given retry policy.
+
+    Only `RetryableError` exceptions are retried; any other exception is raised immediately.
+    A retryable error whose `Retry-After` exceeds the maximum backoff of the policy is raised
+    without retrying.
+    When hedging is enabled in the policy and enough latencies have been observed, each attempt
+    is hedged after the configured latency percentile (see `hedged_call`).
+
+    Args:
+        call (Callable[[], T]): Call to execute.
+        policy (RetryPolicy): Retry policy to apply.
+        latency_tracker (Optional[LatencyTracker]): Tracker used to record latencies and compute
+            the hedging threshold.
+        sleep (Optional[Callable[[float], None]]): Sleep function. Defaults to `time.sleep`.
+        on_discard (Optional[Callable[[T], None]]): Called with the result of a hedged call that
+            lost the race.
+
+    Returns:
+        T: The result of the call.
+
+    Raises:
+        RetryableError: If the last attempt fails with a retryable error.
+    """
+    for attempt in range(policy.max_retries + 1):
+        hedge_after = None
+        if (
+            policy.hedge_percentile is not None
+            and latency_tracker is not None
+            and len(latency_tracker) >= policy.hedge_min_samples
+        ):
+            hedge_after = latency_tracker.percentile(policy.hedge_percentile)
+
+        try:
+            start = time.perf_counter()
+            result = (
+                hedged_call(call, hedge_after, get_hedge_executor(policy.hedge_max_workers), on_discard)
+                if hedge_after is not None else call()
+            )
+            if latency_tracker is not None:
+                latency_tracker.record(time.perf_counter() - start)
+            return result
+        except RetryableError as e:
+            if attempt >= policy.max_retries:
+                raise
+            if e.retry_after is not None and e.retry_after > policy.backoff_max:
+                logger.warning(
+                    f"Attempt {attempt + 1}/{policy.max_retries + 1} failed ({e}), not retrying: "
+                    f"the server asked to wait {e.retry_after:.2f}s, more than {policy.backoff_max:.2f}s"
+                )
+                raise
+            delay = policy.backoff(attempt, e.retry_after)
+            logger.warning(
+                f"Attempt {attempt + 1}/{policy.max_retries + 1} failed ({e}), retrying in {delay:.2f}s"
+            )
+            (sleep or time.sleep)(delay)
@@ -0,0 +1,252 @@
+import json
+import threading
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from opentelemetry import metrics, trace
+from opentelemetry.sdk.metrics import MeterProvider
+from opentelemetry.sdk.metrics.export import (
+    ConsoleMetricExporter,
+    MetricExporter,
+    MetricExportResult,
+    MetricReader,
+    MetricsData,
+    PeriodicExportingMetricReader
+)
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import ReadableSpan, TracerProvider
+from opentelemetry.sdk.trace.export import (
+    BatchSpanProcessor,
+    ConsoleSpanExporter,
+    SpanExporter,
+    SpanExportResult
+)
+
+from src.config import Settings
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class TelemetryError(Exception):
+    """Custom exception for telemetry configuration errors."""
+    pass
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Span exporter appending finished spans to a local file, one JSON object per line.
+
+    Args:
+        path (str): Path of the output file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence[ReadableSpan]) -> SpanExportResult:
+        lines = ''.join(json.dumps(json.loads(span.to_json())) + '\n' for span in spans)
+        try:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as file:
+                file.write(lines)
+            return SpanExportResult.SUCCESS
+        except OSError as e:
+            logger.error(f"Failed to export spans to {self.path}: {e}")
+            return SpanExportResult.FAILURE
+
+    def shutdown(self) -> None:
+        pass
+
+
+class FileMetricExporter(MetricExporter):
+    """
+    Metric exporter appending the collected metrics to a local file, one JSON object per export.
+
+    Args:
+        path (str): Path of the output file.
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, metrics_data: MetricsData, timeout_millis: float = 10_000, **kwargs) -> MetricExportResult:
+        line = json.dumps(json.loads(metrics_data.to_json())) + '\n'
+        try:
+            with self._lock, open(self.path, 'a', encoding='utf-8') as file:
+                file.write(line)
+            return MetricExportResult.SUCCESS
+        except OSError as e:
+            logger.error(f"Failed to export metrics to {self.path}: {e}")
+            return MetricExportResult.FAILURE
+
+    def force_flush(self, timeout_millis: float = 10_000) -> bool:
+        return True
+
+    def shutdown(self, timeout_millis: float = 30_000, **kwargs) -> None:
+        pass
+
+
+def _otlp_exporter(settings: Settings) -> SpanExporter:
+    try:
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+    except ImportError as e:
+        raise TelemetryError(
+            f"The 'otlp' span exporter requires the opentelemetry-exporter-otlp-proto-http package: {e}"
+        )
+    return OTLPSpanExporter()
+
+
+# Span exporter factories, keyed by the name used in the `telemetry_exporter` setting.
+SPAN_EXPORTERS: Dict[str, Callable[[Settings], SpanExporter]] = {
+    "console": lambda settings: ConsoleSpanExporter(),
+    "file": lambda settings: FileSpanExporter(settings.telemetry_file_path),
+    "otlp": _otlp_exporter,
+}
+
+
+def _otlp_metric_exporter(settings: Settings) -> MetricExporter:
+    try:
+        from opentelemetry.exporter.otlp.proto.http.metric_exporter import OTLPMetricExporter
+    except ImportError as e:
+        raise TelemetryError(
+            f"The 'otlp' metric exporter requires the opentelemetry-exporter-otlp-proto-http package: {e}"
+        )
+    return OTLPMetricExporter()
+
+
+def _periodic_reader(exporter: Callable[[Settings], MetricExporter]) -> Callable[[Settings], MetricReader]:
+    """Build a metric reader factory exporting the metrics every `telemetry_metric_export_interval`."""
+    return lambda settings: PeriodicExportingMetricReader(
+        exporter(settings), export_interval_millis=settings.telemetry_metric_export_interval * 1000
+    )
+
+
+# Metric reader factories, keyed by the name used in the `telemetry_exporter` setting. An
+# exporter without a metric reader only exports spans.
+METRIC_READERS: Dict[str, Callable[[Settings], MetricReader]] = {
+    "console": _periodic_reader(lambda settings: ConsoleMetricExporter()),
+    "file": _periodic_reader(lambda settings: FileMetricExporter(settings.telemetry_metrics_file_path)),
+    "otlp": _periodic_reader(_otlp_metric_exporter),
+}
+
+
+def register_span_exporter(name: str, factory: Callable[[Settings], SpanExporter]) -> None:
+    """
+    Register a span exporter, selectable through the `telemetry_exporter` setting.
+
+    Args:
+        name (str): Name of the exporter.
+        factory (Callable[[Settings], SpanExporter]): Builds the exporter from the settings.
+    """
+    SPAN_EXPORTERS[name] = factory
+
+
+def register_metric_reader(name: str, factory: Callable[[Settings], MetricReader]) -> None:
+    """
+    Register a metric reader, selectable through the `telemetry_exporter` setting.
+
+    Args:
+        name (str): Name of the exporter.
+        factory (Callable[[Settings], MetricReader]): Builds the reader from the settings.
+    """
+    METRIC_READERS[name] = factory
+
+
+_configured = False
+_configure_lock = threading.Lock()
+# Providers installed by `configure_tracing`, flushed by `flush_telemetry`.
+_providers: List[Union[TracerProvider, MeterProvider]] = []
+
+
+def configure_tracing(settings: Optional[Settings] = None) -> None:
+    """
+    Install the OpenTelemetry tracer and meter providers with the configured exporters: the span
+    exporters, and the metric readers of the same names (e.g. of the `llm.tokens` and
+    `llm.request.duration` metrics, see `record_usage`).
+
+    It is a no-op after the first call, and when no exporter is configured: spans and metrics
+    are then recorded through the OpenTelemetry API no-op providers at negligible cost. An
+    invalid exporter is reported once with a warning, and telemetry is then disabled rather than
+    failing the pipeline runs.
+
+    Args:
+        settings (Optional[Settings]): Settings to read the exporters from.
+    """
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+
+        settings = settings or Settings()
+        names = [name.strip() for name in (settings.telemetry_exporter or '').split(',') if name.strip()]
+        try:
+            exporters, readers = _create_exporters(names, settings)
+        except TelemetryError as e:
+            logger.warning(f"Tracing and metrics are disabled: {e}")
+            exporters, readers = [], []
+
+        resource = Resource.create({"service.name": settings.telemetry_service_name})
+        if exporters:
+            provider = TracerProvider(resource=resource)
+            for exporter in exporters:
+                provider.add_span_processor(BatchSpanProcessor(exporter))
+            trace.set_tracer_provider(provider)
+            _providers.append(provider)
+            logger.info(f"Tracing configured with span exporters: {', '.join(names)}")
+        if readers:
+            meter_provider = MeterProvider(metric_readers=readers, resource=resource)
+            metrics.set_meter_provider(meter_provider)
+            _providers.append(meter_provider)
+            reader_names = [name for name in names if name in METRIC_READERS]
+            logger.info(f"Metrics configured with metric exporters: {', '.join(reader_names)}")
+
+        _configured = True
+
+
+def flush_telemetry() -> None:
+    """
+    Export the spans and metrics recorded so far, e.g. at the end of a Cloud Function
+    invocation, after which the instance can be frozen before the next periodic export.
+    """
+    for provider in _providers:
+        provider.force_flush()
+
+
+def _create_exporters(
+    names: Sequence[str],
+    settings: Settings
+) -> Tuple[List[SpanExporter], List[MetricReader]]:
+    """
+    Create the span exporters and the metric readers with the given names.
+
+    Args:
+        names (Sequence[str]): Names of the exporters.
+        settings (Settings): Settings to create the exporters from.
+
+    Returns:
+        Tuple[List[SpanExporter], List[MetricReader]]: The span exporters and metric readers.
+
+    Raises:
+        TelemetryError: If an exporter is unknown, or cannot be created.
+    """
+    unknown = [name for name in names if name not in SPAN_EXPORTERS and name not in METRIC_READERS]
+    if unknown:
+        raise TelemetryError(f"Unknown telemetry exporters: {', '.join(unknown)}")
+    exporters = [SPAN_EXPORTERS[name](settings) for name in names if name in SPAN_EXPORTERS]
+    readers = [METRIC_READERS[name](settings) for name in names if name in METRIC_READERS]
+    return exporters, readers
+
+
+def get_tracer(name: str) -> trace.Tracer:
+    """
+    Get an OpenTelemetry tracer.
+
+    Args:
+        name (str): Name of the instrumented module.
+
+    Returns:
+        trace.Tracer: The tracer.
+    """
+    return trace.get_tracer(name)
@@ -0,0 +1,134 @@
+import re
+from collections import Counter
+from typing import List, Sequence, Set
+
+from pydantic import BaseModel
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Lines at the top and bottom of each page where running headers and footers are searched.
+EDGE_LINES = 3
+# Minimum number of pages, and share of the pages, a header or footer line must repeat on.
+MIN_REPEATED_PAGES = 3
+MIN_REPEATED_SHARE = 0.5
+
+PAGE_NUMBER_PATTERN = re.compile(r"^(?:page\s*)?\d{1,4}(?:\s*(?:of|/)\s*\d{1,4})?$", re.IGNORECASE)
+DIGITS_PATTERN = re.compile(r"\d+")
+# A word broken by a hyphen at the end of a line, continued in lowercase on the next line.
+HYPHENATED_LINE_BREAK_PATTERN = re.compile(r"([A-Za-z])-\n[ \t]*([a-z])")
+SPACES_PATTERN = re.compile(r"[ \t\u00a0\u2000-\u200b]+")
+BLANK_LINES_PATTERN = re.compile(r"\n{3,}")
+
+
+class NormalizedText(BaseModel):
+    """
+    Text normalised by `normalize_pages`.
+
+    Attributes:
+        text (str): Normalised text of all the pages, concatenated.
+        page_lengths (List[int]): Length of the normalised text of each page, in `text`.
+        removed_lines (int): Number of running header, footer and page number lines removed.
+        original_length (int): Length of the original text, in characters.
+    """
+
+    text: str
+    page_lengths: List[int]
+    removed_lines: int
+    original_length: int
+
+    @property
+    def reduction(self) -> float:
+        """Share of the original characters removed."""
+        return 1 - len(self.text) / self.original_length if self.original_length else 0.0
+
+
+def _line_key(line: str) -> str:
+    """Comparison key of a line, ignoring case, spacing and numbers (e.g. running page numbers)."""
+    return DIGITS_PATTERN.sub("#", " ".join(line.split()).lower())
+
+
+def _edge_indexes(lines: Sequence[str]) -> List[int]:
+    """
+    Indexes of the first and last non-blank lines of a page: up to `EDGE_LINES` at each edge,
+    and at most a third of the lines each, so that the body of short pages is never an edge.
+    """
+    indexes = [index for index, line in enumerate(lines) if line.strip()]
+    count = min(EDGE_LINES, max(1, len(indexes) // 3))
+    return sorted(set(indexes[:count] + indexes[-count:]))
+
+
+def repeated_edge_lines(pages: Sequence[List[str]]) -> Set[str]:
+    """
+    Detect the running headers and footers: the keys of the lines found at the top or bottom of
+    at least `MIN_REPEATED_PAGES` pages and `MIN_REPEATED_SHARE` of the pages.
+
+    Args:
+        pages (Sequence[List[str]]): The lines of each page.
+
+    Returns:
+        Set[str]: The line keys (see `_line_key`).
+    """
+    threshold = max(MIN_REPEATED_PAGES, MIN_REPEATED_SHARE * len(pages))
+    counts: Counter = Counter()
+    for lines in pages:
+        counts.update({_line_key(lines[index]) for index in _edge_indexes(lines)})
+    return {key for key, count in counts.items() if count >= threshold and key}
+
+
+def normalize_text(text: str) -> str:
+    """
+    Join words hyphenated across line breaks, and collapse runs of spaces and blank lines.
+    Single line breaks are kept, since they delimit headings (e.g. "Abstract").
+    """
+    text = HYPHENATED_LINE_BREAK_PATTERN.sub(r"\1\2", text)
+    text = "\n".join(SPACES_PATTERN.sub(" ", line).strip() for line in text.split("\n"))
+    return BLANK_LINES_PATTERN.sub("\n\n", text).strip()
+
+
+def normalize_pages(pages: Sequence[str]) -> NormalizedText:
+    """
+    Normalise the text of the pages of a document before prompting: strip the running headers,
+    footers and page numbers (from every page but the first), de-hyphenate and collapse
+    whitespace.
+
+    Args:
+        pages (Sequence[str]): The text of each page.
+
+    Returns:
+        NormalizedText: The normalised text, with its page boundaries.
+    """
+    page_lines = [page.split("\n") for page in pages]
+    repeated = repeated_edge_lines(page_lines)
+    removed_lines = 0
+
+    normalized_pages = []
+    for page, lines in enumerate(page_lines):
+        # The first page is kept whole: its top lines hold the title (often repeated as the
+        # running header of the next pages) and its edges the publication date.
+        edges = set(_edge_indexes(lines)) if page > 0 else set()
+        kept = []
+        for index, line in enumerate(lines):
+            if index in edges and (_line_key(line) in repeated or PAGE_NUMBER_PATTERN.match(line.strip())):
+                removed_lines += 1
+                continue
+            kept.append(line)
+        normalized_pages.append(normalize_text("\n".join(kept)))
+
+    # Pages are separated by a line break, so that the last word of a page and the first word
+    # of the next one are not glued together.
+    normalized_pages = [page + "\n" if page else page for page in normalized_pages]
+    result = NormalizedText(
+        text="".join(normalized_pages),
+        page_lengths=[len(page) for page in normalized_pages],
+        removed_lines=removed_lines,
+        original_length=sum(len(page) for page in pages)
+    )
+    logger.info(
+        "Normalised text from %d to %d characters (~%d to ~%d tokens, -%.1f%%), "
+        "%d header, footer and page number lines removed",
+        result.original_length, len(result.text), result.original_length // 4, len(result.text) // 4,
+        result.reduction * 100, removed_lines
+    )
+    return result
@@ -0,0 +1,138 @@
+import re
+import threading
+from typing import Callable, Dict, Optional
+
+from pydantic import BaseModel
+
+TokenCounter = Callable[[str], int]
+
+# Words, numbers and single punctuation characters.
+PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+# Marker inserted where the middle of an over-budget text is dropped.
+TRUNCATION_MARKER = "\n[...]\n"
+# Share of the budget kept from the beginning of an over-budget text, the rest from its end.
+HEAD_SHARE = 2 / 3
+
+_counters: Dict[str, TokenCounter] = {}
+_counters_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text without a tokenizer: one token per punctuation
+    character, and one token per five characters of each word (rounded up). This slightly
+    overestimates the subword tokenizers of the Llama models on English text, which is the safe
+    side for budgets.
+    """
+    return sum((len(piece) + 4) // 5 for piece in PIECE_PATTERN.findall(text))
+
+
+def _tiktoken_counter() -> Optional[TokenCounter]:
+    """Return a `tiktoken` counter, if the optional `tiktoken` package is installed."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+def register_token_counter(model_prefix: str, counter: TokenCounter) -> None:
+    """
+    Register the token counter of the models whose name starts with a prefix, e.g. a tokenizer
+    matching the deployed model.
+    """
+    with _counters_lock:
+        _counters[model_prefix] = counter
+
+
+def get_token_counter(model: Optional[str] = None) -> TokenCounter:
+    """
+    Return the token counter of a model: the registered counter with the longest matching model
+    prefix, otherwise a `tiktoken` BPE counter if `tiktoken` is installed (the Llama 3 tokenizer
+    is a BPE tokenizer of the same family), otherwise `estimate_tokens`.
+    """
+    with _counters_lock:
+        prefixes = sorted((prefix for prefix in _counters if model and model.startswith(prefix)), key=len)
+        if prefixes:
+            return _counters[prefixes[-1]]
+        if "" not in _counters:
+            _counters[""] = _tiktoken_counter() or estimate_tokens
+        return _counters[""]
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Count the tokens of a text with the token counter of a model (see `get_token_counter`)."""
+    return get_token_counter(model)(text)
+
+
+class FittedText(BaseModel):
+    """
+    Text fitted to a token budget by `fit_to_budget`.
+
+    Attributes:
+        text (str): The text, truncated if it exceeded the budget.
+        tokens (int): Tokens of the fitted text.
+        original_tokens (int): Tokens of the original text.
+        truncated (bool): Whether the text was truncated.
+    """
+
+    text: str
+    tokens: int
+    original_tokens: int
+    truncated: bool = False
+
+    @property
+    def dropped_tokens(self) -> int:
+        return self.original_tokens - self.tokens
+
+
+def _cut(text: str, length: int, from_end: bool = False) -> str:
+    """Keep `length` characters from the start (or the end) of a text, at a whitespace boundary."""
+    if length <= 0:
+        return ""
+    if from_end:
+        part = text[-length:]
+        boundary = part.find(" ")
+        return part[boundary + 1:] if 0 <= boundary < len(part) // 10 else part
+    part = text[:length]
+    boundary = part.rfind(" ")
+    return part[:boundary] if boundary > len(part) - len(part) // 10 else part
+
+
+def fit_to_budget(
+    text: str,
+    max_tokens: Optional[int],
+    model: Optional[str] = None
+) -> FittedText:
+    """
+    Fit a text to a token budget.
+
+    Over-budget texts are truncated deterministically: the beginning (title, abstract and
+    introduction) and the end (conclusions) of the text are kept, in a 2:1 ratio, and the middle
+    is replaced by a `[...]` marker. The same text and budget always produce the same output.
+
+    Args:
+        text (str): The text.
+        max_tokens (Optional[int]): Token budget. The text is kept whole if not set.
+        model (Optional[str]): Model whose token counter is used.
+
+    Returns:
+        FittedText: The fitted text.
+    """
+    counter = get_token_counter(model)
+    original_tokens = counter(text)
+    if max_tokens is None or original_tokens <= max_tokens:
+        return FittedText(text=text, tokens=original_tokens, original_tokens=original_tokens)
+
+    # Start from the average characters per token of the text, and shrink until it fits.
+    length = int(len(text) * (max_tokens - counter(TRUNCATION_MARKER)) / original_tokens)
+    while True:
+        head_length = int(length * HEAD_SHARE)
+        fitted = _cut(text, head_length) + TRUNCATION_MARKER + _cut(text, length - head_length, from_end=True)
+        tokens = counter(fitted)
+        if tokens <= max_tokens or length <= 0:
+            break
+        length = int(length * 0.95)
+
+    return FittedText(text=fitted, tokens=tokens, original_tokens=original_tokens, truncated=True)
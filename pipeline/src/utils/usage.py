@@ -0,0 +1,261 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+
+from opentelemetry import metrics, trace
+from pydantic import BaseModel, Field
+
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+meter = metrics.get_meter(__name__)
+
+_token_counter = meter.create_counter(
+    "llm.tokens",
+    unit="{token}",
+    description="Tokens consumed by LLM requests, by task, model and token type."
+)
+_request_duration = meter.create_histogram(
+    "llm.request.duration",
+    unit="s",
+    description="Duration of LLM requests, including retries."
+)
+
+# ID of the paper being processed, bound by the instrumented pipeline nodes.
+_paper_id: ContextVar[Optional[str]] = ContextVar("paper_id", default=None)
+# Usage report of the current run, shared by all the nodes of a pipeline execution.
+_report: ContextVar[Optional["UsageReport"]] = ContextVar("usage_report", default=None)
+
+
+class UsageRecord(BaseModel):
+    """
+    Token usage and latency of a single LLM request.
+
+    Attributes:
+        task (Optional[str]): Name of the task that sent the request (e.g. `metadata`).
+        paper_id (Optional[str]): ID of the processed paper, if known.
+        model (str): Model name.
+        prompt_tokens (int): Prompt tokens.
+        completion_tokens (int): Completion tokens.
+        total_tokens (int): Total tokens.
+        latency (float): Request duration, in seconds, including retries.
+        estimated (bool): Whether the token counts are estimated from the text length, because
+            the response reported no usage (e.g. a stream closed before its final chunk).
+        truncated_tokens (int): Tokens of the input text dropped to fit its token budget (see
+            `fit_to_budget`). The input text was sent whole if 0.
+        created_at (datetime): Time the request completed.
+    """
+
+    task: Optional[str] = None
+    paper_id: Optional[str] = None
+    model: str
+    prompt_tokens: int
+    completion_tokens: int
+    total_tokens: int
+    latency: float
+    estimated: bool = False
+    truncated_tokens: int = 0
+    created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @classmethod
+    def from_response(
+        cls,
+        usage: Optional[Dict[str, Any]],
+        prompt: str,
+        completion: str,
+        **kwargs
+    ) -> "UsageRecord":
+        """
+        Build a record from the `usage` block of an OpenAI-compatible response.
+
+        If the response reported no usage, token counts are estimated at four characters per token.
+
+        Args:
+            usage (Optional[Dict[str, Any]]): The response `usage` block.
+            prompt (str): The prompt sent.
+            completion (str): The completion received.
+            **kwargs: Remaining record fields.
+
+        Returns:
+            UsageRecord: The usage record.
+        """
+        if usage:
+            prompt_tokens = int(usage.get("prompt_tokens") or 0)
+            completion_tokens = int(usage.get("completion_tokens") or 0)
+            total_tokens = int(usage.get("total_tokens") or prompt_tokens + completion_tokens)
+            return cls(
+                prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens,
+                total_tokens=total_tokens,
+                **kwargs
+            )
+
+        prompt_tokens = len(prompt) // 4
+        completion_tokens = len(completion) // 4
+        return cls(
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
+            total_tokens=prompt_tokens + completion_tokens,
+            estimated=True,
+            **kwargs
+        )
+
+
+class UsageTotals(BaseModel):
+    """Aggregated LLM usage."""
+
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    total_tokens: int = 0
+    latency: float = 0.0
+
+    def add(self, record: UsageRecord) -> None:
+        self.requests += 1
+        self.prompt_tokens += record.prompt_tokens
+        self.completion_tokens += record.completion_tokens
+        self.total_tokens += record.total_tokens
+        self.latency += record.latency
+
+
+class UsageReport:
+    """
+    Thread-safe collection of the LLM usage records of a run.
+    """
+
+    def __init__(self):
+        self._records: List[UsageRecord] = []
+        self._lock = threading.Lock()
+
+    def add(self, record: UsageRecord) -> None:
+        with self._lock:
+            self._records.append(record)
+
+    def records(self, paper_id: Optional[str] = None) -> List[UsageRecord]:
+        """Return the records, optionally only those of one paper."""
+        with self._lock:
+            return [record for record in self._records if paper_id is None or record.paper_id == paper_id]
+
+    def totals(self) -> UsageTotals:
+        """Return the usage aggregated over the whole run."""
+        totals = UsageTotals()
+        for record in self.records():
+            totals.add(record)
+        return totals
+
+    def totals_by_task(self) -> Dict[Optional[str], UsageTotals]:
+        """Return the usage aggregated per task."""
+        totals: Dict[Optional[str], UsageTotals] = {}
+        for record in self.records():
+            totals.setdefault(record.task, UsageTotals()).add(record)
+        return totals
+
+    def totals_by_paper(self) -> Dict[Optional[str], UsageTotals]:
+        """Return the usage aggregated per paper."""
+        totals: Dict[Optional[str], UsageTotals] = {}
+        for record in self.records():
+            totals.setdefault(record.paper_id, UsageTotals()).add(record)
+        return totals
+
+
+@contextmanager
+def bind_paper_id(paper_id: Optional[str]) -> Iterator[None]:
+    """
+    Attribute the LLM requests sent within the block to a paper.
+
+    Args:
+        paper_id (Optional[str]): ID of the processed paper.
+    """
+    token = _paper_id.set(paper_id)
+    try:
+        yield
+    finally:
+        _paper_id.reset(token)
+
+
+@contextmanager
+def track_usage() -> Iterator[UsageReport]:
+    """
+    Collect the LLM usage records of the requests sent within the block, including those sent
+    from the threads running the pipeline branches (they inherit the caller context).
+
+    Yields:
+        UsageReport: The usage report of the block.
+    """
+    report = UsageReport()
+    token = _report.set(report)
+    try:
+        yield report
+    finally:
+        _report.reset(token)
+
+
+def current_usage_report() -> Optional[UsageReport]:
+    """Return the usage report of the current run, if any."""
+    return _report.get()
+
+
+def record_usage(
+    usage: Optional[Dict[str, Any]],
+    prompt: str,
+    completion: str,
+    model: str,
+    latency: float,
+    task: Optional[str] = None,
+    truncated_tokens: int = 0
+) -> UsageRecord:
+    """
+    Record the usage of an LLM request.
+
+    The record is attributed to the current paper, added to the current usage report, added to
+    the `llm.tokens` and `llm.request.duration` OpenTelemetry metrics, and attached as an
+    `llm.usage` event to the current span.
+
+    Args:
+        usage (Optional[Dict[str, Any]]): The response `usage` block.
+        prompt (str): The prompt sent.
+        completion (str): The completion received.
+        model (str): Model name.
+        latency (float): Request duration, in seconds.
+        task (Optional[str]): Name of the task that sent the request.
+        truncated_tokens (int): Tokens of the input text dropped to fit its token budget.
+
+    Returns:
+        UsageRecord: The usage record.
+    """
+    record = UsageRecord.from_response(
+        usage,
+        prompt,
+        completion,
+        task=task,
+        paper_id=_paper_id.get(),
+        model=model,
+        latency=latency,
+        truncated_tokens=truncated_tokens
+    )
+
+    report = _report.get()
+    if report is not None:
+        report.add(record)
+
+    attributes = {"llm.task": task or "unknown", "llm.model": model}
+    _token_counter.add(record.prompt_tokens, {**attributes, "llm.token.type": "prompt"})
+    _token_counter.add(record.completion_tokens, {**attributes, "llm.token.type": "completion"})
+    _request_duration.record(latency, attributes)
+    trace.get_current_span().add_event("llm.usage", {
+        **attributes,
+        "llm.prompt_tokens": record.prompt_tokens,
+        "llm.completion_tokens": record.completion_tokens,
+        "llm.estimated": record.estimated,
+        "llm.truncated_tokens": record.truncated_tokens,
+        "llm.latency_s": latency
+    })
+
+    logger.info(
+        "LLM usage for task '%s' of paper ID %s: %d prompt tokens, %d completion tokens%s, %.3fs",
+        task, record.paper_id, record.prompt_tokens, record.completion_tokens,
+        " (estimated)" if record.estimated else "", latency
+    )
+    return record
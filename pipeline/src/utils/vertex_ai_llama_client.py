@@ -1,12 +1,33 @@
+import json
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional, Tuple, Union
+
 import requests
 from google.auth import default
 from google.auth.exceptions import GoogleAuthError
 from google.auth.transport.requests import Request
 from src.config import Settings
+from src.utils.json_utils import JSONObjectScanner
+from src.utils.model_routing import route_model, shared_input_budget
+from src.utils.tokens import fit_to_budget
+from src.utils.retry import (
+    LatencyTracker,
+    RetryableError,
+    RetryPolicy,
+    call_with_retry,
+    parse_retry_after
+)
+from src.utils.usage import record_usage
 from src.logger import get_logger
 
 logger = get_logger(__name__)
 
+# HTTP status codes worth retrying: timeouts, rate limiting and transient server errors.
+RETRYABLE_STATUS_CODES = {408, 429, 500, 502, 503, 504}
+
+_latency_tracker = LatencyTracker()
+
 
 class VertexAILlamaError(Exception):
     """Custom exception for errors related to Vertex AI Llama interactions."""
@@ -98,12 +119,231 @@ def get_endpoint():
         raise VertexAILlamaError(f"Failed to construct API endpoint: {e}")
 
 
-def vertex_ai_llama_request(prompt: str) -> str:
+def get_retry_policy() -> RetryPolicy:
+    """
+    Build the Vertex AI request retry policy from the settings.
+
+    Returns:
+        RetryPolicy: The configured retry policy.
+    """
+    settings = Settings()
+    return RetryPolicy(
+        max_retries=settings.vertex_ai_max_retries,
+        backoff_base=settings.vertex_ai_retry_backoff_base,
+        backoff_max=settings.vertex_ai_retry_backoff_max,
+        hedge_percentile=settings.vertex_ai_hedge_percentile,
+        hedge_max_workers=settings.vertex_ai_hedge_max_workers
+    )
+
+
+@contextmanager
+def _retryable_http_errors():
+    """
+    Translate transient `requests` errors into `RetryableError`.
+    """
+    try:
+        yield
+    except requests.exceptions.HTTPError as e:
+        if e.response is not None and e.response.status_code in RETRYABLE_STATUS_CODES:
+            raise RetryableError(
+                str(e),
+                retry_after=parse_retry_after(e.response.headers.get("Retry-After"))
+            )
+        raise
+    except (
+        requests.exceptions.Timeout,
+        requests.exceptions.ConnectionError,
+        requests.exceptions.ChunkedEncodingError
+    ) as e:
+        raise RetryableError(str(e))
+
+
+def _post_chat_completion(
+    endpoint: str,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+    timeout: float
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Send a single chat completion request and return the content of the last choice, along
+    with the response `usage` block.
+
+    Raises:
+        RetryableError: On timeouts, connection errors and retryable HTTP status codes.
+        VertexAILlamaError: If the response contains no choices.
+        requests.exceptions.RequestException: On non-retryable HTTP errors.
+    """
+    with _retryable_http_errors():
+        response = requests.post(
+            endpoint,
+            headers=headers,
+            json=payload,
+            timeout=timeout
+        )
+        response.raise_for_status()
+
+    body = response.json()
+    choices = body.get('choices', [])
+    if not choices:
+        logger.error("No choices returned in the response.")
+        raise VertexAILlamaError("No choices returned in the response.")
+    return choices[-1].get('message', {}).get('content', ''), body.get('usage')
+
+
+def _stream_chat_completion(
+    endpoint: str,
+    headers: Dict[str, str],
+    payload: Dict[str, Any],
+    timeout: float
+) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Send a streaming chat completion request and return the JSON object in the response, along
+    with the `usage` block if the stream reported it before being closed.
+
+    Server-sent event chunks are consumed as they arrive and scanned incrementally. As soon as
+    the top-level JSON object closes, the connection is closed to abort the generation, so no
+    trailing prose is waited for (nor paid for). If the stream ends before a JSON object is
+    complete, the whole streamed content is returned.
+
+    The `usage` block is requested with `stream_options`: OpenAI-compatible endpoints only send
+    it, in a final chunk without choices, when asked to.
+
+    Raises:
+        RetryableError: On timeouts, connection errors and retryable HTTP status codes.
+        requests.exceptions.RequestException: On non-retryable HTTP errors.
+    """
+    scanner = JSONObjectScanner()
+    content = []
+    usage = None
+
+    with _retryable_http_errors():
+        response = requests.post(
+            endpoint,
+            headers=headers,
+            json={**payload, "stream": True, "stream_options": {"include_usage": True}},
+            timeout=timeout,
+            stream=True
+        )
+        try:
+            response.raise_for_status()
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                usage = chunk.get('usage') or usage
+                choices = chunk.get('choices', [])
+                if not choices:
+                    continue
+                delta = choices[-1].get('delta', {}).get('content') or ''
+                content.append(delta)
+                if scanner.feed(delta):
+                    logger.info("JSON object complete, closing Vertex AI Llama API stream")
+                    return scanner.value, usage
+        finally:
+            response.close()
+
+    return ''.join(content), usage
+
+
+def build_chat_payload(
+    prompt: Union[str, List[Dict[str, str]]],
+    settings: Settings,
+    response_format: Optional[Dict[str, Any]] = None,
+    task: Optional[str] = None,
+    text: Optional[str] = None
+) -> Tuple[Dict[str, Any], int]:
+    """
+    Build the chat completion payload of a request, sent synchronously or in a batch prediction job.
+
+    The model and generation parameters are routed per task and input length (see
+    `route_model`), and the task input text embedded in the prompt is fitted to the token budget
+    of the route (see `fit_to_budget`), shared by the extraction tasks of a paper routed to the
+    same model (see `shared_input_budget`).
+
+    Args:
+        prompt (Union[str, List[Dict[str, str]]]): The user input prompt, or the chat messages.
+        settings (Settings): The pipeline settings.
+        response_format (Optional[Dict[str, Any]]): OpenAI-compatible `response_format`, only
+            added when the `vertex_ai_structured_output` setting is enabled.
+        task (Optional[str]): Name of the task sending the request.
+        text (Optional[str]): Task input text embedded in the prompt.
+
+    Returns:
+        Tuple[Dict[str, Any], int]: The payload, and the number of input text tokens dropped to
+            fit the budget.
+    """
+    messages = [{"role": "user", "content": prompt}] if isinstance(prompt, str) else prompt
+    route = route_model(
+        settings,
+        task,
+        len("".join(message["content"] for message in messages) if text is None else text)
+    )
+
+    truncated_tokens = 0
+    if text is not None:
+        fitted = fit_to_budget(text, shared_input_budget(settings, task, route, len(text)), route.model)
+        if fitted.truncated:
+            logger.warning(
+                "Truncated the input text of task '%s' from %d to %d tokens to fit its budget",
+                task, fitted.original_tokens, fitted.tokens
+            )
+            messages = [
+                {**message, "content": message["content"].replace(text, fitted.text, 1)}
+                for message in messages
+            ]
+            truncated_tokens = fitted.dropped_tokens
+
+    payload = {
+        "model": route.model,
+        "stream": False,
+        "messages": messages,
+        **route.generation_parameters()
+    }
+    if response_format is not None and settings.vertex_ai_structured_output:
+        payload["response_format"] = response_format
+    return payload, truncated_tokens
+
+
+def vertex_ai_llama_request(
+    prompt: Union[str, List[Dict[str, str]]],
+    retry_policy: Optional[RetryPolicy] = None,
+    stream: Optional[bool] = None,
+    response_format: Optional[Dict[str, Any]] = None,
+    task: Optional[str] = None,
+    text: Optional[str] = None
+) -> str:
     """
     Send a request to the Vertex AI Llama API service.
 
+    Transient failures (timeouts, connection errors, rate limiting and 5xx responses) are
+    retried with jittered exponential backoff, honouring the `Retry-After` header. If hedging
+    is enabled, a duplicate request is sent when the first one is slower than the configured
+    latency percentile, and the first answer is used; the usage of the other is recorded too.
+
+    In streaming mode, the response is consumed incrementally and the request returns as soon
+    as the JSON object in the response is complete, aborting any further generation.
+
+    The request payload is built by `build_chat_payload`, and the token usage and latency of
+    every successful request are recorded with `record_usage`.
+
     Args:
-        prompt (str): The user input prompt for the Llama model.
+        prompt (Union[str, List[Dict[str, str]]]): The user input prompt for the Llama model, or
+            the chat messages (`role` and `content`) of the request (see `task_messages`).
+        retry_policy (Optional[RetryPolicy]): Retry policy to apply. Defaults to the policy
+            built from the settings.
+        stream (Optional[bool]): Whether to stream the response. Defaults to the
+            `vertex_ai_stream` setting.
+        response_format (Optional[Dict[str, Any]]): OpenAI-compatible `response_format` describing
+            the expected output (see `json_schema_response_format`). It is only sent when the
+            `vertex_ai_structured_output` setting is enabled, since not every model supports it.
+        task (Optional[str]): Name of the task sending the request, used to attribute the
+            token usage (see `src.utils.usage`) and to route the request to its model.
+        text (Optional[str]): Task input text embedded in the prompt, used by the length-based
+            model routing rules and fitted to the input token budget of the route. Defaults to
+            the whole prompt, which is then never truncated.
 
     Returns:
         str: The model's response to the prompt.
@@ -111,32 +351,44 @@ def vertex_ai_llama_request(prompt: str) -> str:
     Raises:
         VertexAILlamaError: If the API request or response processing fails.
     """
+    settings = Settings()
     headers = {
         "Authorization": f"Bearer {get_token()}",
         "Content-Type": "application/json",
     }
 
-    payload = {
-        "model": Settings().vertex_ai_llama_model,
-        "stream": False,
-        "messages": [{"role": "user", "content": prompt}]
-    }
+    payload, truncated_tokens = build_chat_payload(prompt, settings, response_format, task, text)
 
     try:
         logger.info("Sending request to Vertex AI Llama API")
-        response = requests.post(
-            get_endpoint(),
-            headers=headers,
-            json=payload,
-            timeout=30  # Add a timeout for better reliability
+        endpoint = get_endpoint()
+        stream = settings.vertex_ai_stream if stream is None else stream
+        send = _stream_chat_completion if stream else _post_chat_completion
+        start_time = time.perf_counter()
+
+        def record(response: Tuple[str, Optional[Dict[str, Any]]]) -> None:
+            record_usage(
+                response[1],
+                "".join(message["content"] for message in payload["messages"]),
+                response[0],
+                model=payload["model"],
+                latency=time.perf_counter() - start_time,
+                task=task,
+                truncated_tokens=truncated_tokens
+            )
+
+        # The response of a hedged request that lost the race is billed too: its usage is recorded
+        response = call_with_retry(
+            lambda: send(endpoint, headers, payload, settings.vertex_ai_request_timeout),
+            retry_policy or get_retry_policy(),
+            latency_tracker=_latency_tracker,
+            on_discard=record
         )
-        response.raise_for_status()
-        choices = response.json().get('choices', [])
-        if not choices:
-            logger.error("No choices returned in the response.")
-            raise VertexAILlamaError("No choices returned in the response.")
-        return choices[-1].get('message', {}).get('content', '')
-    except requests.exceptions.RequestException as e:
+        record(response)
+        return response[0]
+    except VertexAILlamaError:
+        raise
+    except (RetryableError, requests.exceptions.RequestException) as e:
         logger.error(f"HTTP request failed: {e}")
         raise VertexAILlamaError(f"HTTP request failed: {e}")
     except KeyError:
@@ -0,0 +1,270 @@
+import base64
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import requests
+from pydantic import BaseModel
+
+from src.config import Settings
+from src.utils.bucket_objects import is_paper_object
+from src.utils.vertex_ai_llama_client import get_project_id, get_token
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+
+PUBSUB_API = "https://pubsub.googleapis.com/v1"
+
+
+class WorkQueueError(Exception):
+    """Custom exception for errors related to the work queues."""
+    pass
+
+
+class QueueMessage(BaseModel):
+    """
+    Message pulled from a work queue: a file to process.
+
+    Attributes:
+        ack_id (str): ID acknowledging the message, unique per delivery.
+        file_name (str): Name of the file in the bucket.
+        attempts (int): Number of deliveries of the message, this one included.
+    """
+
+    ack_id: str
+    file_name: str
+    attempts: int = 1
+
+
+class WorkQueue(ABC):
+    """
+    Interface of the work queues the worker pulls files from (see `run_worker`).
+
+    A pulled message is leased to the worker until it is acknowledged, or negatively
+    acknowledged to be delivered again. A message whose lease expires is delivered again, unless
+    the lease is extended.
+    """
+
+    @abstractmethod
+    def pull(self, max_messages: int) -> List[QueueMessage]:
+        """Pull up to `max_messages` messages, possibly none, without blocking for long."""
+
+    @abstractmethod
+    def ack(self, ack_ids: Sequence[str]) -> None:
+        """Acknowledge messages: they are not delivered again."""
+
+    @abstractmethod
+    def nack(self, ack_ids: Sequence[str]) -> None:
+        """Negatively acknowledge messages: they are delivered again."""
+
+    @abstractmethod
+    def extend(self, ack_ids: Sequence[str], seconds: float) -> None:
+        """Extend the lease of messages to `seconds` from now."""
+
+
+class PubSubWorkQueue(WorkQueue):
+    """
+    Google Cloud Pub/Sub pull subscription to the object notifications of the bucket.
+
+    The file name of a message is its `objectId` attribute, or the `name` of the object resource
+    in its data. Messages of other events than `OBJECT_FINALIZE`, and of objects which are not
+    papers (see `is_paper_object`), are acknowledged when pulled, and not returned.
+
+    Pub/Sub only reports the delivery attempts of a message when the subscription has a
+    dead-letter policy. Without one, the deliveries of each message are counted by the queue
+    itself, by message ID, so that failing messages are still given up after
+    `worker_max_attempts` deliveries to this worker.
+
+    Args:
+        settings (Settings): The pipeline settings (`work_queue_subscription`).
+    """
+
+    def __init__(self, settings: Settings):
+        if not settings.work_queue_subscription:
+            raise WorkQueueError("The work_queue_subscription setting is required by the Pub/Sub work queue")
+        self.subscription = settings.work_queue_subscription
+        if not self.subscription.startswith("projects/"):
+            self.subscription = f"projects/{get_project_id()}/subscriptions/{self.subscription}"
+        self.timeout = settings.vertex_ai_request_timeout
+        self.settings = settings
+        self._lock = threading.Lock()
+        # Deliveries counted by message ID, and message ID of each pending ack ID
+        self._deliveries: Dict[str, int] = {}
+        self._message_ids: Dict[str, str] = {}
+
+    def _request(self, method: str, **body: Any) -> Dict[str, Any]:
+        try:
+            response = requests.post(
+                f"{PUBSUB_API}/{self.subscription}:{method}",
+                headers={"Authorization": f"Bearer {get_token()}", "Content-Type": "application/json"},
+                json=body,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Pub/Sub {method} request failed: {e}")
+            raise WorkQueueError(f"Pub/Sub {method} request failed: {e}")
+
+    def _file_name(self, message: Dict[str, Any]) -> Optional[str]:
+        attributes = message.get("attributes") or {}
+        if attributes.get("eventType", "OBJECT_FINALIZE") != "OBJECT_FINALIZE":
+            return None
+        file_name = attributes.get("objectId")
+        if not file_name:
+            try:
+                file_name = json.loads(base64.b64decode(message.get("data", ""))).get("name")
+            except ValueError:
+                return None
+        if not file_name or not is_paper_object(file_name, self.settings):
+            return None
+        return file_name
+
+    def pull(self, max_messages: int) -> List[QueueMessage]:
+        # Return at once when no message is available, for the worker to complete the papers in flight
+        received = self._request(
+            "pull", maxMessages=max_messages, returnImmediately=True
+        ).get("receivedMessages") or []
+        messages, ignored = [], []
+        for received_message in received:
+            file_name = self._file_name(received_message.get("message") or {})
+            if file_name is None:
+                ignored.append(received_message["ackId"])
+            else:
+                messages.append(QueueMessage(
+                    ack_id=received_message["ackId"],
+                    file_name=file_name,
+                    attempts=self._attempts(received_message)
+                ))
+        if ignored:
+            self.ack(ignored)
+        return messages
+
+    def _attempts(self, received_message: Dict[str, Any]) -> int:
+        """Deliveries of a message: reported with a dead-letter policy, counted by message ID otherwise."""
+        message_id = (received_message.get("message") or {}).get("messageId")
+        with self._lock:
+            if message_id is None:
+                return received_message.get("deliveryAttempt") or 1
+            self._message_ids[received_message["ackId"]] = message_id
+            self._deliveries[message_id] = self._deliveries.get(message_id, 0) + 1
+            return received_message.get("deliveryAttempt") or self._deliveries[message_id]
+
+    def ack(self, ack_ids: Sequence[str]) -> None:
+        if ack_ids:
+            self._request("acknowledge", ackIds=list(ack_ids))
+            with self._lock:
+                for ack_id in ack_ids:
+                    message_id = self._message_ids.pop(ack_id, None)
+                    self._deliveries.pop(message_id, None)
+
+    def nack(self, ack_ids: Sequence[str]) -> None:
+        if ack_ids:
+            self._request("modifyAckDeadline", ackIds=list(ack_ids), ackDeadlineSeconds=0)
+            with self._lock:
+                for ack_id in ack_ids:
+                    self._message_ids.pop(ack_id, None)
+
+    def extend(self, ack_ids: Sequence[str], seconds: float) -> None:
+        if ack_ids:
+            self._request("modifyAckDeadline", ackIds=list(ack_ids), ackDeadlineSeconds=int(seconds))
+
+
+class SQLiteWorkQueue(WorkQueue):
+    """
+    Work queue stored in a SQLite database: a local stand-in of the Pub/Sub queue, for
+    development and tests. Files are added with `publish`.
+
+    Args:
+        path (str): Path of the database, `:memory:` for a queue kept in memory.
+        lease_seconds (float): Lease of a pulled message, after which it is delivered again.
+    """
+
+    def __init__(self, path: str = ":memory:", lease_seconds: float = 600.0):
+        self.lease_seconds = lease_seconds
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, file_name TEXT NOT NULL, "
+            "ack_id TEXT, leased_until REAL NOT NULL DEFAULT 0, attempts INTEGER NOT NULL DEFAULT 0)"
+        )
+
+    def publish(self, file_names: Sequence[str]) -> None:
+        """Add files to the queue."""
+        with self._lock:
+            self._connection.executemany(
+                "INSERT INTO messages (file_name) VALUES (?)", [(file_name,) for file_name in file_names]
+            )
+
+    def pull(self, max_messages: int) -> List[QueueMessage]:
+        now = time.time()
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT id, file_name, attempts FROM messages WHERE leased_until <= ? ORDER BY id LIMIT ?",
+                (now, max_messages)
+            ).fetchall()
+            messages = []
+            for row_id, file_name, attempts in rows:
+                ack_id = uuid.uuid4().hex
+                self._connection.execute(
+                    "UPDATE messages SET ack_id = ?, leased_until = ?, attempts = attempts + 1 WHERE id = ?",
+                    (ack_id, now + self.lease_seconds, row_id)
+                )
+                messages.append(QueueMessage(ack_id=ack_id, file_name=file_name, attempts=attempts + 1))
+            return messages
+
+    def ack(self, ack_ids: Sequence[str]) -> None:
+        with self._lock:
+            self._connection.executemany("DELETE FROM messages WHERE ack_id = ?", [(ack_id,) for ack_id in ack_ids])
+
+    def nack(self, ack_ids: Sequence[str]) -> None:
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE messages SET ack_id = NULL, leased_until = 0 WHERE ack_id = ?", [(ack_id,) for ack_id in ack_ids]
+            )
+
+    def extend(self, ack_ids: Sequence[str], seconds: float) -> None:
+        with self._lock:
+            self._connection.executemany(
+                "UPDATE messages SET leased_until = ? WHERE ack_id = ?",
+                [(time.time() + seconds, ack_id) for ack_id in ack_ids]
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+
+# Work queue factories, keyed by the name used in the `work_queue` setting.
+WORK_QUEUES: Dict[str, Callable[[Settings], WorkQueue]] = {
+    "pubsub": PubSubWorkQueue,
+    "sqlite": lambda settings: SQLiteWorkQueue(settings.work_queue_path),
+}
+
+
+def register_work_queue(name: str, factory: Callable[[Settings], WorkQueue]) -> None:
+    """
+    Register a work queue, selectable through the `work_queue` setting.
+
+    Args:
+        name (str): Name of the queue.
+        factory (Callable[[Settings], WorkQueue]): Builds the queue from the settings.
+    """
+    WORK_QUEUES[name] = factory
+
+
+def get_work_queue(settings: Settings) -> WorkQueue:
+    """
+    Build the work queue configured in the settings.
+
+    Raises:
+        WorkQueueError: If an unknown queue is configured.
+    """
+    if settings.work_queue not in WORK_QUEUES:
+        raise WorkQueueError(f"Unknown work queue: {settings.work_queue}")
+    return WORK_QUEUES[settings.work_queue](settings)
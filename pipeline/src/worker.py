@@ -0,0 +1,208 @@
+import argparse
+import logging
+import signal
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, List, Optional
+
+from langgraph.graph.state import CompiledStateGraph
+from pydantic import BaseModel
+
+from src.config import Settings
+from src.graph import PipelineBuilder, get_shared_branch_executor, payload_scope
+from src.utils.telemetry import configure_tracing, get_tracer
+from src.utils.usage import track_usage
+from src.utils.work_queue import QueueMessage, WorkQueue, get_work_queue
+from src.logger import get_logger
+
+logger = get_logger(__name__)
+tracer = get_tracer(__name__)
+
+# Delay, in seconds, between two pulls of an empty queue, and between two checks of the papers
+# being processed.
+POLL_INTERVAL = 1.0
+
+
+class WorkerResult(BaseModel):
+    """
+    Outcome of a worker run.
+
+    Attributes:
+        processed (List[str]): Files processed (or whose paper had already been processed).
+        retried (List[str]): Files whose processing failed, delivered again later.
+        failed (List[str]): Files given up after `worker_max_attempts` deliveries.
+    """
+
+    processed: List[str] = []
+    retried: List[str] = []
+    failed: List[str] = []
+
+
+def _process(pipeline: CompiledStateGraph, message: QueueMessage) -> None:
+    """Run the pipeline on the file of a message, under its own root span, usage report and payload scope."""
+    with tracer.start_as_current_span(
+        "pipeline",
+        attributes={"file.name": message.file_name, "message.attempts": message.attempts}
+    ), track_usage() as usage, payload_scope():
+        pipeline.invoke({"state": {"file_name": message.file_name}})
+    totals = usage.totals()
+    logger.info(
+        "Processed file %s: %d LLM requests, %d prompt tokens, %d completion tokens",
+        message.file_name, totals.requests, totals.prompt_tokens, totals.completion_tokens
+    )
+
+
+def _flush(queue: WorkQueue, acks: List[str], nacks: List[str]) -> None:
+    """Acknowledge and negatively acknowledge the pending messages, in bulk."""
+    try:
+        if acks:
+            queue.ack(acks)
+        if nacks:
+            queue.nack(nacks)
+        logger.info("Acknowledged %d messages, %d negatively", len(acks), len(nacks))
+    except Exception as e:
+        # The messages are delivered again once their lease expires
+        logger.error(f"Failed to acknowledge {len(acks) + len(nacks)} messages: {e}")
+    acks.clear()
+    nacks.clear()
+
+
+def _extend(queue: WorkQueue, messages: List[QueueMessage], seconds: float) -> None:
+    """Extend the lease of messages being processed or waiting for a slot."""
+    try:
+        queue.extend([message.ack_id for message in messages], seconds)
+    except Exception as e:
+        # The messages are delivered again if their lease expires
+        logger.error(f"Failed to extend the lease of {len(messages)} messages: {e}")
+
+
+def run_worker(
+    queue: Optional[WorkQueue] = None,
+    settings: Optional[Settings] = None,
+    max_messages: Optional[int] = None,
+    exit_when_empty: bool = False,
+    stop: Optional[threading.Event] = None
+) -> WorkerResult:
+    """
+    Process the files of a work queue until stopped: a long-running alternative to the
+    `pipeline` function, which processes one file per invocation.
+
+    The pipeline is compiled once, the file name being passed in its input state, and runs on
+    `worker_concurrency` papers at once. The worker keeps up to `worker_prefetch` messages pulled
+    ahead, so that a free slot is refilled without waiting for the queue, and acknowledges the
+    messages of the processed papers in bulk, at most every `worker_ack_interval` seconds. The
+    message of a failed paper is negatively acknowledged, to be delivered again, and
+    acknowledged once it has been delivered `worker_max_attempts` times. The lease of the pulled
+    messages is extended to `worker_lease_seconds` when they are pulled, then every half lease
+    until they are acknowledged, so that they are not delivered again while processed, or
+    waiting for a free slot.
+
+    Args:
+        queue (Optional[WorkQueue]): The work queue. Defaults to the queue configured with the
+            `work_queue` setting.
+        settings (Optional[Settings]): The pipeline settings.
+        max_messages (Optional[int]): Stop after pulling this number of messages.
+        exit_when_empty (bool): Stop once the queue is empty and every paper is processed.
+        stop (Optional[threading.Event]): Stop once set: no more messages are pulled, and the
+            papers being processed are completed.
+
+    Returns:
+        WorkerResult: The processed, retried and failed files.
+    """
+    settings = settings or Settings()
+    queue = queue or get_work_queue(settings)
+    stop = stop or threading.Event()
+    configure_tracing(settings)
+    pipeline = PipelineBuilder(
+        max_concurrency=settings.graph_max_concurrency,
+        executor=(
+            get_shared_branch_executor(settings.graph_max_concurrency)
+            if settings.graph_shared_executor else None
+        ),
+        metadata_head_pages=settings.metadata_head_pages,
+        speculative_parse=settings.speculative_parse
+    )()
+    prefetch = max(settings.worker_prefetch, settings.worker_concurrency)
+    result = WorkerResult()
+    in_flight: Dict[Future, QueueMessage] = {}
+    acks: List[str] = []
+    nacks: List[str] = []
+    pulled = 0
+    last_flush = last_extend = time.monotonic()
+
+    logger.info(
+        "Worker started: %d papers at once, %d messages prefetched", settings.worker_concurrency, prefetch
+    )
+    with ThreadPoolExecutor(settings.worker_concurrency, thread_name_prefix="worker") as executor:
+        while True:
+            pulling = not stop.is_set() and (max_messages is None or pulled < max_messages)
+            messages: List[QueueMessage] = []
+            if pulling and len(in_flight) < prefetch:
+                count = prefetch - len(in_flight)
+                if max_messages is not None:
+                    count = min(count, max_messages - pulled)
+                try:
+                    messages = queue.pull(count)
+                except Exception as e:
+                    logger.error(f"Failed to pull messages: {e}")
+                pulled += len(messages)
+                if messages:
+                    _extend(queue, messages, settings.worker_lease_seconds)
+                for message in messages:
+                    in_flight[executor.submit(_process, pipeline, message)] = message
+
+            if not in_flight:
+                if not pulling or (exit_when_empty and not messages):
+                    break
+                stop.wait(POLL_INTERVAL)
+                continue
+
+            if time.monotonic() - last_extend >= settings.worker_lease_seconds / 2:
+                _extend(queue, list(in_flight.values()), settings.worker_lease_seconds)
+                last_extend = time.monotonic()
+
+            done, _ = wait(in_flight, timeout=POLL_INTERVAL, return_when=FIRST_COMPLETED)
+            for future in done:
+                message = in_flight.pop(future)
+                try:
+                    future.result()
+                    acks.append(message.ack_id)
+                    result.processed.append(message.file_name)
+                except Exception as e:
+                    if message.attempts >= settings.worker_max_attempts:
+                        logger.error(f"Giving up file {message.file_name} after {message.attempts} attempts: {e}")
+                        acks.append(message.ack_id)
+                        result.failed.append(message.file_name)
+                    else:
+                        logger.error(f"Failed to process file {message.file_name} (attempt {message.attempts}): {e}")
+                        nacks.append(message.ack_id)
+                        result.retried.append(message.file_name)
+
+            if (acks or nacks) and (not in_flight or time.monotonic() - last_flush >= settings.worker_ack_interval):
+                _flush(queue, acks, nacks)
+                last_flush = last_extend = time.monotonic()
+
+    _flush(queue, acks, nacks)
+    logger.info(
+        f"Worker stopped: {len(result.processed)} processed, {len(result.retried)} retried, "
+        f"{len(result.failed)} failed"
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Process the files of a work queue.")
+    parser.add_argument("--max-messages", type=int, help="Stop after pulling this number of messages.")
+    parser.add_argument("--exit-when-empty", action="store_true", help="Stop once the queue is empty.")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    stop = threading.Event()
+    # Complete the papers being processed on termination, e.g. when the instance is scaled in
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    run_worker(max_messages=args.max_messages, exit_when_empty=args.exit_when_empty, stop=stop)
+
+
+if __name__ == "__main__":
+    main()
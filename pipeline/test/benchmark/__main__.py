@@ -0,0 +1,55 @@
+"""
+Run the pipeline benchmark against local stand-ins for GCS, Vertex AI and BigQuery.
+
+Usage:
+    python -m test.benchmark --papers 20 --concurrency 1 4 8 --llm-latency 0.5 --llm-error-rate 0.05
+    python -m test.benchmark --llm-prefill-per-kchar 0.02 --llm-prefix-cache
+"""
+import argparse
+import logging
+
+from test.benchmark.fakes import FaultProfile
+from test.benchmark.harness import BenchmarkConfig, format_result, run_benchmark
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=20, help="Papers processed at each concurrency level.")
+    parser.add_argument("--pages", type=int, default=8, help="Pages of each generated paper.")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="Concurrency levels.")
+    for service, latency in (("storage", 0.05), ("llm", 0.5), ("bigquery", 0.2)):
+        parser.add_argument(f"--{service}-latency", type=float, default=latency, help=f"Mean {service} latency (s).")
+        parser.add_argument(f"--{service}-jitter", type=float, default=0.0, help=f"{service} latency jitter (s).")
+        parser.add_argument(f"--{service}-error-rate", type=float, default=0.0, help=f"{service} error rate (0-1).")
+    parser.add_argument("--llm-per-kchar", type=float, default=0.0, help="Extra LLM latency (s) per 1000 prompt characters.")
+    parser.add_argument("--llm-prefill-per-kchar", type=float, default=0.0, help="LLM prefill latency (s) per 1000 uncached prompt characters.")
+    parser.add_argument("--llm-prefix-cache", action="store_true", help="Simulate an LLM prefix (KV) cache.")
+    parser.add_argument("--graph-max-concurrency", type=int, help="Maximum number of pipeline branches running at once.")
+    parser.add_argument("--graph-shared-executor", action="store_true", help="Share one branch executor across invocations.")
+    parser.add_argument("--metadata-head-pages", type=int, help="Extract the metadata from the first pages as soon as they are parsed.")
+    parser.add_argument("--speculative-parse", action="store_true", help="Parse the PDF while checking whether the paper has been processed.")
+    parser.add_argument("--log-level", default="WARNING", help="Pipeline log level.")
+    args = parser.parse_args()
+
+    logging.disable(getattr(logging, args.log_level.upper()) - 1)
+
+    config = BenchmarkConfig(
+        papers=args.papers,
+        pages=args.pages,
+        concurrency_levels=args.concurrency,
+        storage=FaultProfile(latency=args.storage_latency, jitter=args.storage_jitter, error_rate=args.storage_error_rate),
+        llm=FaultProfile(latency=args.llm_latency, jitter=args.llm_jitter, error_rate=args.llm_error_rate),
+        llm_per_kchar=args.llm_per_kchar,
+        llm_prefill_per_kchar=args.llm_prefill_per_kchar,
+        llm_prefix_cache=args.llm_prefix_cache,
+        bigquery=FaultProfile(latency=args.bigquery_latency, jitter=args.bigquery_jitter, error_rate=args.bigquery_error_rate),
+        graph_max_concurrency=args.graph_max_concurrency,
+        graph_shared_executor=args.graph_shared_executor,
+        metadata_head_pages=args.metadata_head_pages,
+        speculative_parse=args.speculative_parse,
+    )
+    run_benchmark(config, on_result=lambda result: print(format_result(result), end="\n\n", flush=True))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,368 @@
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+import requests
+from pydantic import BaseModel, Field
+
+from src.utils.batch_prediction import BatchJobClient, BatchRequest, BatchResult
+
+
+class FaultProfile(BaseModel):
+    """
+    Latency and error injection profile of a fake service.
+
+    Attributes:
+        latency (float): Mean latency, in seconds, of a call.
+        jitter (float): Maximum random deviation, in seconds, added to the latency.
+        error_rate (float): Probability (0-1) of a call failing.
+    """
+
+    latency: float = Field(0.0, ge=0)
+    jitter: float = Field(0.0, ge=0)
+    error_rate: float = Field(0.0, ge=0, le=1)
+
+    def delay(self, extra: float = 0.0) -> None:
+        """Sleep for the profile latency, plus `extra` seconds."""
+        seconds = self.latency + extra + (random.uniform(-self.jitter, self.jitter) if self.jitter else 0.0)
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def fails(self) -> bool:
+        """Return True if this call has to fail."""
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+
+class FakeBlob:
+    def __init__(self, bucket: "FakeBucket", name: str):
+        self.bucket = bucket
+        self.name = name
+
+    def download_as_bytes(self) -> bytes:
+        self.bucket.profile.delay()
+        if self.bucket.profile.fails():
+            raise ConnectionError(f"Injected error downloading '{self.name}'")
+        return self.bucket.files[self.name]
+
+    def upload_from_string(self, data: Any, content_type: Optional[str] = None) -> None:
+        self.bucket.profile.delay()
+        self.bucket.files[self.name] = data.encode("utf-8") if isinstance(data, str) else data
+
+    def exists(self) -> bool:
+        return self.name in self.bucket.files
+
+    def delete(self) -> None:
+        self.bucket.files.pop(self.name, None)
+
+
+class FakeBucket:
+    """In-memory stand-in for a Google Cloud Storage bucket."""
+
+    def __init__(self, profile: Optional[FaultProfile] = None):
+        self.files: Dict[str, bytes] = {}
+        self.profile = profile or FaultProfile()
+
+    def blob(self, name: str) -> FakeBlob:
+        return FakeBlob(self, name)
+
+
+class FakeStorageClient:
+    """Stand-in for `google.cloud.storage.Client`, serving every bucket name from one FakeBucket."""
+
+    def __init__(self, bucket: FakeBucket):
+        self._bucket = bucket
+
+    def __call__(self, *args, **kwargs) -> "FakeStorageClient":
+        return self
+
+    def bucket(self, name: str) -> FakeBucket:
+        return self._bucket
+
+
+class FakeBigQueryClient:
+    """
+    In-memory stand-in for `google.cloud.bigquery.Client`.
+
+    Rows inserted with `insert_rows_json` are kept per table, and `query` answers the processed
+    paper check by looking up the requested paper IDs in the `research_papers` table.
+    """
+
+    def __init__(self, profile: Optional[FaultProfile] = None, project: str = "benchmark"):
+        self.project = project
+        self.profile = profile or FaultProfile()
+        self.tables: Dict[str, List[Dict[str, Any]]] = {}
+        self.queries = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, *args, **kwargs) -> "FakeBigQueryClient":
+        return self
+
+    def _call(self) -> None:
+        self.profile.delay()
+        if self.profile.fails():
+            raise ConnectionError("Injected BigQuery error")
+
+    def query(self, query: str, job_config: Any = None) -> List[Dict[str, Any]]:
+        self._call()
+        with self._lock:
+            self.queries += 1
+            ids = set()
+            for parameter in getattr(job_config, "query_parameters", None) or []:
+                values = parameter.values if hasattr(parameter, "values") else [parameter.value]
+                ids.update(values)
+            return [
+                {"id": row["id"]}
+                for row in self.tables.get("research_papers", [])
+                if row["id"] in ids
+            ]
+
+    def insert_rows_json(self, table: str, rows: List[Dict[str, Any]], **kwargs) -> List[Any]:
+        self._call()
+        with self._lock:
+            self.tables.setdefault(table.split(".")[-1], []).extend(rows)
+        return []
+
+
+class FakeResponse:
+    """Minimal stand-in for `requests.Response`."""
+
+    def __init__(
+        self,
+        status_code: int = 200,
+        body: Optional[Dict[str, Any]] = None,
+        lines: Optional[List[str]] = None,
+        headers: Optional[Dict[str, str]] = None
+    ):
+        self.status_code = status_code
+        self._body = body or {}
+        self._lines = lines or []
+        self.headers = headers or {}
+        self.closed = False
+
+    def raise_for_status(self) -> None:
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error", response=self)
+
+    def json(self) -> Dict[str, Any]:
+        return self._body
+
+    def iter_lines(self, decode_unicode: bool = False) -> Iterator[str]:
+        for line in self._lines:
+            if self.closed:
+                return
+            yield line
+
+    def close(self) -> None:
+        self.closed = True
+
+
+FAKE_EXTRACTIONS = {
+    "metadata": {
+        "title": "A Benchmark Paper",
+        "authors": ["Alice Johnson", "Bob Smith"],
+        "publication_date": "2024-01-01",
+        "abstract": "This paper is used to benchmark the pipeline."
+    },
+    "summary": {
+        "summary": "A synthetic paper used for benchmarking.",
+        "keywords": ["benchmark", "pipeline", "latency"]
+    },
+    "research": {
+        "methodology": "Synthetic workload generation.",
+        "key_research_findings": ["The pipeline scales with concurrency."]
+    }
+}
+
+
+class FakePrefixCache:
+    """
+    Stand-in for the prefix (KV) cache of an LLM server, e.g. vLLM automatic prefix caching.
+
+    Prompts are split into blocks of `block_chars` characters, each identified by the hash of the
+    whole prompt up to its end, so that a block is only reused after the same prefix. A request
+    prefills its uncached blocks only; blocks being prefilled by a concurrent request are waited
+    for instead of being recomputed.
+
+    Args:
+        block_chars (int): Characters per cache block.
+    """
+
+    def __init__(self, block_chars: int = 1024):
+        self.block_chars = block_chars
+        self._blocks: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+
+    def _hashes(self, prompt: str) -> List[str]:
+        digest = hashlib.sha1()
+        hashes = []
+        for start in range(0, len(prompt) - self.block_chars + 1, self.block_chars):
+            digest.update(prompt[start:start + self.block_chars].encode("utf-8"))
+            hashes.append(digest.hexdigest())
+        return hashes
+
+    def prefill(self, prompt: str, compute: Callable[[int], None]) -> int:
+        """
+        Simulate the prefill of a prompt: wait for its cached (or in-flight) prefix blocks, and
+        compute the rest of the prompt with `compute(characters)`.
+
+        Returns:
+            int: Number of prompt characters served from the cache.
+        """
+        hashes = self._hashes(prompt)
+        with self._lock:
+            cached = 0
+            while cached < len(hashes) and hashes[cached] in self._blocks:
+                cached += 1
+            pending = [self._blocks[block] for block in hashes[:cached]]
+            computed = threading.Event()
+            for block in hashes[cached:]:
+                self._blocks[block] = computed
+
+        for event in pending:
+            event.wait()
+        cached_chars = cached * self.block_chars
+        try:
+            compute(len(prompt) - cached_chars)
+        finally:
+            computed.set()
+        return cached_chars
+
+
+class FakeChatEndpoint:
+    """
+    Stand-in for the Vertex AI OpenAI-compatible chat completions endpoint.
+
+    It replaces `requests.post`, answering each extraction prompt with a canned JSON object
+    matching the task. Latency grows with the prompt size (`per_kchar` seconds per thousand
+    characters) and errors are injected as `503` responses.
+
+    The prompt prefill takes `prefill_per_kchar` seconds per thousand characters not found in the
+    prefix cache (if enabled), and the time to first token of every answered request is recorded.
+    Prefills are serialised, since the concurrent requests of a server share its compute.
+
+    Args:
+        profile (Optional[FaultProfile]): Latency and error injection profile.
+        per_kchar (float): Extra latency, in seconds, per thousand prompt characters.
+        prefill_per_kchar (float): Prefill latency, in seconds, per thousand uncached prompt characters.
+        prefix_cache (bool): Whether to simulate a prefix cache (see `FakePrefixCache`).
+    """
+
+    def __init__(
+        self,
+        profile: Optional[FaultProfile] = None,
+        per_kchar: float = 0.0,
+        prefill_per_kchar: float = 0.0,
+        prefix_cache: bool = False
+    ):
+        self.profile = profile or FaultProfile()
+        self.per_kchar = per_kchar
+        self.prefill_per_kchar = prefill_per_kchar
+        self.prefix_cache = FakePrefixCache() if prefix_cache else None
+        self.calls = 0
+        self.prompt_chars = 0
+        self.cached_chars = 0
+        self.time_to_first_token: List[float] = []
+        self._lock = threading.Lock()
+        self._prefill_lock = threading.Lock()
+
+    @staticmethod
+    def _extraction(prompt: str) -> Dict[str, Any]:
+        if '"publication_date"' in prompt:
+            return FAKE_EXTRACTIONS["metadata"]
+        if '"key_research_findings"' in prompt:
+            return FAKE_EXTRACTIONS["research"]
+        if '"summary"' in prompt:
+            return FAKE_EXTRACTIONS["summary"]
+        return {}
+
+    def _compute(self, characters: int) -> None:
+        """Sleep for the prefill time of a number of prompt characters."""
+        if self.prefill_per_kchar and characters > 0:
+            with self._prefill_lock:
+                time.sleep(self.prefill_per_kchar * characters / 1000)
+
+    def _prefill(self, prompt: str) -> int:
+        """Simulate the prompt prefill, returning the number of characters served from the cache."""
+        if self.prefix_cache is not None:
+            return self.prefix_cache.prefill(prompt, self._compute)
+        self._compute(len(prompt))
+        return 0
+
+    def __call__(self, url: str, **kwargs) -> FakeResponse:
+        start = time.perf_counter()
+        payload = kwargs["json"]
+        prompt = "".join(message["content"] for message in payload["messages"])
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+
+        self.profile.delay(self.per_kchar * len(prompt) / 1000)
+        if self.profile.fails():
+            return FakeResponse(status_code=503)
+        cached_chars = self._prefill(prompt)
+        with self._lock:
+            self.cached_chars += cached_chars
+            self.time_to_first_token.append(time.perf_counter() - start)
+
+        content = json.dumps(self._extraction(prompt))
+        usage = {
+            "prompt_tokens": len(prompt) // 4,
+            "completion_tokens": len(content) // 4,
+            "total_tokens": (len(prompt) + len(content)) // 4
+        }
+        if payload.get("stream"):
+            lines = [
+                "data: " + json.dumps({"choices": [{"delta": {"content": content[i:i + 16]}}]})
+                for i in range(0, len(content), 16)
+            ]
+            # Like OpenAI-compatible endpoints, the usage is only streamed on request
+            if (payload.get("stream_options") or {}).get("include_usage"):
+                lines.append("data: " + json.dumps({"choices": [], "usage": usage}))
+            lines.append("data: [DONE]")
+            return FakeResponse(lines=lines)
+        return FakeResponse(body={"choices": [{"message": {"content": content}}], "usage": usage})
+
+
+
+class FakeBatchJobClient(BatchJobClient):
+    """
+    Local stand-in for the Vertex AI batch prediction jobs, answering every request like
+    `FakeChatEndpoint`. Jobs complete after `polls` state polls.
+
+    Args:
+        polls (int): Number of state polls before a job completes.
+        state (str): Final state of the jobs.
+    """
+
+    def __init__(self, polls: int = 1, state: str = "JOB_STATE_SUCCEEDED"):
+        self.polls = polls
+        self.final_state = state
+        self.jobs: Dict[str, List[BatchRequest]] = {}
+        self.models: Dict[str, str] = {}
+        self._polls: Dict[str, int] = {}
+
+    def submit(self, model: str, batch_requests: Sequence[BatchRequest]) -> str:
+        job = f"jobs/{len(self.jobs)}"
+        self.jobs[job] = list(batch_requests)
+        self.models[job] = model
+        self._polls[job] = 0
+        return job
+
+    def state(self, job: str) -> str:
+        self._polls[job] += 1
+        return self.final_state if self._polls[job] >= self.polls else "JOB_STATE_RUNNING"
+
+    def results(self, job: str) -> List[BatchResult]:
+        results = []
+        for request in self.jobs[job]:
+            prompt = "".join(message["content"] for message in request.payload["messages"])
+            content = json.dumps(FakeChatEndpoint._extraction(prompt))
+            results.append(BatchResult(
+                key=request.key,
+                content=content,
+                usage={"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4}
+            ))
+        return results
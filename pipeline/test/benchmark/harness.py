@@ -0,0 +1,313 @@
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+from unittest.mock import patch
+
+from pydantic import BaseModel, Field
+
+from src.graph import (
+    BranchExecutor,
+    NodeMetrics,
+    PipelineBuilder,
+    add_observer,
+    payload_scope,
+    remove_observer
+)
+from test.benchmark.fakes import (
+    FakeBigQueryClient,
+    FakeBucket,
+    FakeChatEndpoint,
+    FakeStorageClient,
+    FaultProfile
+)
+from test.benchmark.pdf import make_pdf
+
+# Pipeline nodes reported by the benchmark.
+NODES = (
+    "Get File",
+    "Check Processed Paper",
+    "Load PDF",
+    "Normalize Text",
+    "Extract Metadata",
+    "Extract Key Research Findings And Methodology",
+    "Extract Summary And Keywords",
+    "Merge Results",
+    "Insert Data Into BigQuery",
+)
+# Nodes run as parallel branches, whose branch executor queue time is reported.
+BRANCH_NODES = (
+    "Extract Metadata",
+    "Extract Key Research Findings And Methodology",
+    "Extract Summary And Keywords",
+)
+
+# Environment required by `Settings`, set unless already defined.
+BENCHMARK_ENVIRONMENT = {
+    "VERTEX_AI_LLAMA_MODEL": "benchmark-model",
+    "BIGQUERY_DATASET_ID": "benchmark_dataset",
+    "GOOGLE_STORAGE_BUCKET_NAME": "benchmark-bucket",
+    "VERTEX_AI_RETRY_BACKOFF_BASE": "0.05",
+}
+
+
+class BenchmarkConfig(BaseModel):
+    """
+    Benchmark configuration.
+
+    Attributes:
+        papers (int): Number of papers processed at each concurrency level.
+        pages (int): Number of pages of each generated paper.
+        concurrency_levels (List[int]): Number of papers processed concurrently.
+        storage (FaultProfile): Fake Google Cloud Storage profile.
+        llm (FaultProfile): Fake Vertex AI chat endpoint profile.
+        llm_per_kchar (float): Extra fake LLM latency, in seconds, per thousand prompt characters.
+        llm_prefill_per_kchar (float): Fake LLM prefill latency, in seconds, per thousand prompt
+            characters not served from the prefix cache.
+        llm_prefix_cache (bool): Whether the fake LLM simulates a prefix (KV) cache.
+        bigquery (FaultProfile): Fake BigQuery profile.
+        graph_max_concurrency (Optional[int]): Maximum number of branches running at once, per
+            pipeline invocation or, with a shared executor, in total.
+        graph_shared_executor (bool): Whether all the invocations share one branch executor.
+        metadata_head_pages (Optional[int]): Number of pages the metadata is extracted from, as
+            soon as they are parsed.
+        speculative_parse (bool): Whether the PDF is parsed while the processed paper check runs.
+    """
+
+    papers: int = Field(20, ge=1)
+    pages: int = Field(8, ge=1)
+    concurrency_levels: List[int] = [1, 4, 8]
+    storage: FaultProfile = FaultProfile()
+    llm: FaultProfile = FaultProfile()
+    llm_per_kchar: float = 0.0
+    llm_prefill_per_kchar: float = 0.0
+    llm_prefix_cache: bool = False
+    bigquery: FaultProfile = FaultProfile()
+    graph_max_concurrency: Optional[int] = Field(None, ge=1)
+    graph_shared_executor: bool = False
+    metadata_head_pages: Optional[int] = Field(None, ge=1)
+    speculative_parse: bool = False
+
+
+class LatencyStats(BaseModel):
+    """Latency percentiles, in seconds."""
+
+    count: int
+    p50: float
+    p95: float
+    p99: float
+
+    @classmethod
+    def from_samples(cls, samples: List[float]) -> "LatencyStats":
+        if not samples:
+            return cls(count=0, p50=0.0, p95=0.0, p99=0.0)
+        if len(samples) == 1:
+            return cls(count=1, p50=samples[0], p95=samples[0], p99=samples[0])
+        quantiles = statistics.quantiles(samples, n=100, method="inclusive")
+        return cls(count=len(samples), p50=quantiles[49], p95=quantiles[94], p99=quantiles[98])
+
+
+class BenchmarkResult(BaseModel):
+    """Result of a benchmark run at one concurrency level."""
+
+    concurrency: int
+    papers: int
+    failures: int
+    elapsed: float
+    papers_per_second: float
+    end_to_end: LatencyStats
+    nodes: Dict[str, LatencyStats]
+    branch_wait: LatencyStats
+    llm_calls: int
+    llm_prompt_chars: int
+    llm_cached_chars: int
+    llm_time_to_first_token: LatencyStats
+
+
+def generate_paper(index: int, pages: int) -> bytes:
+    """
+    Generate a synthetic research paper PDF. Each index produces a different document.
+    """
+    body = (
+        "We study the throughput of document extraction pipelines under concurrent load. "
+        "Results show that latency is dominated by remote calls. "
+    )
+    page_texts = [
+        f"Benchmark Paper {index}\nAlice Johnson, Bob Smith\nAbstract\n"
+        f"This paper number {index} is used to benchmark the pipeline.\n" + body
+    ]
+    page_texts += [
+        f"Section {page}\n" + "\n".join(body for _ in range(20)) + f"\n{page + 1}"
+        for page in range(1, pages)
+    ]
+    return make_pdf(page_texts)
+
+
+class NodeTimer:
+    """
+    Node metrics observer collecting the wall time of every node execution, grouped by node name,
+    and the branch executor queue time of the branch nodes.
+    """
+
+    def __init__(self):
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self.branch_wait: List[float] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics: NodeMetrics) -> None:
+        with self._lock:
+            self.samples[metrics.node].append(metrics.wall_time)
+            if metrics.node in BRANCH_NODES:
+                self.branch_wait.append(metrics.queue_time)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.samples.clear()
+            self.branch_wait.clear()
+
+
+@contextmanager
+def fake_environment(config: BenchmarkConfig) -> Iterator[Dict[str, object]]:
+    """
+    Patch the Google Cloud Storage, Vertex AI and BigQuery clients with in-process fakes.
+
+    Yields:
+        Dict[str, object]: The fakes, keyed by `bucket`, `llm` and `bigquery`.
+    """
+    bucket = FakeBucket(config.storage)
+    llm = FakeChatEndpoint(
+        config.llm,
+        per_kchar=config.llm_per_kchar,
+        prefill_per_kchar=config.llm_prefill_per_kchar,
+        prefix_cache=config.llm_prefix_cache
+    )
+    bigquery = FakeBigQueryClient(config.bigquery)
+    environment = {key: value for key, value in BENCHMARK_ENVIRONMENT.items() if key not in os.environ}
+
+    with ExitStack() as stack:
+        stack.enter_context(patch.dict(os.environ, environment))
+        stack.enter_context(patch("src.tasks.get_file_from_bucket.get_storage_client", FakeStorageClient(bucket)))
+        stack.enter_context(patch("src.tasks.text_cache.get_storage_client", FakeStorageClient(bucket)))
+        stack.enter_context(patch("src.tasks.check_processed_paper.get_bigquery_client", bigquery))
+        stack.enter_context(patch("src.tasks.insert_data_into_bigquery.get_bigquery_client", bigquery))
+        stack.enter_context(patch("src.utils.vertex_ai_llama_client.requests.post", llm))
+        stack.enter_context(patch("src.utils.vertex_ai_llama_client.get_token", return_value="benchmark-token"))
+        stack.enter_context(patch("src.utils.vertex_ai_llama_client.get_endpoint", return_value="http://fake/chat/completions"))
+        yield {"bucket": bucket, "llm": llm, "bigquery": bigquery}
+
+
+def run_benchmark(
+    config: BenchmarkConfig,
+    on_result: Optional[Callable[[BenchmarkResult], None]] = None
+) -> List[BenchmarkResult]:
+    """
+    Run the compiled pipeline against local fakes at each configured concurrency level.
+
+    Every level processes `config.papers` new papers, so that none of them is skipped by the
+    processed paper check. With `config.graph_shared_executor`, the branches of all the levels
+    run on one branch executor.
+
+    Args:
+        config (BenchmarkConfig): Benchmark configuration.
+        on_result (Optional[Callable[[BenchmarkResult], None]]): Called after each level.
+
+    Returns:
+        List[BenchmarkResult]: One result per concurrency level.
+    """
+    results = []
+    timer = NodeTimer()
+
+    with fake_environment(config) as fakes, ExitStack() as stack:
+        add_observer(timer)
+        stack.callback(remove_observer, timer)
+        executor = None
+        if config.graph_shared_executor:
+            executor = stack.enter_context(BranchExecutor(config.graph_max_concurrency))
+
+        bucket, llm = fakes["bucket"], fakes["llm"]
+        offset = 0
+        for concurrency in config.concurrency_levels:
+            files = []
+            for index in range(offset, offset + config.papers):
+                file_name = f"benchmark/paper-{index}.pdf"
+                bucket.files[file_name] = generate_paper(index, config.pages)
+                files.append(file_name)
+            offset += config.papers
+
+            timer.reset()
+            llm_calls, llm_prompt_chars, llm_cached_chars = llm.calls, llm.prompt_chars, llm.cached_chars
+            llm_requests = len(llm.time_to_first_token)
+            latencies: List[float] = []
+            failures = 0
+            lock = threading.Lock()
+
+            def process(file_name: str) -> None:
+                nonlocal failures
+                start = time.perf_counter()
+                try:
+                    with payload_scope():
+                        PipelineBuilder(
+                            file=file_name,
+                            max_concurrency=config.graph_max_concurrency,
+                            executor=executor,
+                            metadata_head_pages=config.metadata_head_pages,
+                            speculative_parse=config.speculative_parse
+                        )().invoke({"state": {}})
+                    with lock:
+                        latencies.append(time.perf_counter() - start)
+                except Exception:
+                    with lock:
+                        failures += 1
+
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as papers_executor:
+                list(papers_executor.map(process, files))
+            elapsed = time.perf_counter() - start
+
+            result = BenchmarkResult(
+                concurrency=concurrency,
+                papers=config.papers,
+                failures=failures,
+                elapsed=elapsed,
+                papers_per_second=len(latencies) / elapsed if elapsed else 0.0,
+                end_to_end=LatencyStats.from_samples(latencies),
+                nodes={name: LatencyStats.from_samples(timer.samples.get(name, [])) for name in NODES},
+                branch_wait=LatencyStats.from_samples(timer.branch_wait),
+                llm_calls=llm.calls - llm_calls,
+                llm_prompt_chars=llm.prompt_chars - llm_prompt_chars,
+                llm_cached_chars=llm.cached_chars - llm_cached_chars,
+                llm_time_to_first_token=LatencyStats.from_samples(llm.time_to_first_token[llm_requests:])
+            )
+            results.append(result)
+            if on_result:
+                on_result(result)
+
+    return results
+
+
+def format_result(result: BenchmarkResult) -> str:
+    """
+    Format a benchmark result as a plain-text report.
+    """
+    lines = [
+        f"concurrency={result.concurrency} papers={result.papers} failures={result.failures} "
+        f"elapsed={result.elapsed:.2f}s throughput={result.papers_per_second:.2f} papers/s "
+        f"llm_calls={result.llm_calls} llm_prompt_chars={result.llm_prompt_chars} "
+        f"llm_cached_chars={result.llm_cached_chars}",
+        f"  {'node':<48}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}",
+    ]
+    rows = [
+        ("end to end", result.end_to_end),
+        ("branch wait", result.branch_wait),
+        ("llm time to first token", result.llm_time_to_first_token),
+    ]
+    rows += list(result.nodes.items())
+    for name, stats in rows:
+        lines.append(
+            f"  {name:<48}{stats.count:>7}{stats.p50 * 1000:>10.1f}{stats.p95 * 1000:>10.1f}{stats.p99 * 1000:>10.1f}"
+        )
+    return "\n".join(lines)
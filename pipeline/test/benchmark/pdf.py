@@ -0,0 +1,56 @@
+from typing import Dict, List, Optional
+
+
+def _escape(text: str) -> str:
+    """Escape a string for a PDF literal string."""
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(
+    pages: List[str],
+    info: Optional[Dict[str, str]] = None
+) -> bytes:
+    """
+    Build a minimal, valid PDF document with one text page per item of `pages`.
+
+    Args:
+        pages (List[str]): Text of each page. Lines are separated by newlines.
+        info (Optional[Dict[str, str]]): Document information dictionary entries
+            (e.g. `{"Title": "...", "Author": "..."}`).
+
+    Returns:
+        bytes: The PDF document.
+    """
+    page_ids = [4 + 2 * index for index in range(len(pages))]
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{' '.join(f'{page_id} 0 R' for page_id in page_ids)}] /Count {len(pages)} >>",
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for page_id, text in zip(page_ids, pages):
+        lines = ''.join(f"({_escape(line)}) Tj T* " for line in text.split('\n'))
+        stream = f"BT /F1 10 Tf 14 TL 50 800 Td {lines}ET"
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        )
+        objects.append(f"<< /Length {len(stream.encode('latin-1'))} >>\nstream\n{stream}\nendstream")
+    if info:
+        entries = ' '.join(f"/{key} ({_escape(value)})" for key, value in info.items())
+        objects.append(f"<< {entries} >>")
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += f"{number} 0 obj\n{body}\nendobj\n".encode('latin-1')
+
+    xref = len(output)
+    output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode('latin-1')
+    for offset in offsets:
+        output += f"{offset:010d} 00000 n \n".encode('latin-1')
+    trailer = f"<< /Size {len(objects) + 1} /Root 1 0 R"
+    if info:
+        trailer += f" /Info {len(objects)} 0 R"
+    output += f"trailer\n{trailer} >>\nstartxref\n{xref}\n%%EOF\n".encode('latin-1')
+    return bytes(output)
@@ -0,0 +1,97 @@
+import logging
+import pytest
+from typing import Generator
+from src.graph.payload_store import get_payload_store
+from test.benchmark.fakes import FaultProfile
+from test.benchmark.harness import NODES, BenchmarkConfig, format_result, run_benchmark
+
+
+class TestBenchmark:
+    """
+    Smoke tests of the benchmark harness, running the pipeline against local fakes.
+    """
+
+    @pytest.fixture(autouse=True)
+    def quiet_logging(self) -> Generator[None, None, None]:
+        logging.disable(logging.WARNING)
+        yield
+        logging.disable(logging.NOTSET)
+
+    def test_run_benchmark(self):
+        """Test every paper goes through every node at each concurrency level."""
+        config = BenchmarkConfig(papers=3, pages=2, concurrency_levels=[1, 3])
+
+        results = run_benchmark(config)
+
+        assert [result.concurrency for result in results] == [1, 3]
+        for result in results:
+            assert result.failures == 0
+            assert result.end_to_end.count == 3
+            assert result.papers_per_second > 0
+            assert result.llm_calls == 9
+            assert set(result.nodes) == set(NODES)
+            assert all(stats.count == 3 for stats in result.nodes.values())
+            assert result.branch_wait.count == 9
+            assert "end to end" in format_result(result)
+        assert len(get_payload_store()) == 0
+
+    def test_run_benchmark_with_injected_errors(self):
+        """Test failing BigQuery inserts are reported as failures."""
+        config = BenchmarkConfig(
+            papers=2,
+            pages=1,
+            concurrency_levels=[2],
+            bigquery=FaultProfile(error_rate=1.0)
+        )
+
+        [result] = run_benchmark(config)
+
+        assert result.failures == 2
+        assert result.end_to_end.count == 0
+        assert len(get_payload_store()) == 0
+
+    def test_run_benchmark_with_prefix_cache(self):
+        """Test the extraction requests of a paper reuse its cached document prefix."""
+        config = BenchmarkConfig(papers=2, pages=4, concurrency_levels=[1], llm_prefix_cache=True)
+
+        [result] = run_benchmark(config)
+
+        assert result.failures == 0
+        assert result.llm_time_to_first_token.count == result.llm_calls == 6
+        # The first request of each paper prefills the document, the next two reuse it
+        assert result.llm_cached_chars > result.llm_prompt_chars / 2
+        assert "llm time to first token" in format_result(result)
+
+    def test_run_benchmark_with_shared_executor(self):
+        """Test the branches of concurrent papers wait for the workers of a bounded shared executor."""
+        config = BenchmarkConfig(
+            papers=4,
+            pages=1,
+            concurrency_levels=[2],
+            llm=FaultProfile(latency=0.02),
+            graph_max_concurrency=1,
+            graph_shared_executor=True
+        )
+
+        [result] = run_benchmark(config)
+
+        assert result.failures == 0
+        assert result.branch_wait.count == 12
+        # With one worker, the branches of a paper run one after another
+        assert result.branch_wait.p95 >= 0.02
+        assert "branch wait" in format_result(result)
+
+    def test_run_benchmark_with_speculative_parse(self):
+        """Test the papers are processed when parsed while the processed paper check runs."""
+        config = BenchmarkConfig(
+            papers=2,
+            pages=2,
+            concurrency_levels=[1],
+            bigquery=FaultProfile(latency=0.02),
+            speculative_parse=True
+        )
+
+        [result] = run_benchmark(config)
+
+        assert result.failures == 0
+        assert result.llm_calls == 6
@@ -0,0 +1,147 @@
+import threading
+import pytest
+from contextvars import ContextVar
+from unittest.mock import MagicMock, patch
+from src.graph import (
+    BRANCH_EXECUTOR_KEY,
+    BranchExecutor,
+    BranchExecutorError,
+    branch_queue_time,
+    get_shared_branch_executor,
+    install_branch_executor,
+    uninstall_branch_executor
+)
+from src.graph.branch_executor import _get_executor_for_config
+
+request_id: ContextVar[str] = ContextVar("request_id", default="")
+
+
+class TestBranchExecutor:
+    """
+    Test suite for the branch executor.
+    """
+
+    @pytest.fixture
+    def executor(self) -> BranchExecutor:
+        """Fixture to provide a single worker branch executor."""
+        with BranchExecutor(max_workers=1) as executor:
+            yield executor
+
+    def test_runs_in_caller_context(self, executor: BranchExecutor):
+        """
+        Test that the tasks see the context variables of the submitting thread.
+        """
+        token = request_id.set("request-1")
+        try:
+            future = executor.submit(lambda suffix: request_id.get() + suffix, "/a")
+        finally:
+            request_id.reset(token)
+
+        assert future.result() == "request-1/a"
+
+    def test_measures_queue_time(self, executor: BranchExecutor):
+        """
+        Test that a task waiting for a busy worker reports its queue time.
+        """
+        release = threading.Event()
+        first = executor.submit(lambda: (release.wait(1), branch_queue_time())[1])
+        second = executor.submit(branch_queue_time)
+        threading.Timer(0.05, release.set).start()
+
+        assert first.result() < 0.05
+        assert second.result() >= 0.04
+        assert branch_queue_time() == 0.0
+
+    def test_shared_executor_is_reused(self):
+        """
+        Test that the shared executor is created once per number of workers.
+        """
+        with patch("src.graph.branch_executor.logger"):
+            executor = get_shared_branch_executor(3)
+
+            assert get_shared_branch_executor(3) is executor
+            assert executor.max_workers == 3
+            assert get_shared_branch_executor(4) is not executor
+
+    def test_configured_executor_is_not_shut_down(self):
+        """
+        Test that the executor of the run configuration is used and left running.
+        """
+        executor = MagicMock()
+
+        with _get_executor_for_config({"configurable": {BRANCH_EXECUTOR_KEY: executor}}) as used:
+            assert used is executor
+
+        executor.shutdown.assert_not_called()
+
+    def test_executor_per_run(self):
+        """
+        Test that a branch executor with `max_concurrency` workers is created and shut down per run.
+        """
+        with _get_executor_for_config({"max_concurrency": 2, "configurable": {BRANCH_EXECUTOR_KEY: None}}) as used:
+            assert isinstance(used, BranchExecutor)
+            assert used.max_workers == 2
+
+        with pytest.raises(RuntimeError):
+            used.submit(lambda: None)
+
+    def test_install_branch_executor(self):
+        """
+        Test that the LangGraph runner creates its executors with the branch executor hook.
+        """
+        from langgraph.pregel import executor
+
+        install_branch_executor()
+        install_branch_executor()
+
+        assert executor.get_executor_for_config is _get_executor_for_config
+
+    def test_other_graphs_use_langchain_executor(self):
+        """
+        Test that the runs without the branch executor entry, i.e. of other graphs, get LangChain's executor.
+        """
+        with _get_executor_for_config({"max_concurrency": 2}) as used:
+            assert not isinstance(used, BranchExecutor)
+
+    def test_uninstall_branch_executor(self):
+        """
+        Test that LangChain's executor is restored in the LangGraph runner.
+        """
+        from langchain_core.runnables.config import get_executor_for_config
+        from langgraph.pregel import executor
+
+        install_branch_executor()
+        uninstall_branch_executor()
+        try:
+            assert executor.get_executor_for_config is get_executor_for_config
+        finally:
+            install_branch_executor()
+
+    def test_install_branch_executor_unsupported_version(self):
+        """
+        Test that the hook is not installed on an unsupported LangGraph version.
+        """
+        from langgraph.pregel import executor
+
+        uninstall_branch_executor()
+        try:
+            with patch("src.graph.branch_executor.importlib.metadata.version", return_value="0.3.0"), \
+                    pytest.raises(BranchExecutorError, match="0.3.0"):
+                install_branch_executor()
+            assert executor.get_executor_for_config is not _get_executor_for_config
+        finally:
+            install_branch_executor()
+
+    def test_install_branch_executor_missing_hook(self):
+        """
+        Test that the hook is not installed when the LangGraph runner no longer uses `get_executor_for_config`.
+        """
+        from langgraph.pregel import executor
+
+        uninstall_branch_executor()
+        try:
+            with patch.object(executor, "get_executor_for_config", None), \
+                    pytest.raises(BranchExecutorError, match="missing"):
+                install_branch_executor()
+        finally:
+            install_branch_executor()
@@ -2,6 +2,7 @@ import pytest
 from typing import Generator
 from unittest.mock import patch, MagicMock
 from src.graph import CheckProcessedPaper, PipelineState, GraphError
+from src.graph.check_processed_paper_node import CHECK_EXECUTOR_WORKERS, get_check_executor
 
 
 class TestExtractSummaryAndKeywordsNode:
@@ -48,6 +49,20 @@ class TestExtractSummaryAndKeywordsNode:
         assert result
         mock_logger.info.assert_called_once_with("Checking if paper ID paper_id has been processed")
 
+    def test_check_processed_paper_node_speculative(
+        self,
+        mock_pipeline_state: PipelineState,
+        mock_extract_summary_and_keywords_task: MagicMock,
+        mock_logger: MagicMock
+    ) -> None:
+        """Test the speculative CheckProcessedPaper node only starts the check, passing on its future."""
+        executor = MagicMock()
+
+        result = CheckProcessedPaper(speculative=True, executor=executor)(mock_pipeline_state)
+
+        executor.submit.assert_called_once_with(mock_extract_summary_and_keywords_task, "paper_id")
+        assert result == {"state": {"processed_check": executor.submit.return_value}}
+
     def test_check_processed_paper_node_raises_graph_error(
         self,
         mock_pipeline_state_with_error: PipelineState,
@@ -58,3 +73,17 @@ class TestExtractSummaryAndKeywordsNode:
         with pytest.raises(GraphError):
             check_processed_paper(mock_pipeline_state_with_error)
         mock_logger.error.assert_called_once()
+
+    def test_check_processed_paper_node_speculative_executor(
+        self,
+        mock_pipeline_state: PipelineState,
+        mock_extract_summary_and_keywords_task: MagicMock,
+        mock_logger: MagicMock
+    ) -> None:
+        """Test the speculative check runs on its dedicated executor, not on the branch executor."""
+        with patch("src.graph.branch_executor.get_shared_branch_executor") as mock_branch_executor:
+            result = CheckProcessedPaper(speculative=True)(mock_pipeline_state)
+
+        assert result["state"]["processed_check"].result() is True
+        mock_branch_executor.assert_not_called()
+        assert get_check_executor().max_workers == CHECK_EXECUTOR_WORKERS
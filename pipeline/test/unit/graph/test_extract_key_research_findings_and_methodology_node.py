@@ -54,9 +54,8 @@ class TestExtractKeyResearchFindingsAndMethodologyNode:
             "Extracting key research findings and methodology from paper ID paper_id"
         )
         assert result == {
-            "state": {
-                "research": {"key_findings": ["Finding 1", "Finding 2"], "methodology": "Experimental"}
-            }
+            "record": {"key_findings": ["Finding 1", "Finding 2"], "methodology": "Experimental"},
+            "failed_fields": []
         }
 
     def test_extract_key_research_findings_and_methodology_raises_graph_error(
@@ -1,7 +1,10 @@
 import pytest
 from typing import Generator
 from unittest.mock import patch, MagicMock
+from concurrent.futures import Future
 from src.graph import ExtractMetadata, PipelineState, GraphError
+from src.graph.extract_metadata_node import extract_head_metadata
+from src.utils.pdf_utils import PDFContent
 
 
 class TestExtractMetadataNode:
@@ -49,14 +52,66 @@ class TestExtractMetadataNode:
         """Test ExtractMetadata node to verify the state output."""
         result = extract_metadata(mock_pipeline_state)
 
-        mock_extract_metadata_task.assert_called_once_with("Mocked extracted text")
+        mock_extract_metadata_task.assert_called_once_with(
+            "Mocked extracted text",
+            document_info=None,
+            first_page=""
+        )
         mock_logger.info.assert_called_once_with("Extracting metadata from paper ID paper_id")
         assert result == {
-            "state": {
-                "metadata": "metadata"
-            }
+            "record": "metadata",
+            "failed_fields": []
         }
 
+    def test_extract_metadata_with_document_info(
+        self,
+        mock_pipeline_state: PipelineState,
+        mock_extract_metadata_task: MagicMock,
+        mock_logger: MagicMock,
+        extract_metadata: ExtractMetadata
+    ) -> None:
+        """Test ExtractMetadata passes the document info and the first page text to the task."""
+        mock_pipeline_state["state"]["document_info"] = {"Title": "Mocked title"}
+        mock_pipeline_state["state"]["page_lengths"] = [6, 15]
+
+        extract_metadata(mock_pipeline_state)
+
+        mock_extract_metadata_task.assert_called_once_with(
+            "Mocked extracted text",
+            document_info={"Title": "Mocked title"},
+            first_page="Mocked"
+        )
+
+    def test_extract_metadata_awaits_head_metadata(
+        self,
+        mock_pipeline_state: PipelineState,
+        mock_extract_metadata_task: MagicMock,
+        mock_logger: MagicMock,
+        extract_metadata: ExtractMetadata
+    ) -> None:
+        """Test ExtractMetadata returns the metadata extracted from the first pages, when started by LoadPDF."""
+        head_metadata = Future()
+        head_metadata.set_result(({"title": "Mocked title"}, ["authors"]))
+        mock_pipeline_state["state"]["head_metadata"] = head_metadata
+
+        result = extract_metadata(mock_pipeline_state)
+
+        mock_extract_metadata_task.assert_not_called()
+        assert result == {"record": {"title": "Mocked title"}, "failed_fields": ["authors"]}
+
+    def test_extract_head_metadata(self, mock_extract_metadata_task: MagicMock) -> None:
+        """Test the metadata of the first pages is extracted from their normalised text."""
+        head = PDFContent(text="First page\nSecond page", page_lengths=[11, 11], document_info={"Title": "Mocked title"})
+
+        record, failed_fields = extract_head_metadata(head)
+
+        assert record == "metadata"
+        assert failed_fields == []
+        text = mock_extract_metadata_task.call_args.args[0]
+        assert "First page" in text and "Second page" in text
+        assert mock_extract_metadata_task.call_args.kwargs["document_info"] == {"Title": "Mocked title"}
+        assert mock_extract_metadata_task.call_args.kwargs["first_page"].strip() == "First page"
+
     def test_extract_metadata_raises_graph_error(
         self,
         mock_pipeline_state_with_error: PipelineState,
@@ -54,9 +54,8 @@ class TestExtractSummaryAndKeywordsNode:
             "Extracting summary and keywords from paper ID paper_id"
         )
         assert result == {
-            "state": {
-                "summary": {"summary": "summary", "keywords": ["keyword1", "keyword2"]}
-            }
+            "record": {"summary": "summary", "keywords": ["keyword1", "keyword2"]},
+            "failed_fields": []
         }
 
     def test_extract_summary_and_keywords_raises_graph_error(
@@ -0,0 +1,76 @@
+import pytest
+from typing import Generator
+from unittest.mock import patch, MagicMock
+from src.graph import FindNearDuplicate, GraphError, MemoryPayloadStore
+from src.utils.near_duplicates import NearDuplicateIndex, minhash_signature
+
+FIRST_PAGE = "Benchmark Paper\nAlice Johnson, Bob Smith\n"
+TEXT = FIRST_PAGE + " ".join(
+    f"Sentence {index} of the paper studies document extraction pipelines." for index in range(30)
+)
+
+
+class TestFindNearDuplicateNode:
+    @pytest.fixture()
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        with patch("src.graph.find_near_duplicate_node.logger") as mock_logger:
+            yield mock_logger
+
+    @pytest.fixture()
+    def index(self) -> Generator[NearDuplicateIndex, None, None]:
+        index = NearDuplicateIndex()
+        with patch("src.graph.find_near_duplicate_node.near_duplicate_index", return_value=index):
+            yield index
+
+    @pytest.fixture()
+    def mock_settings(self) -> Generator[MagicMock, None, None]:
+        with patch("src.graph.find_near_duplicate_node.Settings") as mock_settings:
+            mock_settings.return_value.near_duplicate_threshold = 0.8
+            yield mock_settings.return_value
+
+    @pytest.fixture()
+    def state(self) -> Generator[dict, None, None]:
+        store = MemoryPayloadStore()
+        with patch("src.graph.payload_store.get_payload_store", return_value=store):
+            yield {
+                "state": {
+                    "paper_id": "paper-2",
+                    "text": store.put(TEXT),
+                    "page_lengths": [len(FIRST_PAGE), len(TEXT) - len(FIRST_PAGE)],
+                    "document_info": {"Author": "Alice Johnson, Bob Smith"}
+                }
+            }
+
+    def test_disabled(self, mock_logger, index, mock_settings, state):
+        """Test the node does nothing without a similarity threshold."""
+        mock_settings.near_duplicate_threshold = None
+
+        assert FindNearDuplicate()(state) == {"state": {}}
+
+    def test_no_duplicate(self, mock_logger, index, mock_settings, state):
+        """Test the signature is added to the state when no indexed paper is similar."""
+        result = FindNearDuplicate()(state)
+
+        assert result == {"state": {"minhash": minhash_signature(TEXT)}}
+
+    def test_duplicate(self, mock_logger, index, mock_settings, state):
+        """Test the fields of a near duplicate are reused, with the metadata of the new PDF."""
+        index.add("paper-1", minhash_signature(TEXT), {
+            "title": "Benchmark Paper",
+            "authors": ["Alice Johnson"],
+            "summary": "A summary."
+        })
+
+        result = FindNearDuplicate()(state)
+
+        assert result["state"] == {"minhash": minhash_signature(TEXT), "duplicate_of": "paper-1"}
+        assert result["record"]["summary"] == "A summary."
+        assert result["record"]["authors"] == ["Alice Johnson", "Bob Smith"]
+
+    def test_error(self, mock_logger, index, mock_settings, state):
+        """Test errors are raised as GraphError."""
+        del state["state"]["text"]
+
+        with pytest.raises(GraphError):
+            FindNearDuplicate()(state)
+        mock_logger.error.assert_called_once()
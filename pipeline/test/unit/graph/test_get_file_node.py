@@ -2,7 +2,7 @@ import pytest
 from unittest.mock import patch, MagicMock
 from typing import Generator
 from io import BytesIO
-from src.graph import GetFile
+from src.graph import GetFile, MemoryPayloadStore, PayloadHandle
 
 
 class TestGetFileNode:
@@ -23,6 +23,12 @@ class TestGetFileNode:
         with patch("src.graph.get_file_node.generate_file_hash", return_value="mocked_paper_id") as mock:
             yield mock
 
+    @pytest.fixture()
+    def payload_store(self) -> Generator[MemoryPayloadStore, None, None]:
+        store = MemoryPayloadStore()
+        with patch("src.graph.payload_store.get_payload_store", return_value=store):
+            yield store
+
     @pytest.fixture()
     def mock_logger(self) -> Generator[MagicMock, None, None]:
         with patch("src.graph.get_file_node.logger") as mock_logger:
@@ -34,8 +40,9 @@ class TestGetFileNode:
         mock_get_file_from_bucket: MagicMock,
         mock_generate_file_hash: MagicMock,
         mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore
     ) -> None:
-        """Test GetFile to verify the state output."""
+        """Test GetFile to verify the state output, with the file kept in the payload store."""
         file_name = "dummy_file.pdf"
         get_file_node = GetFile(file_name)
 
@@ -45,9 +52,20 @@ class TestGetFileNode:
         mock_generate_file_hash.assert_called_once_with(mock_file)
         mock_logger.info.assert_called_once_with(f"Getting file {file_name} from GCS bucket")
 
-        assert result == {
-            "state": {
-                "file": mock_file,
-                "paper_id": "mocked_paper_id"
-            }
-        }
+        file = result["state"]["file"]
+        assert isinstance(file, PayloadHandle)
+        assert payload_store.get(file).getvalue() == b"Mocked file content"
+        assert result["state"]["paper_id"] == "mocked_paper_id"
+
+    def test_get_file_name_from_state(
+        self,
+        mock_get_file_from_bucket: MagicMock,
+        mock_generate_file_hash: MagicMock,
+        mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore
+    ) -> None:
+        """Test GetFile reads the file name from the state when none is bound to the node."""
+        result = GetFile()({"state": {"file_name": "state_file.pdf"}})
+
+        mock_get_file_from_bucket.assert_called_once_with("state_file.pdf")
+        assert result["state"]["paper_id"] == "mocked_paper_id"
@@ -0,0 +1,136 @@
+import pytest
+from io import BytesIO
+from unittest.mock import MagicMock, patch
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter
+from opentelemetry.trace import StatusCode
+from src.graph import InstrumentedNode, NodeMetrics, add_observer, remove_observer
+from src.graph.instrumentation import payload_size
+
+
+class TestInstrumentedNode:
+    """
+    Test suite for the InstrumentedNode wrapper.
+    """
+
+    @pytest.fixture
+    def mock_logger(self) -> MagicMock:
+        """Fixture to patch the logger."""
+        with patch("src.graph.instrumentation.logger") as mock_logger:
+            yield mock_logger
+
+    @pytest.fixture
+    def exporter(self) -> InMemorySpanExporter:
+        """Fixture to record the spans of a local tracer provider."""
+        exporter = InMemorySpanExporter()
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(exporter))
+        with patch("src.graph.instrumentation.tracer", provider.get_tracer(__name__)):
+            yield exporter
+
+    @pytest.fixture
+    def observer(self) -> MagicMock:
+        """Fixture to register a node metrics observer."""
+        observer = MagicMock()
+        add_observer(observer)
+        yield observer
+        remove_observer(observer)
+
+    def test_records_metrics(
+        self,
+        mock_logger: MagicMock,
+        exporter: InMemorySpanExporter,
+        observer: MagicMock
+    ):
+        """
+        Test that a node execution is traced and its metrics reported to the observers.
+        """
+        node = MagicMock(return_value={"state": {"text": "abcd"}})
+        state = {"state": {"paper_id": "paper-1", "file": BytesIO(b"123456")}}
+
+        result = InstrumentedNode("Load PDF", node)(state)
+
+        assert result == {"state": {"text": "abcd"}}
+        node.assert_called_once_with(state)
+
+        metrics = observer.call_args.args[0]
+        assert isinstance(metrics, NodeMetrics)
+        assert metrics.node == "Load PDF"
+        assert metrics.paper_id == "paper-1"
+        assert metrics.input_size == len("paper-1") + 6
+        assert metrics.output_size == 4
+        assert metrics.wall_time >= 0
+        assert metrics.queue_time == 0.0
+        assert metrics.error is None
+
+        span = exporter.get_finished_spans()[0]
+        assert span.name == "Load PDF"
+        assert span.attributes["paper.id"] == "paper-1"
+        assert span.attributes["node.output_bytes"] == 4
+        mock_logger.info.assert_called_once()
+
+    @patch("src.graph.instrumentation.branch_queue_time", return_value=0.25)
+    def test_records_queue_time(
+        self,
+        mock_branch_queue_time: MagicMock,
+        mock_logger: MagicMock,
+        exporter: InMemorySpanExporter,
+        observer: MagicMock
+    ):
+        """
+        Test that the time a branch waited for an executor worker is recorded.
+        """
+        InstrumentedNode("Extract Metadata", MagicMock(return_value={}))({"state": {}})
+
+        assert observer.call_args.args[0].queue_time == 0.25
+        assert exporter.get_finished_spans()[0].attributes["node.queue_time_s"] == 0.25
+
+    def test_records_error(
+        self,
+        mock_logger: MagicMock,
+        exporter: InMemorySpanExporter,
+        observer: MagicMock
+    ):
+        """
+        Test that a node error is re-raised and recorded in the span and the metrics.
+        """
+        node = MagicMock(side_effect=ValueError("boom"))
+
+        with pytest.raises(ValueError, match="boom"):
+            InstrumentedNode("Merge Results", node)({"state": {}})
+
+        metrics = observer.call_args.args[0]
+        assert metrics.error == "boom"
+        assert metrics.paper_id is None
+
+        span = exporter.get_finished_spans()[0]
+        assert span.status.status_code == StatusCode.ERROR
+        assert "paper.id" not in span.attributes
+
+    def test_observer_error_is_logged(
+        self,
+        mock_logger: MagicMock,
+        exporter: InMemorySpanExporter
+    ):
+        """
+        Test that a failing observer does not fail the node.
+        """
+        observer = MagicMock(side_effect=RuntimeError("observer failure"))
+        add_observer(observer)
+        try:
+            result = InstrumentedNode("Get File", MagicMock(return_value={"state": {}}))({"state": {}})
+        finally:
+            remove_observer(observer)
+
+        assert result == {"state": {}}
+        mock_logger.error.assert_called_once_with("Node metrics observer failed: observer failure")
+
+    def test_payload_size(self):
+        """
+        Test the approximate payload sizes.
+        """
+        assert payload_size("abc") == 3
+        assert payload_size(b"ab") == 2
+        assert payload_size(BytesIO(b"abcde")) == 5
+        assert payload_size({"a": ["xy", "z"], "b": {"c": "12"}}) == 5
@@ -1,13 +1,21 @@
 import pytest
+from concurrent.futures import Future
 from typing import Generator
 from unittest.mock import patch, MagicMock
-from src.graph import LoadPDF, PipelineState, GraphError
+from io import BytesIO
+from src.graph import LoadPDF, MemoryPayloadStore, PipelineState, GraphError
+from src.utils.pdf_utils import PDFContent
 
 
 class TestLoadPDFNode:
     @pytest.fixture()
-    def mock_extract_text_from_pdf_task(self) -> Generator[MagicMock, None, None]:
-        with patch("src.graph.load_pdf_node.extract_text_from_pdf", return_value="Mocked extracted text") as mock:
+    def mock_extract_pdf_content(self) -> Generator[MagicMock, None, None]:
+        content = PDFContent(
+            text="Mocked extracted text",
+            page_lengths=[6, 15],
+            document_info={"Title": "Mocked title"}
+        )
+        with patch("src.graph.load_pdf_node.extract_pdf_content", return_value=content) as mock:
             yield mock
 
     @pytest.fixture()
@@ -15,6 +23,12 @@ class TestLoadPDFNode:
         with patch("src.graph.load_pdf_node.logger") as mock_logger:
             yield mock_logger
 
+    @pytest.fixture()
+    def payload_store(self) -> Generator[MemoryPayloadStore, None, None]:
+        store = MemoryPayloadStore()
+        with patch("src.graph.payload_store.get_payload_store", return_value=store):
+            yield store
+
     @pytest.fixture()
     def file(self) -> str:
         return "dummy"
@@ -44,17 +58,125 @@ class TestLoadPDFNode:
     def test_load_pdf_state(
         self,
         mock_pipeline_state: PipelineState,
-        mock_extract_text_from_pdf_task: MagicMock,
+        mock_extract_pdf_content: MagicMock,
         mock_logger: MagicMock,
         file: str,
-        load_pdf: LoadPDF
+        load_pdf: LoadPDF,
+        payload_store: MemoryPayloadStore
     ) -> None:
         """Test LoadPDF to verify the state output."""
         result = load_pdf(mock_pipeline_state)
 
-        mock_extract_text_from_pdf_task.assert_called_once_with(file)
+        mock_extract_pdf_content.assert_called_once_with(file, head_pages=0, on_head=None, cancelled=None)
         mock_logger.info.assert_called_once_with("Extracting text from PDF for paper ID paper_id")
-        assert result == {"state": {"text": "Mocked extracted text"}}
+        assert result["state"]["file"] is None
+        assert payload_store.get(result["state"]["text"]) == "Mocked extracted text"
+        assert result["state"]["page_lengths"] == [6, 15]
+        assert result["state"]["document_info"] == {"Title": "Mocked title"}
+        assert "head_metadata" not in result["state"]
+
+    def test_load_pdf_releases_file(
+        self,
+        mock_extract_pdf_content: MagicMock,
+        mock_logger: MagicMock,
+        load_pdf: LoadPDF,
+        payload_store: MemoryPayloadStore
+    ) -> None:
+        """Test LoadPDF reads the file from the payload store and releases it."""
+        file = payload_store.put(BytesIO(b"%PDF"))
+
+        result = load_pdf({"state": {"file": file, "paper_id": "paper_id"}})
+
+        assert mock_extract_pdf_content.call_args.args[0].getvalue() == b"%PDF"
+        assert len(payload_store) == 1
+        assert payload_store.get(result["state"]["text"]) == "Mocked extracted text"
+
+    def test_load_pdf_starts_head_metadata(
+        self,
+        mock_pipeline_state: PipelineState,
+        mock_extract_pdf_content: MagicMock,
+        mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore
+    ) -> None:
+        """Test LoadPDF submits the metadata extraction of the first pages, and passes on its future."""
+        head = PDFContent(text="Mocked", page_lengths=[6], document_info={"Title": "Mocked title"})
+        executor = MagicMock()
+
+        def extract(file, head_pages, on_head, cancelled):
+            on_head(head)
+            return mock_extract_pdf_content.return_value
+        mock_extract_pdf_content.side_effect = extract
+
+        with patch("src.graph.load_pdf_node.extract_head_metadata") as mock_extract_head_metadata, \
+                patch("src.graph.load_pdf_node.Settings") as mock_settings:
+            mock_settings.return_value.near_duplicate_threshold = None
+            result = LoadPDF(head_pages=1, executor=executor)(mock_pipeline_state)
+
+        assert mock_extract_pdf_content.call_args.kwargs["head_pages"] == 1
+        executor.submit.assert_called_once_with(mock_extract_head_metadata, head)
+        assert result["state"]["head_metadata"] is executor.submit.return_value
+        assert payload_store.get(result["state"]["text"]) == "Mocked extracted text"
+
+    def test_load_pdf_no_head_metadata_with_near_duplicates(
+        self,
+        mock_pipeline_state: PipelineState,
+        mock_extract_pdf_content: MagicMock,
+        mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore
+    ) -> None:
+        """Test LoadPDF does not extract the metadata early when near duplicates are looked up."""
+        executor = MagicMock()
+
+        with patch("src.graph.load_pdf_node.Settings") as mock_settings:
+            mock_settings.return_value.near_duplicate_threshold = 0.9
+            result = LoadPDF(head_pages=1, executor=executor)(mock_pipeline_state)
+
+        mock_extract_pdf_content.assert_called_once_with(
+            mock_pipeline_state["state"]["file"], head_pages=0, on_head=None, cancelled=None
+        )
+        executor.submit.assert_not_called()
+        assert "head_metadata" not in result["state"]
+
+    def test_load_pdf_speculative_new_paper(
+        self,
+        mock_pipeline_state: PipelineState,
+        mock_extract_pdf_content: MagicMock,
+        mock_logger: MagicMock,
+        load_pdf: LoadPDF,
+        payload_store: MemoryPayloadStore
+    ) -> None:
+        """Test LoadPDF passes on the text of a paper the speculative check found new."""
+        processed_check = Future()
+        processed_check.set_result(False)
+        mock_pipeline_state["state"]["processed_check"] = processed_check
+
+        result = load_pdf(mock_pipeline_state)
+
+        assert mock_extract_pdf_content.call_args.kwargs["cancelled"]() is False
+        assert result["state"]["processed"] is False
+        assert result["state"]["processed_check"] is None
+        assert payload_store.get(result["state"]["text"]) == "Mocked extracted text"
+
+    def test_load_pdf_speculative_processed_paper(
+        self,
+        mock_pipeline_state: PipelineState,
+        mock_extract_pdf_content: MagicMock,
+        mock_logger: MagicMock,
+        load_pdf: LoadPDF,
+        payload_store: MemoryPayloadStore
+    ) -> None:
+        """Test LoadPDF cancels the parse of a paper the speculative check found processed, and discards it."""
+        processed_check = Future()
+        processed_check.set_result(True)
+        mock_pipeline_state["state"]["file"] = payload_store.put(BytesIO(b"%PDF"))
+        mock_pipeline_state["state"]["processed_check"] = processed_check
+
+        result = load_pdf(mock_pipeline_state)
+
+        assert mock_extract_pdf_content.call_args.kwargs["cancelled"]() is True
+        assert result == {"state": {"processed": True, "processed_check": None, "file": None}}
+        assert len(payload_store) == 0
+        mock_logger.info.assert_any_call("Paper ID paper_id has been processed, discarding its text")
 
     def test_load_pdf_raises_graph_error(
         self,
@@ -2,7 +2,7 @@ import pytest
 from io import BytesIO
 from typing import Generator
 from unittest.mock import patch, MagicMock
-from src.graph import PipelineState, GraphError, MergeResults
+from src.graph import PipelineState, GraphError, MergeResults, PaperRecord, merge_record
 
 
 class TestMergeResultsNode:
@@ -11,15 +11,17 @@ class TestMergeResultsNode:
         """
         Fixture to provide a mock PipelineState with appropriate state data.
         """
+        record = PaperRecord()
+        merge_record(record, {"title": "title", "authors": ["authors"], "abstract": "abstract", "publication_date": "publication_date"})
+        merge_record(record, {"summary": "summary", "keywords": ["keywords"]})
+        merge_record(record, {"methodology": "methodology", "key_research_findings": ["key_research_findings"]})
         return {
             "state": {
                 "file": BytesIO(b"Mock PDF content"),
                 "paper_id": "paper_id",
-                "text": "Text",
-                "metadata": {"title": "title", "authors": "authors", "abstract": "abstract", "publication_date": "publication_date"},
-                "summary": {"summary": "summary", "keywords": "keywords"},
-                "research": {"methodology": "methodology", "key_research_findings": "key_research_findings"}
-            }
+                "text": "Text"
+            },
+            "record": record
         }
 
     @pytest.fixture
@@ -48,13 +50,17 @@ class TestMergeResultsNode:
         expected_result = {
             "state": {
                 "title": "title",
-                "authors": "authors",
+                "authors": ["authors"],
                 "abstract": "abstract",
                 "publication_date": "publication_date",
                 "summary": "summary",
-                "keywords": "keywords",
+                "keywords": ["keywords"],
                 "methodology": "methodology",
-                "key_research_findings": "key_research_findings"
+                "key_research_findings": ["key_research_findings"],
+                "field_status": [
+                    {"field": field, "status": "extracted"} for field in PaperRecord.__slots__
+                ],
+                "text": None
             }
         }
 
@@ -68,9 +74,144 @@ class TestMergeResultsNode:
         merge_results: MergeResults
     ) -> None:
         """Test MergeResults raises GraphError on exception."""
-        mock_pipeline_state["state"] = None  # This will break the reduce call
+        mock_pipeline_state["record"].title = 1  # This will break the record validation
 
         with pytest.raises(GraphError):
             merge_results(mock_pipeline_state)
 
         mock_logger.error.assert_called_once_with("Failed to merge results.")
+
+    def test_merge_results_normalises_record(
+        self,
+        mock_pipeline_state: PipelineState,
+        mock_logger: MagicMock,
+        merge_results: MergeResults
+    ) -> None:
+        """Test MergeResults validates the record once, wrapping single strings in list fields."""
+        mock_pipeline_state["record"].authors = "Alice Johnson"
+
+        result = merge_results(mock_pipeline_state)
+
+        assert result["state"]["authors"] == ["Alice Johnson"]
+
+    @patch("src.graph.merge_results_node.store_text")
+    @patch("src.graph.merge_results_node.Settings")
+    def test_merge_results_with_failed_fields(
+        self,
+        mock_settings: MagicMock,
+        mock_store_text: MagicMock,
+        mock_pipeline_state: PipelineState,
+        mock_logger: MagicMock,
+        merge_results: MergeResults
+    ) -> None:
+        """Test the failed fields are reported in the field status, and the text is cached."""
+        mock_settings.return_value.text_cache_bucket_name = "text-cache-bucket"
+        mock_pipeline_state["record"].update({"summary": None, "keywords": None, "abstract": None})
+        mock_pipeline_state["failed_fields"] = ["summary", "keywords"]
+
+        result = merge_results(mock_pipeline_state)
+
+        statuses = {status["field"]: status["status"] for status in result["state"]["field_status"]}
+        assert statuses["summary"] == statuses["keywords"] == "failed"
+        assert statuses["abstract"] == "missing"
+        assert statuses["title"] == "extracted"
+        mock_store_text.assert_called_once_with("paper_id", "Text")
+
+    @patch("src.graph.merge_results_node.store_text")
+    @patch("src.graph.merge_results_node.Settings")
+    def test_merge_results_text_cache_error(
+        self,
+        mock_settings: MagicMock,
+        mock_store_text: MagicMock,
+        mock_pipeline_state: PipelineState,
+        mock_logger: MagicMock,
+        merge_results: MergeResults
+    ) -> None:
+        """Test a text caching error does not fail the paper."""
+        mock_settings.return_value.text_cache_bucket_name = "text-cache-bucket"
+        mock_store_text.side_effect = Exception("Upload failed")
+        mock_pipeline_state["failed_fields"] = ["methodology"]
+
+        result = merge_results(mock_pipeline_state)
+
+        assert result["state"]["text"] is None
+        mock_logger.error.assert_called_once_with(
+            "Failed to cache the text of paper ID paper_id, its failed fields cannot be repaired: Upload failed"
+        )
+
+    @patch("src.graph.merge_results_node.store_text")
+    def test_merge_results_without_failed_fields(
+        self,
+        mock_store_text: MagicMock,
+        mock_pipeline_state: PipelineState,
+        mock_logger: MagicMock,
+        merge_results: MergeResults
+    ) -> None:
+        """Test the text is not cached if every branch succeeded."""
+        mock_pipeline_state["failed_fields"] = []
+
+        merge_results(mock_pipeline_state)
+
+        mock_store_text.assert_not_called()
+
+    @patch("src.graph.merge_results_node.near_duplicate_index")
+    @patch("src.graph.merge_results_node.Settings")
+    def test_merge_results_indexes_paper(
+        self,
+        mock_settings: MagicMock,
+        mock_index: MagicMock,
+        mock_pipeline_state: PipelineState,
+        mock_logger: MagicMock,
+        merge_results: MergeResults
+    ) -> None:
+        """Test a paper with a MinHash signature is added to the near-duplicate index with its fields."""
+        mock_pipeline_state["state"]["minhash"] = [1, 2, 3]
+
+        merge_results(mock_pipeline_state)
+
+        mock_index.return_value.add.assert_called_once_with(
+            "paper_id", [1, 2, 3], mock_pipeline_state["record"].to_dict()
+        )
+
+    @patch("src.graph.merge_results_node.near_duplicate_index")
+    @patch("src.graph.merge_results_node.store_text")
+    @patch("src.graph.merge_results_node.Settings")
+    def test_merge_results_does_not_index_duplicates_or_failures(
+        self,
+        mock_settings: MagicMock,
+        mock_store_text: MagicMock,
+        mock_index: MagicMock,
+        mock_pipeline_state: PipelineState,
+        mock_logger: MagicMock,
+        merge_results: MergeResults
+    ) -> None:
+        """Test near duplicates and papers with failed fields are not indexed."""
+        mock_pipeline_state["state"].update({"minhash": [1, 2, 3], "duplicate_of": "other"})
+        merge_results(mock_pipeline_state)
+
+        mock_pipeline_state["state"].pop("duplicate_of")
+        mock_pipeline_state["failed_fields"] = ["summary"]
+        merge_results(mock_pipeline_state)
+
+        mock_index.return_value.add.assert_not_called()
+
+    @patch("src.graph.merge_results_node.near_duplicate_index")
+    @patch("src.graph.merge_results_node.Settings")
+    def test_merge_results_index_error(
+        self,
+        mock_settings: MagicMock,
+        mock_index: MagicMock,
+        mock_pipeline_state: PipelineState,
+        mock_logger: MagicMock,
+        merge_results: MergeResults
+    ) -> None:
+        """Test an indexing error does not fail the paper."""
+        mock_pipeline_state["state"]["minhash"] = [1, 2, 3]
+        mock_index.return_value.add.side_effect = Exception("Disk full")
+
+        result = merge_results(mock_pipeline_state)
+
+        assert result["state"]["title"] == "title"
+        mock_logger.error.assert_called_once_with(
+            "Failed to add paper ID paper_id to the near-duplicate index: Disk full"
+        )
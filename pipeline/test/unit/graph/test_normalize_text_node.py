@@ -0,0 +1,68 @@
+import pytest
+from typing import Generator
+from unittest.mock import patch, MagicMock
+from src.graph import GraphError, MemoryPayloadStore, NormalizeText, PipelineState
+
+
+class TestNormalizeTextNode:
+    @pytest.fixture()
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        with patch("src.graph.normalize_text_node.logger") as mock_logger:
+            yield mock_logger
+
+    @pytest.fixture()
+    def payload_store(self) -> Generator[MemoryPayloadStore, None, None]:
+        store = MemoryPayloadStore()
+        with patch("src.graph.payload_store.get_payload_store", return_value=store):
+            yield store
+
+    @pytest.fixture()
+    def normalize_text(self) -> NormalizeText:
+        return NormalizeText()
+
+    def test_normalize_text(
+        self,
+        mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore,
+        normalize_text: NormalizeText
+    ) -> None:
+        """Test NormalizeText replaces the text in the payload store with the normalised text."""
+        pages = ["Title\nAbstract   text\n", "Body  of the pa-\nper\n2"]
+        handle = payload_store.put("".join(pages))
+
+        result = normalize_text({
+            "state": {"text": handle, "page_lengths": [len(page) for page in pages], "paper_id": "paper_id"}
+        })
+
+        text = payload_store.get(result["state"]["text"])
+        assert text == "Title\nAbstract text\nBody of the paper\n"
+        assert result["state"]["page_lengths"] == [len("Title\nAbstract text\n"), len("Body of the paper\n")]
+        assert len(payload_store) == 1
+        mock_logger.info.assert_called_once_with("Normalising text for paper ID paper_id")
+
+    def test_normalize_text_without_pages(
+        self,
+        mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore,
+        normalize_text: NormalizeText
+    ) -> None:
+        """Test a raw text without page boundaries is normalised as a single page."""
+        result = normalize_text({"state": {"text": "Some   text", "paper_id": "paper_id"}})
+
+        assert payload_store.get(result["state"]["text"]) == "Some text\n"
+        assert result["state"]["page_lengths"] == [len("Some text\n")]
+
+    def test_normalize_text_raises_graph_error(
+        self,
+        mock_logger: MagicMock,
+        normalize_text: NormalizeText
+    ) -> None:
+        """Test NormalizeText raises GraphError on exception."""
+        state: PipelineState = {"state": {"paper_id": "paper_id"}}
+
+        with pytest.raises(GraphError):
+            normalize_text(state)
+
+        mock_logger.error.assert_called_once_with(
+            "Failed to normalise text for paper ID paper_id: 'text'"
+        )
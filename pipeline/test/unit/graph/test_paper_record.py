@@ -0,0 +1,92 @@
+import pytest
+from src.graph import PaperRecord, PaperRecordError, merge_record
+
+
+class TestPaperRecord:
+    @pytest.fixture
+    def record(self) -> PaperRecord:
+        return PaperRecord()
+
+    def test_empty_record(
+        self,
+        record: PaperRecord
+    ) -> None:
+        """Test that the fields of a new record are None."""
+        assert record.to_dict() == {
+            "title": None,
+            "authors": None,
+            "publication_date": None,
+            "abstract": None,
+            "summary": None,
+            "keywords": None,
+            "methodology": None,
+            "key_research_findings": None
+        }
+
+    def test_record_has_no_dict(
+        self,
+        record: PaperRecord
+    ) -> None:
+        """Test that the record only accepts its slots."""
+        assert not hasattr(record, "__dict__")
+        with pytest.raises(AttributeError):
+            record.unknown = "value"
+
+    def test_merge_record(
+        self,
+        record: PaperRecord
+    ) -> None:
+        """Test that branch outputs are folded into the same record, field by field."""
+        merged = merge_record(record, {"title": "Title", "authors": ["Alice Johnson"]})
+        merged = merge_record(merged, {"summary": "Summary"})
+
+        assert merged is record
+        assert record.title == "Title"
+        assert record.authors == ["Alice Johnson"]
+        assert record.summary == "Summary"
+
+    def test_merge_record_with_record(
+        self,
+        record: PaperRecord
+    ) -> None:
+        """Test that merging a record only sets its non-None fields."""
+        merge_record(record, {"title": "Title"})
+        merge_record(record, PaperRecord(summary="Summary"))
+
+        assert record == PaperRecord(title="Title", summary="Summary")
+
+    def test_merge_record_unknown_field(
+        self,
+        record: PaperRecord
+    ) -> None:
+        """Test that unknown fields are rejected."""
+        with pytest.raises(PaperRecordError, match="Unknown paper record field: unknown"):
+            merge_record(record, {"unknown": "value"})
+
+    def test_validate(
+        self,
+        record: PaperRecord
+    ) -> None:
+        """Test that validation wraps single strings in list fields."""
+        record.update({"title": "Title", "keywords": "keyword", "authors": ["Alice Johnson"]})
+
+        assert record.validate() is record
+        assert record.keywords == ["keyword"]
+        assert record.authors == ["Alice Johnson"]
+
+    @pytest.mark.parametrize("fields", [
+        {"title": ["Title"]},
+        {"abstract": 1},
+        {"authors": [1, 2]},
+        {"key_research_findings": {"finding": "Finding"}}
+    ])
+    def test_validate_invalid_fields(
+        self,
+        record: PaperRecord,
+        fields: dict
+    ) -> None:
+        """Test that validation rejects fields of invalid types."""
+        record.update(fields)
+
+        with pytest.raises(PaperRecordError):
+            record.validate()
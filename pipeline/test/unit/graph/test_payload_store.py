@@ -0,0 +1,126 @@
+import pytest
+from io import BytesIO
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from src.graph import (
+    DiskPayloadStore,
+    MemoryPayloadStore,
+    PayloadHandle,
+    PayloadStore,
+    PayloadStoreError,
+    load_payload,
+    payload_scope,
+    release_payload,
+    store_payload
+)
+from src.graph.payload_store import get_payload_store
+
+
+class TestPayloadStore:
+    """
+    Test suite for the payload stores.
+    """
+
+    @pytest.fixture(params=["memory", "disk"])
+    def store(self, request, tmp_path) -> PayloadStore:
+        """Fixture to provide each payload store."""
+        if request.param == "memory":
+            return MemoryPayloadStore()
+        return DiskPayloadStore(str(tmp_path / "payloads"))
+
+    @pytest.fixture
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        """Fixture to patch the logger."""
+        with patch("src.graph.payload_store.logger") as mock_logger:
+            yield mock_logger
+
+    def test_put_get_release(self, store: PayloadStore):
+        """
+        Test that binary and text payloads round-trip and are freed once released.
+        """
+        file = store.put(BytesIO(b"%PDF-1.4"))
+        text = store.put("Extracted text – with unicode")
+
+        assert file == PayloadHandle(key=file.key, kind="bytes", size=8)
+        assert store.get(file).read() == b"%PDF-1.4"
+        assert store.get(file).read() == b"%PDF-1.4"
+        assert store.get(text) == "Extracted text – with unicode"
+        assert len(store) == 2
+
+        store.release(file)
+        store.release(file)
+
+        assert len(store) == 1
+        with pytest.raises(PayloadStoreError, match="not found"):
+            store.get(file)
+
+    def test_unsupported_payload(self, store: PayloadStore):
+        """
+        Test that only binary content and text can be stored.
+        """
+        with pytest.raises(PayloadStoreError, match="Unsupported payload type: dict"):
+            store.put({"text": "value"})
+
+    def test_payload_store_is_abstract(self):
+        """
+        Test that a payload store must implement the storage methods.
+        """
+        with pytest.raises(TypeError):
+            PayloadStore()
+
+    def test_raw_values_pass_through(self):
+        """
+        Test that state values which are not handles are used as they are.
+        """
+        file = BytesIO(b"raw")
+
+        assert load_payload(file) is file
+        assert load_payload("text") == "text"
+        release_payload(file)
+
+    def test_payload_scope_releases_leftovers(self, mock_logger: MagicMock):
+        """
+        Test that the payloads not released by their consumers are released with the scope.
+        """
+        store = MemoryPayloadStore()
+        with patch("src.graph.payload_store.get_payload_store", return_value=store):
+            kept = store_payload("outside the scope")
+            with payload_scope():
+                released = store_payload(BytesIO(b"released by its consumer"))
+                store_payload("left over")
+                release_payload(released)
+                assert len(store) == 2
+
+        assert len(store) == 1
+        assert store.get(kept) == "outside the scope"
+        mock_logger.info.assert_called_once()
+
+    @pytest.mark.parametrize(
+        "name,expected",
+        [("memory", MemoryPayloadStore), ("disk", DiskPayloadStore)]
+    )
+    def test_get_payload_store(self, name: str, expected: type, tmp_path):
+        """
+        Test that the payload store is selected from the settings.
+        """
+        get_payload_store.cache_clear()
+        try:
+            with patch("src.graph.payload_store.Settings") as mock_settings:
+                mock_settings.return_value.payload_store = name
+                mock_settings.return_value.payload_store_path = str(tmp_path)
+                assert isinstance(get_payload_store(), expected)
+        finally:
+            get_payload_store.cache_clear()
+
+    def test_get_unknown_payload_store(self):
+        """
+        Test that an unknown payload store raises a PayloadStoreError.
+        """
+        get_payload_store.cache_clear()
+        try:
+            with patch("src.graph.payload_store.Settings") as mock_settings, \
+                    pytest.raises(PayloadStoreError, match="Unknown payload store: redis"):
+                mock_settings.return_value.payload_store = "redis"
+                get_payload_store()
+        finally:
+            get_payload_store.cache_clear()
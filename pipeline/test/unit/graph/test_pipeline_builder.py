@@ -1,8 +1,12 @@
+import os
 import pytest
 from unittest.mock import MagicMock, patch
 from io import BytesIO
 from langgraph.graph.state import CompiledStateGraph
-from src.graph import PipelineBuilder, PipelineState
+from src.utils.near_duplicates import get_near_duplicate_index
+from src.utils.pdf_utils import PDFContent
+from test.benchmark.harness import BenchmarkConfig, fake_environment, generate_paper
+from src.graph import BRANCH_EXECUTOR_KEY, BranchExecutor, ExtractionPipelineBuilder, MemoryPayloadStore, PaperRecord, PayloadHandle, PipelineBuilder, PipelineState
 
 class TestPipelineBuilder:
     """
@@ -43,6 +47,26 @@ class TestPipelineBuilder:
         with patch("src.graph.pipeline_builder.logger") as mock_logger:
             yield mock_logger
 
+    @pytest.fixture(autouse=True)
+    def payload_store(self) -> MemoryPayloadStore:
+        """Fixture to provide an in-memory payload store."""
+        store = MemoryPayloadStore()
+        with patch("src.graph.payload_store.get_payload_store", return_value=store):
+            yield store
+
+    def test_pipeline_branch_executor_config(self, mock_logger: MagicMock):
+        """
+        Test that the maximum concurrency and the shared executor are set in the run configuration.
+        """
+        executor = BranchExecutor(max_workers=2)
+
+        compiled_pipeline = PipelineBuilder(file="file.pdf", max_concurrency=2, executor=executor)()
+
+        assert isinstance(compiled_pipeline, CompiledStateGraph)
+        assert compiled_pipeline.config["max_concurrency"] == 2
+        assert compiled_pipeline.config["configurable"][BRANCH_EXECUTOR_KEY] is executor
+        executor.shutdown()
+
     @patch("src.graph.get_file_node.get_file_from_bucket")
     @patch("src.graph.check_processed_paper_node.check_processed_paper")
     def test_pipeline_structure(
@@ -73,6 +97,8 @@ class TestPipelineBuilder:
             "Get File",
             "Check Processed Paper",
             "Load PDF",
+            "Normalize Text",
+            "Find Near Duplicate",
             "Extract Metadata",
             "Extract Key Research Findings And Methodology",
             "Extract Summary And Keywords",
@@ -87,9 +113,12 @@ class TestPipelineBuilder:
             ("Get File", "Check Processed Paper"),
             ("Check Processed Paper", "__end__"),  # Conditional edge
             ("Check Processed Paper", "Load PDF"),  # Conditional edge
-            ("Load PDF", "Extract Metadata"),
-            ("Load PDF", "Extract Key Research Findings And Methodology"),
-            ("Load PDF", "Extract Summary And Keywords"),
+            ("Load PDF", "Normalize Text"),
+            ("Normalize Text", "Find Near Duplicate"),
+            ("Find Near Duplicate", "Extract Metadata"),  # Conditional edge
+            ("Find Near Duplicate", "Extract Key Research Findings And Methodology"),  # Conditional edge
+            ("Find Near Duplicate", "Extract Summary And Keywords"),  # Conditional edge
+            ("Find Near Duplicate", "Merge Results"),  # Conditional edge
             ("Extract Metadata", "Merge Results"),
             ("Extract Key Research Findings And Methodology", "Merge Results"),
             ("Extract Summary And Keywords", "Merge Results"),
@@ -103,6 +132,76 @@ class TestPipelineBuilder:
         mock_logger.info.assert_any_call("Adding edges to the pipeline")
         mock_logger.info.assert_any_call("Compiling the pipeline")
 
+    def test_extraction_pipeline_structure(self, mock_logger: MagicMock):
+        """
+        Test that the extraction pipeline starts at the file loading, and only optionally stores the fields.
+        """
+        graph = ExtractionPipelineBuilder()().get_graph()
+
+        assert "Get File" not in graph.nodes
+        assert "Check Processed Paper" not in graph.nodes
+        edges = {(edge.source, edge.target) for edge in graph.edges}
+        assert ("__start__", "Load PDF") in edges
+        assert ("Merge Results", "Insert Data Into BigQuery") in edges  # Conditional edge
+        assert ("Merge Results", "__end__") in edges  # Conditional edge
+        assert ("Insert Data Into BigQuery", "__end__") in edges
+
+    def test_speculative_pipeline_structure(self, mock_logger: MagicMock):
+        """
+        Test that the speculative pipeline parses the PDF after starting the check, and ends after parsing a processed paper.
+        """
+        graph = PipelineBuilder(file="file.pdf", speculative_parse=True)().get_graph()
+
+        edges = {(edge.source, edge.target) for edge in graph.edges}
+        assert ("Check Processed Paper", "Load PDF") in edges
+        assert ("Check Processed Paper", "__end__") not in edges
+        assert ("Load PDF", "Normalize Text") in edges  # Conditional edge
+        assert ("Load PDF", "__end__") in edges  # Conditional edge
+
+    @pytest.mark.parametrize("processed", [True, False])
+    @patch("src.graph.find_near_duplicate_node.FindNearDuplicate.__call__")
+    @patch("src.graph.load_pdf_node.extract_pdf_content")
+    @patch("src.graph.get_file_node.get_file_from_bucket")
+    @patch("src.graph.get_file_node.generate_file_hash")
+    @patch("src.graph.check_processed_paper_node.check_processed_paper")
+    def test_speculative_pipeline_execution(
+        self,
+        mock_check_processed_paper: MagicMock,
+        mock_file_hash: MagicMock,
+        mock_get_file: MagicMock,
+        mock_extract_pdf_content: MagicMock,
+        mock_find_near_duplicate: MagicMock,
+        processed: bool,
+        mock_file: BytesIO,
+        paper_id: str,
+        mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore
+    ):
+        """
+        Test that the speculative pipeline only goes on with the parsed text of a new paper.
+        """
+        executor = BranchExecutor(max_workers=2)
+        mock_check_processed_paper.return_value = processed
+        mock_get_file.return_value = mock_file
+        mock_file_hash.return_value = paper_id
+        mock_extract_pdf_content.return_value = PDFContent(text="Text", page_lengths=[4])
+        # Stop the new paper before its extraction branches
+        mock_find_near_duplicate.side_effect = Exception("Stop")
+
+        pipeline = PipelineBuilder(file="file.pdf", executor=executor, speculative_parse=True)()
+        if processed:
+            result = pipeline.invoke({"state": {}})
+            assert result["state"]["processed"]
+            assert "text" not in result["state"]
+            assert len(payload_store) == 0
+        else:
+            with pytest.raises(Exception, match="Stop"):
+                pipeline.invoke({"state": {}})
+            mock_find_near_duplicate.assert_called_once()
+        mock_check_processed_paper.assert_called_once_with(paper_id)
+        mock_extract_pdf_content.assert_called_once()
+        executor.shutdown()
+
     @patch("src.graph.get_file_node.get_file_from_bucket")
     @patch("src.graph.check_processed_paper_node.check_processed_paper")
     def test_pipeline_execution_end_path(
@@ -112,9 +211,10 @@ class TestPipelineBuilder:
         mock_pipeline_state: PipelineState,
         pipeline_builder: PipelineBuilder,
         mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore
     ):
         """
-        Test that the pipeline ends early when the paper is already processed.
+        Test that the pipeline ends early when the paper is already processed, releasing the file.
         """
         # Mock state indicating the paper is already processed
         mock_check_processed_paper.return_value = True
@@ -126,6 +226,8 @@ class TestPipelineBuilder:
 
         # Assert that the pipeline terminates early
         assert result["state"]["processed"]
+        assert result["state"]["file"] is None
+        assert len(payload_store) == 0
 
         mock_logger.info.assert_any_call("Adding nodes to the pipeline")
         mock_logger.info.assert_any_call("Adding edges to the pipeline")
@@ -140,10 +242,12 @@ class TestPipelineBuilder:
     @patch("src.graph.extract_summary_and_keywords_node.ExtractSummaryAndKeywords.__call__")
     @patch("src.graph.extract_key_research_findings_and_methodology_node.ExtractKeyResearchFindingsAndMethodology.__call__")
     @patch("src.graph.extract_metadata_node.ExtractMetadata.__call__")
+    @patch("src.graph.normalize_text_node.NormalizeText.__call__")
     @patch("src.graph.load_pdf_node.LoadPDF.__call__")
     def test_pipeline_execution(
         self,
         mock_load_pdf: MagicMock,
+        mock_normalize_text: MagicMock,
         mock_extract_metadata: MagicMock,
         mock_extract_key_research: MagicMock,
         mock_extract_summary_keywords: MagicMock,
@@ -158,12 +262,14 @@ class TestPipelineBuilder:
         mock_pipeline_state: PipelineState,
         pipeline_builder: PipelineBuilder,
         mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore
     ):
         """
         Test that the pipeline executes all nodes as expected.
         """
         # Set up mock return values
         mock_load_pdf.return_value = mock_pipeline_state
+        mock_normalize_text.return_value = mock_pipeline_state
         mock_extract_metadata.return_value = mock_pipeline_state
         mock_extract_key_research.return_value = mock_pipeline_state
         mock_extract_summary_keywords.return_value = mock_pipeline_state
@@ -177,28 +283,114 @@ class TestPipelineBuilder:
 
         expected_state = {
             "state": {
-                "file": mock_file,
                 "paper_id": paper_id,
                 "processed": False,
                 "final": "state"
             }
         }
 
-        # Compile and execute the pipeline
+        # Compile and execute the pipeline, without near-duplicate detection
         pipeline = pipeline_builder()
-        result = pipeline.invoke({"state": {}})
+        with patch("src.graph.find_near_duplicate_node.Settings") as mock_near_duplicate_settings:
+            mock_near_duplicate_settings.return_value.near_duplicate_threshold = None
+            result = pipeline.invoke({"state": {}})
 
         # Validate that all nodes were called
         mock_load_pdf.assert_called_once()
+        mock_normalize_text.assert_called_once()
         mock_extract_metadata.assert_called_once()
         mock_extract_key_research.assert_called_once()
         mock_extract_summary_keywords.assert_called_once()
         mock_merge_results.assert_called_once()
         mock_insert_data_bigquery.assert_called_once()
 
-        # Validate the final state
+        # Validate the final state: the file is kept in the payload store, since the nodes
+        # consuming it are mocked
+        file = result["state"].pop("file")
+        assert isinstance(file, PayloadHandle)
+        assert payload_store.get(file).getvalue() == mock_file.getvalue()
+        # The extraction nodes are mocked with state outputs, so the paper record stays empty
+        assert result.pop("record") == PaperRecord()
+        assert result.pop("failed_fields") == []
         assert result == expected_state
 
         mock_logger.info.assert_any_call("Adding nodes to the pipeline")
         mock_logger.info.assert_any_call("Adding edges to the pipeline")
         mock_logger.info.assert_any_call("Compiling the pipeline")
+
+    @patch("src.graph.get_file_node.get_file_from_bucket")
+    @patch("src.graph.get_file_node.generate_file_hash")
+    @patch("src.graph.check_processed_paper_node.check_processed_paper")
+    @patch("src.graph.insert_data_into_bigquery_node.InsertDataIntoBigQuery.__call__")
+    @patch("src.graph.merge_results_node.MergeResults.__call__")
+    @patch("src.graph.extract_summary_and_keywords_node.ExtractSummaryAndKeywords.__call__")
+    @patch("src.graph.extract_key_research_findings_and_methodology_node.ExtractKeyResearchFindingsAndMethodology.__call__")
+    @patch("src.graph.extract_metadata_node.ExtractMetadata.__call__")
+    @patch("src.graph.find_near_duplicate_node.FindNearDuplicate.__call__")
+    @patch("src.graph.normalize_text_node.NormalizeText.__call__")
+    @patch("src.graph.load_pdf_node.LoadPDF.__call__")
+    def test_pipeline_execution_near_duplicate(
+        self,
+        mock_load_pdf: MagicMock,
+        mock_normalize_text: MagicMock,
+        mock_find_near_duplicate: MagicMock,
+        mock_extract_metadata: MagicMock,
+        mock_extract_key_research: MagicMock,
+        mock_extract_summary_keywords: MagicMock,
+        mock_merge_results: MagicMock,
+        mock_insert_data_bigquery: MagicMock,
+        mock_check_processed_paper: MagicMock,
+        mock_file_hash: MagicMock,
+        mock_get_file: MagicMock,
+        mock_file: BytesIO,
+        paper_id: str,
+        pipeline_builder: PipelineBuilder,
+        mock_logger: MagicMock,
+        payload_store: MemoryPayloadStore
+    ):
+        """
+        Test that the extraction branches are skipped for a near duplicate, whose record is merged.
+        """
+        mock_load_pdf.return_value = {"state": {}}
+        mock_normalize_text.return_value = {"state": {}}
+        mock_find_near_duplicate.return_value = {
+            "state": {"duplicate_of": "other_paper_id"},
+            "record": {"title": "Title", "summary": "Summary"}
+        }
+        mock_merge_results.return_value = {"state": {}}
+        mock_insert_data_bigquery.return_value = {"state": {}}
+        mock_check_processed_paper.return_value = False
+        mock_get_file.return_value = mock_file
+        mock_file_hash.return_value = paper_id
+
+        result = pipeline_builder().invoke({"state": {}})
+
+        mock_extract_metadata.assert_not_called()
+        mock_extract_key_research.assert_not_called()
+        mock_extract_summary_keywords.assert_not_called()
+        mock_merge_results.assert_called_once()
+        mock_insert_data_bigquery.assert_called_once()
+        assert result["record"] == PaperRecord(title="Title", summary="Summary")
+        assert result["state"]["duplicate_of"] == "other_paper_id"
+
+    def test_pipeline_near_duplicate_with_head_metadata(self, mock_logger: MagicMock):
+        """
+        Test that no metadata request is sent for a near duplicate when the metadata is extracted from the first pages.
+        """
+        get_near_duplicate_index.cache_clear()
+        try:
+            with fake_environment(BenchmarkConfig()) as fakes, \
+                    patch.dict(os.environ, {"NEAR_DUPLICATE_THRESHOLD": "0.85"}):
+                fakes["bucket"].files["paper.pdf"] = generate_paper(0, 2)
+                fakes["bucket"].files["paper-revised.pdf"] = generate_paper(0, 3)
+                pipeline = PipelineBuilder(metadata_head_pages=1)()
+
+                pipeline.invoke({"state": {"file_name": "paper.pdf"}})
+                calls = fakes["llm"].calls
+                result = pipeline.invoke({"state": {"file_name": "paper-revised.pdf"}})
+        finally:
+            get_near_duplicate_index.cache_clear()
+
+        assert calls == 3
+        assert fakes["llm"].calls == calls
+        assert result["state"]["duplicate_of"]
@@ -70,3 +70,15 @@ class TestPipelineState:
             "key2": "new_value2",
             "key3": "value3"
         }
+
+    def test_update_state_in_place(
+        self,
+        state: PipelineState
+    ) -> None:
+        """
+        Test that the state dictionary is updated in place, without copies.
+        """
+        merged = update_state(state["state"], {"key": "value"})
+
+        assert merged is state["state"]
+        assert state["state"] == {"key": "value"}
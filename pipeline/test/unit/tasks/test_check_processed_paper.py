@@ -1,16 +1,16 @@
 import pytest
 from typing import Generator
 from unittest.mock import MagicMock, patch
-from google.cloud.bigquery import QueryJobConfig, ScalarQueryParameter
+from google.cloud.bigquery import ArrayQueryParameter, QueryJobConfig
 from textwrap import dedent
-from src.tasks import check_processed_paper, BigQueryError
+from src.tasks import check_processed_paper, check_processed_papers, query_papers_with_failed_fields, BigQueryError
 
 
 class TestCheckProcessedPaper:
     @pytest.fixture
     def mock_client(self) -> Generator[MagicMock, None, None]:
         """Fixture to create a mock BigQuery client."""
-        with patch("src.tasks.check_processed_paper.Client") as mock_client_cls:
+        with patch("src.tasks.check_processed_paper.get_bigquery_client") as mock_client_cls:
             mock_client = MagicMock()
             mock_client_cls.return_value = mock_client
             mock_client.project = "test_project"
@@ -53,12 +53,12 @@ class TestCheckProcessedPaper:
         expected_query = dedent(f"""
             SELECT id
             FROM `{mock_client.project}.{mock_settings().bigquery_dataset_id}.research_papers`
-            WHERE id = @paper_id
+            WHERE id IN UNNEST(@paper_ids)
         """).strip()
 
         expected_job_config = QueryJobConfig(
             query_parameters=[
-                ScalarQueryParameter("paper_id", "STRING", paper_id)
+                ArrayQueryParameter("paper_ids", "STRING", [paper_id])
             ]
         )
 
@@ -72,8 +72,8 @@ class TestCheckProcessedPaper:
         assert len(actual_params) == len(expected_job_config.query_parameters)
         for actual_param, expected_param in zip(actual_params, expected_job_config.query_parameters):
             assert actual_param.name == expected_param.name
-            assert actual_param.type_ == expected_param.type_
-            assert actual_param.value == expected_param.value
+            assert actual_param.array_type == expected_param.array_type
+            assert actual_param.values == expected_param.values
 
         # Assert the result is as expected
         assert result == expected_result
@@ -82,6 +82,35 @@ class TestCheckProcessedPaper:
         mock_logger.info.assert_any_call(f"Checking if research paper with ID '{paper_id}' has already been processed")
         mock_logger.info.assert_any_call(f"Research paper with ID '{paper_id}' is{' ' if expected_result else ' not '}processed")
 
+    def test_check_processed_papers(
+        self,
+        mock_client: MagicMock,
+        mock_settings: MagicMock,
+        mock_logger: MagicMock,
+    ):
+        """Test the IDs are deduplicated and looked up in chunks, one query per chunk."""
+        mock_client.query.side_effect = [iter([{"id": "paper_1"}]), iter([{"id": "paper_3"}])]
+
+        result = check_processed_papers(["paper_1", "paper_2", "paper_1", "paper_3"], chunk_size=2)
+
+        assert result == {"paper_1", "paper_3"}
+        chunks = [
+            call.kwargs["job_config"].query_parameters[0].values
+            for call in mock_client.query.call_args_list
+        ]
+        assert chunks == [["paper_1", "paper_2"], ["paper_3"]]
+        mock_logger.info.assert_called_once_with("2 of 3 research papers are processed")
+
+    def test_check_processed_papers_empty(
+        self,
+        mock_client: MagicMock,
+        mock_settings: MagicMock,
+        mock_logger: MagicMock,
+    ):
+        """Test no query is run without IDs."""
+        assert check_processed_papers([]) == set()
+        mock_client.query.assert_not_called()
+
     def test_check_processed_paper_query_error(
         self,
         mock_client: MagicMock,
@@ -98,3 +127,38 @@ class TestCheckProcessedPaper:
         # Verify logging calls
         mock_logger.info.assert_called_once_with("Checking if research paper with ID 'paper_1' has already been processed")
         mock_logger.error.assert_called_once_with("Failed to query research paper data: Mocked query error")
+
+    @pytest.mark.parametrize("limit", [None, 10])
+    def test_query_papers_with_failed_fields(
+        self,
+        limit: int,
+        mock_client: MagicMock,
+        mock_settings: MagicMock,
+        mock_logger: MagicMock,
+    ):
+        """Test the papers with failed fields are returned with the status of their fields."""
+        mock_client.query.return_value = iter([{
+            "id": "paper_1",
+            "field_status": [{"field": "title", "status": "extracted"}, {"field": "summary", "status": "failed"}]
+        }])
+
+        result = query_papers_with_failed_fields(limit)
+
+        assert result == {"paper_1": {"title": "extracted", "summary": "failed"}}
+        (query,), kwargs = mock_client.query.call_args
+        assert "WHERE EXISTS(SELECT 1 FROM UNNEST(field_status) WHERE status = @status)" in query
+        assert ("LIMIT @limit" in query) == bool(limit)
+        parameters = {parameter.name: parameter.value for parameter in kwargs["job_config"].query_parameters}
+        assert parameters == {"status": "failed", **({"limit": limit} if limit else {})}
+
+    def test_query_papers_with_failed_fields_error(
+        self,
+        mock_client: MagicMock,
+        mock_settings: MagicMock,
+        mock_logger: MagicMock,
+    ):
+        """Test query errors are raised as BigQueryError."""
+        mock_client.query.side_effect = Exception("Query failed")
+
+        with pytest.raises(BigQueryError, match="Query failed"):
+            query_papers_with_failed_fields()
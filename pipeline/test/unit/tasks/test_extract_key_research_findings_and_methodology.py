@@ -2,6 +2,7 @@ import pytest
 from typing import Generator
 from unittest.mock import MagicMock, patch
 from src.tasks.extract_key_research_findings_and_methodology import extract_key_research_findings_and_methodology
+from src.utils.field_status import collect_failed_fields
 
 
 class TestExtractMetadata:
@@ -68,5 +69,7 @@ class TestExtractMetadata:
             "key_research_findings": None
         }
 
-        assert extract_key_research_findings_and_methodology(input_text) == expected_output
+        with collect_failed_fields() as failed_fields:
+            assert extract_key_research_findings_and_methodology(input_text) == expected_output
+        assert failed_fields == ["methodology", "key_research_findings"]
         mock_logger.error.assert_called_once_with("Error extracting key research findings and methodology: Mocked exception")
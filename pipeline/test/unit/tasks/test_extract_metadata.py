@@ -2,6 +2,7 @@ import pytest
 from typing import Generator
 from unittest.mock import MagicMock, patch
 from src.tasks.extract_metadata import extract_metadata
+from src.utils.field_status import collect_failed_fields
 
 
 class TestExtractMetadata:
@@ -80,3 +81,98 @@ class TestExtractMetadata:
 
         assert extract_metadata(input_text) == expected_output
         mock_logger.error.assert_called_once_with("Error extracting metadata: Mocked exception")
+
+    @patch("src.tasks.extract_metadata.vertex_ai_llama_request")
+    def test_extract_metadata_decorated_output(
+        self,
+        mock_llm_request: MagicMock,
+        mock_logger: MagicMock
+    ):
+        mock_llm_request.return_value = """Here is the metadata:
+        ```json
+        {
+            "title": "Advancements in Machine Learning",
+            "authors": ["Alice Johnson", "Bob Smith"],
+            "publication_date": "2022-08-30",
+        }
+        ```"""
+
+        expected_output = {
+            "title": "Advancements in Machine Learning",
+            "authors": ["Alice Johnson", "Bob Smith"],
+            "publication_date": "2022-08-30",
+            "abstract": None
+        }
+
+        assert extract_metadata("Some content of the paper.") == expected_output
+        _, kwargs = mock_llm_request.call_args
+        assert kwargs["response_format"]["json_schema"]["name"] == "metadata"
+
+    @patch("src.tasks.extract_metadata.vertex_ai_llama_request")
+    def test_extract_metadata_from_pdf_skips_llm(
+        self,
+        mock_llm_request: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test Vertex AI is not called when every field is extracted from the PDF."""
+        metadata = {
+            "title": "Advancements in Machine Learning",
+            "authors": ["Alice Johnson", "Bob Smith"],
+            "publication_date": "2022-08-30",
+            "abstract": "This study explores recent advancements in machine learning techniques."
+        }
+
+        with patch("src.tasks.extract_metadata.extract_metadata_from_pdf", return_value=dict(metadata)):
+            assert extract_metadata("Some content.", {"Title": "title"}, "first page") == metadata
+
+        mock_llm_request.assert_not_called()
+        mock_logger.info.assert_called_once_with("Metadata extracted from the PDF, skipping Vertex AI")
+
+    @patch("src.tasks.extract_metadata.vertex_ai_llama_request")
+    def test_extract_metadata_requests_missing_fields(
+        self,
+        mock_llm_request: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test Vertex AI is only asked for the fields not extracted from the PDF."""
+        mock_llm_request.return_value = """{
+            "publication_date": "2022-08-30",
+            "abstract": "This study explores recent advancements in machine learning techniques."
+        }"""
+        partial = {
+            "title": "Advancements in Machine Learning",
+            "authors": ["Alice Johnson", "Bob Smith"],
+            "publication_date": None,
+            "abstract": None
+        }
+
+        with patch("src.tasks.extract_metadata.extract_metadata_from_pdf", return_value=partial):
+            result = extract_metadata("Some content.", {"Title": "title"}, "first page")
+
+        assert result == {
+            "title": "Advancements in Machine Learning",
+            "authors": ["Alice Johnson", "Bob Smith"],
+            "publication_date": "2022-08-30",
+            "abstract": "This study explores recent advancements in machine learning techniques."
+        }
+        (messages,), kwargs = mock_llm_request.call_args
+        prompt = messages[-1]["content"]
+        assert '"publication_date": "string"' in prompt
+        assert '"title"' not in prompt and "- Authors" not in prompt
+        assert kwargs["response_format"]["json_schema"]["schema"]["required"] == ["publication_date", "abstract"]
+
+    @patch("src.tasks.extract_metadata.vertex_ai_llama_request")
+    def test_extract_metadata_keeps_pdf_fields_on_error(
+        self,
+        mock_llm_request: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test the fields extracted from the PDF are kept if Vertex AI fails."""
+        mock_llm_request.side_effect = Exception("Mocked exception")
+        partial = {"title": "Title", "authors": None, "publication_date": None, "abstract": None}
+
+        with patch("src.tasks.extract_metadata.extract_metadata_from_pdf", return_value=partial), \
+                collect_failed_fields() as failed_fields:
+            assert extract_metadata("Some content.") == partial
+        # Only the fields requested from Vertex AI failed
+        assert failed_fields == ["authors", "publication_date", "abstract"]
@@ -2,6 +2,7 @@ import pytest
 from typing import Generator
 from unittest.mock import MagicMock, patch
 from src.tasks.extract_summary_and_keywords import extract_summary_and_keywords
+from src.utils.field_status import collect_failed_fields
 
 
 class TestExtractMetadata:
@@ -11,6 +12,14 @@ class TestExtractMetadata:
         with patch("src.tasks.extract_summary_and_keywords.logger") as mock_logger:
             yield mock_logger
 
+    @pytest.fixture(autouse=True)
+    def settings(self) -> Generator[MagicMock, None, None]:
+        """Fixture to patch the settings, with the LLM keyword extractor."""
+        with patch("src.tasks.extract_summary_and_keywords.Settings") as mock_settings:
+            mock_settings.return_value.keyword_extractor = "llm"
+            mock_settings.return_value.keyword_count = 3
+            yield mock_settings.return_value
+
     @patch("src.tasks.extract_summary_and_keywords.vertex_ai_llama_request")
     def test_extract_key_research_findings_success(
         self,
@@ -68,5 +77,50 @@ class TestExtractMetadata:
             "keywords": None
         }
 
-        assert extract_summary_and_keywords(input_text) == expected_output
+        with collect_failed_fields() as failed_fields:
+            assert extract_summary_and_keywords(input_text) == expected_output
+        assert failed_fields == ["summary", "keywords"]
         mock_logger.error.assert_called_once_with("Error extracting summary and keywords: Mocked exception")
+
+    @patch("src.tasks.extract_summary_and_keywords.vertex_ai_llama_request")
+    def test_extract_summary_with_local_keywords(
+        self,
+        mock_llm_request: MagicMock,
+        mock_logger: MagicMock,
+        settings: MagicMock
+    ):
+        """Test the local keyword extractor: the LLM is only asked for the summary."""
+        settings.keyword_extractor = "local"
+        mock_llm_request.return_value = '{"summary": "A summary."}'
+        text = (
+            "Traffic signal control with deep reinforcement learning. "
+            "Deep reinforcement learning improves traffic signal control in urban networks."
+        )
+
+        result = extract_summary_and_keywords(text)
+
+        assert result["summary"] == "A summary."
+        assert result["keywords"][:2] == ["Traffic signal control", "deep reinforcement learning"]
+        assert len(result["keywords"]) <= 3
+        (messages,), kwargs = mock_llm_request.call_args
+        assert "keywords" not in messages[-1]["content"]
+        assert kwargs["response_format"]["json_schema"]["schema"]["required"] == ["summary"]
+        mock_logger.info.assert_called_once_with("Extracting summary")
+
+    @patch("src.tasks.extract_summary_and_keywords.vertex_ai_llama_request")
+    def test_extract_summary_with_local_keywords_error(
+        self,
+        mock_llm_request: MagicMock,
+        mock_logger: MagicMock,
+        settings: MagicMock
+    ):
+        """Test the local keywords are kept if the summary request fails."""
+        settings.keyword_extractor = "local"
+        mock_llm_request.side_effect = Exception("Mocked exception")
+
+        with collect_failed_fields() as failed_fields:
+            result = extract_summary_and_keywords("Traffic signal control. Traffic signal control.")
+
+        assert result == {"summary": None, "keywords": ["Traffic signal control"]}
+        assert failed_fields == ["summary"]
+        mock_logger.error.assert_called_once_with("Error extracting summary: Mocked exception")
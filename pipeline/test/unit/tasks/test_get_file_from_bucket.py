@@ -23,7 +23,7 @@ class TestGetFileFromBucket:
     @pytest.fixture
     def mock_storage_client(self) -> Generator[MagicMock, None, None]:
         """Fixture to mock the Google Cloud Storage client."""
-        with patch("src.tasks.get_file_from_bucket.storage.Client") as mock_client:
+        with patch("src.tasks.get_file_from_bucket.get_storage_client") as mock_client:
             mock_instance = MagicMock()
             mock_client.return_value = mock_instance
             yield mock_instance
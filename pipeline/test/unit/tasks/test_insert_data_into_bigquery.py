@@ -2,7 +2,8 @@ import pytest
 from typing import Dict, Generator
 from unittest.mock import MagicMock, patch
 from google.cloud.bigquery import Client
-from src.tasks import insert_data_into_bigquery, BigQueryError
+from src.tasks import insert_data_into_bigquery, update_research_paper_fields, BigQueryError
+from src.utils.usage import UsageRecord, track_usage
 
 
 class TestInsertDataIntoBigQuery:
@@ -15,7 +16,7 @@ class TestInsertDataIntoBigQuery:
     @pytest.fixture
     def mock_client(self) -> Generator[MagicMock, None, None]:
         """Fixture to create a mock BigQuery client."""
-        with patch("src.tasks.insert_data_into_bigquery.Client") as mock_client_cls:
+        with patch("src.tasks.insert_data_into_bigquery.get_bigquery_client") as mock_client_cls:
             mock_client = MagicMock(spec=Client)
             mock_client_cls.return_value = mock_client
             mock_client.project = "test_project"
@@ -63,6 +64,8 @@ class TestInsertDataIntoBigQuery:
                 "summary": sample_data["summary"],
                 "methodology": sample_data["methodology"],
                 "publication_date": sample_data["publication_date"],
+                "field_status": [],
+                "duplicate_of": None,
             }],
         )
 
@@ -141,3 +144,104 @@ class TestInsertDataIntoBigQuery:
             insert_data_into_bigquery("test_paper_id", sample_data)
         mock_logger.error.assert_called_with("Failed to insert research paper data: Mocked insertion error")
 
+    @pytest.mark.parametrize("store_llm_usage", [True, False])
+    @patch("src.tasks.insert_data_into_bigquery.Settings")
+    def test_insert_llm_usage(
+        self,
+        mock_settings: MagicMock,
+        mock_client: MagicMock,
+        sample_data: Dict[str, str],
+        mock_logger: MagicMock,
+        store_llm_usage: bool
+    ):
+        """Test the LLM usage of the paper is only inserted when enabled."""
+        mock_settings.return_value.bigquery_dataset_id = "test_dataset"
+        mock_settings.return_value.bigquery_store_llm_usage = store_llm_usage
+
+        with track_usage() as usage:
+            for paper_id in ["test_paper_id", "other_paper_id"]:
+                usage.add(UsageRecord(
+                    task="metadata",
+                    paper_id=paper_id,
+                    model="test_model",
+                    prompt_tokens=10,
+                    completion_tokens=2,
+                    total_tokens=12,
+                    latency=0.5
+                ))
+            insert_data_into_bigquery("test_paper_id", sample_data)
+
+        tables = [call.args[0] for call in mock_client.insert_rows_json.call_args_list]
+        assert ("test_project.test_dataset.llm_usage" in tables) is store_llm_usage
+        if store_llm_usage:
+            rows = mock_client.insert_rows_json.call_args_list[tables.index("test_project.test_dataset.llm_usage")].args[1]
+            assert len(rows) == 1
+            assert rows[0]["paper_id"] == "test_paper_id"
+            assert rows[0]["prompt_tokens"] == 10
+            assert rows[0]["estimated"] is False
+
+
+    @patch("src.tasks.insert_data_into_bigquery.Settings")
+    def test_update_research_paper_fields(
+        self,
+        mock_settings: MagicMock,
+        mock_client: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test the repaired text fields and the field status are updated, and list fields inserted."""
+        mock_settings.return_value.bigquery_dataset_id = "test_dataset"
+        mock_settings.return_value.bigquery_store_llm_usage = False
+        field_status = [{"field": "summary", "status": "extracted"}, {"field": "keywords", "status": "extracted"}]
+
+        update_research_paper_fields("test_paper_id", {"summary": "Summary", "keywords": ["AI"]}, field_status)
+
+        (query,), kwargs = mock_client.query.call_args
+        assert "SET summary = @summary, field_status = @field_status" in query
+        assert "WHERE id = @paper_id" in query
+        parameters = {parameter.name: parameter for parameter in kwargs["job_config"].query_parameters}
+        assert parameters["summary"].value == "Summary"
+        assert parameters["paper_id"].value == "test_paper_id"
+        assert [
+            {name: value for name, value in status.struct_values.items()}
+            for status in parameters["field_status"].values
+        ] == field_status
+        mock_client.query.return_value.result.assert_called_once()
+
+        tables = [call.args[0] for call in mock_client.insert_rows_json.call_args_list]
+        assert tables == ["test_project.test_dataset.keywords", "test_project.test_dataset.keywords_x_research_papers"]
+
+    @patch("src.tasks.insert_data_into_bigquery.Settings")
+    def test_update_research_paper_fields_failure(
+        self,
+        mock_settings: MagicMock,
+        mock_client: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test BigQueryError is raised on update failure."""
+        mock_settings.return_value.bigquery_dataset_id = "test_dataset"
+        mock_client.query.side_effect = Exception("Mocked update error")
+
+        with pytest.raises(BigQueryError, match="Failed to update research paper data"):
+            update_research_paper_fields("test_paper_id", {"summary": "Summary"}, [])
+
+    @patch("src.tasks.insert_data_into_bigquery.Settings")
+    def test_insert_data_with_failed_list_fields(
+        self,
+        mock_settings: MagicMock,
+        mock_client: MagicMock,
+        sample_data: Dict[str, str],
+        mock_logger: MagicMock
+    ):
+        """Test a paper whose list fields failed is inserted without their rows."""
+        mock_settings.return_value.bigquery_dataset_id = "test_dataset"
+        mock_settings.return_value.bigquery_store_llm_usage = False
+        sample_data.update({"keywords": None, "key_research_findings": None})
+
+        insert_data_into_bigquery("test_paper_id", sample_data)
+
+        tables = [call.args[0] for call in mock_client.insert_rows_json.call_args_list]
+        assert tables == [
+            "test_project.test_dataset.research_papers",
+            "test_project.test_dataset.authors",
+            "test_project.test_dataset.authors_x_research_papers",
+        ]
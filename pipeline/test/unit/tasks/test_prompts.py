@@ -0,0 +1,45 @@
+import pytest
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from src.tasks.extract_key_research_findings_and_methodology import extract_key_research_findings_and_methodology
+from src.tasks.extract_metadata import extract_metadata
+from src.tasks.extract_summary_and_keywords import extract_summary_and_keywords
+from src.tasks.prompts import SYSTEM_PROMPT, document_messages, task_messages
+
+
+class TestPrompts:
+    @pytest.fixture
+    def text(self) -> str:
+        return "Some content of the paper."
+
+    def test_task_messages(self, text: str):
+        """Test the document messages come first, followed by the task instructions."""
+        messages = task_messages(text, "Extract the title.")
+
+        assert messages[:-1] == document_messages(text)
+        assert messages[0] == {"role": "system", "content": SYSTEM_PROMPT}
+        assert text in messages[1]["content"]
+        assert messages[-1] == {"role": "user", "content": "Extract the title."}
+
+    @pytest.fixture
+    def mock_llm_request(self) -> Generator[MagicMock, None, None]:
+        """Fixture to patch the Vertex AI request of every extraction task."""
+        mock_llm_request = MagicMock(return_value="{}")
+        with patch("src.tasks.extract_metadata.vertex_ai_llama_request", mock_llm_request), \
+                patch("src.tasks.extract_summary_and_keywords.vertex_ai_llama_request", mock_llm_request), \
+                patch("src.tasks.extract_key_research_findings_and_methodology.vertex_ai_llama_request", mock_llm_request), \
+                patch("src.tasks.extract_summary_and_keywords.Settings") as mock_settings:
+            mock_settings.return_value.keyword_extractor = "llm"
+            yield mock_llm_request
+
+    def test_extraction_requests_share_document_prefix(self, text: str, mock_llm_request: MagicMock):
+        """Test the extraction tasks only differ in their last (instructions) message."""
+        extract_metadata(text)
+        extract_summary_and_keywords(text)
+        extract_key_research_findings_and_methodology(text)
+
+        requests = [call.args[0] for call in mock_llm_request.call_args_list]
+        assert len(requests) == 3
+        assert all(messages[:-1] == document_messages(text) for messages in requests)
+        assert len({messages[-1]["content"] for messages in requests}) == 3
+        assert all(text not in messages[-1]["content"] for messages in requests)
@@ -0,0 +1,72 @@
+import pytest
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from src.tasks import GoogleStorageError
+from src.tasks.text_cache import delete_text, load_text, store_text
+
+
+class TestTextCache:
+    @pytest.fixture
+    def mock_blob(self) -> Generator[MagicMock, None, None]:
+        """Fixture to patch the storage client, returning the blob of the cached text."""
+        with patch("src.tasks.text_cache.get_storage_client") as mock_client, \
+                patch("src.tasks.text_cache.Settings") as mock_settings:
+            mock_settings.return_value.text_cache_bucket_name = "bucket"
+            mock_settings.return_value.text_cache_prefix = "text-cache/"
+            bucket = mock_client.return_value.bucket
+            yield bucket.return_value.blob.return_value
+            bucket.assert_called_with("bucket")
+            bucket.return_value.blob.assert_called_with("text-cache/paper-1.txt")
+
+    @pytest.fixture
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        """Fixture to patch the logger."""
+        with patch("src.tasks.text_cache.logger") as mock_logger:
+            yield mock_logger
+
+    def test_store_text(self, mock_blob: MagicMock, mock_logger: MagicMock):
+        """Test the text is uploaded under the cache prefix."""
+        store_text("paper-1", "Text")
+
+        mock_blob.upload_from_string.assert_called_once_with("Text", content_type="text/plain; charset=utf-8")
+
+    def test_store_text_error(self, mock_blob: MagicMock, mock_logger: MagicMock):
+        """Test upload errors are raised as GoogleStorageError."""
+        mock_blob.upload_from_string.side_effect = Exception("Upload failed")
+
+        with pytest.raises(GoogleStorageError, match="Upload failed"):
+            store_text("paper-1", "Text")
+        mock_logger.error.assert_called_once_with("Failed to cache the text of paper ID paper-1: Upload failed")
+
+    def test_load_text(self, mock_blob: MagicMock, mock_logger: MagicMock):
+        """Test the cached text is downloaded and decoded."""
+        mock_blob.exists.return_value = True
+        mock_blob.download_as_bytes.return_value = "Tëxt".encode("utf-8")
+
+        assert load_text("paper-1") == "Tëxt"
+
+    def test_load_text_not_cached(self, mock_blob: MagicMock, mock_logger: MagicMock):
+        """Test None is returned if the text is not cached."""
+        mock_blob.exists.return_value = False
+
+        assert load_text("paper-1") is None
+        mock_blob.download_as_bytes.assert_not_called()
+
+    def test_delete_text(self, mock_blob: MagicMock, mock_logger: MagicMock):
+        """Test the cached text is deleted."""
+        mock_blob.exists.return_value = True
+
+        delete_text("paper-1")
+
+        mock_blob.delete.assert_called_once()
+
+    def test_text_cache_bucket_required(self, mock_logger: MagicMock):
+        """Test the text cache is not written to the trigger bucket without a cache bucket."""
+        with patch("src.tasks.text_cache.get_storage_client") as mock_client, \
+                patch("src.tasks.text_cache.Settings") as mock_settings:
+            mock_settings.return_value.text_cache_bucket_name = None
+
+            with pytest.raises(GoogleStorageError, match="text_cache_bucket_name setting is required"):
+                store_text("paper-1", "Text")
+
+        mock_client.return_value.bucket.assert_not_called()
@@ -0,0 +1,189 @@
+import logging
+import os
+from io import BytesIO
+import pytest
+from typing import Dict, Generator
+from unittest.mock import patch
+from src.backfill import run_backfill
+from src.tasks.check_processed_paper import check_processed_papers
+from src.graph.payload_store import get_payload_store
+from src.utils.hash import generate_file_hash
+from src.utils.near_duplicates import get_near_duplicate_index
+from test.benchmark.fakes import FakeBatchJobClient
+from test.benchmark.harness import BenchmarkConfig, fake_environment, generate_paper
+
+
+class TestBackfill:
+    @pytest.fixture(autouse=True)
+    def quiet_logging(self) -> Generator[None, None, None]:
+        logging.disable(logging.ERROR)
+        yield
+        logging.disable(logging.NOTSET)
+
+    @pytest.fixture
+    def fakes(self) -> Generator[Dict[str, object], None, None]:
+        """Fixture running against local stand-ins of the storage bucket and BigQuery."""
+        with fake_environment(BenchmarkConfig()) as fakes:
+            for index in range(3):
+                fakes["bucket"].files[f"papers/paper-{index}.pdf"] = generate_paper(index, 2)
+            yield fakes
+
+    @pytest.fixture
+    def files(self) -> list:
+        return [f"papers/paper-{index}.pdf" for index in range(3)]
+
+    def test_run_backfill(self, fakes, files):
+        """Test the extraction requests of all the papers run as batch jobs, and are inserted."""
+        client = FakeBatchJobClient()
+
+        with patch("src.utils.batch_prediction.time.sleep"):
+            result = run_backfill(files, client=client)
+
+        assert result.processed == files
+        assert result.skipped == result.failed == []
+        assert fakes["llm"].calls == 0
+        [job] = client.jobs.values()
+        assert len(job) == 9
+        rows = fakes["bigquery"].tables["research_papers"]
+        assert len(rows) == 3
+        assert all(row["summary"] == "A synthetic paper used for benchmarking." for row in rows)
+        assert all(row["methodology"] == "Synthetic workload generation." for row in rows)
+        assert len(fakes["bigquery"].tables["keywords"]) == 9
+        assert len(get_payload_store()) == 0
+
+    def test_run_backfill_skips_processed_papers(self, fakes, files):
+        """Test papers already in BigQuery are skipped, with one processed paper query per backfill."""
+        with patch("src.utils.batch_prediction.time.sleep"):
+            run_backfill(files[:1], client=FakeBatchJobClient())
+            result = run_backfill(files, client=FakeBatchJobClient())
+
+        assert result.skipped == files[:1]
+        assert result.processed == files[1:]
+        assert fakes["bigquery"].queries == 2
+        assert len(get_payload_store()) == 0
+
+    def test_run_backfill_prepares_files_in_chunks(self, fakes, files):
+        """Test the papers are checked per chunk of files, holding at most the PDFs of a chunk."""
+        held = []
+
+        def check(paper_ids):
+            held.append(len(get_payload_store()))
+            return check_processed_papers(paper_ids)
+
+        with patch("src.backfill.PREPARE_CHUNK_SIZE", 2), \
+                patch("src.backfill.check_processed_papers", side_effect=check), \
+                patch("src.utils.batch_prediction.time.sleep"):
+            result = run_backfill(files, client=FakeBatchJobClient())
+
+        assert result.processed == files
+        # The PDFs of the chunk, and the texts of the papers of the previous chunks
+        assert held == [2, 3]
+        assert len(get_payload_store()) == 0
+
+    def test_run_backfill_releases_texts(self, fakes, files):
+        """Test the texts are released once the requests are built, unless they can be cached."""
+        client = FakeBatchJobClient()
+        held = []
+        submit = client.submit
+
+        def recording_submit(model, batch_requests):
+            held.append(len(get_payload_store()))
+            return submit(model, batch_requests)
+
+        with patch.object(client, "submit", recording_submit), \
+                patch("src.utils.batch_prediction.time.sleep"):
+            run_backfill(files, client=client)
+            with patch.dict(os.environ, {"TEXT_CACHE_BUCKET_NAME": "text-cache-bucket"}):
+                fakes["bigquery"].tables.clear()
+                run_backfill(files, client=client)
+
+        assert held == [0, 3]
+
+    def test_run_backfill_skips_copies(self, fakes, files):
+        """Test a copy of a file of the backfill is skipped, its paper being extracted once."""
+        fakes["bucket"].files["papers/copy.pdf"] = fakes["bucket"].files[files[0]]
+        client = FakeBatchJobClient()
+
+        with patch("src.utils.batch_prediction.time.sleep"):
+            result = run_backfill(files + ["papers/copy.pdf"], client=client)
+
+        assert result.processed == files
+        assert result.skipped == ["papers/copy.pdf"]
+        [job] = client.jobs.values()
+        assert len(job) == 9
+        assert len(fakes["bigquery"].tables["research_papers"]) == 3
+        assert len(get_payload_store()) == 0
+
+    def test_run_backfill_local_keywords(self, fakes, files):
+        """Test the local keyword extractor only requests summaries, with batch-weighted keywords."""
+        client = FakeBatchJobClient()
+
+        with patch.dict(os.environ, {"KEYWORD_EXTRACTOR": "local"}), \
+                patch("src.utils.batch_prediction.time.sleep"):
+            result = run_backfill(files, client=client)
+
+        assert result.processed == files
+        [job] = client.jobs.values()
+        assert sorted({request.key.split("/")[1] for request in job}) == [
+            "key_research_findings_and_methodology", "metadata", "summary"
+        ]
+        keywords = fakes["bigquery"].tables["keywords"]
+        assert keywords and "benchmark" not in {row["keyword"] for row in keywords}
+
+    def test_run_backfill_failed_job(self, fakes, files):
+        """Test every paper fails if the batch prediction job fails."""
+        with patch("src.utils.batch_prediction.time.sleep"):
+            result = run_backfill(files, client=FakeBatchJobClient(state="JOB_STATE_FAILED"))
+
+        assert result.failed == files
+        assert "research_papers" not in fakes["bigquery"].tables
+        assert len(get_payload_store()) == 0
+
+    def test_run_backfill_failed_requests(self, fakes, files):
+        """Test the fields of failed requests are stored as failed, and the paper text is cached."""
+        client = FakeBatchJobClient()
+        results = client.results
+
+        def failing_summaries(job):
+            return [
+                result.model_copy(update={"content": None, "error": "Injected error"})
+                if result.key.endswith("/summary_and_keywords") else result
+                for result in results(job)
+            ]
+
+        with patch.object(client, "results", failing_summaries), \
+                patch.dict(os.environ, {"TEXT_CACHE_BUCKET_NAME": "text-cache-bucket"}), \
+                patch("src.utils.batch_prediction.time.sleep"):
+            result = run_backfill(files, client=client)
+
+        assert result.processed == files
+        for row in fakes["bigquery"].tables["research_papers"]:
+            statuses = {status["field"]: status["status"] for status in row["field_status"]}
+            assert statuses["summary"] == statuses["keywords"] == "failed"
+            assert statuses["methodology"] == "extracted"
+            assert f"text-cache/{row['id']}.txt" in fakes["bucket"].files
+
+    def test_run_backfill_near_duplicates(self, fakes, files):
+        """Test a near duplicate of an earlier paper of the backfill reuses its fields, without requests."""
+        fakes["bucket"].files["papers/paper-0-revised.pdf"] = generate_paper(0, 3)
+        files = files + ["papers/paper-0-revised.pdf"]
+        client = FakeBatchJobClient()
+        get_near_duplicate_index.cache_clear()
+
+        try:
+            with patch.dict(os.environ, {"NEAR_DUPLICATE_THRESHOLD": "0.85"}), \
+                    patch("src.utils.batch_prediction.time.sleep"):
+                result = run_backfill(files, client=client)
+            index = get_near_duplicate_index(None)
+        finally:
+            get_near_duplicate_index.cache_clear()
+
+        assert result.processed == files
+        [job] = client.jobs.values()
+        assert len(job) == 9
+        rows = {row["id"]: row for row in fakes["bigquery"].tables["research_papers"]}
+        [duplicate] = [row for row in rows.values() if row["duplicate_of"]]
+        original = rows[duplicate["duplicate_of"]]
+        assert original["id"] == generate_file_hash(BytesIO(fakes["bucket"].files[files[0]]))
+        assert duplicate["summary"] == original["summary"]
+        assert len(index) == 3 and duplicate["id"] not in index
@@ -119,3 +119,28 @@ class TestSettings:
             assert any (
                 field in error_message for field in ['vertex_ai_llama_model', 'bigquery_dataset_id', 'google_storage_bucket_name']
             ), "Error should mention missing fields 'vertex_ai_llama_model', 'bigquery_dataset_id' and 'google_storage_bucket_name'"
+
+    def test_task_models_from_json(
+        self,
+        monkeypatch: pytest.MonkeyPatch
+    ):
+        """
+        Test the per-task model settings are parsed from a JSON environment variable.
+        """
+        monkeypatch.setenv('VERTEX_AI_LLAMA_MODEL', 'llama3.2-test')
+        monkeypatch.setenv('BIGQUERY_DATASET_ID', 'test_dataset')
+        monkeypatch.setenv('GOOGLE_STORAGE_BUCKET_NAME', 'test_bucket')
+        monkeypatch.setenv(
+            'VERTEX_AI_TASK_MODELS',
+            '{"metadata": {"model": "small", "max_tokens": 256, '
+            '"rules": [{"min_chars": 100000, "model": "long"}]}}'
+        )
+
+        settings = Settings()
+
+        metadata = settings.vertex_ai_task_models["metadata"]
+        assert metadata.model == "small"
+        assert metadata.max_tokens == 256
+        assert metadata.temperature is None
+        assert metadata.rules[0].min_chars == 100000
+        assert metadata.rules[0].model == "long"
@@ -1,7 +1,9 @@
 import os
 import logging
+import pytest
+from logging.handlers import QueueHandler
 from unittest.mock import patch, MagicMock
-from src.logger import get_logger
+from src.logger import configure_logging, flush_logging, get_logger, shutdown_logging
 
 
 class TestSetupLogger:
@@ -21,6 +23,15 @@ class TestSetupLogger:
         if "FUNCTION_NAME" in os.environ:
             del os.environ["FUNCTION_NAME"]
 
+    @pytest.fixture(autouse=True)
+    def restart_listener(self):
+        """
+        Stop the logging listener around each test, so that it is set up with the patched handlers.
+        """
+        shutdown_logging()
+        yield
+        shutdown_logging()
+
     def test_get_logger_local_logging(self):
         """
         Test get_logger function when FUNCTION_NAME is not set (local logging).
@@ -29,8 +40,8 @@ class TestSetupLogger:
             patch("src.logger.logging.StreamHandler") as mock_stream_handler:
 
             # Mock the file and stream handlers
-            mock_file_handler.return_value = MagicMock()
-            mock_stream_handler.return_value = MagicMock()
+            mock_file_handler.return_value = MagicMock(level=logging.NOTSET)
+            mock_stream_handler.return_value = MagicMock(level=logging.NOTSET)
 
             logger = get_logger("test_logger")
 
@@ -52,6 +63,7 @@ class TestSetupLogger:
 
             # Mock Google Cloud Logging Client
             mock_cloud_instance = MagicMock()
+            mock_cloud_instance.get_default_handler.return_value = MagicMock(level=logging.NOTSET)
             mock_cloud_client.return_value = mock_cloud_instance
 
             # Mock the file and stream handlers (should not be called in cloud env)
@@ -62,7 +74,7 @@ class TestSetupLogger:
 
             # Check that Google Cloud logging is configured
             mock_cloud_client.assert_called_once()
-            mock_cloud_instance.setup_logging.assert_called_once_with(log_level=logging.INFO)
+            mock_cloud_instance.get_default_handler.assert_called_once()
 
             # Check that no FileHandler or StreamHandler is added in cloud environment
             mock_file_handler.assert_not_called()
@@ -70,3 +82,60 @@ class TestSetupLogger:
 
             # Ensure propagation is disabled
             assert logger.propagate is False
+        del os.environ["FUNCTION_NAME"]
+
+    def test_get_logger_sets_up_logging_once(self):
+        """
+        Test that every logger shares one queue handler, and that the handlers are created once.
+        """
+        with patch("src.logger.logging.FileHandler") as mock_file_handler, \
+            patch("src.logger.logging.StreamHandler") as mock_stream_handler:
+            mock_file_handler.return_value = MagicMock(level=logging.NOTSET)
+            mock_stream_handler.return_value = MagicMock(level=logging.NOTSET)
+
+            first = get_logger("test_logger_first")
+            second = get_logger("test_logger_second")
+            get_logger("test_logger_first")
+
+            mock_file_handler.assert_called_once_with("app.log")
+            mock_stream_handler.assert_called_once()
+            assert first.handlers == second.handlers == [configure_logging()]
+            assert isinstance(first.handlers[0], QueueHandler)
+
+    def test_records_are_handled_by_the_listener(self):
+        """
+        Test that records are formatted lazily and written by the listener thread.
+        """
+        handler = MagicMock(level=logging.NOTSET)
+        with patch("src.logger._create_handlers", return_value=[handler]):
+            logger = get_logger("test_logger_lazy")
+            logger.info("Generated %s", "hash")
+            shutdown_logging()
+
+        record = handler.handle.call_args.args[0]
+        assert record.msg == "Generated %s"
+        assert record.getMessage() == "Generated hash"
+
+    def test_flush_logging_writes_queued_records(self):
+        """
+        Test that flush_logging writes the queued records and keeps the listener running.
+        """
+        handler = MagicMock(level=logging.NOTSET)
+        with patch("src.logger._create_handlers", return_value=[handler]):
+            logger = get_logger("test_logger_flush")
+            logger.info("Before flush")
+            flush_logging()
+
+            assert handler.handle.call_args.args[0].getMessage() == "Before flush"
+            handler.flush.assert_called()
+
+            logger.info("After flush")
+            shutdown_logging()
+
+        assert handler.handle.call_args.args[0].getMessage() == "After flush"
+
+    def test_flush_logging_without_listener(self):
+        """
+        Test that flush_logging does nothing before logging is configured.
+        """
+        flush_logging()
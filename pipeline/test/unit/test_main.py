@@ -1,8 +1,13 @@
+import json
+import logging
+from io import BytesIO
 from unittest.mock import MagicMock, patch
 from cloudevents.http import CloudEvent
+import flask
 import pytest
-from src.main import pipeline
-from typing import Generator
+from src.main import extract, get_extraction_pipeline, pipeline
+from test.benchmark.harness import BenchmarkConfig, fake_environment, generate_paper
+from typing import Any, Dict, Generator, List, Tuple
 
 @pytest.fixture
 def mock_cloud_event() -> Generator[CloudEvent, None, None]:
@@ -36,6 +41,56 @@ def test_pipeline_logs_event(
 
     mock_logging_info.assert_called_once_with(mock_cloud_event)
 
+@pytest.mark.parametrize("name", ["folder/Test.json", "text-cache/Test.pdf", "batch-prediction/1/Test.pdf"])
+@patch("src.main.PipelineBuilder")
+@patch("src.main.Settings")
+def test_pipeline_ignores_other_objects(
+    mock_settings: MagicMock,
+    mock_pipeline_builder: MagicMock,
+    mock_cloud_event: CloudEvent,
+    name: str
+) -> None:
+    """Test the pipeline function ignores the objects which are not papers."""
+    mock_settings.return_value.text_cache_prefix = "text-cache"
+    mock_settings.return_value.batch_prediction_prefix = "batch-prediction"
+    mock_cloud_event.data["name"] = name
+
+    pipeline(mock_cloud_event)
+
+    mock_pipeline_builder.assert_not_called()
+
+
+@patch("src.main.PipelineBuilder")
+@patch("src.main.Settings")
+def test_pipeline_processes_papers(
+    mock_settings: MagicMock,
+    mock_pipeline_builder: MagicMock,
+    mock_cloud_event: CloudEvent
+) -> None:
+    """Test the pipeline function runs the pipeline on a PDF file."""
+    mock_settings.return_value.text_cache_prefix = "text-cache"
+    mock_settings.return_value.batch_prediction_prefix = "batch-prediction"
+    mock_settings.return_value.graph_shared_executor = False
+    mock_cloud_event.data["name"] = "folder/Test.pdf"
+
+    pipeline(mock_cloud_event)
+
+    mock_pipeline_builder.return_value.return_value.invoke.assert_called_once_with({"state": {}})
+
+@patch("src.main.flush_logging")
+@patch("logging.info")
+def test_pipeline_flushes_logging(
+    mock_logging_info: MagicMock,
+    mock_flush_logging: MagicMock,
+    mock_cloud_event: CloudEvent
+) -> None:
+    """Test the pipeline function flushes the queued log records, even after an exception."""
+    mock_logging_info.side_effect = Exception("Mocked Exception")
+
+    pipeline(mock_cloud_event)
+
+    mock_flush_logging.assert_called_once()
+
 @patch("logging.exception")
 @patch("logging.info")
 def test_pipeline_logs_exception(
@@ -52,4 +107,74 @@ def test_pipeline_logs_exception(
 
     mock_logging_exception.assert_called_once()
     args, _ = mock_logging_exception.call_args
-    assert "Mocked Exception" in str(args[0])
\ No newline at end of file
+    assert "Mocked Exception" in str(args[0])
+
+class TestExtract:
+    @pytest.fixture(autouse=True)
+    def quiet_logging(self) -> Generator[None, None, None]:
+        logging.disable(logging.ERROR)
+        yield
+        logging.disable(logging.NOTSET)
+
+    @pytest.fixture
+    def fakes(self) -> Generator[Dict[str, object], None, None]:
+        """Fixture running against local stand-ins of Vertex AI and BigQuery, with a fresh pipeline."""
+        get_extraction_pipeline.cache_clear()
+        with fake_environment(BenchmarkConfig()) as fakes:
+            yield fakes
+        get_extraction_pipeline.cache_clear()
+
+    @staticmethod
+    def post(data: Any, query_string: str = "") -> Tuple[Any, List[Dict[str, Any]]]:
+        """Post a request to the extract function, and parse its JSON lines."""
+        with flask.Flask(__name__).test_request_context(
+            "/", method="POST", data=data, query_string=query_string
+        ):
+            response = extract(flask.request)
+            if isinstance(response, tuple):
+                return response, []
+            return response, [json.loads(line) for line in "".join(response.response).splitlines()]
+
+    def test_extract(self, fakes):
+        """Test the fields of each branch are streamed, then the merged fields, without storing them."""
+        response, lines = self.post(generate_paper(0, 2))
+
+        assert response.mimetype == "application/x-ndjson"
+        assert sorted(line["node"] for line in lines[:-1]) == [
+            "Extract Key Research Findings And Methodology", "Extract Metadata", "Extract Summary And Keywords"
+        ]
+        result = lines[-1]
+        assert result["fields"]["summary"] == "A synthetic paper used for benchmarking."
+        assert result["fields"]["methodology"] == "Synthetic workload generation."
+        assert {status["status"] for status in result["field_status"]} == {"extracted"}
+        assert result["stored"] is False
+        assert "research_papers" not in fakes["bigquery"].tables
+
+    def test_extract_and_store(self, fakes):
+        """Test the fields are inserted into BigQuery on request, once per paper."""
+        paper = generate_paper(0, 2)
+
+        _, first = self.post(paper, "store=true")
+        _, second = self.post(paper, "store=true")
+
+        assert first[-1]["stored"] is True
+        assert second[-1]["stored"] is False
+        assert [row["id"] for row in fakes["bigquery"].tables["research_papers"]] == [first[-1]["paper_id"]]
+
+    def test_extract_multipart(self, fakes):
+        """Test the file can be posted as a multipart form part."""
+        _, lines = self.post({"file": (BytesIO(generate_paper(0, 2)), "paper.pdf")})
+
+        assert lines[-1]["fields"]["summary"] == "A synthetic paper used for benchmarking."
+
+    def test_extract_without_file(self, fakes):
+        """Test a request without a file is rejected."""
+        (_, status), _ = self.post(b"")
+
+        assert status == 400
+
+    def test_extract_error(self, fakes):
+        """Test an invalid PDF file streams an error."""
+        _, lines = self.post(b"Not a PDF")
+
+        assert list(lines[-1]) == ["error"]
@@ -0,0 +1,118 @@
+import pytest
+from typing import Dict, Generator
+from unittest.mock import MagicMock, patch
+from src.repair import repair_paper, run_repair
+
+
+class TestRepair:
+    @pytest.fixture(autouse=True)
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        """Fixture to patch the logger."""
+        with patch("src.repair.logger") as mock_logger:
+            yield mock_logger
+
+    @pytest.fixture
+    def settings(self) -> MagicMock:
+        settings = MagicMock()
+        settings.keyword_extractor = "llm"
+        settings.keyword_count = 10
+        return settings
+
+    @pytest.fixture
+    def statuses(self) -> Dict[str, str]:
+        return {
+            "title": "extracted",
+            "authors": "extracted",
+            "abstract": "missing",
+            "summary": "failed",
+            "keywords": "extracted",
+            "methodology": "extracted",
+            "key_research_findings": "extracted"
+        }
+
+    @pytest.fixture
+    def mocks(self) -> Generator[Dict[str, MagicMock], None, None]:
+        """Fixture to patch the text cache, Vertex AI and BigQuery."""
+        with patch("src.repair.load_text", return_value="Paper text") as load_text, \
+                patch("src.repair.delete_text") as delete_text, \
+                patch("src.repair.vertex_ai_llama_request") as llm_request, \
+                patch("src.repair.update_research_paper_fields") as update:
+            yield {"load_text": load_text, "delete_text": delete_text, "llm_request": llm_request, "update": update}
+
+    def test_repair_paper(self, mocks, settings, statuses):
+        """Test only the failing task runs, and only the failed fields are updated."""
+        mocks["llm_request"].return_value = '{"summary": "A summary."}'
+
+        assert repair_paper("paper-1", statuses, settings) == []
+
+        mocks["llm_request"].assert_called_once()
+        (messages,), kwargs = mocks["llm_request"].call_args
+        assert kwargs["task"] == "summary_and_keywords"
+        assert kwargs["response_format"]["json_schema"]["schema"]["required"] == ["summary"]
+        paper_id, data, field_status = mocks["update"].call_args.args
+        assert paper_id == "paper-1"
+        assert data == {"summary": "A summary."}
+        assert field_status == [
+            {"field": field, "status": "extracted" if field == "summary" else status}
+            for field, status in statuses.items()
+        ]
+        mocks["delete_text"].assert_called_once_with("paper-1")
+
+    def test_repair_paper_targets_failed_metadata_fields(self, mocks, settings, statuses):
+        """Test the metadata request only asks for the failed metadata fields."""
+        statuses.update({"summary": "extracted", "authors": "failed", "keywords": "failed"})
+        mocks["llm_request"].side_effect = [
+            '{"authors": ["Alice Johnson"]}',
+            '{"summary": "Another summary.", "keywords": ["AI"]}'
+        ]
+
+        assert repair_paper("paper-1", statuses, settings) == []
+
+        schemas = [call.kwargs["response_format"]["json_schema"]["schema"] for call in mocks["llm_request"].call_args_list]
+        assert [schema["required"] for schema in schemas] == [["authors"], ["summary", "keywords"]]
+        # The summary was extracted already: it is not overwritten
+        assert mocks["update"].call_args.args[1] == {"authors": ["Alice Johnson"], "keywords": ["AI"]}
+
+    def test_repair_paper_still_failing(self, mocks, settings, statuses):
+        """Test the fields of a task failing again stay failed, and the text stays cached."""
+        mocks["llm_request"].side_effect = Exception("Mocked exception")
+
+        assert repair_paper("paper-1", statuses, settings) == ["summary"]
+
+        assert mocks["update"].call_args.args[1] == {}
+        assert mocks["update"].call_args.args[2] == [{"field": field, "status": status} for field, status in statuses.items()]
+        mocks["delete_text"].assert_not_called()
+
+    def test_repair_paper_local_keywords(self, mocks, settings, statuses):
+        """Test failed keywords are extracted locally with the local keyword extractor."""
+        settings.keyword_extractor = "local"
+        statuses.update({"summary": "extracted", "keywords": "failed"})
+
+        with patch("src.repair.extract_keywords", return_value=["Paper text"]):
+            assert repair_paper("paper-1", statuses, settings) == []
+
+        mocks["llm_request"].assert_not_called()
+        assert mocks["update"].call_args.args[1] == {"keywords": ["Paper text"]}
+
+    def test_repair_paper_text_not_cached(self, mocks, settings, statuses):
+        """Test a paper whose text is not cached is skipped."""
+        mocks["load_text"].return_value = None
+
+        assert repair_paper("paper-1", statuses, settings) is None
+
+        mocks["llm_request"].assert_not_called()
+        mocks["update"].assert_not_called()
+
+    @patch("src.repair.repair_paper")
+    @patch("src.repair.query_papers_with_failed_fields")
+    def test_run_repair(self, mock_query: MagicMock, mock_repair_paper: MagicMock, settings):
+        """Test the papers are reported by the outcome of their repair."""
+        mock_query.return_value = {paper_id: {} for paper_id in ["a", "b", "c", "d"]}
+        mock_repair_paper.side_effect = [[], ["summary"], None, Exception("Update failed")]
+
+        result = run_repair(limit=4, settings=settings)
+
+        mock_query.assert_called_once_with(4)
+        assert result.repaired == ["a"]
+        assert result.failed == ["b", "d"]
+        assert result.skipped == ["c"]
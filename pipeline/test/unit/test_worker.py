@@ -0,0 +1,116 @@
+import itertools
+import logging
+import os
+import threading
+import pytest
+from typing import Dict, Generator, List, Sequence
+from unittest.mock import patch
+from src.graph import PipelineBuilder
+from src.graph.payload_store import get_payload_store
+from src.utils.work_queue import SQLiteWorkQueue
+from src.worker import run_worker
+from test.benchmark.harness import BenchmarkConfig, fake_environment, generate_paper
+
+
+class RecordingQueue(SQLiteWorkQueue):
+    """SQLite work queue recording the sizes of the pulls and acknowledgements."""
+
+    def __init__(self):
+        super().__init__()
+        self.pulls: List[int] = []
+        self.pulled: List[int] = []
+        self.acks: List[int] = []
+        self.extends: List[int] = []
+
+    def pull(self, max_messages: int):
+        self.pulls.append(max_messages)
+        messages = super().pull(max_messages)
+        self.pulled.append(len(messages))
+        return messages
+
+    def ack(self, ack_ids: Sequence[str]) -> None:
+        self.acks.append(len(ack_ids))
+        super().ack(ack_ids)
+
+    def extend(self, ack_ids: Sequence[str], seconds: float) -> None:
+        self.extends.append(len(ack_ids))
+        super().extend(ack_ids, seconds)
+
+
+class TestWorker:
+    @pytest.fixture(autouse=True)
+    def quiet_logging(self) -> Generator[None, None, None]:
+        logging.disable(logging.ERROR)
+        yield
+        logging.disable(logging.NOTSET)
+
+    @pytest.fixture
+    def fakes(self) -> Generator[Dict[str, object], None, None]:
+        """Fixture running against local stand-ins of the storage bucket, Vertex AI and BigQuery."""
+        with fake_environment(BenchmarkConfig()) as fakes, \
+                patch.dict(os.environ, {"WORKER_CONCURRENCY": "2", "WORKER_PREFETCH": "4"}):
+            for index in range(6):
+                fakes["bucket"].files[f"papers/paper-{index}.pdf"] = generate_paper(index, 2)
+            yield fakes
+
+    @pytest.fixture
+    def queue(self) -> RecordingQueue:
+        queue = RecordingQueue()
+        queue.publish([f"papers/paper-{index}.pdf" for index in range(6)])
+        return queue
+
+    def test_run_worker(self, fakes, queue):
+        """Test the queued papers are processed with one compiled pipeline, and acknowledged in bulk."""
+        with patch("src.worker.PipelineBuilder", wraps=PipelineBuilder) as builder:
+            result = run_worker(queue, exit_when_empty=True)
+
+        builder.assert_called_once()
+        assert sorted(result.processed) == [f"papers/paper-{index}.pdf" for index in range(6)]
+        assert result.retried == result.failed == []
+        assert len(fakes["bigquery"].tables["research_papers"]) == 6
+        assert len(queue) == 0
+        assert queue.pulls[0] == 4
+        assert sum(queue.acks) == 6
+        # The lease of the prefetched messages is extended as soon as they are pulled
+        assert queue.extends[0] == 4
+        assert len(get_payload_store()) == 0
+
+    def test_run_worker_extends_leases(self, fakes, queue):
+        """Test the lease of the messages in flight is extended every half lease."""
+        with patch.dict(os.environ, {"WORKER_LEASE_SECONDS": "10"}), patch("src.worker.time") as mock_time:
+            # Half a lease passes between two iterations of the worker loop
+            mock_time.monotonic.side_effect = itertools.count(0, 5.0)
+            result = run_worker(queue, exit_when_empty=True)
+
+        assert len(result.processed) == 6
+        pulls = sum(1 for count in queue.pulled if count)
+        assert len(queue.extends) > pulls
+
+    def test_run_worker_max_messages(self, fakes, queue):
+        """Test the worker stops after pulling the given number of messages."""
+        result = run_worker(queue, max_messages=3)
+
+        assert len(result.processed) == 3
+        assert len(queue) == 3
+
+    def test_run_worker_stop(self, fakes, queue):
+        """Test a stopped worker pulls no more messages."""
+        stop = threading.Event()
+        stop.set()
+
+        result = run_worker(queue, stop=stop)
+
+        assert result.processed == []
+        assert queue.pulls == []
+
+    def test_run_worker_retries_failed_papers(self, fakes, queue):
+        """Test failed papers are delivered again, and given up after the maximum attempts."""
+        del fakes["bucket"].files["papers/paper-0.pdf"]
+
+        with patch.dict(os.environ, {"WORKER_MAX_ATTEMPTS": "2"}):
+            result = run_worker(queue, exit_when_empty=True)
+
+        assert result.retried == ["papers/paper-0.pdf"]
+        assert result.failed == ["papers/paper-0.pdf"]
+        assert len(result.processed) == 5
+        assert len(queue) == 0
@@ -0,0 +1,181 @@
+import json
+import pytest
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from requests.exceptions import HTTPError
+from src.utils.batch_prediction import (
+    BATCH_JOB_CLIENTS,
+    BatchPredictionError,
+    BatchRequest,
+    BatchResult,
+    VertexAIBatchJobClient,
+    get_batch_job_client,
+    parse_prediction,
+    register_batch_job_client,
+    run_batch_prediction
+)
+from test.benchmark.fakes import FakeBatchJobClient
+
+
+class TestBatchPrediction:
+    @pytest.fixture
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        with patch("src.utils.batch_prediction.logger") as mock_logger:
+            yield mock_logger
+
+    @pytest.fixture
+    def mock_sleep(self) -> Generator[MagicMock, None, None]:
+        with patch("src.utils.batch_prediction.time.sleep") as mock_sleep:
+            yield mock_sleep
+
+    @pytest.fixture
+    def settings(self) -> MagicMock:
+        settings = MagicMock()
+        settings.google_storage_bucket_name = "bucket"
+        settings.batch_prediction_bucket_name = "bucket"
+        settings.batch_prediction_prefix = "batch-prediction/"
+        settings.batch_prediction_poll_interval = 10.0
+        settings.batch_prediction_timeout = 3600.0
+        settings.vertex_ai_request_timeout = 30.0
+        settings.batch_job_client = "vertex_ai"
+        return settings
+
+    @pytest.fixture
+    def batch_requests(self) -> list:
+        return [
+            BatchRequest(key="paper/metadata", payload={"model": "small", "messages": [{"role": "user", "content": '"publication_date"'}]}),
+            BatchRequest(key="paper/summary", payload={"model": "large", "messages": [{"role": "user", "content": '"summary"'}]}),
+            BatchRequest(key="paper/findings", payload={"model": "large", "messages": [{"role": "user", "content": '"key_research_findings"'}]}),
+        ]
+
+    def test_parse_prediction(self):
+        """Test successful and failed prediction lines are parsed."""
+        assert parse_prediction({
+            "custom_id": "a",
+            "response": {"body": {"choices": [{"message": {"content": "{}"}}], "usage": {"prompt_tokens": 3}}}
+        }) == BatchResult(key="a", content="{}", usage={"prompt_tokens": 3})
+        assert parse_prediction({"custom_id": "b", "response": {"choices": [{"message": {"content": "x"}}]}}).content == "x"
+        assert parse_prediction({"custom_id": "c", "error": "quota"}) == BatchResult(key="c", error="quota")
+
+    def test_run_batch_prediction(self, batch_requests, settings, mock_logger, mock_sleep):
+        """Test one job is submitted per model, and polled until completion."""
+        client = FakeBatchJobClient(polls=3)
+
+        results = run_batch_prediction(batch_requests, client, settings)
+
+        assert sorted(client.models.values()) == ["large", "small"]
+        assert set(results) == {"paper/metadata", "paper/summary", "paper/findings"}
+        assert "publication_date" in json.loads(results["paper/metadata"].content)
+        assert mock_sleep.call_count == 2
+        mock_sleep.assert_called_with(10.0)
+
+    def test_run_batch_prediction_failed_job(self, batch_requests, settings, mock_logger, mock_sleep):
+        """Test failed jobs raise a BatchPredictionError."""
+        with pytest.raises(BatchPredictionError, match="JOB_STATE_FAILED"):
+            run_batch_prediction(batch_requests, FakeBatchJobClient(state="JOB_STATE_FAILED"), settings)
+
+    def test_run_batch_prediction_timeout(self, batch_requests, settings, mock_logger, mock_sleep):
+        """Test jobs not completed before the timeout raise a BatchPredictionError."""
+        settings.batch_prediction_timeout = 0.0
+
+        with pytest.raises(BatchPredictionError, match="did not complete in time"):
+            run_batch_prediction(batch_requests, FakeBatchJobClient(polls=10), settings)
+
+    def test_get_batch_job_client(self, settings):
+        """Test clients are built from the registry."""
+        assert isinstance(get_batch_job_client(settings), VertexAIBatchJobClient)
+
+        settings.batch_job_client = "fake"
+        with pytest.raises(BatchPredictionError, match="Unknown batch job client: fake"):
+            get_batch_job_client(settings)
+
+        with patch.dict(BATCH_JOB_CLIENTS):
+            register_batch_job_client("fake", lambda settings: FakeBatchJobClient())
+            assert isinstance(get_batch_job_client(settings), FakeBatchJobClient)
+
+
+class TestVertexAIBatchJobClient:
+    @pytest.fixture(autouse=True)
+    def mock_credentials(self) -> Generator[None, None, None]:
+        with patch("src.utils.batch_prediction.get_token", return_value="token"), \
+                patch("src.utils.batch_prediction.get_project_id", return_value="project"), \
+                patch("src.utils.batch_prediction.logger"):
+            yield
+
+    @pytest.fixture
+    def mock_bucket(self) -> Generator[MagicMock, None, None]:
+        with patch("src.utils.batch_prediction.get_storage_client") as mock_storage_client:
+            yield mock_storage_client.return_value.bucket.return_value
+
+    @pytest.fixture
+    def mock_request(self) -> Generator[MagicMock, None, None]:
+        with patch("src.utils.batch_prediction.requests.request") as mock_request:
+            yield mock_request
+
+    @pytest.fixture
+    def client(self) -> VertexAIBatchJobClient:
+        settings = MagicMock()
+        settings.google_storage_bucket_name = "trigger-bucket"
+        settings.batch_prediction_bucket_name = "bucket"
+        settings.batch_prediction_prefix = "batch-prediction/"
+        settings.vertex_ai_request_timeout = 30.0
+        return VertexAIBatchJobClient(settings)
+
+    def test_bucket_defaults_to_pipeline_bucket(self):
+        """Test the bucket of the pipeline is used, with a warning, without a batch prediction bucket."""
+        settings = MagicMock()
+        settings.google_storage_bucket_name = "trigger-bucket"
+        settings.batch_prediction_bucket_name = None
+        settings.batch_prediction_prefix = "batch-prediction"
+
+        with patch("src.utils.batch_prediction.logger") as mock_logger:
+            client = VertexAIBatchJobClient(settings)
+
+        assert client.bucket_name == "trigger-bucket"
+        mock_logger.warning.assert_called_once()
+
+    def test_submit(self, client, mock_bucket, mock_request):
+        """Test the requests are uploaded as JSONL and the job created for the publisher model."""
+        mock_request.return_value.json.return_value = {"name": "projects/project/locations/us-central1/batchPredictionJobs/1"}
+        payload = {"model": "meta/llama-3.1-405b-instruct-maas", "messages": []}
+
+        job = client.submit("meta/llama-3.1-405b-instruct-maas", [BatchRequest(key="a", payload=payload)])
+
+        assert job == "projects/project/locations/us-central1/batchPredictionJobs/1"
+        input_name = mock_bucket.blob.call_args.args[0]
+        assert input_name.startswith("batch-prediction/") and input_name.endswith("/input.jsonl")
+        lines = mock_bucket.blob.return_value.upload_from_string.call_args.args[0]
+        assert json.loads(lines) == {"custom_id": "a", "method": "POST", "url": "/v1/chat/completions", "body": payload}
+
+        method, url = mock_request.call_args.args
+        body = mock_request.call_args.kwargs["json"]
+        assert (method, url) == ("POST", "https://us-central1-aiplatform.googleapis.com/v1/projects/project/locations/us-central1/batchPredictionJobs")
+        assert body["model"] == "publishers/meta/models/llama-3.1-405b-instruct-maas"
+        assert body["inputConfig"]["gcsSource"]["uris"] == [f"gs://bucket/{input_name}"]
+        assert mock_request.call_args.kwargs["headers"]["Authorization"] == "Bearer token"
+
+    def test_state_and_results(self, client, mock_bucket, mock_request):
+        """Test the job state is polled and the prediction files read."""
+        mock_request.return_value.json.return_value = {
+            "state": "JOB_STATE_SUCCEEDED",
+            "outputInfo": {"gcsOutputDirectory": "gs://bucket/batch-prediction/1/output/prediction-1"}
+        }
+        predictions = MagicMock()
+        predictions.name = "batch-prediction/1/output/prediction-1/predictions.jsonl"
+        predictions.download_as_bytes.return_value = (
+            json.dumps({"custom_id": "a", "response": {"choices": [{"message": {"content": "{}"}}]}}) + "\n"
+        ).encode("utf-8")
+        other = MagicMock()
+        other.name = "batch-prediction/1/output/prediction-1/metadata.json"
+        mock_bucket.list_blobs.return_value = [predictions, other]
+
+        assert client.state("jobs/1") == "JOB_STATE_SUCCEEDED"
+        assert client.results("jobs/1") == [BatchResult(key="a", content="{}")]
+        mock_bucket.list_blobs.assert_called_once_with(prefix="batch-prediction/1/output/prediction-1")
+
+    def test_request_error(self, client, mock_request):
+        """Test HTTP errors raise a BatchPredictionError."""
+        mock_request.return_value.raise_for_status.side_effect = HTTPError("403 Forbidden")
+
+        with pytest.raises(BatchPredictionError, match="403 Forbidden"):
+            client.state("jobs/1")
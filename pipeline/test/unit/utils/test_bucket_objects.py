@@ -0,0 +1,28 @@
+import pytest
+from unittest.mock import MagicMock
+from src.utils.bucket_objects import is_paper_object
+
+
+class TestIsPaperObject:
+    """Unit tests for is_paper_object."""
+
+    @pytest.fixture
+    def settings(self) -> MagicMock:
+        settings = MagicMock()
+        settings.text_cache_prefix = "text-cache/"
+        settings.batch_prediction_prefix = "batch-prediction"
+        return settings
+
+    @pytest.mark.parametrize("name, expected", [
+        ("paper.pdf", True),
+        ("papers/Paper.PDF", True),
+        ("papers/paper.json", False),
+        ("text-cache/paper-1.txt", False),
+        ("text-cache/paper-1.pdf", False),
+        ("text-cache-papers/paper.pdf", True),
+        ("batch-prediction/1/input.jsonl", False),
+        ("batch-prediction/1/output/paper.pdf", False),
+    ])
+    def test_is_paper_object(self, settings: MagicMock, name: str, expected: bool):
+        """Test only the PDF files outside of the prefixes written by the pipeline are papers."""
+        assert is_paper_object(name, settings) is expected
@@ -0,0 +1,80 @@
+import pytest
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from pydantic import ValidationError
+from src.utils import clients
+from src.utils.clients import (
+    get_bigquery_client,
+    get_storage_client,
+    prewarm_clients,
+    prewarm_clients_if_enabled
+)
+
+
+class TestClients:
+    """
+    Test suite for the shared Google Cloud clients.
+    """
+
+    @pytest.fixture(autouse=True)
+    def clear_cache(self) -> Generator[None, None, None]:
+        """Fixture to clear the cached clients."""
+        get_bigquery_client.cache_clear()
+        get_storage_client.cache_clear()
+        yield
+        get_bigquery_client.cache_clear()
+        get_storage_client.cache_clear()
+
+    @pytest.fixture
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        """Fixture to patch the logger."""
+        with patch("src.utils.clients.logger") as mock_logger:
+            yield mock_logger
+
+    def test_clients_are_created_once(self, mock_logger: MagicMock):
+        """
+        Test that each client is created on first use and then reused.
+        """
+        with patch.object(clients.bigquery, "Client") as mock_bigquery_client, \
+                patch.object(clients.storage, "Client") as mock_storage_client:
+            assert get_bigquery_client() is get_bigquery_client()
+            assert get_storage_client() is get_storage_client()
+
+        mock_bigquery_client.assert_called_once_with()
+        mock_storage_client.assert_called_once_with()
+
+    def test_prewarm_clients(self, mock_logger: MagicMock):
+        """
+        Test that every pre-warming task runs, and that failures are only logged.
+        """
+        tasks = {"ok": MagicMock(), "failing": MagicMock(side_effect=RuntimeError("no credentials"))}
+        with patch.dict(clients.PREWARM_TASKS, tasks, clear=True):
+            for future in prewarm_clients():
+                future.result()
+
+        tasks["ok"].assert_called_once()
+        tasks["failing"].assert_called_once()
+        mock_logger.error.assert_called_once_with("Failed to pre-warm failing: no credentials")
+
+    @pytest.mark.parametrize("enabled", [True, False])
+    def test_prewarm_clients_if_enabled(self, mock_logger: MagicMock, enabled: bool):
+        """
+        Test that pre-warming only starts when enabled in the settings.
+        """
+        with patch("src.utils.clients.Settings") as mock_settings, \
+                patch("src.utils.clients.prewarm_clients") as mock_prewarm_clients:
+            mock_settings.return_value.prewarm_clients = enabled
+            prewarm_clients_if_enabled()
+
+        assert mock_prewarm_clients.called is enabled
+
+    def test_prewarm_clients_invalid_settings(self, mock_logger: MagicMock):
+        """
+        Test that invalid settings skip pre-warming without raising.
+        """
+        with patch("src.utils.clients.Settings") as mock_settings, \
+                patch("src.utils.clients.prewarm_clients") as mock_prewarm_clients:
+            mock_settings.side_effect = ValidationError.from_exception_data("Settings", [])
+            prewarm_clients_if_enabled()
+
+        mock_prewarm_clients.assert_not_called()
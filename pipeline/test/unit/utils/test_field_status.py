@@ -0,0 +1,42 @@
+from src.utils.field_status import collect_failed_fields, field_status, report_failed_fields
+
+
+class TestFieldStatus:
+    """
+    Test suite for the field status utilities.
+    """
+
+    def test_collect_failed_fields(self):
+        """
+        Test that the failed fields are collected once each, and only within the collector.
+        """
+        report_failed_fields(["title"])
+
+        with collect_failed_fields() as failed_fields:
+            report_failed_fields(["summary", "keywords"])
+            report_failed_fields(["summary"])
+
+        report_failed_fields(["abstract"])
+        assert failed_fields == ["summary", "keywords"]
+
+    def test_nested_collectors(self):
+        """
+        Test that a nested collector does not report to the outer one.
+        """
+        with collect_failed_fields() as outer:
+            with collect_failed_fields() as inner:
+                report_failed_fields(["summary"])
+            report_failed_fields(["title"])
+
+        assert inner == ["summary"]
+        assert outer == ["title"]
+
+    def test_field_status(self):
+        """
+        Test that failed fields are reported as such, and the others by their value.
+        """
+        assert field_status({"title": "Title", "abstract": None, "summary": None}, ["summary"]) == [
+            {"field": "title", "status": "extracted"},
+            {"field": "abstract", "status": "missing"},
+            {"field": "summary", "status": "failed"},
+        ]
@@ -48,8 +48,11 @@ class TestFileHash:
         assert isinstance(hash_value, str)
         assert len(hash_value) == 64  # SHA-256 hash length
         # Verify logging calls
-        mock_logger.info.assert_any_call(f"Generating hash for file: {file_input}")
-        mock_logger.info.assert_any_call(f"Hash generated: {hash_value}")
+        if isinstance(file_input, str):
+            mock_logger.info.assert_any_call("Generating hash for file: %s", file_input)
+        else:
+            mock_logger.info.assert_any_call("Generating hash for in-memory file of %d bytes", 20)
+        mock_logger.info.assert_any_call("Hash generated: %s", hash_value)
 
     def test_generate_file_hash_non_existent_file(
         self,
@@ -59,7 +62,7 @@ class TestFileHash:
         with pytest.raises(FileNotFoundError):
             generate_file_hash("non_existent_file.txt")
         # Verify logging call
-        mock_logger.info.assert_any_call("Generating hash for file: non_existent_file.txt")
+        mock_logger.info.assert_any_call("Generating hash for file: %s", "non_existent_file.txt")
 
     @pytest.mark.parametrize(
         "file_input",
@@ -83,8 +86,11 @@ class TestFileHash:
             assert isinstance(hash_value, str)
             assert len(hash_value) == 64  # SHA-256 hash length
             # Verify logging calls
-            mock_logger.info.assert_any_call(f"Generating hash for file: {file_input}")
-            mock_logger.info.assert_any_call(f"Hash generated: {hash_value}")
+            if isinstance(file_input, str):
+                mock_logger.info.assert_any_call("Generating hash for file: %s", file_input)
+            else:
+                mock_logger.info.assert_any_call("Generating hash for in-memory file of %d bytes", 0)
+            mock_logger.info.assert_any_call("Hash generated: %s", hash_value)
         finally:
             if isinstance(file_input, str) and os.path.exists(file_input):
                 os.remove(file_input)
@@ -102,7 +108,7 @@ class TestFileHash:
         with pytest.raises(OSError):
             generate_file_hash(self.test_file_path)
         # Verify logging call
-        mock_logger.info.assert_any_call(f"Generating hash for file: {self.test_file_path}")
+        mock_logger.info.assert_any_call("Generating hash for file: %s", self.test_file_path)
 
 
 class TestUniqueHash:
@@ -117,8 +123,8 @@ class TestUniqueHash:
         assert isinstance(hash_value, str)
         assert len(hash_value) == 64  # SHA-256 hash length
         # Verify logging calls
-        mock_logger.info.assert_any_call("Generating hash for string: Test string")
-        mock_logger.info.assert_any_call(f"Hash generated: {hash_value}")
+        mock_logger.info.assert_any_call("Generating hash for string: %s", "Test string")
+        mock_logger.info.assert_any_call("Hash generated: %s", hash_value)
 
     def test_generate_unique_hash_empty_string(
         self,
@@ -129,7 +135,7 @@ class TestUniqueHash:
             generate_unique_hash("")
         assert "Input string must not be empty" in str(excinfo.value)
         # Verify logging calls
-        mock_logger.info.assert_any_call("Generating hash for string: ")
+        mock_logger.info.assert_any_call("Generating hash for string: %s", "")
         mock_logger.error.assert_any_call("Input string must not be empty or only whitespace.")
 
     def test_generate_unique_hash_whitespace_string(
@@ -141,5 +147,5 @@ class TestUniqueHash:
             generate_unique_hash("   ")
         assert "Input string must not be empty" in str(excinfo.value)
         # Verify logging calls
-        mock_logger.info.assert_any_call("Generating hash for string:    ")
+        mock_logger.info.assert_any_call("Generating hash for string: %s", "   ")
         mock_logger.error.assert_any_call("Input string must not be empty or only whitespace.")
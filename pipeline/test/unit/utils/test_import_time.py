@@ -0,0 +1,57 @@
+from unittest.mock import patch
+from src.utils.import_time import (
+    format_report,
+    main,
+    parse_import_times,
+    total_import_time
+)
+
+IMPORT_TIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     json.decoder
+import time:       300 |        420 |   json
+import time:      2000 |       2000 |       langgraph.graph.state
+import time:      1000 |       3000 |     langgraph.graph
+import time:       500 |       3920 | src.main
+"""
+
+
+class TestImportTime:
+    """
+    Test suite for the import time report.
+    """
+
+    def test_parse_import_times(self):
+        """
+        Test that every module line is parsed, with its nesting depth.
+        """
+        timings = parse_import_times(IMPORT_TIME_OUTPUT)
+
+        assert [timing.module for timing in timings] == [
+            "json.decoder", "json", "langgraph.graph.state", "langgraph.graph", "src.main"
+        ]
+        assert timings[0].self_us == 120
+        assert [timing.depth for timing in timings] == [2, 1, 3, 2, 0]
+        assert total_import_time("src.main", timings) == 3.92
+
+    def test_format_report(self):
+        """
+        Test that packages and modules are ranked by self import time.
+        """
+        report = format_report("src.main", parse_import_times(IMPORT_TIME_OUTPUT), top=2)
+        lines = report.splitlines()
+
+        assert lines[0] == "Import time of src.main: 3.9 ms"
+        assert lines[3].split() == ["langgraph", "3.0"]
+        assert lines[4].split() == ["src", "0.5"]
+        assert lines[7].split() == ["langgraph.graph.state", "2.0", "2.0"]
+
+    def test_main_budget(self, capsys):
+        """
+        Test that exceeding the import time budget fails.
+        """
+        with patch("src.utils.import_time.measure_import_times", return_value=parse_import_times(IMPORT_TIME_OUTPUT)):
+            assert main(["src.main", "--budget-ms", "10"]) == 0
+            assert main(["src.main", "--budget-ms", "1"]) == 1
+
+        assert "Import time budget exceeded: 3.9 ms > 1.0 ms" in capsys.readouterr().out
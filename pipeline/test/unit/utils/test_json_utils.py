@@ -0,0 +1,110 @@
+import pytest
+from src.utils.json_utils import (
+    JSONObjectScanner,
+    JSONParseError,
+    extract_json_object,
+    json_schema_response_format,
+    repair_json
+)
+
+
+class TestJSONObjectScanner:
+    """Unit tests for JSONObjectScanner."""
+
+    def _scan(self, chunks: list) -> JSONObjectScanner:
+        scanner = JSONObjectScanner()
+        for chunk in chunks:
+            if scanner.feed(chunk):
+                break
+        return scanner
+
+    @pytest.mark.parametrize(
+        "chunks,expected",
+        [
+            (['{"a": 1}'], '{"a": 1}'),
+            (['{"a"', ': [1, ', '{"b": 2}]', '}'], '{"a": [1, {"b": 2}]}'),
+            (['```json\n', '{"a": "x"}', '\n```'], '{"a": "x"}'),
+            (['Here is the JSON: {"a": "}"}'], '{"a": "}"}'),
+            (['{"a": "say \\"{hi}\\""}'], '{"a": "say \\"{hi}\\""}'),
+            (['{"a": "back\\\\', '"} trailing prose'], '{"a": "back\\\\"}'),
+        ]
+    )
+    def test_complete_object(self, chunks: list, expected: str):
+        """Test the scanner detects the end of the top-level object across chunks."""
+        scanner = self._scan(chunks)
+        assert scanner.complete
+        assert scanner.value == expected
+
+    def test_incomplete_object(self):
+        """Test the scanner reports an incomplete object."""
+        scanner = self._scan(['No JSON yet, ', '{"a": [1, 2'])
+        assert not scanner.complete
+        assert scanner.value == '{"a": [1, 2'
+
+    def test_feed_after_complete(self):
+        """Test chunks fed after completion are ignored."""
+        scanner = JSONObjectScanner()
+        assert scanner.feed('{}')
+        assert scanner.feed('{"ignored": true}')
+        assert scanner.value == '{}'
+
+
+class TestRepairJSON:
+    """Unit tests for repair_json."""
+
+    @pytest.mark.parametrize(
+        "text,expected",
+        [
+            ('{"a": 1,}', '{"a": 1}'),
+            ('{"a": [1, 2, ],\n}', '{"a": [1, 2]}'),
+            ('{"a": "x", // The a field\n"b": None}', '{"a": "x", \n"b": null}'),
+            ('{"a": True, "b": False}', '{"a": true, "b": false}'),
+            ('{"a": "https://example.com"}', '{"a": "https://example.com"}'),
+            ('{"a": \u201cquoted\u201d}', '{"a": "quoted"}'),
+            ('{"a": ["x", "trunc', '{"a": ["x", "trunc"]}'),
+            ('{"a": {"b": 1', '{"a": {"b": 1}}'),
+            ('{"a": ', '{"a": null}'),
+            ('{"a": 1} trailing', '{"a": 1}'),
+        ]
+    )
+    def test_repair_json(self, text: str, expected: str):
+        """Test common LLM JSON defects are repaired."""
+        assert repair_json(text) == expected
+
+
+class TestExtractJSONObject:
+    """Unit tests for extract_json_object."""
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            '{"title": "T", "authors": ["A"]}',
+            '```json\n{"title": "T", "authors": ["A"]}\n```',
+            'Here is the extracted metadata:\n{"title": "T", "authors": ["A"]}\nLet me know!',
+            '{"title": "T", "authors": ["A",],}',
+            '{"title": "T", "authors": ["A"',
+        ]
+    )
+    def test_extract_json_object(self, text: str):
+        """Test a JSON object is extracted from decorated or defective responses."""
+        assert extract_json_object(text) == {"title": "T", "authors": ["A"]}
+
+    def test_extract_json_object_fields(self):
+        """Test the result is restricted to the expected fields."""
+        result = extract_json_object('{"title": "T", "extra": 1}', fields=["title", "abstract"])
+        assert result == {"title": "T", "abstract": None}
+
+    @pytest.mark.parametrize("text", ["No JSON here", "[1, 2]", '{"a": 1 "b"}'])
+    def test_extract_json_object_error(self, text: str):
+        """Test JSONParseError is raised when no JSON object can be extracted."""
+        with pytest.raises(JSONParseError):
+            extract_json_object(text)
+
+
+def test_json_schema_response_format():
+    """Test the OpenAI-compatible response_format payload."""
+    schema = {"type": "object"}
+    assert json_schema_response_format("test", schema) == {
+        "type": "json_schema",
+        "json_schema": {"name": "test", "schema": schema, "strict": True}
+    }
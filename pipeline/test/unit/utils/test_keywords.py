@@ -0,0 +1,62 @@
+import pytest
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from src.utils.keywords import candidate_phrases, extract_keywords, extract_keywords_batch
+
+TEXT = """Deep reinforcement learning for traffic signal control.
+We propose a deep reinforcement learning approach to traffic signal control in urban networks.
+The traffic signal controller learns from simulated intersections, and results show reduced
+travel time compared with fixed-time control."""
+
+
+class TestKeywords:
+    @pytest.fixture(autouse=True)
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        with patch("src.utils.keywords.logger") as mock_logger:
+            yield mock_logger
+
+    def test_candidate_phrases(self) -> None:
+        """Test phrases are split on stopwords and punctuation, keeping their last words."""
+        assert candidate_phrases("We propose graph neural networks, and a new fine-tuning method.") == [
+            ("graph", "neural", "networks"),
+            ("fine-tuning", "method")
+        ]
+        assert candidate_phrases("Scalable sparse graph neural networks") == [("graph", "neural", "networks")]
+
+    def test_extract_keywords(self) -> None:
+        keywords = extract_keywords(TEXT, top_n=3)
+
+        assert keywords[:2] == ["traffic signal control", "Deep reinforcement learning"]
+        assert len(keywords) == 3
+
+    def test_extract_keywords_skips_sub_phrases(self) -> None:
+        """Test phrases contained in a better ranked phrase are not returned."""
+        keywords = extract_keywords(TEXT, top_n=10)
+
+        assert "reinforcement learning" not in [keyword.lower() for keyword in keywords]
+
+    def test_extract_keywords_empty(self) -> None:
+        assert extract_keywords("", top_n=5) == []
+        assert extract_keywords("We and the of it.", top_n=5) == []
+
+    def test_extract_keywords_batch(self, mock_logger: MagicMock) -> None:
+        """Test phrases shared by every document of the batch rank below specific ones."""
+        texts = [
+            "Proceedings of Machine Learning Research. Graph neural networks for molecules. "
+            "Graph neural networks predict molecule properties.",
+            "Proceedings of Machine Learning Research. Traffic signal control. "
+            "Traffic signal control reduces travel time."
+        ]
+
+        keywords = extract_keywords_batch(texts, top_n=2)
+
+        assert keywords == [
+            ["Graph neural networks", "predict molecule properties"],
+            ["Traffic signal control", "reduces travel time"]
+        ]
+        assert "Machine Learning Research" in extract_keywords_batch(texts[:1], top_n=2)[0]
+        mock_logger.info.assert_any_call("Extracted keywords from %d documents", 2)
+
+    def test_extract_keywords_batch_matches_single(self) -> None:
+        """Test a batch of one document ranks the phrases like a single extraction."""
+        assert extract_keywords_batch([TEXT], top_n=5) == [extract_keywords(TEXT, top_n=5)]
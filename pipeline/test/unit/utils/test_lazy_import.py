@@ -0,0 +1,47 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+from src.utils.lazy_import import LazyModule, lazy_import
+
+
+class TestLazyImport:
+    """
+    Test suite for the lazy module imports.
+    """
+
+    def test_module_is_imported_on_first_use(self):
+        """
+        Test that the module is only imported when one of its attributes is used.
+        """
+        with patch("src.utils.lazy_import.importlib.import_module", return_value=sys.modules["json"]) as mock_import:
+            module = lazy_import("json")
+
+            assert isinstance(module, LazyModule)
+            assert "not loaded" in repr(module)
+            mock_import.assert_not_called()
+
+            assert module.dumps({"a": 1}) == '{"a": 1}'
+            assert module.loads("[]") == []
+            mock_import.assert_called_once_with("json")
+            assert "(loaded)" in repr(module)
+
+    def test_concurrent_first_use(self):
+        """
+        Test that concurrent first uses import the module once.
+        """
+        with patch("src.utils.lazy_import.importlib.import_module", return_value=sys.modules["json"]) as mock_import:
+            module = lazy_import("json")
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: module.dumps(1), range(32)))
+
+        assert results == ["1"] * 32
+        mock_import.assert_called_once_with("json")
+
+    def test_attributes_can_be_patched(self):
+        """
+        Test that module attributes can be patched through the proxy.
+        """
+        module = lazy_import("json")
+        with patch.object(module, "dumps", return_value="patched"):
+            assert module.dumps(1) == "patched"
+        assert module.dumps(1) == "1"
@@ -0,0 +1,121 @@
+import pytest
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from src.config import ModelRule, TaskModelSettings
+from src.utils.model_routing import ModelRoute, route_model, shared_input_budget
+
+
+class TestModelRouting:
+    @pytest.fixture
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        with patch("src.utils.model_routing.logger") as mock_logger:
+            yield mock_logger
+
+    @pytest.fixture
+    def settings(self) -> MagicMock:
+        settings = MagicMock()
+        settings.vertex_ai_llama_model = "default_model"
+        settings.vertex_ai_max_input_tokens = None
+        settings.vertex_ai_task_models = {
+            "metadata": TaskModelSettings(model="small_model", max_tokens=256, temperature=0.0),
+            "summary_and_keywords": TaskModelSettings(
+                temperature=0.2,
+                rules=[
+                    ModelRule(max_chars=1000, max_tokens=128),
+                    ModelRule(min_chars=50000, model="long_context_model", max_tokens=1024)
+                ]
+            )
+        }
+        return settings
+
+    def test_route_unconfigured_task(
+        self,
+        settings: MagicMock,
+        mock_logger: MagicMock
+    ) -> None:
+        """Test tasks without settings use the global model and default parameters."""
+        route = route_model(settings, "key_research_findings_and_methodology", 100)
+
+        assert route == ModelRoute(model="default_model")
+        assert route.generation_parameters() == {}
+        mock_logger.info.assert_not_called()
+
+    def test_route_without_task(
+        self,
+        settings: MagicMock,
+        mock_logger: MagicMock
+    ) -> None:
+        """Test requests without a task use the global model."""
+        assert route_model(settings, None, 100) == ModelRoute(model="default_model")
+
+    def test_route_task_model(
+        self,
+        settings: MagicMock,
+        mock_logger: MagicMock
+    ) -> None:
+        """Test a task is routed to its model and generation parameters."""
+        route = route_model(settings, "metadata", 100000)
+
+        assert route == ModelRoute(model="small_model", max_tokens=256, temperature=0.0)
+        assert route.generation_parameters() == {"max_tokens": 256, "temperature": 0.0}
+        mock_logger.info.assert_called_once_with(
+            "Routing task '%s' (%d characters) to model %s", "metadata", 100000, "small_model"
+        )
+
+    @pytest.mark.parametrize("text_length, expected", [
+        (500, ModelRoute(model="default_model", max_tokens=128, temperature=0.2)),
+        (1000, ModelRoute(model="default_model", temperature=0.2)),
+        (50000, ModelRoute(model="long_context_model", max_tokens=1024, temperature=0.2)),
+    ])
+    def test_route_length_rules(
+        self,
+        settings: MagicMock,
+        mock_logger: MagicMock,
+        text_length: int,
+        expected: ModelRoute
+    ) -> None:
+        """Test the first rule matching the text length overrides the task parameters."""
+        assert route_model(settings, "summary_and_keywords", text_length) == expected
+
+    def test_route_input_token_budget(
+        self,
+        settings: MagicMock,
+        mock_logger: MagicMock
+    ) -> None:
+        """Test the global input token budget is overridden by the task and rule budgets."""
+        settings.vertex_ai_max_input_tokens = 100000
+        settings.vertex_ai_task_models["metadata"].max_input_tokens = 4000
+        settings.vertex_ai_task_models["summary_and_keywords"].rules[1].max_input_tokens = 120000
+
+        assert route_model(settings, "key_research_findings_and_methodology", 100).max_input_tokens == 100000
+        assert route_model(settings, "metadata", 100).max_input_tokens == 4000
+        assert route_model(settings, "summary_and_keywords", 60000).max_input_tokens == 120000
+
+    def test_shared_input_budget(
+        self,
+        settings: MagicMock,
+        mock_logger: MagicMock
+    ) -> None:
+        """Test extraction tasks routed to the same model share the smallest input token budget."""
+        settings.vertex_ai_max_input_tokens = 100000
+        settings.vertex_ai_task_models = {"metadata": TaskModelSettings(max_input_tokens=4000)}
+
+        for task in ("metadata", "summary_and_keywords", "key_research_findings_and_methodology"):
+            route = route_model(settings, task, 100)
+            assert shared_input_budget(settings, task, route, 100) == 4000
+        route = route_model(settings, "other_task", 100)
+        assert shared_input_budget(settings, "other_task", route, 100) == 100000
+
+    def test_shared_input_budget_task_models(
+        self,
+        settings: MagicMock,
+        mock_logger: MagicMock
+    ) -> None:
+        """Test extraction tasks routed to different models keep their own input token budget."""
+        settings.vertex_ai_max_input_tokens = 100000
+        settings.vertex_ai_task_models["metadata"].max_input_tokens = 4000
+
+        route = route_model(settings, "key_research_findings_and_methodology", 100)
+        assert shared_input_budget(settings, "key_research_findings_and_methodology", route, 100) == 100000
+        route = route_model(settings, "metadata", 100)
+        assert shared_input_budget(settings, "metadata", route, 100) == 4000
@@ -0,0 +1,126 @@
+import json
+import pytest
+from src.utils.near_duplicates import (
+    NUM_PERM,
+    NearDuplicateIndex,
+    NearDuplicateIndexError,
+    minhash_signature,
+    minhash_signatures,
+    signature_similarity
+)
+
+TEXT = " ".join(
+    f"Sentence {index} of the paper studies the throughput of document extraction pipelines under load."
+    for index in range(30)
+)
+REVISED_TEXT = TEXT.replace("Sentence 7 of", "Sentence seven of")
+OTHER_TEXT = " ".join(
+    f"Paragraph {index} reports a randomised trial of a new treatment for chronic migraine in adults."
+    for index in range(30)
+)
+
+
+class TestMinHash:
+    """
+    Test suite for the MinHash signatures.
+    """
+
+    def test_signature_is_deterministic(self):
+        """
+        Test that a signature has NUM_PERM values, and is the same for the same text and case.
+        """
+        signature = minhash_signature(TEXT)
+
+        assert len(signature) == NUM_PERM
+        assert minhash_signature(TEXT.upper()) == signature
+        assert minhash_signatures([TEXT, OTHER_TEXT]) == [signature, minhash_signature(OTHER_TEXT)]
+
+    def test_similarity(self):
+        """
+        Test that near-duplicate texts are estimated similar, and unrelated texts are not.
+        """
+        signature = minhash_signature(TEXT)
+
+        assert signature_similarity(signature, minhash_signature(REVISED_TEXT)) > 0.8
+        assert signature_similarity(signature, minhash_signature(OTHER_TEXT)) < 0.2
+
+    def test_short_text(self):
+        """
+        Test that texts shorter than a shingle still have a full signature.
+        """
+        signature = minhash_signature("Hello")
+
+        assert len(signature) == NUM_PERM
+        assert signature_similarity(signature, minhash_signature("hello")) == 1.0
+
+    def test_similarity_length_mismatch(self):
+        """
+        Test that signatures of different lengths cannot be compared.
+        """
+        with pytest.raises(NearDuplicateIndexError):
+            signature_similarity(minhash_signature(TEXT), minhash_signature(TEXT, num_perm=64))
+
+
+class TestNearDuplicateIndex:
+    """
+    Test suite for the near-duplicate index.
+    """
+
+    def test_query(self):
+        """
+        Test that the most similar paper above the threshold is returned, with its record.
+        """
+        index = NearDuplicateIndex()
+        index.add("paper-1", minhash_signature(TEXT), {"title": "Title"})
+        index.add("paper-2", minhash_signature(OTHER_TEXT), {"title": "Other"})
+
+        duplicate = index.query(minhash_signature(REVISED_TEXT), threshold=0.8)
+
+        assert duplicate.paper_id == "paper-1"
+        assert duplicate.record == {"title": "Title"}
+        assert duplicate.similarity > 0.8
+        assert index.query(minhash_signature(REVISED_TEXT), threshold=1.0) is None
+
+    def test_replace_entry(self):
+        """
+        Test that adding a paper again replaces its signature and record.
+        """
+        index = NearDuplicateIndex()
+        index.add("paper-1", minhash_signature(TEXT), {"title": "Title"})
+        index.add("paper-1", minhash_signature(OTHER_TEXT), {"title": "Other"})
+
+        assert len(index) == 1
+        assert index.query(minhash_signature(TEXT), threshold=0.5) is None
+        assert index.query(minhash_signature(OTHER_TEXT), threshold=0.5).record == {"title": "Other"}
+
+    def test_persistence(self, tmp_path):
+        """
+        Test that the entries are appended to the index file, and loaded by a new index.
+        """
+        path = str(tmp_path / "index.jsonl")
+        index = NearDuplicateIndex(path)
+        index.add("paper-1", minhash_signature(TEXT), {"title": "Title"})
+
+        with open(path) as file:
+            assert json.loads(file.readline())["paper_id"] == "paper-1"
+
+        reloaded = NearDuplicateIndex(path)
+        assert "paper-1" in reloaded
+        assert reloaded.query(minhash_signature(TEXT), threshold=1.0).record == {"title": "Title"}
+
+    def test_invalid_file(self, tmp_path):
+        """
+        Test that an invalid index file raises NearDuplicateIndexError.
+        """
+        path = tmp_path / "index.jsonl"
+        path.write_text("not json\n")
+
+        with pytest.raises(NearDuplicateIndexError, match="Failed to load"):
+            NearDuplicateIndex(str(path))
+
+    def test_invalid_bands(self):
+        """
+        Test that the number of bands must divide the signature length.
+        """
+        with pytest.raises(NearDuplicateIndexError, match="must divide"):
+            NearDuplicateIndex(bands=7)
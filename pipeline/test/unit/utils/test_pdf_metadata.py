@@ -0,0 +1,108 @@
+import pytest
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from src.utils.pdf_metadata import (
+    extract_abstract,
+    extract_authors,
+    extract_metadata_from_pdf,
+    extract_publication_date,
+    extract_title,
+    parse_pdf_date
+)
+
+FIRST_PAGE = """Advancements in Machine
+Learning
+Alice Johnson, Bob Smith
+University of Somewhere, August 2022
+Abstract—This study explores recent advancements in machine learning techniques,
+focusing on the trade-offs between model size, latency and accuracy in production.
+Keywords: machine learning, latency
+1 Introduction
+Machine learning is everywhere."""
+
+
+class TestPDFMetadata:
+    @pytest.fixture
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        with patch("src.utils.pdf_metadata.logger") as mock_logger:
+            yield mock_logger
+
+    @pytest.mark.parametrize("value, expected", [
+        ("D:20220830120000+01'00'", "2022-08-30"),
+        ("20220830", "2022-08-30"),
+        ("D:20221330", None),
+        ("August 2022", None),
+        ("", None),
+    ])
+    def test_parse_pdf_date(self, value: str, expected: str) -> None:
+        assert parse_pdf_date(value) == expected
+
+    @pytest.mark.parametrize("title, expected", [
+        ("Advancements in Machine Learning", "Advancements in Machine Learning"),
+        ("advancements  in machine learning", "advancements in machine learning"),
+        ("paper.pdf", None),
+        ("Microsoft Word - Advancements in Machine Learning", None),
+        ("Short", None),
+        ("A Title Not Printed On The Page", None),
+    ])
+    def test_extract_title(self, title: str, expected: str) -> None:
+        """Test the document info title is only kept when printed on the first page."""
+        assert extract_title({"Title": title}, FIRST_PAGE) == expected
+
+    @pytest.mark.parametrize("author, expected", [
+        ("Alice Johnson, Bob Smith", ["Alice Johnson", "Bob Smith"]),
+        ("Alice Johnson and Bob Smith", ["Alice Johnson", "Bob Smith"]),
+        ("Alice Johnson; Carol White", None),
+        ("Johnson, A.", None),
+        ("", None),
+    ])
+    def test_extract_authors(self, author: str, expected: list) -> None:
+        """Test the document info authors are only kept when all are printed on the first page."""
+        assert extract_authors({"Author": author}, FIRST_PAGE) == expected
+
+    def test_extract_publication_date(self) -> None:
+        """Test the creation date is only kept when its year is printed on the first page."""
+        assert extract_publication_date({"CreationDate": "D:20220830"}, FIRST_PAGE) == "2022-08-30"
+        assert extract_publication_date({"CreationDate": "D:20240101"}, FIRST_PAGE) is None
+        assert extract_publication_date({}, FIRST_PAGE) is None
+
+    def test_extract_abstract(self) -> None:
+        assert extract_abstract(FIRST_PAGE) == (
+            "This study explores recent advancements in machine learning techniques, "
+            "focusing on the trade-offs between model size, latency and accuracy in production."
+        )
+
+    @pytest.mark.parametrize("first_page", [
+        "Title\nAbstract\nThis abstract continues on the next page " + "and on " * 20,
+        "Title\nAbstract\nToo short.\n1 Introduction\n",
+        "Title\nNo abstract heading here.\n1 Introduction\n",
+    ])
+    def test_extract_abstract_not_confident(self, first_page: str) -> None:
+        """Test abstracts without a closing heading, too short or missing are not returned."""
+        assert extract_abstract(first_page) is None
+
+    def test_extract_metadata_from_pdf(self, mock_logger: MagicMock) -> None:
+        document_info = {
+            "Title": "Advancements in Machine Learning",
+            "Author": "Alice Johnson, Bob Smith",
+            "CreationDate": "D:20220830120000Z"
+        }
+
+        metadata = extract_metadata_from_pdf(document_info, FIRST_PAGE)
+
+        assert metadata["title"] == "Advancements in Machine Learning"
+        assert metadata["authors"] == ["Alice Johnson", "Bob Smith"]
+        assert metadata["publication_date"] == "2022-08-30"
+        assert metadata["abstract"].startswith("This study explores")
+        mock_logger.info.assert_called_once_with(
+            "Metadata fields extracted from the PDF: %s",
+            ["title", "authors", "publication_date", "abstract"]
+        )
+
+    def test_extract_metadata_from_pdf_without_input(self, mock_logger: MagicMock) -> None:
+        assert extract_metadata_from_pdf(None, None) == {
+            "title": None,
+            "authors": None,
+            "publication_date": None,
+            "abstract": None
+        }
@@ -1,7 +1,7 @@
 import pytest
 from io import BytesIO
 from unittest.mock import MagicMock, patch
-from src.utils.pdf_utils import extract_text_from_pdf, PDFExtractionError
+from src.utils.pdf_utils import extract_pdf_content, PDFContent, PDFExtractionError
 from typing import Generator
 from unittest.mock import Mock
 
@@ -45,7 +45,7 @@ class TestPDFUtils:
         with patch('pdfplumber.open') as mock_pdfplumber_open:
             yield mock_pdfplumber_open
 
-    def test_extract_text_from_pdf(
+    def test_extract_pdf_content_bytesio(
         self,
         mock_pdf_with_pages: MagicMock,
         mock_pdfplumber_open: Generator[Mock, None, None],
@@ -53,61 +53,111 @@ class TestPDFUtils:
     ):
         mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf_with_pages
 
-        pdf_path = "dummy_path.pdf"
-        result = extract_text_from_pdf(pdf_path)
+        # Creating a BytesIO object
+        pdf_bytes = BytesIO(b"%PDF-1.4 dummy pdf content")
+
+        result = extract_pdf_content(pdf_bytes)
 
-        assert result == "Page 1 text.Page 2 text."
+        assert result.text == "Page 1 text.Page 2 text."
         # Verify logging calls
         mock_logger.info.assert_any_call("Extracting text from PDF")
         mock_logger.info.assert_any_call("Text extracted from PDF")
 
-    def test_extract_text_from_pdf_empty(
+    def test_extract_pdf_content(
+        self,
+        mock_pdf_with_pages: MagicMock,
+        mock_pdfplumber_open: Generator[Mock, None, None],
+        mock_logger: Generator[MagicMock, None, None]
+    ):
+        mock_pdf_with_pages.metadata = {
+            "Title": "  Advancements in Machine Learning ",
+            "Author": b"Alice Johnson",
+            "CreationDate": "D:20220830120000Z",
+            "Producer": "pdfTeX",
+            "Subject": ""
+        }
+        mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf_with_pages
+
+        result = extract_pdf_content("dummy_path.pdf")
+
+        assert result == PDFContent(
+            text="Page 1 text.Page 2 text.",
+            page_lengths=[len("Page 1 text."), len("Page 2 text.")],
+            document_info={
+                "Title": "Advancements in Machine Learning",
+                "Author": "Alice Johnson",
+                "CreationDate": "D:20220830120000Z"
+            }
+        )
+        assert result.pages() == ["Page 1 text.", "Page 2 text."]
+        mock_logger.info.assert_any_call("Text extracted from PDF")
+
+    def test_extract_pdf_content_empty(
         self,
         mock_pdf_empty: MagicMock,
         mock_pdfplumber_open: Generator[Mock, None, None],
         mock_logger: Generator[MagicMock, None, None]
     ):
+        mock_pdf_empty.metadata = {}
         mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf_empty
 
-        pdf_path = "dummy_path.pdf"
-        result = extract_text_from_pdf(pdf_path)
-
-        assert result == ""
-        # Verify logging calls
-        mock_logger.info.assert_any_call("Extracting text from PDF")
-        mock_logger.info.assert_any_call("Text extracted from PDF")
+        assert extract_pdf_content("dummy_path.pdf") == PDFContent(text="")
 
-    def test_extract_text_from_pdf_error(
+    def test_extract_pdf_content_error(
         self,
         mock_pdfplumber_open: Generator[Mock, None, None],
         mock_logger: Generator[MagicMock, None, None]
     ):
-        # Mocking pdfplumber to raise an exception
         mock_pdfplumber_open.side_effect = Exception("File not found")
 
-        # Running the test and expecting a custom exception
-        pdf_path = "non_existent.pdf"
         with pytest.raises(PDFExtractionError, match="Failed to extract text from PDF: File not found"):
-            extract_text_from_pdf(pdf_path)
+            extract_pdf_content("non_existent.pdf")
 
-        # Verify logging calls
-        mock_logger.info.assert_any_call("Extracting text from PDF")
-        mock_logger.error.assert_any_call("Failed to extract text from PDF: File not found")
+    def test_extract_pdf_content_head(
+        self,
+        mock_pdf_with_pages: MagicMock,
+        mock_pdfplumber_open: Generator[Mock, None, None],
+        mock_logger: Generator[MagicMock, None, None]
+    ):
+        """Test the head content is handed over once its pages are parsed, before the next ones."""
+        mock_pdf_with_pages.metadata = {"Title": "Title"}
+        mock_pdf_with_pages.pages[1].extract_text.side_effect = lambda: heads.append("parsed") or "Page 2 text."
+        mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf_with_pages
+        heads = []
+
+        result = extract_pdf_content("dummy_path.pdf", head_pages=1, on_head=heads.append)
 
-    def test_extract_text_from_pdf_bytesio(
+        assert heads == [PDFContent(text="Page 1 text.", page_lengths=[12], document_info={"Title": "Title"}), "parsed"]
+        assert result.text == "Page 1 text.Page 2 text."
+
+    def test_extract_pdf_content_head_short_document(
         self,
         mock_pdf_with_pages: MagicMock,
         mock_pdfplumber_open: Generator[Mock, None, None],
         mock_logger: Generator[MagicMock, None, None]
     ):
+        """Test the head content of a document shorter than the head is its whole content."""
+        mock_pdf_with_pages.metadata = {}
         mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf_with_pages
+        heads = []
 
-        # Creating a BytesIO object
-        pdf_bytes = BytesIO(b"%PDF-1.4 dummy pdf content")
+        result = extract_pdf_content("dummy_path.pdf", head_pages=5, on_head=heads.append)
 
-        result = extract_text_from_pdf(pdf_bytes)
+        assert heads == [result]
 
-        assert result == "Page 1 text.Page 2 text."
-        # Verify logging calls
-        mock_logger.info.assert_any_call("Extracting text from PDF")
-        mock_logger.info.assert_any_call("Text extracted from PDF")
+    def test_extract_pdf_content_cancelled(
+        self,
+        mock_pdf_with_pages: MagicMock,
+        mock_pdfplumber_open: Generator[Mock, None, None],
+        mock_logger: Generator[MagicMock, None, None]
+    ):
+        """Test the remaining pages are not parsed once the extraction is cancelled."""
+        mock_pdf_with_pages.metadata = {}
+        mock_pdfplumber_open.return_value.__enter__.return_value = mock_pdf_with_pages
+        checks = iter([False, True])
+
+        result = extract_pdf_content("dummy_path.pdf", cancelled=lambda: next(checks))
+
+        assert result.text == "Page 1 text."
+        mock_pdf_with_pages.pages[1].extract_text.assert_not_called()
+        mock_logger.info.assert_any_call("PDF extraction cancelled after 1 pages")
@@ -0,0 +1,228 @@
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from src.utils.retry import (
+    HedgeExecutor,
+    LatencyTracker,
+    RetryableError,
+    RetryPolicy,
+    call_with_retry,
+    hedged_call,
+    parse_retry_after
+)
+
+
+@pytest.fixture
+def mock_logger() -> Generator[MagicMock, None, None]:
+    """Fixture to patch the logger."""
+    with patch("src.utils.retry.logger") as mock_logger:
+        yield mock_logger
+
+
+class TestRetryPolicy:
+    """Unit tests for RetryPolicy backoff computation."""
+
+    @pytest.mark.parametrize("attempt", [0, 1, 2, 5, 10])
+    def test_backoff_is_bounded(self, attempt: int):
+        """Test the jittered backoff never exceeds the exponential bound nor the maximum."""
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=8.0)
+        for _ in range(50):
+            delay = policy.backoff(attempt)
+            assert 0 <= delay <= min(8.0, 2 ** attempt)
+
+    def test_backoff_honours_retry_after(self):
+        """Test Retry-After is a lower bound, not capped at the maximum backoff."""
+        policy = RetryPolicy(backoff_base=0.0, backoff_max=10.0)
+        assert policy.backoff(0, retry_after=4.0) == 4.0
+        assert policy.backoff(0, retry_after=60.0) == 60.0
+
+
+class TestParseRetryAfter:
+    """Unit tests for parse_retry_after."""
+
+    @pytest.mark.parametrize(
+        "value,expected",
+        [
+            ("5", 5.0),
+            ("0.5", 0.5),
+            (None, None),
+            ("", None),
+            ("not a date", None),
+        ]
+    )
+    def test_parse_retry_after(self, value, expected):
+        """Test parsing delay-seconds and invalid values."""
+        assert parse_retry_after(value) == expected
+
+    def test_parse_retry_after_http_date(self):
+        """Test parsing an HTTP-date value."""
+        value = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+        assert 25 <= parse_retry_after(value) <= 30
+
+
+class TestLatencyTracker:
+    """Unit tests for LatencyTracker."""
+
+    def test_percentile(self):
+        """Test percentiles over the recorded window."""
+        tracker = LatencyTracker(window=100)
+        assert tracker.percentile(95) is None
+        for latency in range(1, 101):
+            tracker.record(float(latency))
+        assert len(tracker) == 100
+        assert tracker.percentile(50) == 51.0
+        assert tracker.percentile(95) == 95.0
+
+    def test_window(self):
+        """Test old latencies are evicted from the window."""
+        tracker = LatencyTracker(window=3)
+        for latency in [100.0, 1.0, 2.0, 3.0]:
+            tracker.record(latency)
+        assert len(tracker) == 3
+        assert tracker.percentile(100) == 3.0
+
+
+class TestCallWithRetry:
+    """Unit tests for call_with_retry."""
+
+    def test_retries_until_success(self, mock_logger: MagicMock):
+        """Test retryable errors are retried with backoff."""
+        call = MagicMock(side_effect=[RetryableError("boom"), RetryableError("boom", retry_after=2.0), "ok"])
+        sleep = MagicMock()
+
+        result = call_with_retry(call, RetryPolicy(max_retries=3, backoff_base=0.0), sleep=sleep)
+
+        assert result == "ok"
+        assert call.call_count == 3
+        assert sleep.call_args_list[-1].args[0] == 2.0
+
+    def test_raises_when_exhausted(self, mock_logger: MagicMock):
+        """Test the last retryable error is raised once retries are exhausted."""
+        call = MagicMock(side_effect=RetryableError("boom"))
+
+        with pytest.raises(RetryableError, match="boom"):
+            call_with_retry(call, RetryPolicy(max_retries=2, backoff_base=0.0), sleep=MagicMock())
+
+        assert call.call_count == 3
+
+    def test_long_retry_after_is_not_retried(self, mock_logger: MagicMock):
+        """Test a Retry-After longer than the maximum backoff stops the retries."""
+        call = MagicMock(side_effect=RetryableError("boom", retry_after=60.0))
+        sleep = MagicMock()
+
+        with pytest.raises(RetryableError, match="boom"):
+            call_with_retry(call, RetryPolicy(max_retries=3, backoff_max=10.0), sleep=sleep)
+
+        assert call.call_count == 1
+        sleep.assert_not_called()
+        mock_logger.warning.assert_called_once()
+
+    def test_non_retryable_errors_are_raised(self, mock_logger: MagicMock):
+        """Test other exceptions are not retried."""
+        call = MagicMock(side_effect=ValueError("bad request"))
+
+        with pytest.raises(ValueError):
+            call_with_retry(call, RetryPolicy(max_retries=2), sleep=MagicMock())
+
+        call.assert_called_once()
+
+    def test_records_latencies(self, mock_logger: MagicMock):
+        """Test successful attempts are recorded in the latency tracker."""
+        tracker = LatencyTracker()
+        call_with_retry(lambda: "ok", RetryPolicy(), latency_tracker=tracker)
+        assert len(tracker) == 1
+
+    def test_hedges_after_percentile(self, mock_logger: MagicMock):
+        """Test a duplicate call is sent once enough latencies have been observed."""
+        tracker = LatencyTracker()
+        for _ in range(5):
+            tracker.record(0.01)
+
+        with patch("src.utils.retry.hedged_call", return_value="hedged") as mock_hedged_call:
+            result = call_with_retry(
+                lambda: "ok",
+                RetryPolicy(hedge_percentile=95, hedge_min_samples=5),
+                latency_tracker=tracker
+            )
+
+        assert result == "hedged"
+        assert mock_hedged_call.call_args.args[1] == 0.01
+
+
+class TestHedgedCall:
+    """Unit tests for hedged_call."""
+
+    def test_fast_call_is_not_hedged(self, mock_logger: MagicMock):
+        """Test a call completing before the threshold is executed once."""
+        call = MagicMock(return_value="ok")
+        assert hedged_call(call, hedge_after=1.0) == "ok"
+        call.assert_called_once()
+
+    def test_slow_call_is_hedged(self, mock_logger: MagicMock):
+        """Test the hedged duplicate wins when the primary call is slow."""
+        calls = []
+
+        def call():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.5)
+                return "slow"
+            return "fast"
+
+        assert hedged_call(call, hedge_after=0.05) == "fast"
+        assert len(calls) == 2
+
+    def test_hedged_call_errors(self, mock_logger: MagicMock):
+        """Test the error is raised when every call fails."""
+        def call():
+            time.sleep(0.05)
+            raise RetryableError("boom")
+
+        with pytest.raises(RetryableError):
+            hedged_call(call, hedge_after=0.01)
+
+    def test_losing_call_is_discarded(self, mock_logger: MagicMock):
+        """Test the result of the call that lost the race is handed to on_discard once it completes."""
+        calls = []
+        discarded = threading.Event()
+        results = []
+
+        def call():
+            calls.append(None)
+            if len(calls) == 1:
+                time.sleep(0.2)
+                return "slow"
+            return "fast"
+
+        def on_discard(result):
+            results.append(result)
+            discarded.set()
+
+        assert hedged_call(call, hedge_after=0.05, executor=HedgeExecutor(2), on_discard=on_discard) == "fast"
+        assert discarded.wait(1.0)
+        assert results == ["slow"]
+
+    def test_hedge_requires_a_free_worker(self, mock_logger: MagicMock):
+        """Test no duplicate is sent while every worker of the executor is busy."""
+        call = MagicMock(side_effect=lambda: time.sleep(0.1) or "slow")
+
+        assert hedged_call(call, hedge_after=0.01, executor=HedgeExecutor(1)) == "slow"
+        call.assert_called_once()
+
+    def test_saturated_executor_runs_inline(self, mock_logger: MagicMock):
+        """Test the call runs in the calling thread, unhedged, when no worker is free."""
+        executor = HedgeExecutor(1)
+        release = threading.Event()
+        executor.try_submit(release.wait)
+        caller = threading.current_thread()
+        call = MagicMock(side_effect=lambda: threading.current_thread() is caller)
+
+        try:
+            assert hedged_call(call, hedge_after=0.01, executor=executor) is True
+        finally:
+            release.set()
+        call.assert_called_once()
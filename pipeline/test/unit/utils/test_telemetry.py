@@ -0,0 +1,186 @@
+import json
+import pytest
+from unittest.mock import MagicMock, patch
+from opentelemetry.metrics import _internal as metrics_internal
+from opentelemetry.sdk.metrics.export import InMemoryMetricReader, MetricExportResult, PeriodicExportingMetricReader
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor, SpanExportResult
+from opentelemetry.util._once import Once
+from src.utils.telemetry import (
+    METRIC_READERS,
+    SPAN_EXPORTERS,
+    FileMetricExporter,
+    FileSpanExporter,
+    TelemetryError,
+    configure_tracing,
+    flush_telemetry,
+    register_metric_reader,
+    register_span_exporter
+)
+from src.utils.usage import record_usage
+
+
+class TestTelemetry:
+    """
+    Test suite for the telemetry module.
+    """
+
+    @pytest.fixture
+    def mock_logger(self) -> MagicMock:
+        """Fixture to patch the logger."""
+        with patch("src.utils.telemetry.logger") as mock_logger:
+            yield mock_logger
+
+    @pytest.fixture
+    def unconfigured(self):
+        """Fixture to reset the tracing configuration and patch the global tracer and meter providers."""
+        with patch("src.utils.telemetry._configured", False), \
+                patch("src.utils.telemetry._providers", []), \
+                patch("src.utils.telemetry.metrics.set_meter_provider"), \
+                patch("src.utils.telemetry.trace.set_tracer_provider") as mock_set_tracer_provider:
+            yield mock_set_tracer_provider
+
+    @pytest.fixture
+    def meter_provider_unset(self):
+        """Fixture allowing the global meter provider to be set again, as if it was never set."""
+        with patch("src.utils.telemetry._configured", False), \
+                patch.object(metrics_internal, "_METER_PROVIDER", None), \
+                patch.object(metrics_internal, "_METER_PROVIDER_SET_ONCE", Once()), \
+                patch("src.utils.telemetry._providers", []) as providers:
+            yield
+            for provider in providers:
+                provider.shutdown()
+
+    @staticmethod
+    def settings(exporter) -> MagicMock:
+        settings = MagicMock()
+        settings.telemetry_exporter = exporter
+        settings.telemetry_service_name = "test-service"
+        settings.telemetry_metric_export_interval = 60.0
+        return settings
+
+    def test_file_span_exporter(self, tmp_path):
+        """
+        Test that finished spans are appended to the file as JSON lines.
+        """
+        path = tmp_path / "spans.jsonl"
+        provider = TracerProvider()
+        provider.add_span_processor(SimpleSpanProcessor(FileSpanExporter(str(path))))
+        tracer = provider.get_tracer(__name__)
+
+        with tracer.start_as_current_span("parent"):
+            with tracer.start_as_current_span("child"):
+                pass
+
+        spans = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [span["name"] for span in spans] == ["child", "parent"]
+        assert spans[0]["context"]["trace_id"] == spans[1]["context"]["trace_id"]
+
+    def test_file_span_exporter_error(self, tmp_path, mock_logger: MagicMock):
+        """
+        Test that an unwritable file fails the export without raising.
+        """
+        exporter = FileSpanExporter(str(tmp_path / "missing" / "spans.jsonl"))
+        span = MagicMock()
+        span.to_json.return_value = "{}"
+
+        assert exporter.export([span]) == SpanExportResult.FAILURE
+        mock_logger.error.assert_called_once()
+
+    def test_configure_tracing_disabled(self, unconfigured: MagicMock, mock_logger: MagicMock):
+        """
+        Test that no tracer provider is installed without configured exporters.
+        """
+        configure_tracing(self.settings(None))
+
+        unconfigured.assert_not_called()
+
+    def test_configure_tracing(self, unconfigured: MagicMock, mock_logger: MagicMock):
+        """
+        Test that a registered exporter is installed, and that tracing is configured only once.
+        """
+        factory = MagicMock()
+        with patch.dict(SPAN_EXPORTERS):
+            register_span_exporter("custom", factory)
+            configure_tracing(self.settings("custom, console"))
+            configure_tracing(self.settings("custom"))
+
+        factory.assert_called_once()
+        unconfigured.assert_called_once()
+        provider = unconfigured.call_args.args[0]
+        assert provider.resource.attributes["service.name"] == "test-service"
+        assert [call.args[0] for call in mock_logger.info.call_args_list] == [
+            "Tracing configured with span exporters: custom, console",
+            "Metrics configured with metric exporters: console"
+        ]
+
+    def test_configure_tracing_unknown_exporter(self, unconfigured: MagicMock, mock_logger: MagicMock):
+        """
+        Test that an unknown exporter disables tracing with a single warning.
+        """
+        configure_tracing(self.settings("file,unknown"))
+        configure_tracing(self.settings("file,unknown"))
+
+        unconfigured.assert_not_called()
+        mock_logger.warning.assert_called_once_with("Tracing and metrics are disabled: Unknown telemetry exporters: unknown")
+
+    def test_configure_tracing_exporter_error(self, unconfigured: MagicMock, mock_logger: MagicMock):
+        """
+        Test that an exporter which cannot be created disables tracing.
+        """
+        factory = MagicMock(side_effect=TelemetryError("Missing package"))
+        with patch.dict(SPAN_EXPORTERS):
+            register_span_exporter("custom", factory)
+            configure_tracing(self.settings("console,custom"))
+
+        unconfigured.assert_not_called()
+        mock_logger.warning.assert_called_once_with("Tracing and metrics are disabled: Missing package")
+
+    def test_file_metric_exporter(self, tmp_path):
+        """Test that the collected metrics are appended to the file as JSON lines."""
+        path = tmp_path / "metrics.jsonl"
+        metrics_data = MagicMock()
+        metrics_data.to_json.return_value = '{"resource_metrics": []}'
+
+        assert FileMetricExporter(str(path)).export(metrics_data) == MetricExportResult.SUCCESS
+        assert [json.loads(line) for line in path.read_text().splitlines()] == [{"resource_metrics": []}]
+
+    def test_configure_tracing_exports_usage_metrics(self, meter_provider_unset, mock_logger: MagicMock):
+        """Test that the LLM usage metrics are recorded through the configured metric reader."""
+        reader = InMemoryMetricReader()
+        with patch.dict(METRIC_READERS), patch.dict(SPAN_EXPORTERS):
+            register_metric_reader("memory", lambda settings: reader)
+            configure_tracing(self.settings("memory"))
+
+        record_usage(
+            {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120},
+            "prompt", "completion", model="model", latency=1.5, task="metadata"
+        )
+
+        [resource_metrics] = reader.get_metrics_data().resource_metrics
+        assert resource_metrics.resource.attributes["service.name"] == "test-service"
+        recorded = {
+            metric.name: metric.data.data_points
+            for scope_metrics in resource_metrics.scope_metrics
+            for metric in scope_metrics.metrics
+        }
+        tokens = {point.attributes["llm.token.type"]: point.value for point in recorded["llm.tokens"]}
+        assert tokens == {"prompt": 100, "completion": 20}
+        [duration] = recorded["llm.request.duration"]
+        assert (duration.count, duration.sum) == (1, 1.5)
+        assert duration.attributes == {"llm.task": "metadata", "llm.model": "model"}
+
+    def test_flush_telemetry(self, meter_provider_unset, mock_logger: MagicMock):
+        """Test that flush_telemetry exports the metrics recorded so far."""
+        exporter = MagicMock(_preferred_temporality={}, _preferred_aggregation={})
+        exporter.export.return_value = MetricExportResult.SUCCESS
+        with patch.dict(METRIC_READERS), patch.dict(SPAN_EXPORTERS):
+            register_metric_reader("periodic", lambda settings: PeriodicExportingMetricReader(
+                exporter, export_interval_millis=3_600_000
+            ))
+            configure_tracing(self.settings("periodic"))
+
+        record_usage(None, "prompt", "completion", model="model", latency=0.5)
+        flush_telemetry()
+
+        exporter.export.assert_called()
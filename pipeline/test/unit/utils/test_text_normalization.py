@@ -0,0 +1,83 @@
+import pytest
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from src.utils.text_normalization import normalize_pages, normalize_text, repeated_edge_lines
+
+
+WORDS = ["alpha", "beta", "gamma", "delta", "epsilon"]
+
+
+def make_body(number: int) -> str:
+    return "\n".join(f"{word} {WORDS[number]} sentence" for word in WORDS)
+
+
+def make_page(number: int) -> str:
+    return f"Journal of Pipelines, Vol. 3\n{make_body(number)}\nPreprint submitted to arXiv\n{number}\n"
+
+
+class TestTextNormalization:
+    @pytest.fixture(autouse=True)
+    def mock_logger(self) -> Generator[MagicMock, None, None]:
+        with patch("src.utils.text_normalization.logger") as mock_logger:
+            yield mock_logger
+
+    def test_normalize_text(self) -> None:
+        """Test hyphenated line breaks are joined and whitespace collapsed, keeping line breaks."""
+        text = "Abstract\nWe study  extrac-\ntion\tpipelines.\n\n\n\nWell-known  Results-\nKeep"
+
+        assert normalize_text(text) == "Abstract\nWe study extraction pipelines.\n\nWell-known Results-\nKeep"
+
+    def test_repeated_edge_lines(self) -> None:
+        """Test lines repeated at the page edges are detected, ignoring their numbers."""
+        pages = [make_page(number).split("\n") for number in range(1, 5)]
+
+        assert repeated_edge_lines(pages) == {
+            "journal of pipelines, vol. #",
+            "preprint submitted to arxiv",
+            "#"
+        }
+
+    def test_repeated_edge_lines_short_documents(self) -> None:
+        """Test lines repeated on fewer than three pages are kept."""
+        pages = [make_page(number).split("\n") for number in range(1, 3)]
+
+        assert repeated_edge_lines(pages) == set()
+
+    def test_normalize_pages(self, mock_logger: MagicMock) -> None:
+        """Test running headers, footers and page numbers are stripped, except on the first page."""
+        pages = [make_page(number) for number in range(1, 5)]
+
+        result = normalize_pages(pages)
+
+        first_page = pages[0]
+        assert result.text == first_page + "".join(f"{make_body(number)}\n" for number in range(2, 5))
+        assert result.page_lengths == [len(first_page)] + [len(f"{make_body(number)}\n") for number in range(2, 5)]
+        assert result.removed_lines == 9
+        assert result.original_length == sum(len(page) for page in pages)
+        assert 0 < result.reduction < 1
+        assert mock_logger.info.call_args.args[1:3] == (result.original_length, len(result.text))
+
+    def test_normalize_pages_keeps_body_lines(self) -> None:
+        """Test repeated lines are only stripped at the page edges, and page numbers only alone."""
+        pages = [
+            "Title\nIntro",
+            "Header\nA\nB\nC\n12 results\nD\nE\nF\nHeader",
+            "Header\nG\nH\nI\nHeader\nJ\nK\nL\n3",
+            "Header\nM\nN\nO\nP"
+        ]
+
+        result = normalize_pages(pages)
+
+        assert result.text.split("\n") == [
+            "Title", "Intro",
+            "A", "B", "C", "12 results", "D", "E", "F",
+            "G", "H", "I", "Header", "J", "K", "L",
+            "M", "N", "O", "P", ""
+        ]
+
+    def test_normalize_pages_empty(self) -> None:
+        result = normalize_pages([])
+
+        assert result.text == ""
+        assert result.page_lengths == []
+        assert result.reduction == 0.0
@@ -0,0 +1,66 @@
+import pytest
+from typing import Generator
+from unittest.mock import patch
+from src.utils.tokens import (
+    TRUNCATION_MARKER,
+    count_tokens,
+    estimate_tokens,
+    fit_to_budget,
+    get_token_counter,
+    register_token_counter
+)
+
+
+class TestTokens:
+    @pytest.fixture(autouse=True)
+    def counters(self) -> Generator[dict, None, None]:
+        """Isolate the registered token counters, and count without `tiktoken`."""
+        with patch("src.utils.tokens._counters", {"": estimate_tokens}) as counters:
+            yield counters
+
+    @pytest.fixture
+    def text(self) -> str:
+        return " ".join(f"word{index}" for index in range(1000))
+
+    def test_estimate_tokens(self) -> None:
+        """Test tokens are estimated per word length and punctuation character."""
+        assert estimate_tokens("") == 0
+        assert estimate_tokens("The cat sat.") == 4
+        assert estimate_tokens("Transformers") == 3
+
+    def test_get_token_counter_longest_prefix(self) -> None:
+        """Test the registered counter with the longest matching model prefix is used."""
+        register_token_counter("meta/", lambda text: 1)
+        register_token_counter("meta/llama-3.1", lambda text: 2)
+
+        assert count_tokens("text", "meta/llama-3.1-405b-instruct-maas") == 2
+        assert count_tokens("text", "meta/llama-3.3-70b-instruct-maas") == 1
+        assert get_token_counter("other") is estimate_tokens
+        assert get_token_counter() is estimate_tokens
+
+    def test_fit_to_budget_within_budget(self, text: str) -> None:
+        """Test texts within the budget, or without a budget, are kept whole."""
+        for max_tokens in (None, 1990):
+            fitted = fit_to_budget(text, max_tokens)
+
+            assert fitted.text == text
+            assert not fitted.truncated
+            assert fitted.tokens == fitted.original_tokens == estimate_tokens(text) == 1990
+            assert fitted.dropped_tokens == 0
+
+    def test_fit_to_budget_truncates(self, text: str) -> None:
+        """Test over-budget texts keep their beginning and end, at word boundaries."""
+        fitted = fit_to_budget(text, 300)
+
+        assert fitted.truncated
+        assert fitted.tokens <= 300
+        assert fitted.original_tokens == 1990
+        assert fitted.dropped_tokens == 1990 - fitted.tokens
+        head, tail = fitted.text.split(TRUNCATION_MARKER)
+        assert head.startswith("word0 word1 ") and tail.endswith(" word999")
+        assert text.startswith(head) and text.endswith(tail)
+        assert len(head) > len(tail)
+
+    def test_fit_to_budget_deterministic(self, text: str) -> None:
+        """Test the same text and budget always produce the same output."""
+        assert fit_to_budget(text, 300) == fit_to_budget(text, 300)
@@ -0,0 +1,89 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from unittest.mock import MagicMock, patch
+from src.utils.usage import (
+    UsageRecord,
+    bind_paper_id,
+    current_usage_report,
+    record_usage,
+    track_usage
+)
+
+
+class TestUsage:
+    """
+    Test suite for the LLM usage accounting.
+    """
+
+    @pytest.fixture
+    def mock_logger(self) -> MagicMock:
+        """Fixture to patch the logger."""
+        with patch("src.utils.usage.logger") as mock_logger:
+            yield mock_logger
+
+    def test_record_from_response_usage(self):
+        """
+        Test that the token counts are read from the response usage block.
+        """
+        record = UsageRecord.from_response(
+            {"prompt_tokens": 120, "completion_tokens": 30, "total_tokens": 150},
+            "prompt",
+            "completion",
+            model="test_model",
+            latency=1.5
+        )
+
+        assert (record.prompt_tokens, record.completion_tokens, record.total_tokens) == (120, 30, 150)
+        assert record.estimated is False
+
+    def test_record_estimated_without_usage(self):
+        """
+        Test that the token counts are estimated when the response reports no usage.
+        """
+        record = UsageRecord.from_response(None, "x" * 400, "y" * 40, model="test_model", latency=0.1)
+
+        assert (record.prompt_tokens, record.completion_tokens, record.total_tokens) == (100, 10, 110)
+        assert record.estimated is True
+
+    def test_record_usage_outside_report(self, mock_logger: MagicMock):
+        """
+        Test that usage is recorded without an active usage report.
+        """
+        assert current_usage_report() is None
+
+        record = record_usage(None, "prompt", "completion", model="test_model", latency=0.2, task="metadata")
+
+        assert record.task == "metadata"
+        assert record.paper_id is None
+        mock_logger.info.assert_called_once()
+
+    def test_track_usage(self, mock_logger: MagicMock):
+        """
+        Test that the records of the run are attributed to the bound paper and aggregated,
+        including those recorded from threads inheriting the run context.
+        """
+        usage = {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}
+
+        def extract(task: str, paper_id: str) -> None:
+            with bind_paper_id(paper_id):
+                record_usage(usage, "prompt", "completion", model="test_model", latency=0.5, task=task)
+
+        with track_usage() as report:
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                futures = [
+                    executor.submit(copy_context().run, extract, task, paper_id)
+                    for task, paper_id in [("metadata", "paper_1"), ("summary", "paper_1"), ("metadata", "paper_2")]
+                ]
+                for future in futures:
+                    future.result()
+
+        assert current_usage_report() is None
+        assert len(report.records()) == 3
+        assert [record.task for record in report.records("paper_2")] == ["metadata"]
+
+        totals = report.totals()
+        assert (totals.requests, totals.prompt_tokens, totals.completion_tokens) == (3, 30, 6)
+        assert totals.latency == pytest.approx(1.5)
+        assert report.totals_by_task()["metadata"].requests == 2
+        assert report.totals_by_paper()["paper_1"].total_tokens == 24
@@ -1,8 +1,10 @@
+import json
 import pytest
 from unittest.mock import patch, MagicMock
-from requests.exceptions import RequestException
+from requests.exceptions import HTTPError, RequestException, Timeout
 from google.auth.exceptions import GoogleAuthError
 from typing import Generator
+from src.config import TaskModelSettings
 from src.utils.vertex_ai_llama_client import (
     get_credentials,
     get_token,
@@ -41,6 +43,16 @@ class TestVertexAILlama:
         """Fixture for mocked settings."""
         settings = MagicMock()
         settings.vertex_ai_llama_model = "test_model"
+        settings.vertex_ai_request_timeout = 30.0
+        settings.vertex_ai_max_retries = 2
+        settings.vertex_ai_retry_backoff_base = 0.0
+        settings.vertex_ai_retry_backoff_max = 0.0
+        settings.vertex_ai_hedge_percentile = None
+        settings.vertex_ai_hedge_max_workers = 16
+        settings.vertex_ai_stream = False
+        settings.vertex_ai_structured_output = False
+        settings.vertex_ai_task_models = {}
+        settings.vertex_ai_max_input_tokens = None
         return settings
 
     @pytest.fixture
@@ -169,3 +181,348 @@ class TestVertexAILlama:
 
         mock_logger.info.assert_any_call("Sending request to Vertex AI Llama API")
         mock_logger.info.assert_any_call("Retrieving Vertex AI access token")
+
+    def _http_error_response(self, status_code: int, retry_after: str = None) -> MagicMock:
+        """Build a mocked response whose raise_for_status raises an HTTPError."""
+        response = MagicMock()
+        response.status_code = status_code
+        response.headers = {"Retry-After": retry_after} if retry_after else {}
+        response.raise_for_status.side_effect = HTTPError(f"{status_code} Error", response=response)
+        return response
+
+    def test_vertex_ai_llama_request_retries_transient_errors(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test vertex_ai_llama_request retries timeouts and retryable status codes."""
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": "test_response"}}]
+        }
+        patch_requests_post.side_effect = [
+            Timeout("Read timed out"),
+            self._http_error_response(503),
+            mock_response
+        ]
+
+        with patch("src.utils.retry.time.sleep"):
+            response = vertex_ai_llama_request("test_prompt")
+
+        assert response == "test_response"
+        assert patch_requests_post.call_count == 3
+        assert patch_requests_post.call_args.kwargs["timeout"] == 30.0
+
+    def test_vertex_ai_llama_request_honours_retry_after(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock,
+        settings: MagicMock
+    ):
+        """Test vertex_ai_llama_request waits for the Retry-After delay on rate limiting."""
+        settings.vertex_ai_retry_backoff_max = 10.0
+        mock_response = MagicMock()
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": "test_response"}}]
+        }
+        patch_requests_post.side_effect = [self._http_error_response(429, "3"), mock_response]
+
+        with patch("src.utils.retry.time.sleep") as mock_sleep:
+            assert vertex_ai_llama_request("test_prompt") == "test_response"
+
+        delay = mock_sleep.call_args.args[0]
+        assert delay >= 3.0
+
+    def test_vertex_ai_llama_request_retries_exhausted(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test vertex_ai_llama_request raises VertexAILlamaError once retries are exhausted."""
+        patch_requests_post.side_effect = Timeout("Read timed out")
+
+        with patch("src.utils.retry.time.sleep"), \
+                pytest.raises(VertexAILlamaError, match="HTTP request failed: Read timed out"):
+            vertex_ai_llama_request("test_prompt")
+
+        assert patch_requests_post.call_count == 3
+
+    def test_vertex_ai_llama_request_does_not_retry_client_errors(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test vertex_ai_llama_request fails fast on non-retryable HTTP errors."""
+        patch_requests_post.return_value = self._http_error_response(400)
+
+        with pytest.raises(VertexAILlamaError, match="HTTP request failed: 400 Error"):
+            vertex_ai_llama_request("test_prompt")
+
+        patch_requests_post.assert_called_once()
+
+    def _sse_response(self, chunks: list) -> MagicMock:
+        """Build a mocked streaming response emitting the given content chunks as SSE lines."""
+        lines = []
+        for chunk in chunks:
+            lines.append(json.dumps({"choices": [{"delta": {"content": chunk}}]}))
+            lines.append("")
+        response = MagicMock()
+        response.iter_lines.return_value = iter([f"data: {line}" if line else line for line in lines] + ["data: [DONE]"])
+        return response
+
+    def test_vertex_ai_llama_request_stream(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test streaming mode returns as soon as the JSON object is complete."""
+        mock_response = self._sse_response(['```json\n{"title": "A {', 'brace}"', '}\n```', "\nHope this helps!"])
+        patch_requests_post.return_value = mock_response
+
+        response = vertex_ai_llama_request("test_prompt", stream=True)
+
+        assert response == '{"title": "A {brace}"}'
+        _, kwargs = patch_requests_post.call_args
+        assert kwargs["stream"] is True
+        assert kwargs["json"]["stream"] is True
+        assert kwargs["json"]["stream_options"] == {"include_usage": True}
+        mock_response.close.assert_called_once()
+        mock_logger.info.assert_any_call("JSON object complete, closing Vertex AI Llama API stream")
+
+    def test_vertex_ai_llama_request_stream_from_settings(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock,
+        settings: MagicMock
+    ):
+        """Test streaming mode is enabled through the settings."""
+        settings.vertex_ai_stream = True
+        patch_requests_post.return_value = self._sse_response(['{"summary": "text"}'])
+
+        assert vertex_ai_llama_request("test_prompt") == '{"summary": "text"}'
+
+    def test_vertex_ai_llama_request_stream_without_json(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test the whole content is returned when the stream holds no complete JSON object."""
+        patch_requests_post.return_value = self._sse_response(["I could not ", "find the data."])
+
+        assert vertex_ai_llama_request("test_prompt", stream=True) == "I could not find the data."
+
+    @pytest.mark.parametrize("structured_output", [True, False])
+    def test_vertex_ai_llama_request_response_format(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock,
+        settings: MagicMock,
+        structured_output: bool
+    ):
+        """Test the response_format is only sent when structured output is enabled."""
+        settings.vertex_ai_structured_output = structured_output
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"choices": [{"message": {"content": "{}"}}]}
+        patch_requests_post.return_value = mock_response
+        response_format = {"type": "json_schema", "json_schema": {"name": "test", "schema": {}}}
+
+        vertex_ai_llama_request("test_prompt", response_format=response_format)
+
+        payload = patch_requests_post.call_args.kwargs["json"]
+        if structured_output:
+            assert payload["response_format"] == response_format
+        else:
+            assert "response_format" not in payload
+
+    def test_vertex_ai_llama_request_records_usage(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test the response usage block is recorded and attributed to the task."""
+        mock_response = MagicMock()
+        usage = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+        mock_response.json.return_value = {
+            "choices": [{"message": {"content": "test_response"}}],
+            "usage": usage
+        }
+        patch_requests_post.return_value = mock_response
+
+        with patch("src.utils.vertex_ai_llama_client.record_usage") as mock_record_usage:
+            vertex_ai_llama_request("test_prompt", task="metadata")
+
+        args, kwargs = mock_record_usage.call_args
+        assert args == (usage, "test_prompt", "test_response")
+        assert kwargs["model"] == "test_model"
+        assert kwargs["task"] == "metadata"
+        assert kwargs["latency"] >= 0
+
+    def test_vertex_ai_llama_request_records_discarded_hedge_usage(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test the usage of a hedged request that lost the race is recorded too."""
+        winner = {"prompt_tokens": 100, "completion_tokens": 20, "total_tokens": 120}
+        loser = {"prompt_tokens": 100, "completion_tokens": 25, "total_tokens": 125}
+
+        def call_with_retry(call, policy, latency_tracker, on_discard):
+            on_discard(("slow_response", loser))
+            return "test_response", winner
+
+        with patch("src.utils.vertex_ai_llama_client.call_with_retry", side_effect=call_with_retry), \
+                patch("src.utils.vertex_ai_llama_client.record_usage") as mock_record_usage:
+            assert vertex_ai_llama_request("test_prompt", task="metadata") == "test_response"
+
+        assert [call.args for call in mock_record_usage.call_args_list] == [
+            (loser, "test_prompt", "slow_response"),
+            (winner, "test_prompt", "test_response")
+        ]
+
+    def test_vertex_ai_llama_request_stream_records_usage(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock
+    ):
+        """Test the usage block of the final stream chunk is recorded."""
+        usage = {"prompt_tokens": 50, "completion_tokens": 5, "total_tokens": 55}
+        mock_response = MagicMock()
+        mock_response.iter_lines.return_value = iter([
+            "data: " + json.dumps({"choices": [{"delta": {"content": "no json"}}]}),
+            "data: " + json.dumps({"choices": [], "usage": usage}),
+            "data: [DONE]"
+        ])
+        patch_requests_post.return_value = mock_response
+
+        with patch("src.utils.vertex_ai_llama_client.record_usage") as mock_record_usage:
+            assert vertex_ai_llama_request("test_prompt", stream=True, task="summary") == "no json"
+
+        assert mock_record_usage.call_args.args == (usage, "test_prompt", "no json")
+
+    def test_vertex_ai_llama_request_routes_task_model(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock,
+        settings: MagicMock
+    ):
+        """Test the request is sent to the model and generation parameters routed for its task."""
+        settings.vertex_ai_task_models = {
+            "metadata": TaskModelSettings(model="small_model", max_tokens=512, temperature=0.0)
+        }
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"choices": [{"message": {"content": "{}"}}]}
+        patch_requests_post.return_value = mock_response
+
+        with patch("src.utils.vertex_ai_llama_client.record_usage") as mock_record_usage:
+            vertex_ai_llama_request("test_prompt", task="metadata", text="x" * 100)
+            vertex_ai_llama_request("test_prompt", task="summary_and_keywords", text="x" * 100)
+
+        first, second = [call.kwargs["json"] for call in patch_requests_post.call_args_list]
+        assert first["model"] == "small_model"
+        assert first["max_tokens"] == 512
+        assert first["temperature"] == 0.0
+        assert second["model"] == "test_model"
+        assert "max_tokens" not in second and "temperature" not in second
+        assert mock_record_usage.call_args_list[0].kwargs["model"] == "small_model"
+
+    def test_vertex_ai_llama_request_truncates_text_over_budget(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock,
+        settings: MagicMock
+    ):
+        """Test the input text is fitted to the token budget of its task, and the truncation recorded."""
+        settings.vertex_ai_task_models = {"metadata": TaskModelSettings(max_input_tokens=50)}
+        text = " ".join(f"word{index}" for index in range(200))
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"choices": [{"message": {"content": "{}"}}]}
+        patch_requests_post.return_value = mock_response
+
+        with patch("src.utils.vertex_ai_llama_client.record_usage") as mock_record_usage:
+            vertex_ai_llama_request(f"Text: {text}", task="metadata", text=text)
+
+        prompt = patch_requests_post.call_args.kwargs["json"]["messages"][0]["content"]
+        assert prompt.startswith("Text: word0 word1")
+        assert "[...]" in prompt and prompt.endswith("word199")
+        assert mock_record_usage.call_args.kwargs["truncated_tokens"] > 0
+        mock_logger.warning.assert_called_once()
+
+    def test_vertex_ai_llama_request_truncates_text_once(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock,
+        settings: MagicMock
+    ):
+        """Test the extraction tasks sharing a model send the paper text truncated the same way."""
+        settings.vertex_ai_max_input_tokens = 100
+        settings.vertex_ai_task_models = {"metadata": TaskModelSettings(max_input_tokens=50)}
+        text = " ".join(f"word{index}" for index in range(200))
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"choices": [{"message": {"content": "{}"}}]}
+        patch_requests_post.return_value = mock_response
+
+        with patch("src.utils.vertex_ai_llama_client.record_usage"):
+            for task in ("metadata", "summary_and_keywords"):
+                vertex_ai_llama_request(
+                    [{"role": "user", "content": text}, {"role": "user", "content": task}],
+                    task=task,
+                    text=text
+                )
+
+        first, second = [call.kwargs["json"]["messages"][0] for call in patch_requests_post.call_args_list]
+        assert first == second and "[...]" in first["content"]
+
+    def test_vertex_ai_llama_request_messages(
+        self,
+        patch_get_credentials: MagicMock,
+        patch_settings: MagicMock,
+        patch_requests_post: MagicMock,
+        mock_logger: MagicMock,
+        settings: MagicMock
+    ):
+        """Test chat messages are sent as given, with the input text fitted in the message holding it."""
+        settings.vertex_ai_max_input_tokens = 50
+        text = " ".join(f"word{index}" for index in range(200))
+        messages = [
+            {"role": "system", "content": "system"},
+            {"role": "user", "content": f"Text: {text}"},
+            {"role": "user", "content": "instructions"}
+        ]
+        mock_response = MagicMock()
+        mock_response.json.return_value = {"choices": [{"message": {"content": "{}"}}]}
+        patch_requests_post.return_value = mock_response
+
+        with patch("src.utils.vertex_ai_llama_client.record_usage"):
+            vertex_ai_llama_request(messages, text=text)
+
+        sent = patch_requests_post.call_args.kwargs["json"]["messages"]
+        assert [message["role"] for message in sent] == ["system", "user", "user"]
+        assert sent[0] == messages[0] and sent[2] == messages[2]
+        assert sent[1]["content"].startswith("Text: word0") and "[...]" in sent[1]["content"]
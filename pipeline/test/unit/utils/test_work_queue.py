@@ -0,0 +1,184 @@
+import base64
+import json
+import pytest
+import requests
+from typing import Generator
+from unittest.mock import MagicMock, patch
+from src.utils.work_queue import PubSubWorkQueue, SQLiteWorkQueue, WorkQueueError, get_work_queue
+
+
+class TestSQLiteWorkQueue:
+    def test_pull_and_ack(self):
+        """Test messages are pulled in order, leased, and removed once acknowledged."""
+        queue = SQLiteWorkQueue()
+        queue.publish(["a.pdf", "b.pdf", "c.pdf"])
+
+        first = queue.pull(2)
+        second = queue.pull(2)
+
+        assert [message.file_name for message in first] == ["a.pdf", "b.pdf"]
+        assert [message.file_name for message in second] == ["c.pdf"]
+        assert queue.pull(2) == []
+        queue.ack([message.ack_id for message in first + second])
+        assert len(queue) == 0
+
+    def test_nack(self):
+        """Test a negatively acknowledged message is delivered again, with its attempts counted."""
+        queue = SQLiteWorkQueue()
+        queue.publish(["a.pdf"])
+
+        [message] = queue.pull(1)
+        queue.nack([message.ack_id])
+        [redelivered] = queue.pull(1)
+
+        assert redelivered.file_name == "a.pdf"
+        assert redelivered.attempts == 2
+        assert redelivered.ack_id != message.ack_id
+
+    def test_expired_lease(self):
+        """Test a message whose lease expired is delivered again, and its old ack ID is stale."""
+        queue = SQLiteWorkQueue(lease_seconds=0)
+        queue.publish(["a.pdf"])
+
+        [message] = queue.pull(1)
+        [redelivered] = queue.pull(1)
+        queue.ack([message.ack_id])
+
+        assert len(queue) == 1
+        queue.ack([redelivered.ack_id])
+        assert len(queue) == 0
+
+    def test_extend(self):
+        """Test a message whose lease is extended is not delivered again."""
+        queue = SQLiteWorkQueue(lease_seconds=0)
+        queue.publish(["a.pdf"])
+
+        [message] = queue.pull(1)
+        queue.extend([message.ack_id], 60)
+
+        assert queue.pull(1) == []
+
+    def test_persistence(self, tmp_path):
+        """Test the messages are kept in the database file."""
+        path = str(tmp_path / "queue.sqlite3")
+        SQLiteWorkQueue(path).publish(["a.pdf"])
+
+        assert [message.file_name for message in SQLiteWorkQueue(path).pull(1)] == ["a.pdf"]
+
+
+class TestPubSubWorkQueue:
+    @pytest.fixture
+    def settings(self) -> MagicMock:
+        settings = MagicMock()
+        settings.work_queue_subscription = "papers"
+        settings.vertex_ai_request_timeout = 10.0
+        settings.text_cache_prefix = "text-cache"
+        settings.batch_prediction_prefix = "batch-prediction"
+        return settings
+
+    @pytest.fixture
+    def mock_post(self) -> Generator[MagicMock, None, None]:
+        with patch("src.utils.work_queue.get_token", return_value="token"), \
+                patch("src.utils.work_queue.get_project_id", return_value="project"), \
+                patch("src.utils.work_queue.logger"), \
+                patch("src.utils.work_queue.requests.post") as mock_post:
+            yield mock_post
+
+    def test_pull(self, mock_post: MagicMock, settings: MagicMock):
+        """Test the file names are read from the notifications, and other events acknowledged."""
+        data = base64.b64encode(json.dumps({"name": "papers/b.pdf"}).encode()).decode()
+        mock_post.return_value.json.side_effect = [
+            {"receivedMessages": [
+                {"ackId": "1", "message": {"attributes": {"eventType": "OBJECT_FINALIZE", "objectId": "papers/a.pdf"}}},
+                {"ackId": "2", "message": {"data": data}, "deliveryAttempt": 3},
+                {"ackId": "3", "message": {"attributes": {"eventType": "OBJECT_DELETE", "objectId": "papers/c.pdf"}}},
+            ]},
+            {}
+        ]
+
+        messages = PubSubWorkQueue(settings).pull(10)
+
+        assert [(message.ack_id, message.file_name, message.attempts) for message in messages] == [
+            ("1", "papers/a.pdf", 1), ("2", "papers/b.pdf", 3)
+        ]
+        pull, ack = mock_post.call_args_list
+        assert pull.args[0] == "https://pubsub.googleapis.com/v1/projects/project/subscriptions/papers:pull"
+        assert pull.kwargs["json"] == {"maxMessages": 10, "returnImmediately": True}
+        assert ack.args[0].endswith(":acknowledge")
+        assert ack.kwargs["json"] == {"ackIds": ["3"]}
+
+    def test_pull_ignores_other_objects(self, mock_post: MagicMock, settings: MagicMock):
+        """Test the notifications of objects which are not papers are acknowledged, and not returned."""
+        mock_post.return_value.json.side_effect = [
+            {"receivedMessages": [
+                {"ackId": "1", "message": {"attributes": {"objectId": "papers/a.pdf"}}},
+                {"ackId": "2", "message": {"attributes": {"objectId": "papers/a.json"}}},
+                {"ackId": "3", "message": {"attributes": {"objectId": "text-cache/a.pdf"}}},
+                {"ackId": "4", "message": {"attributes": {"objectId": "batch-prediction/1/input.jsonl"}}},
+            ]},
+            {}
+        ]
+
+        messages = PubSubWorkQueue(settings).pull(10)
+
+        assert [message.file_name for message in messages] == ["papers/a.pdf"]
+        assert mock_post.call_args_list[1].kwargs["json"] == {"ackIds": ["2", "3", "4"]}
+
+    def test_pull_counts_deliveries(self, mock_post: MagicMock, settings: MagicMock):
+        """Test the deliveries are counted by message ID when Pub/Sub does not report them."""
+        def received(ack_id):
+            return {"receivedMessages": [{"ackId": ack_id, "message": {
+                "messageId": "m1", "attributes": {"objectId": "papers/a.pdf"}
+            }}]}
+        mock_post.return_value.json.side_effect = [received("1"), {}, received("2"), {}, received("3")]
+        queue = PubSubWorkQueue(settings)
+
+        [first] = queue.pull(1)
+        queue.nack([first.ack_id])
+        [second] = queue.pull(1)
+        queue.ack([second.ack_id])
+        [third] = queue.pull(1)
+
+        assert (first.attempts, second.attempts, third.attempts) == (1, 2, 1)
+
+    def test_nack(self, mock_post: MagicMock, settings: MagicMock):
+        """Test negative acknowledgements reset the ack deadline."""
+        settings.work_queue_subscription = "projects/other/subscriptions/papers"
+
+        PubSubWorkQueue(settings).nack(["1", "2"])
+
+        assert mock_post.call_args.args[0] == "https://pubsub.googleapis.com/v1/projects/other/subscriptions/papers:modifyAckDeadline"
+        assert mock_post.call_args.kwargs["json"] == {"ackIds": ["1", "2"], "ackDeadlineSeconds": 0}
+
+    def test_extend(self, mock_post: MagicMock, settings: MagicMock):
+        """Test lease extensions modify the ack deadline."""
+        PubSubWorkQueue(settings).extend(["1", "2"], 60.0)
+
+        assert mock_post.call_args.args[0].endswith(":modifyAckDeadline")
+        assert mock_post.call_args.kwargs["json"] == {"ackIds": ["1", "2"], "ackDeadlineSeconds": 60}
+
+    def test_request_error(self, mock_post: MagicMock, settings: MagicMock):
+        """Test request errors are raised as WorkQueueError."""
+        mock_post.side_effect = requests.exceptions.ConnectionError("Connection refused")
+
+        with pytest.raises(WorkQueueError, match="Connection refused"):
+            PubSubWorkQueue(settings).ack(["1"])
+
+    def test_subscription_required(self, settings: MagicMock):
+        """Test the subscription setting is required."""
+        settings.work_queue_subscription = None
+
+        with pytest.raises(WorkQueueError, match="work_queue_subscription"):
+            PubSubWorkQueue(settings)
+
+
+def test_get_work_queue():
+    """Test the configured queue is built, and unknown queues are rejected."""
+    settings = MagicMock()
+    settings.work_queue = "sqlite"
+    settings.work_queue_path = ":memory:"
+    assert isinstance(get_work_queue(settings), SQLiteWorkQueue)
+
+    settings.work_queue = "unknown"
+    with pytest.raises(WorkQueueError, match="Unknown work queue"):
+        get_work_queue(settings)
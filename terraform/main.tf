@@ -1,8 +1,9 @@
 module "storage" {
-  source      = "./modules/storage"
-  bucket_name = "${var.bucket_name}-${var.project_id}"
-  project_id  = var.project_id
-  region      = var.region
+  source            = "./modules/storage"
+  bucket_name       = "${var.bucket_name}-${var.project_id}"
+  batch_bucket_name = "${var.bucket_name}-batch-${var.project_id}"
+  project_id        = var.project_id
+  region            = var.region
 }
 
 module "bigquery" {
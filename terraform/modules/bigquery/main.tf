@@ -38,6 +38,28 @@ resource "google_bigquery_table" "research_papers" {
     "name": "publication_date",
     "type": "DATE",
     "mode": "NULLABLE"
+  },
+  {
+    "name": "field_status",
+    "type": "RECORD",
+    "mode": "REPEATED",
+    "fields": [
+      {
+        "name": "field",
+        "type": "STRING",
+        "mode": "REQUIRED"
+      },
+      {
+        "name": "status",
+        "type": "STRING",
+        "mode": "REQUIRED"
+      }
+    ]
+  },
+  {
+    "name": "duplicate_of",
+    "type": "STRING",
+    "mode": "NULLABLE"
   }
 ]
 EOF
@@ -142,3 +164,63 @@ resource "google_bigquery_table" "key_research_findings" {
 ]
 EOF
 }
+
+resource "google_bigquery_table" "llm_usage" {
+  dataset_id = google_bigquery_dataset.research_papers_dataset.dataset_id
+  table_id   = "llm_usage"
+
+  schema = <<EOF
+[
+  {
+    "name": "paper_id",
+    "type": "STRING",
+    "mode": "REQUIRED"
+  },
+  {
+    "name": "task",
+    "type": "STRING",
+    "mode": "NULLABLE"
+  },
+  {
+    "name": "model",
+    "type": "STRING",
+    "mode": "REQUIRED"
+  },
+  {
+    "name": "prompt_tokens",
+    "type": "INTEGER",
+    "mode": "REQUIRED"
+  },
+  {
+    "name": "completion_tokens",
+    "type": "INTEGER",
+    "mode": "REQUIRED"
+  },
+  {
+    "name": "total_tokens",
+    "type": "INTEGER",
+    "mode": "REQUIRED"
+  },
+  {
+    "name": "latency",
+    "type": "FLOAT",
+    "mode": "REQUIRED"
+  },
+  {
+    "name": "estimated",
+    "type": "BOOLEAN",
+    "mode": "REQUIRED"
+  },
+  {
+    "name": "truncated_tokens",
+    "type": "INTEGER",
+    "mode": "REQUIRED"
+  },
+  {
+    "name": "created_at",
+    "type": "TIMESTAMP",
+    "mode": "REQUIRED"
+  }
+]
+EOF
+}
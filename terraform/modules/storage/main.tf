@@ -4,6 +4,15 @@ resource "google_storage_bucket" "event_bucket" {
   force_destroy = true
 }
 
+# Bucket of the backfill batch prediction inputs and outputs, kept apart from the event bucket
+# so that they do not trigger the pipeline.
+
+resource "google_storage_bucket" "batch_bucket" {
+  name          = var.batch_bucket_name
+  location      = var.region
+  force_destroy = true
+}
+
 # Use the same bucket to upload a hello world function.
 # This is needed to successfully create a Cloud Function via Terraform.
 
@@ -1,3 +1,7 @@
 output "function_archive_object" {
   value = google_storage_bucket_object.function_archive
 }
+
+output "batch_bucket_name" {
+  value = google_storage_bucket.batch_bucket.name
+}
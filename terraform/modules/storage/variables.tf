@@ -3,6 +3,11 @@ variable "bucket_name" {
   type        = string
 }
 
+variable "batch_bucket_name" {
+  description = "Name of the GCS bucket of the batch prediction jobs"
+  type        = string
+}
+
 variable "project_id" {
   description = "GCP Project ID"
   type        = string